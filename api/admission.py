@@ -0,0 +1,165 @@
+"""
+Admission control
+Per-endpoint concurrency limits and bounded queues, with fast rejection when full
+"""
+
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from api.config import (
+    SCORING_MAX_CONCURRENCY,
+    SCORING_MAX_QUEUE,
+    BATCH_MAX_CONCURRENCY,
+    BATCH_MAX_QUEUE,
+    EXPLAIN_MAX_CONCURRENCY,
+    EXPLAIN_MAX_QUEUE,
+    ADMISSION_RETRY_AFTER
+)
+from api.metrics import REGISTRY
+from api.scheduler import INTERACTIVE, BULK, EXPLAIN, peek_queue_depths
+
+logger = logging.getLogger(__name__)
+
+# Endpoint classes share their names with the scheduler priority classes
+SCORING = INTERACTIVE
+BATCH = BULK
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when an endpoint class has no free slot nor queue space"""
+
+    def __init__(self, endpoint_class: str, retry_after: int):
+        super().__init__(f"Too many concurrent {endpoint_class} requests, retry later")
+        self.endpoint_class = endpoint_class
+        self.retry_after = retry_after
+
+
+_admitted = REGISTRY.counter(
+    "admission_admitted_total",
+    "Requests admitted, by endpoint class",
+    ("endpoint_class",)
+)
+_rejected = REGISTRY.counter(
+    "admission_rejected_total",
+    "Requests rejected because the queue was full, by endpoint class",
+    ("endpoint_class",)
+)
+
+
+class EndpointLimiter:
+    """
+    Bound on the number of in-flight requests for one class of endpoints
+
+    Up to `max_concurrency + max_queue` requests are admitted at once;
+    their work is executed by the shared inference scheduler, which runs
+    at most `max_concurrency` tasks of the class simultaneously. Anything
+    beyond the bound is rejected immediately instead of piling up.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, retry_after: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        """Admitted requests not yet completed"""
+        return self._in_flight
+
+    def _admit(self) -> None:
+        """Reserve a slot or raise AdmissionRejectedError"""
+        with self._lock:
+            if self._in_flight >= self.max_concurrency + self.max_queue:
+                _rejected.inc(self.name)
+                raise AdmissionRejectedError(self.name, self.retry_after)
+            self._in_flight += 1
+        _admitted.inc(self.name)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        Hold an admission slot for the duration of a request
+
+        Raises
+        ------
+        AdmissionRejectedError
+            If the limiter is full
+        """
+        self._admit()
+        try:
+            yield
+        finally:
+            self._release()
+
+
+class AdmissionController:
+    """
+    Admission limiters for the scoring, batch and explanation endpoints
+    """
+
+    def __init__(self, retry_after: int = ADMISSION_RETRY_AFTER):
+        self.limiters: Dict[str, EndpointLimiter] = {
+            SCORING: EndpointLimiter(SCORING, SCORING_MAX_CONCURRENCY, SCORING_MAX_QUEUE, retry_after),
+            BATCH: EndpointLimiter(BATCH, BATCH_MAX_CONCURRENCY, BATCH_MAX_QUEUE, retry_after),
+            EXPLAIN: EndpointLimiter(EXPLAIN, EXPLAIN_MAX_CONCURRENCY, EXPLAIN_MAX_QUEUE, retry_after)
+        }
+
+    def admit(self, endpoint_class: str):
+        """Async context manager holding an admission slot of an endpoint class"""
+        return self.limiters[endpoint_class].admit()
+
+    def stats(self) -> Dict[str, int]:
+        """Admitted in-flight requests per endpoint class"""
+        return {name: limiter.in_flight for name, limiter in self.limiters.items()}
+
+
+# Global admission controller instance
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """
+    Get or create the global admission controller
+
+    Returns
+    -------
+    AdmissionController
+        The admission controller instance
+    """
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController()
+    return _controller
+
+
+def _in_flight() -> Dict:
+    if _controller is None:
+        return {}
+    return {(name,): count for name, count in _controller.stats().items()}
+
+
+def _queue_depths() -> Dict:
+    return {(name,): depth for name, depth in peek_queue_depths().items()}
+
+
+REGISTRY.gauge(
+    "admission_in_flight",
+    "Admitted requests not yet completed, by endpoint class",
+    ("endpoint_class",),
+    function=_in_flight
+)
+REGISTRY.gauge(
+    "admission_queue_depth",
+    "Tasks waiting for an inference thread, by endpoint class",
+    ("endpoint_class",),
+    function=_queue_depths
+)
@@ -0,0 +1,466 @@
+"""
+Native artifact bundle
+Exports the pickled scoring pipeline to native, memory-mappable files and
+scores from them without importing sklearn or LightGBM at startup
+
+Usage:
+    python -m api.artifacts export [--output model_bundle]
+"""
+
+import argparse
+import json
+import logging
+import pickle
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from api.config import (
+    ARTIFACT_BUNDLE_DIR,
+    MODEL_PATH,
+    FEATURE_NAMES_PATH,
+    LOG_LEVEL
+)
+from api.manifest import file_digest
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+MODEL_FILE = "model.txt"
+FEATURE_NAMES_FILE = "feature_names.json"
+
+# Flattened tree arrays, one row per tree and one column per node
+TREE_ARRAYS = ("split_feature", "threshold", "left", "right", "default_left", "missing_type", "value")
+
+# LightGBM missing value handling (include/LightGBM/tree.h)
+_MISSING_NONE = 0
+_MISSING_ZERO = 1
+_MISSING_NAN = 2
+_MISSING_TYPES = {"None": _MISSING_NONE, "Zero": _MISSING_ZERO, "NaN": _MISSING_NAN}
+_ZERO_THRESHOLD = 1e-35
+
+# Rows traversed at once, bounding the (rows x trees) work arrays
+_ROW_BLOCK = 256
+
+
+class NativeModel:
+    """
+    Scaler + gradient boosted trees evaluated with numpy
+
+    Drop-in replacement for the (MinMaxScaler, LGBMClassifier) pipeline's
+    `predict_proba`, reproducing LightGBM's numerical split decisions and
+    missing value handling. All trees are traversed level by level at once,
+    on flat node arrays indexed by `tree * nodes_per_tree + node`.
+    """
+
+    def __init__(
+        self,
+        trees: Dict[str, np.ndarray],
+        scale: np.ndarray,
+        offset: np.ndarray,
+        max_depth: int,
+        sigmoid: float = 1.0,
+        clip: Optional[Tuple[float, float]] = None,
+        data_min: Optional[np.ndarray] = None,
+        data_max: Optional[np.ndarray] = None
+    ):
+        self.num_trees, nodes_per_tree = trees["value"].shape
+        # Views on the (possibly memory-mapped) arrays, no copy
+        self.split_feature = trees["split_feature"].reshape(-1)
+        self.threshold = trees["threshold"].reshape(-1)
+        self.left = trees["left"].reshape(-1)
+        self.right = trees["right"].reshape(-1)
+        self.value = trees["value"].reshape(-1)
+        self.default_left = trees["default_left"].reshape(-1)
+        self.missing_type = trees["missing_type"].reshape(-1)
+        # Direction of a NaN value: its default direction for NaN and Zero
+        # missing types, otherwise the direction of 0.0
+        self.nan_left = np.where(
+            self.missing_type == _MISSING_NONE, 0.0 <= self.threshold, self.default_left
+        )
+        self.has_zero_missing = bool(np.any(self.missing_type == _MISSING_ZERO))
+        self.scale = scale
+        self.offset = offset
+        self.sigmoid = sigmoid
+        self.clip = clip
+        # Training range of each feature (the scaler's data_min_/data_max_),
+        # None for bundles exported without it
+        self.data_min = data_min
+        self.data_max = data_max
+        self.num_features = scale.shape[0]
+        self.max_depth = max_depth
+        self._tree_base = np.arange(self.num_trees, dtype=np.int64) * nodes_per_tree
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the model arrays (mapped pages are shared between processes)"""
+        arrays = (
+            self.split_feature, self.threshold, self.left, self.right, self.value,
+            self.default_left, self.missing_type, self.nan_left, self.scale, self.offset
+        )
+        return int(sum(array.nbytes for array in arrays))
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """
+        Apply the MinMaxScaler step
+
+        float32 input stays float32, rounded after each operation like
+        sklearn's in-place scaling; anything else is scaled in float64.
+        """
+        X = np.asarray(X)
+        dtype = np.float32 if X.dtype == np.float32 else np.float64
+        X = np.multiply(X, self.scale, out=np.empty(X.shape, dtype=dtype))
+        np.add(X, self.offset, out=X)
+        if self.clip is not None:
+            np.clip(X, self.clip[0], self.clip[1], out=X)
+        return X
+
+    def _raw_block(self, X: np.ndarray) -> np.ndarray:
+        n_rows = X.shape[0]
+        row_base = (np.arange(n_rows, dtype=np.int64) * X.shape[1])[:, None]
+        values = np.ascontiguousarray(X).reshape(-1)
+        index = np.broadcast_to(self._tree_base, (n_rows, self.num_trees))
+        for _ in range(self.max_depth):
+            x = values.take(row_base + self.split_feature.take(index))
+            go_left = x <= self.threshold.take(index)
+            is_nan = np.isnan(x)
+            if is_nan.any():
+                go_left[is_nan] = self.nan_left.take(index[is_nan])
+            if self.has_zero_missing:
+                zero = (np.abs(x) <= _ZERO_THRESHOLD) & (self.missing_type.take(index) == _MISSING_ZERO)
+                go_left[zero] = self.default_left.take(index[zero])
+            index = self._tree_base + np.where(go_left, self.left.take(index), self.right.take(index))
+        return self.value.take(index).sum(axis=1)
+
+    def predict_raw(self, X: np.ndarray) -> np.ndarray:
+        """
+        Raw boosting scores (log-odds) for scaled features
+
+        Parameters
+        ----------
+        X : np.ndarray
+            Scaled features matrix of shape (n_rows, n_features)
+
+        Returns
+        -------
+        np.ndarray
+            Raw scores of shape (n_rows,)
+        """
+        if X.shape[0] == 0:
+            return np.empty(0)
+        return np.concatenate([
+            self._raw_block(X[start:start + _ROW_BLOCK])
+            for start in range(0, X.shape[0], _ROW_BLOCK)
+        ])
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities, as returned by the sklearn pipeline
+
+        Parameters
+        ----------
+        X : np.ndarray
+            Raw features matrix of shape (n_rows, n_features)
+
+        Returns
+        -------
+        np.ndarray
+            Probabilities of shape (n_rows, 2): [no default, default]
+        """
+        proba_default = 1.0 / (1.0 + np.exp(-self.sigmoid * self.predict_raw(self.transform(X))))
+        return np.column_stack([1.0 - proba_default, proba_default])
+
+
+def _flatten_trees(tree_info: List[dict]) -> Tuple[Dict[str, np.ndarray], int]:
+    """
+    Flatten LightGBM's JSON tree dump into padded per-node arrays
+
+    Leaves point to themselves so that every tree can be traversed for
+    the same number of levels.
+
+    Returns
+    -------
+    Tuple[Dict[str, np.ndarray], int]
+        Arrays of shape (n_trees, max_nodes) and the maximum tree depth
+    """
+    flat = []
+    max_depth = 0
+    for info in tree_info:
+        nodes = []
+
+        def _visit(tree: dict, depth: int = 0) -> int:
+            nonlocal max_depth
+            max_depth = max(max_depth, depth)
+            index = len(nodes)
+            nodes.append(None)
+            if "leaf_value" in tree:
+                nodes[index] = (0, 0.0, index, index, False, _MISSING_NONE, tree["leaf_value"])
+                return index
+            if tree["decision_type"] != "<=":
+                raise ValueError("Categorical splits are not supported by the native bundle")
+            left = _visit(tree["left_child"], depth + 1)
+            right = _visit(tree["right_child"], depth + 1)
+            nodes[index] = (
+                tree["split_feature"], tree["threshold"], left, right,
+                tree["default_left"], _MISSING_TYPES[tree["missing_type"]], 0.0
+            )
+            return index
+
+        _visit(info["tree_structure"])
+        flat.append(nodes)
+
+    width = max(len(nodes) for nodes in flat)
+    dtypes = (np.int32, np.float64, np.int32, np.int32, np.bool_, np.int8, np.float64)
+    arrays = {
+        name: np.zeros((len(flat), width), dtype=dtype)
+        for name, dtype in zip(TREE_ARRAYS, dtypes)
+    }
+    for t, nodes in enumerate(flat):
+        # Padding nodes are unreachable leaves
+        arrays["left"][t] = arrays["right"][t] = np.arange(width)
+        for n, node in enumerate(nodes):
+            for name, field in zip(TREE_ARRAYS, node):
+                arrays[name][t, n] = field
+    return arrays, max_depth
+
+
+def _strip_parameters(model_str: str) -> str:
+    """
+    Remove the training parameters block from a LightGBM model string
+
+    The block is informational only, and parameters unknown to an older
+    LightGBM runtime make it refuse to load the file.
+    """
+    start = model_str.find("\nparameters:\n")
+    end = model_str.find("end of parameters\n")
+    if start == -1 or end == -1:
+        return model_str
+    return model_str[:start + 1] + model_str[end + len("end of parameters\n"):]
+
+
+def export_bundle(
+    output_dir: str = ARTIFACT_BUNDLE_DIR,
+    model_path: str = MODEL_PATH,
+    feature_names_path: str = FEATURE_NAMES_PATH
+) -> Path:
+    """
+    Export the pickled pipeline and feature names to a native bundle
+
+    Writes LightGBM's native model file, the flattened trees and scaler
+    parameters as `.npy` arrays, the feature names as JSON and a manifest.
+    The exported model is checked against the pipeline before returning.
+
+    Parameters
+    ----------
+    output_dir : str
+        Bundle directory (created if needed)
+    model_path : str
+        Pickled (MinMaxScaler, LGBMClassifier) pipeline
+    feature_names_path : str
+        Pickled feature names list
+
+    Returns
+    -------
+    Path
+        The bundle directory
+
+    Raises
+    ------
+    ValueError
+        If the pipeline cannot be represented by the bundle
+    """
+    from api.predictor import load_feature_names
+
+    with open(model_path, 'rb') as f:
+        pipeline = pickle.load(f)
+    feature_names = load_feature_names(feature_names_path)
+
+    if len(pipeline.steps) != 2:
+        raise ValueError("Only (MinMaxScaler, LightGBM) pipelines can be exported")
+    scaler, classifier = pipeline.steps[0][1], pipeline.steps[1][1]
+    if not hasattr(scaler, "data_range_") or not hasattr(classifier, "booster_"):
+        raise ValueError("Only (MinMaxScaler, LightGBM) pipelines can be exported")
+
+    booster = classifier.booster_
+    dump = booster.dump_model()
+    objective = dump["objective"].split()
+    if objective[0] != "binary" or dump["num_class"] != 1 or dump["average_output"]:
+        raise ValueError(f"Unsupported objective for the native bundle: {dump['objective']}")
+    sigmoid = float(dict(item.split(":") for item in objective[1:]).get("sigmoid", 1.0))
+
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+
+    (output / MODEL_FILE).write_text(_strip_parameters(booster.model_to_string()))
+    with open(output / FEATURE_NAMES_FILE, 'w') as f:
+        json.dump(feature_names, f)
+
+    arrays, max_depth = _flatten_trees(dump["tree_info"])
+    arrays["scale"] = np.asarray(scaler.scale_, dtype=np.float64)
+    arrays["offset"] = np.asarray(scaler.min_, dtype=np.float64)
+    arrays["data_min"] = np.asarray(scaler.data_min_, dtype=np.float64)
+    arrays["data_max"] = np.asarray(scaler.data_max_, dtype=np.float64)
+    for name, array in arrays.items():
+        np.save(output / f"{name}.npy", array)
+
+    clip = list(scaler.feature_range) if getattr(scaler, "clip", False) else None
+    model = NativeModel(
+        arrays, arrays["scale"], arrays["offset"], max_depth, sigmoid, clip,
+        data_min=arrays["data_min"], data_max=arrays["data_max"]
+    )
+    _check_equivalence(pipeline, model, scaler)
+
+    manifest = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "source_model": Path(model_path).name,
+        "source_model_sha256": file_digest(model_path),
+        "lightgbm_version": dump["version"],
+        "num_trees": model.num_trees,
+        "num_features": model.num_features,
+        "max_depth": model.max_depth,
+        "sigmoid": sigmoid,
+        "clip": clip,
+        "files": {
+            "model": MODEL_FILE,
+            "feature_names": FEATURE_NAMES_FILE,
+            "arrays": {name: f"{name}.npy" for name in arrays}
+        }
+    }
+    with open(output / MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(f"Exported {model.num_trees} trees and {model.num_features} features to {output}")
+    return output
+
+
+def _check_equivalence(pipeline, model: NativeModel, scaler, n_rows: int = 512) -> None:
+    """
+    Compare native and pipeline probabilities on synthetic rows
+
+    Rows are drawn around the training range, with missing values and
+    zeros, to exercise every split direction.
+    """
+    rng = np.random.default_rng(0)
+    low, span = scaler.data_min_, scaler.data_range_
+    X = low + span * rng.uniform(-0.1, 1.1, size=(n_rows, model.num_features))
+    X[rng.random(X.shape) < 0.2] = np.nan
+    X[rng.random(X.shape) < 0.05] = 0.0
+
+    expected = pipeline.predict_proba(X)[:, 1]
+    actual = model.predict_proba(X)[:, 1]
+    max_error = float(np.max(np.abs(expected - actual)))
+    if max_error > 1e-9:
+        raise ValueError(f"Exported model diverges from the pipeline (max error {max_error:.2e})")
+
+
+def bundle_exists(bundle_dir: str = ARTIFACT_BUNDLE_DIR) -> bool:
+    """Whether a bundle manifest is present in the directory"""
+    return (Path(bundle_dir) / MANIFEST_FILE).is_file()
+
+
+def bundle_matches_model(bundle_dir: str = ARTIFACT_BUNDLE_DIR, model_path: str = MODEL_PATH) -> bool:
+    """
+    Whether a bundle was exported from the pickled model now on disk
+
+    A retrained model copied over the pickle leaves the bundle stale. A
+    bundle without a source hash, or without a pickle to compare it
+    with, is taken as current (the manifest check decides).
+    """
+    source_digest = read_bundle_manifest(bundle_dir).get("source_model_sha256")
+    if source_digest is None or not Path(model_path).is_file():
+        return True
+    return source_digest == file_digest(model_path)
+
+
+def read_bundle_manifest(bundle_dir: str = ARTIFACT_BUNDLE_DIR) -> Dict:
+    """
+    Read and check a bundle's manifest
+
+    Raises
+    ------
+    ValueError
+        If the bundle format version is not supported
+    """
+    with open(Path(bundle_dir) / MANIFEST_FILE, 'r') as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format version: {manifest.get('format_version')}")
+    return manifest
+
+
+def load_bundle(bundle_dir: str = ARTIFACT_BUNDLE_DIR) -> Tuple[NativeModel, List[str]]:
+    """
+    Load a native bundle, memory-mapping its arrays
+
+    Parameters
+    ----------
+    bundle_dir : str
+        Directory written by `export_bundle`
+
+    Returns
+    -------
+    Tuple[NativeModel, List[str]]
+        The model and the feature names in model order
+
+    Raises
+    ------
+    ValueError
+        If the bundle format version is not supported
+    """
+    bundle = Path(bundle_dir)
+    manifest = read_bundle_manifest(bundle_dir)
+
+    files = manifest["files"]
+    # Plain ndarray views on the mapped files: pages are shared between
+    # worker processes and only read in when first touched
+    arrays = {
+        name: np.load(bundle / filename, mmap_mode='r').view(np.ndarray)
+        for name, filename in files["arrays"].items()
+    }
+    with open(bundle / files["feature_names"], 'r') as f:
+        feature_names = json.load(f)
+
+    clip = manifest.get("clip")
+    model = NativeModel(
+        {name: arrays[name] for name in TREE_ARRAYS},
+        arrays["scale"],
+        arrays["offset"],
+        max_depth=manifest["max_depth"],
+        sigmoid=manifest["sigmoid"],
+        clip=tuple(clip) if clip else None,
+        data_min=arrays.get("data_min"),
+        data_max=arrays.get("data_max")
+    )
+    if model.num_features != len(feature_names):
+        raise ValueError("Bundle feature names do not match the scaler parameters")
+    return model, feature_names
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Manage the native model artifact bundle")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export = subparsers.add_parser("export", help="Export the pickled model to a native bundle")
+    export.add_argument(
+        "--output", default=ARTIFACT_BUNDLE_DIR,
+        help="Bundle directory (default: %(default)s)"
+    )
+    export.add_argument("--model", default=MODEL_PATH, help="Pickled pipeline")
+    export.add_argument("--feature-names", default=FEATURE_NAMES_PATH, help="Pickled feature names")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, LOG_LEVEL),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    if args.command == "export":
+        export_bundle(args.output, args.model, args.feature_names)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,598 @@
+"""
+Prediction audit log
+Append-only record of every decision, written in batches off the request path
+
+Endpoints hand their decisions to an `AuditSink`, which only appends them
+to an in-memory queue. A background thread hashes the features and writes
+the queued records in batches to rotating NDJSON or Parquet files in
+AUDIT_LOG_DIR:
+
+    audit-20250101T120000-4242-000001.ndjson
+    audit-20250101T130512-4242-000002.parquet
+
+Names hold the writing process id, and files are created exclusively, so
+processes sharing the directory, or a restart within the same second,
+never write to or replace each other's files. Parquet files are written
+under a `.tmp` suffix and renamed once closed, so readers only ever see
+complete files; a Parquet file is closed and published at the latest
+AUDIT_PUBLISH_INTERVAL seconds after it was started, which bounds both how
+late its records reach readers and how many a crash can lose. NDJSON
+lines are readable as soon as their batch is written. The queue holds at most
+AUDIT_QUEUE_SIZE records; beyond, records are dropped and counted, or the
+request is rejected (AUDIT_OVERFLOW). Endpoints reserve the queue space of
+their decisions before scoring (`AuditSink.reserve`), so a rejected request
+has not been scored, nor counted by the monitors. On shutdown the queue is drained and
+the files are synced to disk.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from api.config import (
+    AUDIT_LOG_DIR,
+    AUDIT_FORMAT,
+    AUDIT_FEATURES,
+    AUDIT_QUEUE_SIZE,
+    AUDIT_BATCH_SIZE,
+    AUDIT_FLUSH_INTERVAL,
+    AUDIT_ROTATE_MB,
+    AUDIT_PUBLISH_INTERVAL,
+    AUDIT_OVERFLOW,
+    AUDIT_RETRY_AFTER
+)
+from api.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Formats
+NDJSON = "ndjson"
+PARQUET = "parquet"
+
+# Overflow policies
+DROP = "drop"
+REJECT = "reject"
+
+# Columns of an audit record, in file order
+FIELDS = (
+    "timestamp", "request_id", "endpoint", "client_id", "features_sha256",
+    "probability_default", "decision", "threshold", "artifact_id", "features"
+)
+
+_records = REGISTRY.counter(
+    "audit_records_total",
+    "Audit records written"
+)
+_dropped = REGISTRY.counter(
+    "audit_records_dropped_total",
+    "Audit records dropped because the audit queue was full"
+)
+_rejected = REGISTRY.counter(
+    "audit_rejected_requests_total",
+    "Requests rejected because the audit queue was full"
+)
+_write_errors = REGISTRY.counter(
+    "audit_write_errors_total",
+    "Audit batches that could not be written"
+)
+
+
+class AuditBackpressureError(Exception):
+    """Raised when the audit queue is full and overflowing requests are rejected"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Audit log is saturated, retry later")
+        self.retry_after = retry_after
+
+
+def features_digest(features: Dict[str, float]) -> str:
+    """
+    SHA-256 of a client's features, independent of their order
+
+    Parameters
+    ----------
+    features : Dict[str, float]
+        Client features
+
+    Returns
+    -------
+    str
+        Hex digest
+    """
+    payload = json.dumps(sorted(features.items()), separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _NdjsonFile:
+    """NDJSON audit file, appended to"""
+
+    suffix = ".ndjson"
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "x", encoding="utf-8")
+
+    @property
+    def size(self) -> int:
+        return self._file.tell()
+
+    def write(self, rows: List[Dict]) -> None:
+        self._file.write("".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows))
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+
+class _ParquetFile:
+    """Parquet audit file, one row group per batch, visible once closed"""
+
+    suffix = ".parquet"
+
+    def __init__(self, path: Path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.path = path
+        self._tmp_path = path.with_name(path.name + ".tmp")
+        if path.exists():
+            raise FileExistsError(f"Audit file {path} already exists")
+        # Claims the name; the writer then truncates its own file
+        open(self._tmp_path, "xb").close()
+        self._schema = pa.schema([
+            ("timestamp", pa.float64()),
+            ("request_id", pa.string()),
+            ("endpoint", pa.string()),
+            ("client_id", pa.string()),
+            ("features_sha256", pa.string()),
+            ("probability_default", pa.float64()),
+            ("decision", pa.string()),
+            ("threshold", pa.float64()),
+            ("artifact_id", pa.string()),
+            # Sparse features as JSON, so the schema does not depend on them
+            ("features", pa.string())
+        ])
+        self._writer = pq.ParquetWriter(str(self._tmp_path), self._schema)
+        self.size = 0
+
+    def write(self, rows: List[Dict]) -> None:
+        columns = {name: [row.get(name) for row in rows] for name in FIELDS}
+        columns["features"] = [
+            None if features is None else json.dumps(features, separators=(",", ":"))
+            for features in columns["features"]
+        ]
+        self._writer.write_table(self._pa.table(columns, schema=self._schema))
+        self.size = self._tmp_path.stat().st_size
+
+    def close(self) -> None:
+        self._writer.close()
+        # Linking never replaces an existing file, unlike a rename
+        try:
+            os.link(self._tmp_path, self.path)
+        except FileExistsError:
+            self.path = self.path.with_name(f"{self.path.stem}-{uuid.uuid4().hex[:8]}{self.suffix}")
+            logger.error(f"Audit file name taken, closing as {self.path.name}")
+            os.link(self._tmp_path, self.path)
+        os.unlink(self._tmp_path)
+
+
+class AuditSink:
+    """
+    Bounded, batched writer of audit records
+
+    Parameters
+    ----------
+    directory : str
+        Where audit files are written (created if needed)
+    fmt : str
+        NDJSON or PARQUET
+    features : str
+        'hash' to record the features digest only, 'full' to also record
+        the sparse features (e.g. for offline drift reports)
+    queue_size : int
+        Records held in memory at most
+    batch_size : int
+        Records per write
+    flush_interval : float
+        Seconds a record waits at most before being written
+    rotate_bytes : int
+        File size from which a new file is started
+    publish_interval : float
+        Seconds after which a Parquet file is closed and published, even
+        below `rotate_bytes` (0 = on rotation and shutdown only)
+    overflow : str
+        DROP or REJECT when the queue is full
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        fmt: str = AUDIT_FORMAT,
+        features: str = AUDIT_FEATURES,
+        queue_size: int = AUDIT_QUEUE_SIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        rotate_bytes: int = int(AUDIT_ROTATE_MB * 1024 * 1024),
+        publish_interval: float = AUDIT_PUBLISH_INTERVAL,
+        overflow: str = AUDIT_OVERFLOW
+    ):
+        if fmt not in (NDJSON, PARQUET):
+            raise ValueError(f"Unknown audit format '{fmt}', expected '{NDJSON}' or '{PARQUET}'")
+        if overflow not in (DROP, REJECT):
+            raise ValueError(f"Unknown audit overflow policy '{overflow}', expected '{DROP}' or '{REJECT}'")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fmt = fmt
+        self.full_features = features == "full"
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.publish_interval = publish_interval
+        self.overflow = overflow
+
+        self._pending: deque = deque()
+        # Queue space held by reservations not yet recorded
+        self._reserved = 0
+        self._cond = threading.Condition()
+        # Signalled when queue space frees up, for writers waiting on it
+        self._space = threading.Condition(self._cond)
+        self._stopped = False
+        self._file = None
+        self._opened_at = 0.0
+        self._sequence = 0
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Records queued and not yet written"""
+        return len(self._pending)
+
+    def reserve(self, count: int) -> "AuditReservation":
+        """
+        Hold queue space for the decisions of a request about to be scored
+
+        Parameters
+        ----------
+        count : int
+            Decisions the request will record
+
+        Returns
+        -------
+        AuditReservation
+            To record the decisions with, or release; holds nothing if the
+            queue is full and the overflow policy is DROP
+
+        Raises
+        ------
+        AuditBackpressureError
+            If the queue is full and the overflow policy is REJECT
+        """
+        with self._cond:
+            if self._stopped or len(self._pending) + self._reserved + count > self.queue_size:
+                if self.overflow == REJECT and not self._stopped:
+                    _rejected.inc()
+                    raise AuditBackpressureError(AUDIT_RETRY_AFTER)
+                return AuditReservation(self, 0)
+            self._reserved += count
+        return AuditReservation(self, count)
+
+    def _release(self, count: int) -> None:
+        """Give back reserved queue space"""
+        with self._cond:
+            self._reserved -= count
+            self._space.notify_all()
+
+    def wait_for_space(self, count: int, timeout: float) -> bool:
+        """
+        Wait until `count` records fit in the queue, for background writers
+        that would rather slow down than lose records
+
+        Returns
+        -------
+        bool
+            False if they still do not fit after `timeout` seconds; True
+            once the sink is closed (recording then drops them)
+        """
+        with self._cond:
+            return self._space.wait_for(
+                lambda: self._stopped or len(self._pending) + self._reserved + count <= self.queue_size,
+                timeout
+            )
+
+    def record(
+        self,
+        endpoint: str,
+        decisions: List[Dict],
+        threshold: float,
+        artifact_id: Optional[str],
+        reserved: int = 0
+    ) -> bool:
+        """
+        Queue the decisions of one request
+
+        Parameters
+        ----------
+        endpoint : str
+            Endpoint that took the decisions
+        decisions : List[Dict]
+            One dict per client with client_id, features,
+            probability_default and decision. Features are hashed on the
+            writer thread, so they must not be modified afterwards.
+        threshold : float
+            Decision threshold used
+        artifact_id : str, optional
+            Identity of the artifacts used
+        reserved : int
+            Queue space reserved for these decisions, released here
+
+        Returns
+        -------
+        bool
+            False if the records were dropped
+
+        Raises
+        ------
+        AuditBackpressureError
+            If the queue is full and the overflow policy is REJECT
+        """
+        timestamp = time.time()
+        request_id = uuid.uuid4().hex
+        with self._cond:
+            self._reserved -= reserved
+            # Reserved space was counted when reserving, it always fits
+            fits = len(decisions) <= reserved or (
+                len(self._pending) + self._reserved + len(decisions) <= self.queue_size
+            )
+            if self._stopped or not fits:
+                if self.overflow == REJECT and not self._stopped:
+                    _rejected.inc()
+                    raise AuditBackpressureError(AUDIT_RETRY_AFTER)
+                _dropped.inc(amount=len(decisions))
+                return False
+            self._pending.extend(
+                (timestamp, request_id, endpoint, threshold, artifact_id, decision)
+                for decision in decisions
+            )
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def _run(self) -> None:
+        """Write queued records in batches until closed and drained"""
+        while True:
+            with self._cond:
+                if not self._stopped and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.batch_size))]
+                if batch:
+                    self._space.notify_all()
+                done = self._stopped and not self._pending
+            if batch:
+                self._write(batch)
+            if done:
+                return
+            if self._publish_due():
+                self._close_file()
+
+    def _write(self, batch: List[tuple]) -> None:
+        """Format and append a batch, rotating the file if needed"""
+        rows = []
+        for timestamp, request_id, endpoint, threshold, artifact_id, decision in batch:
+            features = decision["features"]
+            rows.append({
+                "timestamp": timestamp,
+                "request_id": request_id,
+                "endpoint": endpoint,
+                "client_id": None if decision.get("client_id") is None else str(decision["client_id"]),
+                "features_sha256": features_digest(features),
+                "probability_default": float(decision["probability_default"]),
+                "decision": decision["decision"],
+                "threshold": float(threshold),
+                "artifact_id": artifact_id,
+                "features": features if self.full_features else None
+            })
+        try:
+            if self._file is None:
+                self._file = self._open()
+            self._file.write(rows)
+            _records.inc(amount=len(rows))
+            if self._file.size >= self.rotate_bytes or self._publish_due():
+                self._close_file()
+        except Exception as e:
+            _write_errors.inc()
+            logger.error(f"Could not write {len(rows)} audit records: {str(e)}")
+
+    def _publish_due(self) -> bool:
+        """Whether the current Parquet file has been open for the publish interval"""
+        return (
+            self._file is not None
+            and self.fmt == PARQUET
+            and self.publish_interval > 0
+            and time.monotonic() - self._opened_at >= self.publish_interval
+        )
+
+    def _close_file(self) -> None:
+        """Close (and for Parquet, publish) the current file"""
+        file, self._file = self._file, None
+        try:
+            file.close()
+        except Exception as e:
+            _write_errors.inc()
+            logger.error(f"Could not close audit file {file.path}: {str(e)}")
+
+    def _open(self):
+        """Start a new audit file, under a name no other file has"""
+        file_class = _ParquetFile if self.fmt == PARQUET else _NdjsonFile
+        while True:
+            self._sequence += 1
+            name = f"audit-{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{os.getpid()}-{self._sequence:06d}"
+            try:
+                file = file_class(self.directory / (name + file_class.suffix))
+            except FileExistsError:
+                continue
+            self._opened_at = time.monotonic()
+            return file
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Write the queued records, then close and sync the current file
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Seconds to wait for the writer thread
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+            self._space.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error(f"Audit writer did not finish, {self.pending} records not written")
+            return
+        if self._file is not None:
+            self._close_file()
+
+
+class AuditReservation:
+    """
+    Audit queue space held for the decisions of one request
+
+    Released when the block it is used in exits, if not recorded by then.
+    """
+
+    def __init__(self, sink: Optional[AuditSink], count: int):
+        self.sink = sink
+        self.count = count
+
+    def record(self, endpoint: str, decisions: List[Dict], threshold: float, artifact_id: Optional[str]) -> bool:
+        """Queue the decisions into the reserved space (see `AuditSink.record`)"""
+        if self.sink is None:
+            return False
+        count, self.count = self.count, 0
+        return self.sink.record(endpoint, decisions, threshold, artifact_id, reserved=count)
+
+    def release(self) -> None:
+        """Give back the space if nothing was recorded"""
+        if self.count:
+            count, self.count = self.count, 0
+            self.sink._release(count)
+
+    def __enter__(self) -> "AuditReservation":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+def reserve_audit(count: int) -> AuditReservation:
+    """
+    Reserve audit queue space for a request, if the audit log is enabled
+
+    Raises
+    ------
+    AuditBackpressureError
+        If the queue is full and the overflow policy is REJECT
+    """
+    sink = get_audit_sink()
+    return sink.reserve(count) if sink is not None else AuditReservation(None, 0)
+
+
+def read_audit(
+    directory: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    batch_size: int = AUDIT_BATCH_SIZE
+) -> Iterator[Dict]:
+    """
+    Records of the audit files of a directory, file by file
+
+    Files are read in name (so time) order, NDJSON line by line and Parquet
+    `batch_size` rows at a time, so memory does not grow with the log.
+    Files still being written (`.tmp`) and malformed lines are skipped.
+
+    Parameters
+    ----------
+    directory : str
+        Audit log directory
+    since, until : float, optional
+        Keep records with since <= timestamp < until (Unix time)
+    batch_size : int
+        Parquet rows decoded at once
+
+    Yields
+    ------
+    dict
+        Audit record, features as a dict (None unless logged in full)
+    """
+    for path in sorted(Path(directory).glob("audit-*")):
+        if path.suffix == _NdjsonFile.suffix:
+            rows = _read_ndjson(path)
+        elif path.suffix == _ParquetFile.suffix:
+            rows = _read_parquet(path, batch_size)
+        else:
+            continue
+        for row in rows:
+            timestamp = row.get("timestamp") or 0.0
+            if (since is None or timestamp >= since) and (until is None or timestamp < until):
+                yield row
+
+
+def _read_ndjson(path: Path) -> Iterator[Dict]:
+    """Records of an NDJSON audit file"""
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping malformed audit line {number} of {path}")
+
+
+def _read_parquet(path: Path, batch_size: int) -> Iterator[Dict]:
+    """Records of a Parquet audit file, features decoded from JSON"""
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(str(path)).iter_batches(batch_size=batch_size):
+        for row in batch.to_pylist():
+            if row.get("features") is not None:
+                row["features"] = json.loads(row["features"])
+            yield row
+
+
+# Global audit sink instance
+_audit_sink: Optional[AuditSink] = None
+_audit_lock = threading.Lock()
+
+
+def get_audit_sink() -> Optional[AuditSink]:
+    """Get or create the audit sink (None if AUDIT_LOG_DIR is not set)"""
+    global _audit_sink
+    if AUDIT_LOG_DIR is None:
+        return None
+    if _audit_sink is None:
+        with _audit_lock:
+            if _audit_sink is None:
+                _audit_sink = AuditSink(AUDIT_LOG_DIR)
+                logger.info(f"Writing the prediction audit log to {AUDIT_LOG_DIR} ({AUDIT_FORMAT})")
+    return _audit_sink
+
+
+def shutdown_audit_sink(timeout: float = 30.0) -> None:
+    """Write the queued audit records and close the audit files"""
+    global _audit_sink
+    with _audit_lock:
+        if _audit_sink is not None:
+            _audit_sink.close(timeout)
+            _audit_sink = None
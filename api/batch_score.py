@@ -0,0 +1,340 @@
+"""
+Offline batch scoring
+Scores a whole CSV or Parquet portfolio with the same predictor as the API
+
+Usage
+-----
+python -m api.batch_score clients.csv scores.parquet --id-column SK_ID_CURR
+"""
+
+import argparse
+import logging
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from api.config import (
+    BATCH_SCORE_CHUNK_SIZE,
+    BATCH_SCORE_WORKERS,
+    FEATURE_DTYPE,
+    FEATURE_NAMES_PATH,
+    LOG_LEVEL
+)
+from api.predictor import CreditScorePredictor, load_feature_names
+
+if TYPE_CHECKING:
+    # pandas is imported on first use, keeping it out of the API's startup
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_COLUMNS = [
+    "probability_default",
+    "probability_no_default",
+    "prediction",
+    "decision",
+    "threshold_used"
+]
+
+# Predictor owned by the current process, loaded once by _init_worker
+_worker_predictor: Optional[CreditScorePredictor] = None
+
+
+def _init_worker():
+    """Load the predictor once per worker process"""
+    global _worker_predictor
+    _worker_predictor = CreditScorePredictor()
+
+
+def _score_chunk(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+    """
+    Score a prepared feature matrix with the worker's predictor
+
+    Parameters
+    ----------
+    X : np.ndarray
+        Features matrix in model column order
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray, float]
+        (proba_default, predictions, decisions, threshold)
+    """
+    predictor = _worker_predictor
+    proba_default = predictor.predict_proba_matrix(X)
+    predictions, decisions = predictor.apply_threshold(proba_default)
+    return proba_default, predictions, decisions, predictor.get_threshold()
+
+
+class FeatureMapper:
+    """
+    Maps input columns onto the model feature order
+
+    The mapping is resolved once per file; each chunk is then copied
+    into a NaN-filled matrix with a single fancy-indexed assignment.
+    """
+
+    def __init__(self, feature_names: List[str], columns: List[str], dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        positions = {name: i for i, name in enumerate(feature_names)}
+        self.n_features = len(feature_names)
+        self.source_columns = [c for c in columns if c in positions]
+        self.target_positions = np.array(
+            [positions[c] for c in self.source_columns],
+            dtype=np.intp
+        )
+        present = set(columns)
+        self.missing_features = [
+            name for name in feature_names if name not in present
+        ]
+
+    def transform(self, chunk: "pd.DataFrame") -> np.ndarray:
+        """
+        Build the model input matrix for a chunk
+
+        Parameters
+        ----------
+        chunk : pd.DataFrame
+            Input rows
+
+        Returns
+        -------
+        np.ndarray
+            Features matrix, NaN for features absent from the input
+        """
+        X = np.full((len(chunk), self.n_features), np.nan, dtype=self.dtype)
+        if self.source_columns:
+            X[:, self.target_positions] = chunk[self.source_columns].to_numpy(
+                dtype=self.dtype,
+                na_value=np.nan
+            )
+        return X
+
+
+def _is_parquet(path: str) -> bool:
+    """Whether a path should be handled as Parquet (otherwise CSV)"""
+    return Path(path).suffix.lower() in (".parquet", ".pq")
+
+
+def _read_columns(path: str) -> Tuple[List[str], Optional[int]]:
+    """
+    Read the column names (and row count when cheap) of an input file
+
+    Returns
+    -------
+    Tuple[List[str], Optional[int]]
+        (columns, total_rows) - total_rows is None for CSV
+    """
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        return parquet_file.schema_arrow.names, parquet_file.metadata.num_rows
+    import pandas as pd
+    return list(pd.read_csv(path, nrows=0).columns), None
+
+
+def _read_chunks(
+    path: str,
+    columns: List[str],
+    chunk_size: int
+) -> Iterator["pd.DataFrame"]:
+    """Yield the requested columns of an input file chunk by chunk"""
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size)
+
+
+class ResultWriter:
+    """Incremental CSV or Parquet writer for scored chunks"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._parquet_writer = None
+        self._header_written = False
+
+    def write(self, frame: "pd.DataFrame"):
+        """Append a chunk of results"""
+        if _is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            frame.to_csv(
+                self.path,
+                mode="a" if self._header_written else "w",
+                header=not self._header_written,
+                index=False
+            )
+            self._header_written = True
+
+    def close(self):
+        """Flush and close the output file"""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+
+def _results_frame(
+    ids: Optional["pd.Series"],
+    id_column: Optional[str],
+    scored: Tuple[np.ndarray, np.ndarray, np.ndarray, float]
+) -> "pd.DataFrame":
+    """Assemble the output rows for one scored chunk"""
+    import pandas as pd
+    proba_default, predictions, decisions, threshold = scored
+    frame = pd.DataFrame({
+        "probability_default": proba_default,
+        "probability_no_default": 1.0 - proba_default,
+        "prediction": predictions,
+        "decision": decisions,
+        "threshold_used": threshold
+    }, columns=OUTPUT_COLUMNS)
+    if ids is not None:
+        frame.insert(0, id_column, ids.to_numpy())
+    return frame
+
+
+def score_file(
+    input_path: str,
+    output_path: str,
+    chunk_size: int = BATCH_SCORE_CHUNK_SIZE,
+    workers: int = BATCH_SCORE_WORKERS,
+    id_column: Optional[str] = None
+) -> Dict:
+    """
+    Score every row of an input file and write the decisions
+
+    Parameters
+    ----------
+    input_path : str
+        CSV or Parquet file with one client per row and feature columns
+    output_path : str
+        CSV or Parquet destination (format chosen from the extension)
+    chunk_size : int
+        Number of rows read and scored at once
+    workers : int
+        Number of scoring processes (1 scores in the current process)
+    id_column : Optional[str]
+        Column copied as-is to the output to identify each client
+
+    Returns
+    -------
+    Dict
+        Summary with row counts, approvals, duration and throughput
+    """
+    feature_names = load_feature_names(FEATURE_NAMES_PATH)
+    columns, total_rows = _read_columns(input_path)
+    if id_column is not None and id_column not in columns:
+        raise ValueError(f"ID column '{id_column}' not found in {input_path}")
+
+    mapper = FeatureMapper(feature_names, columns, dtype=FEATURE_DTYPE)
+    logger.info(
+        f"Mapped {len(mapper.source_columns)}/{len(feature_names)} model features "
+        f"({len(mapper.missing_features)} missing, scored as NaN)"
+    )
+    read_columns = list(mapper.source_columns)
+    if id_column is not None and id_column not in read_columns:
+        read_columns.append(id_column)
+
+    writer = ResultWriter(output_path)
+    executor = None
+    in_flight = deque()
+    summary = {"rows": 0, "approved": 0, "rejected": 0}
+    start = time.perf_counter()
+
+    def _collect(ids, scored):
+        frame = _results_frame(ids, id_column, scored)
+        writer.write(frame)
+        approved = int((frame["prediction"] == 0).sum())
+        summary["rows"] += len(frame)
+        summary["approved"] += approved
+        summary["rejected"] += len(frame) - approved
+        elapsed = time.perf_counter() - start
+        progress = f"{summary['rows']}/{total_rows}" if total_rows else str(summary["rows"])
+        logger.info(
+            f"Scored {progress} rows ({summary['rows'] / max(elapsed, 1e-9):.0f} rows/s)"
+        )
+
+    try:
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        else:
+            _init_worker()
+
+        for chunk in _read_chunks(input_path, read_columns, chunk_size):
+            X = mapper.transform(chunk)
+            ids = chunk[id_column] if id_column is not None else None
+            if executor is None:
+                _collect(ids, _score_chunk(X))
+                continue
+
+            in_flight.append((ids, executor.submit(_score_chunk, X)))
+            # Keep a bounded number of chunks in memory, written in input order
+            while len(in_flight) >= 2 * workers:
+                pending_ids, future = in_flight.popleft()
+                _collect(pending_ids, future.result())
+
+        while in_flight:
+            pending_ids, future = in_flight.popleft()
+            _collect(pending_ids, future.result())
+    finally:
+        writer.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    summary["seconds"] = time.perf_counter() - start
+    summary["rows_per_second"] = summary["rows"] / max(summary["seconds"], 1e-9)
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(
+        description="Score a CSV or Parquet portfolio with the credit scoring model"
+    )
+    parser.add_argument("input", help="Input CSV or Parquet file")
+    parser.add_argument("output", help="Output CSV or Parquet file")
+    parser.add_argument(
+        "--chunk-size", type=int, default=BATCH_SCORE_CHUNK_SIZE,
+        help="Rows per chunk (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=BATCH_SCORE_WORKERS,
+        help="Scoring processes (default: %(default)s)"
+    )
+    parser.add_argument("--id-column", default=None, help="Client identifier column")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, LOG_LEVEL),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    summary = score_file(
+        args.input,
+        args.output,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        id_column=args.id_column
+    )
+    logger.info(
+        f"Done: {summary['rows']} rows in {summary['seconds']:.1f}s "
+        f"({summary['rows_per_second']:.0f} rows/s), "
+        f"{summary['approved']} approved, {summary['rejected']} rejected"
+    )
+
+
+if __name__ == "__main__":
+    main()
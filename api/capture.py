@@ -0,0 +1,247 @@
+"""
+Traffic capture
+Sampled request bodies written to a JSONL file for later replay
+
+Each line is one request:
+
+    {"timestamp": 1700000000.0, "method": "POST", "path": "/predict",
+     "body": {...}, "status_code": 200}
+
+Captured bodies contain client data: keep the file with the same care as
+the application data. The middleware is only installed when CAPTURE_PATH
+is set.
+
+The middleware only queues the raw body; a background thread parses and
+writes it, so no disk I/O happens on the request path. The queue holds at
+most CAPTURE_QUEUE_SIZE requests; beyond, requests are not captured and
+are counted in capture_records_dropped_total.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from api.config import CAPTURE_PATHS, CAPTURE_QUEUE_SIZE, CAPTURE_SAMPLE_RATE
+from api.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+_dropped = REGISTRY.counter(
+    "capture_records_dropped_total",
+    "Captured requests dropped because the capture queue was full"
+)
+
+
+class CaptureWriter:
+    """
+    Append-only JSONL file of captured requests, written by a background thread
+
+    Parameters
+    ----------
+    path : str
+        Capture file, created or appended to
+    queue_size : int
+        Requests held in memory at most; beyond, they are dropped
+    """
+
+    def __init__(self, path: str, queue_size: int = CAPTURE_QUEUE_SIZE):
+        self.path = path
+        self.queue_size = queue_size
+        self._file = open(path, "a")
+        self._pending: deque = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="capture-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record: Dict) -> bool:
+        """
+        Queue one request for writing
+
+        Parameters
+        ----------
+        record : dict
+            Captured request; a bytes body is parsed by the writer thread and
+            the request skipped if it is not valid JSON
+
+        Returns
+        -------
+        bool
+            False if the queue was full and the request dropped
+        """
+        with self._cond:
+            if self._stopped or len(self._pending) >= self.queue_size:
+                _dropped.inc()
+                return False
+            self._pending.append(record)
+            self._cond.notify()
+        return True
+
+    def _run(self) -> None:
+        """Write queued requests until closed and drained"""
+        while True:
+            with self._cond:
+                if not self._stopped and not self._pending:
+                    self._cond.wait()
+                batch = list(self._pending)
+                self._pending.clear()
+                done = self._stopped
+            if batch:
+                self._write(batch)
+            if done:
+                return
+
+    def _write(self, batch: List[Dict]) -> None:
+        """Format and append a batch of requests"""
+        lines = []
+        for record in batch:
+            if isinstance(record.get("body"), bytes):
+                try:
+                    record = {**record, "body": json.loads(record["body"])}
+                except ValueError:
+                    continue
+            lines.append(json.dumps(record, separators=(",", ":")) + "\n")
+        try:
+            self._file.writelines(lines)
+            self._file.flush()
+        except (OSError, ValueError) as e:
+            # Capture is best effort; never stop the writer for it
+            logger.warning(f"Could not capture {len(lines)} requests: {str(e)}")
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Write the queued requests, then close the file
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Seconds to wait for the writer thread
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error("Capture writer did not finish, queued requests not written")
+            return
+        self._file.close()
+
+
+def read_capture(path: str) -> Iterator[Dict]:
+    """
+    Requests of a capture file, in file order
+
+    Malformed lines (e.g. a line cut short by a crash) are skipped.
+
+    Parameters
+    ----------
+    path : str
+        Capture file
+
+    Yields
+    ------
+    dict
+        Captured request
+    """
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping malformed capture line {number} of {path}")
+                continue
+            if "path" in record and "body" in record:
+                yield record
+
+
+class CaptureMiddleware:
+    """
+    ASGI middleware capturing a sample of scoring requests
+
+    Parameters
+    ----------
+    app
+        Wrapped ASGI application
+    writer : CaptureWriter
+        Where captured requests go
+    sample_rate : float
+        Fraction of requests captured
+    paths : Tuple[str, ...]
+        Request paths eligible for capture
+    """
+
+    def __init__(
+        self,
+        app,
+        writer: CaptureWriter,
+        sample_rate: float = CAPTURE_SAMPLE_RATE,
+        paths: Tuple[str, ...] = CAPTURE_PATHS
+    ):
+        self.app = app
+        self.writer = writer
+        self.sample_rate = sample_rate
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+            or random.random() >= self.sample_rate
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        timestamp = time.time()
+
+        async def receive_captured():
+            message = await receive()
+            if message["type"] == "http.request":
+                chunks.append(message.get("body", b""))
+            return message
+
+        async def send_captured(message):
+            if message["type"] == "http.response.start":
+                self._write(timestamp, scope, b"".join(chunks), message["status"])
+            await send(message)
+
+        await self.app(scope, receive_captured, send_captured)
+
+    def _write(self, timestamp: float, scope: dict, body: bytes, status_code: int) -> None:
+        """Queue a request; the writer thread skips it if the body is not valid JSON"""
+        self.writer.write({
+            "timestamp": timestamp,
+            "method": scope["method"],
+            "path": scope["path"],
+            "body": body,
+            "status_code": status_code
+        })
+
+
+# Capture file of the serving process
+_writer: Optional[CaptureWriter] = None
+
+
+def get_capture_writer(path: str) -> CaptureWriter:
+    """Get or open the capture file"""
+    global _writer
+    if _writer is None:
+        _writer = CaptureWriter(path)
+        logger.info(f"Capturing a {CAPTURE_SAMPLE_RATE:.1%} sample of scoring requests to {path}")
+    return _writer
+
+
+def shutdown_capture() -> None:
+    """Close the capture file"""
+    global _writer
+    if _writer is not None:
+        _writer.close()
+        _writer = None
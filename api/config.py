@@ -3,6 +3,7 @@ Configuration for the Credit Scoring API
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 # Base directory
@@ -14,6 +15,28 @@ EXPLAINER_PATH = os.getenv("EXPLAINER_PATH", str(BASE_DIR / "explainer.sav"))
 FEATURE_NAMES_PATH = os.getenv("FEATURE_NAMES_PATH", str(BASE_DIR / "feature_names.sav"))
 THRESHOLD_PATH = os.getenv("THRESHOLD_PATH", str(BASE_DIR / "optimal_threshold.json"))
 
+# Artifact manifest (python -m api.manifest write): content hashes checked at load
+ARTIFACT_MANIFEST_PATH = os.getenv("ARTIFACT_MANIFEST_PATH", str(BASE_DIR / "artifacts_manifest.json"))
+ARTIFACT_ID_HEADER = "X-Artifact-Id"  # response header carrying the artifact identity
+
+# Native artifact bundle (python -m api.artifacts export), preferred over the pickles when present
+ARTIFACT_BUNDLE_DIR = os.getenv("ARTIFACT_BUNDLE_DIR", str(BASE_DIR / "model_bundle"))
+
+# Optional artifacts (SHAP explainer): released after this much disuse and reloaded
+# on demand; kept resident only while their total size fits in the budget
+OPTIONAL_ARTIFACT_IDLE_TIMEOUT = float(os.getenv("OPTIONAL_ARTIFACT_IDLE_TIMEOUT", "1800"))  # seconds, 0 = never
+OPTIONAL_ARTIFACTS_MEMORY_BUDGET = int(
+    float(os.getenv("OPTIONAL_ARTIFACTS_MEMORY_BUDGET_MB", "0")) * 1024 * 1024
+)  # 0 = unlimited
+
+# Feature matrices: float32 halves their memory (the pipeline and the native bundle
+# both accept it); scoring matrices of up to SCRATCH_MAX_ROWS rows are reused per thread
+FEATURE_DTYPE = os.getenv("FEATURE_DTYPE", "float64")  # "float64" or "float32"
+SCRATCH_MAX_ROWS = int(os.getenv("SCRATCH_MAX_ROWS", "128"))
+
+# Hot reload: poll the artifact files and reload the predictor when they change
+ARTIFACT_WATCH_INTERVAL = float(os.getenv("ARTIFACT_WATCH_INTERVAL", "0"))  # seconds, 0 = disabled
+
 # API Configuration
 API_TITLE = "Credit Scoring API"
 API_DESCRIPTION = """
@@ -30,11 +53,146 @@ API_VERSION = "1.0.0"
 
 # Business logic
 DEFAULT_THRESHOLD = 0.5  # Will be overridden by optimal_threshold.json
-FN_COST = 1  # False Negative cost
-FP_COST = 10  # False Positive cost (loan to bad client)
+FN_COST = float(os.getenv("FN_COST", "1"))  # False Negative cost (good client refused)
+FP_COST = float(os.getenv("FP_COST", "10"))  # False Positive cost (loan to bad client)
+
+# Offline batch scoring (python -m api.batch_score)
+BATCH_SCORE_CHUNK_SIZE = int(os.getenv("BATCH_SCORE_CHUNK_SIZE", "50000"))
+BATCH_SCORE_WORKERS = int(os.getenv("BATCH_SCORE_WORKERS", str(os.cpu_count() or 1)))
+
+# Background scoring jobs (/jobs)
+JOBS_DIR = os.getenv("JOBS_DIR", str(Path(tempfile.gettempdir()) / "credit-scoring-jobs"))
+JOBS_MAX_CONCURRENT = int(os.getenv("JOBS_MAX_CONCURRENT", "2"))
+JOBS_MAX_QUEUED = int(os.getenv("JOBS_MAX_QUEUED", "8"))
+JOBS_CHUNK_SIZE = int(os.getenv("JOBS_CHUNK_SIZE", "5000"))
+JOBS_RETENTION_SECONDS = float(os.getenv("JOBS_RETENTION_SECONDS", "3600"))
+
+# Admission control: concurrent requests executing and waiting, per endpoint class
+SCORING_MAX_CONCURRENCY = int(os.getenv("SCORING_MAX_CONCURRENCY", "4"))
+SCORING_MAX_QUEUE = int(os.getenv("SCORING_MAX_QUEUE", "64"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "2"))
+BATCH_MAX_QUEUE = int(os.getenv("BATCH_MAX_QUEUE", "8"))
+EXPLAIN_MAX_CONCURRENCY = int(os.getenv("EXPLAIN_MAX_CONCURRENCY", "1"))
+EXPLAIN_MAX_QUEUE = int(os.getenv("EXPLAIN_MAX_QUEUE", "4"))
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1000"))  # larger batches go through /jobs
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))  # seconds
+
+# Inference scheduler: interactive scoring always runs first, the remaining
+# capacity is shared between batch and explanation work by weight
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", str(os.cpu_count() or 1)))
+SCHEDULER_WEIGHTS = {
+    "batch": int(os.getenv("SCHEDULER_BATCH_WEIGHT", "2")),
+    "explain": int(os.getenv("SCHEDULER_EXPLAIN_WEIGHT", "1")),
+    "shadow": int(os.getenv("SCHEDULER_SHADOW_WEIGHT", "1"))
+}
+SCHEDULER_MAX_RUNNING = {
+    "scoring": SCORING_MAX_CONCURRENCY,
+    "batch": BATCH_MAX_CONCURRENCY,
+    "explain": EXPLAIN_MAX_CONCURRENCY,
+    "shadow": int(os.getenv("SHADOW_MAX_CONCURRENCY", "1"))
+}
+SCHEDULER_CHUNK_SIZE = int(os.getenv("SCHEDULER_CHUNK_SIZE", "100"))  # rows per bulk task
+
+# Deadlines: clients may send their remaining time budget (seconds) in this header;
+# queued work past its deadline or whose client disconnected is dropped
+DEADLINE_HEADER = "X-Request-Timeout"
+DEFAULT_REQUEST_TIMEOUT = float(os.getenv("DEFAULT_REQUEST_TIMEOUT", "0")) or None  # 0 = none
+DISCONNECT_POLL_INTERVAL = float(os.getenv("DISCONNECT_POLL_INTERVAL", "0.05"))  # seconds
+
+# Request timing: optional Server-Timing header with the stage breakdown, and the
+# slowest requests kept in memory for GET /admin/slow-requests
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() in ("1", "true", "yes")
+SLOW_REQUEST_THRESHOLD = float(os.getenv("SLOW_REQUEST_THRESHOLD", "1.0"))  # seconds, 0 = disabled
+SLOW_REQUEST_BUFFER_SIZE = int(os.getenv("SLOW_REQUEST_BUFFER_SIZE", "100"))  # most recent kept
+
+# On-demand profiling: with an admin token, requests sent with the X-Profile
+# header ('cpu', 'memory' or 'all') are profiled; off by default
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "20"))  # most recent profiles kept
+PROFILE_TOP_FUNCTIONS = int(os.getenv("PROFILE_TOP_FUNCTIONS", "50"))  # rows per report
+
+# Traffic capture: a sample of scoring request bodies appended to a JSONL file,
+# replayable with `python -m tests.bench.loadgen --replay`; off unless a path is set
+CAPTURE_PATH = os.getenv("CAPTURE_PATH") or None
+CAPTURE_SAMPLE_RATE = float(os.getenv("CAPTURE_SAMPLE_RATE", "0.01"))  # fraction of requests kept
+CAPTURE_QUEUE_SIZE = int(os.getenv("CAPTURE_QUEUE_SIZE", "10000"))  # requests held in memory at most
+CAPTURE_PATHS = ("/predict", "/predict/batch", "/feature-importance")
+
+# Prediction audit log: every decision of /predict and /predict/batch is queued
+# and written in batches by a background thread; off unless a directory is set
+AUDIT_LOG_DIR = os.getenv("AUDIT_LOG_DIR") or None
+AUDIT_FORMAT = os.getenv("AUDIT_FORMAT", "ndjson")  # "ndjson" or "parquet"
+AUDIT_FEATURES = os.getenv("AUDIT_FEATURES", "hash")  # "hash" or "full" (hash and sparse features)
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "100000"))  # records held in memory at most
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "1000"))  # records per write
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))  # seconds between writes at most
+AUDIT_ROTATE_MB = float(os.getenv("AUDIT_ROTATE_MB", "100"))  # file size before starting a new one
+# Parquet files are only readable once closed: close them at least this often
+AUDIT_PUBLISH_INTERVAL = float(os.getenv("AUDIT_PUBLISH_INTERVAL", "60"))  # seconds, 0 = on rotation only
+# When the queue is full: "drop" the records (counted) or "reject" the request (503)
+AUDIT_OVERFLOW = os.getenv("AUDIT_OVERFLOW", "drop")
+AUDIT_RETRY_AFTER = int(os.getenv("AUDIT_RETRY_AFTER", "1"))  # seconds, on 503
+
+# Drift monitoring: scored features are counted into the bins of a reference profile
+# built from the training data (python -m api.drift build); off without the profile
+DRIFT_REFERENCE_PATH = os.getenv("DRIFT_REFERENCE_PATH", str(BASE_DIR / "drift_reference.json"))
+DRIFT_BINS = int(os.getenv("DRIFT_BINS", "10"))  # quantile bins per feature, when building the profile
+DRIFT_PSI_THRESHOLD = float(os.getenv("DRIFT_PSI_THRESHOLD", "0.2"))  # PSI above which a feature has drifted
+# Raw training rows kept with the profile, as the reference of offline drift reports
+DRIFT_REFERENCE_SAMPLE_PATH = os.getenv(
+    "DRIFT_REFERENCE_SAMPLE_PATH", str(BASE_DIR / "drift_reference_sample.parquet")
+)
+DRIFT_REFERENCE_SAMPLE_ROWS = int(os.getenv("DRIFT_REFERENCE_SAMPLE_ROWS", "10000"))
+
+# Offline drift reports (python -m api.drift_report) over the audit log, which
+# must record the features (AUDIT_FEATURES=full)
+DRIFT_REPORT_DIR = os.getenv("DRIFT_REPORT_DIR", str(BASE_DIR / "drift_reports"))
+DRIFT_REPORT_SAMPLE = int(os.getenv("DRIFT_REPORT_SAMPLE", "20000"))  # audited rows compared at most
+
+# Score monitor: probability distribution and approval rate of scored clients, in
+# time buckets kept in a ring buffer (fixed memory), summed over rolling windows
+SCORE_MONITOR_BUCKET_SECONDS = int(os.getenv("SCORE_MONITOR_BUCKET_SECONDS", "3600"))
+SCORE_MONITOR_BUCKETS = int(os.getenv("SCORE_MONITOR_BUCKETS", "48"))  # history kept, in buckets
+SCORE_MONITOR_RESOLUTION = int(os.getenv("SCORE_MONITOR_RESOLUTION", "1000"))  # probability bins per bucket
+SCORE_MONITOR_WINDOWS = [
+    int(seconds) for seconds in os.getenv("SCORE_MONITOR_WINDOWS", "3600,21600,86400").split(",") if seconds.strip()
+]  # rolling windows reported, in seconds
+
+# Champion/challenger: challengers are native bundles, given as "name=path,name=path";
+# a sampled share of scored clients is scored again by them in the background
+CHALLENGER_BUNDLES = {
+    name.strip(): path.strip()
+    for name, _, path in (
+        item.partition("=") for item in os.getenv("CHALLENGER_BUNDLES", "").split(",") if item.strip()
+    )
+}
+SHADOW_SAMPLE_RATE = float(os.getenv("SHADOW_SAMPLE_RATE", "0.1"))
+SHADOW_BATCH_SIZE = int(os.getenv("SHADOW_BATCH_SIZE", "64"))
+SHADOW_FLUSH_INTERVAL = float(os.getenv("SHADOW_FLUSH_INTERVAL", "1.0"))  # seconds
+SHADOW_MAX_QUEUE = int(os.getenv("SHADOW_MAX_QUEUE", "10000"))  # clients waiting, beyond that they are dropped
+SHADOW_STORE_DIR = os.getenv("SHADOW_STORE_DIR", str(Path(tempfile.gettempdir()) / "credit-scoring-shadow"))
+
+# Warm-up: /ready reports ready only once synthetic predictions (and optionally
+# explanations) have gone through the champion and every challenger
+WARMUP_ROUNDS = int(os.getenv("WARMUP_ROUNDS", "3"))  # 0 = ready without warm-up
+WARMUP_BATCH_SIZE = int(os.getenv("WARMUP_BATCH_SIZE", "32"))  # rows per synthetic batch
+WARMUP_EXPLAIN = os.getenv("WARMUP_EXPLAIN", "false").lower() in ("1", "true", "yes")
+
+# Admin endpoints (/admin/...) require this token in the X-Admin-Token header;
+# they are disabled when it is not set
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN") or None
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
 
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # "json" (one object per line) or "text"
+# Records are written by a background thread; the request only enqueues them
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() in ("1", "true", "yes")
+LOG_LAZY_FORMAT = os.getenv("LOG_LAZY_FORMAT", "true").lower() in ("1", "true", "yes")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # records beyond are dropped
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))  # requests whose INFO logs are kept
 
 # CORS
 ALLOWED_ORIGINS = [
@@ -0,0 +1,171 @@
+"""
+Request deadlines and cancellation
+Lets queued or chunked work be dropped once nobody will read its result
+"""
+
+import asyncio
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+
+from api.config import (
+    DEADLINE_HEADER,
+    DEFAULT_REQUEST_TIMEOUT,
+    DISCONNECT_POLL_INTERVAL
+)
+from api.metrics import REGISTRY
+
+DEADLINE = "deadline"
+DISCONNECTED = "disconnected"
+
+_cancelled = REGISTRY.counter(
+    "requests_cancelled_total",
+    "Work dropped because its deadline passed or its client disconnected",
+    ("endpoint_class", "reason", "stage")
+)
+
+
+class RequestCancelledError(Exception):
+    """Raised when work is abandoned because its client went away"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Request cancelled ({reason})")
+        self.reason = reason
+
+
+class DeadlineExceededError(RequestCancelledError):
+    """Raised when work is abandoned because its deadline passed"""
+
+    def __init__(self):
+        super().__init__(DEADLINE)
+
+
+class CancellationToken:
+    """
+    Shared flag telling inference threads that a request was abandoned
+
+    Checked by the scheduler before running a queued task, and by chunked
+    work between chunks.
+    """
+
+    __slots__ = ("endpoint_class", "deadline", "reason", "_counted")
+
+    def __init__(self, endpoint_class: str, deadline: Optional[float] = None):
+        self.endpoint_class = endpoint_class
+        self.deadline = deadline  # time.monotonic() value, None for no deadline
+        self.reason: Optional[str] = None
+        self._counted = False
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (None if there is none)"""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def cancel(self, reason: str) -> None:
+        """Mark the request as abandoned"""
+        if self.reason is None:
+            self.reason = reason
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the request was abandoned or is past its deadline"""
+        if self.reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.reason = DEADLINE
+        return self.reason is not None
+
+    def check(self, stage: str) -> None:
+        """
+        Raise if the request was abandoned, counting it once in metrics
+
+        Parameters
+        ----------
+        stage : str
+            Where the work was dropped (e.g. "queued", "between_chunks")
+        """
+        if self.cancelled:
+            if not self._counted:
+                self._counted = True
+                _cancelled.inc(self.endpoint_class, self.reason, stage)
+            if self.reason == DEADLINE:
+                raise DeadlineExceededError()
+            raise RequestCancelledError(self.reason)
+
+
+def token_from_headers(endpoint_class: str, headers) -> CancellationToken:
+    """
+    Build a cancellation token from the optional deadline header
+
+    The header carries the client's remaining time budget in seconds
+    (relative, so client and server clocks need not agree).
+
+    Raises
+    ------
+    ValueError
+        If the header is not a positive number
+    """
+    raw = headers.get(DEADLINE_HEADER)
+    timeout = DEFAULT_REQUEST_TIMEOUT
+    if raw is not None:
+        timeout = float(raw)
+        if not timeout > 0:
+            raise ValueError(f"{DEADLINE_HEADER} must be a positive number of seconds")
+    deadline = time.monotonic() + timeout if timeout else None
+    return CancellationToken(endpoint_class, deadline)
+
+
+async def gather_guarded(
+    futures: List[Future],
+    token: CancellationToken,
+    request=None
+) -> list:
+    """
+    Await scheduler futures while watching the deadline and the client
+
+    If the deadline passes or the client disconnects, the token is
+    cancelled so that queued tasks are dropped before execution, and
+    the remaining futures are abandoned.
+
+    Parameters
+    ----------
+    futures : List[Future]
+        Scheduler futures, in result order
+    token : CancellationToken
+        Token the futures' tasks were submitted with
+    request : Optional[Request]
+        Incoming request, polled for client disconnection
+
+    Returns
+    -------
+    list
+        Results of the futures, in order
+
+    Raises
+    ------
+    RequestCancelledError
+        If the work was abandoned (DeadlineExceededError for deadlines)
+    """
+    wrapped = [asyncio.wrap_future(future) for future in futures]
+    pending = set(wrapped)
+    try:
+        while pending:
+            timeout = DISCONNECT_POLL_INTERVAL if request is not None else None
+            remaining = token.remaining()
+            if remaining is not None:
+                remaining = max(0.0, remaining)
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_EXCEPTION
+            )
+            for fut in done:
+                if fut.exception() is not None:
+                    raise fut.exception()
+            if not pending:
+                break
+            if request is not None and await request.is_disconnected():
+                token.cancel(DISCONNECTED)
+            token.check("waiting")
+    finally:
+        for fut in pending:
+            fut.cancel()
+    return [fut.result() for fut in wrapped]
@@ -0,0 +1,433 @@
+"""
+Feature drift monitoring
+Streaming per-feature histograms of scored traffic, compared to training
+
+A reference profile, built from the training data when the model is
+trained, gives each feature quantile bin edges and the share of training
+rows in each bin (plus a missing-value bin). The serving process counts
+the rows it scores into the same bins, one vectorized update per scored
+matrix, in fixed-size arrays. Drift scores (PSI and a binned
+Kolmogorov-Smirnov distance) are computed on demand from the counts.
+
+The build also keeps a seeded sample of raw training rows with their
+scored probability of default (DRIFT_REFERENCE_SAMPLE_PATH), the reference
+of the offline drift reports (`api.drift_report`).
+
+Usage
+-----
+python -m api.drift build train.csv [--output drift_reference.json] [--bins 10]
+                                    [--reference-rows 10000]
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from api.config import (
+    DRIFT_REFERENCE_PATH,
+    DRIFT_REFERENCE_SAMPLE_PATH,
+    DRIFT_REFERENCE_SAMPLE_ROWS,
+    DRIFT_BINS,
+    LOG_LEVEL
+)
+from api.manifest import feature_order_digest
+from api.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_FORMAT_VERSION = 1
+
+# Score column of the raw reference rows
+PROBABILITY_COLUMN = "probability_default"
+
+# Floor on bin shares, so empty bins do not make PSI infinite
+_PSI_EPSILON = 1e-4
+
+# Scored rows are binned this many at a time, bounding the temporary arrays
+_UPDATE_ROWS = 256
+
+_observed_rows = REGISTRY.counter(
+    "drift_observed_rows_total",
+    "Scored rows counted into the drift histograms"
+)
+
+
+class DriftMonitor:
+    """
+    Streaming histograms of scored features against a reference profile
+
+    Parameters
+    ----------
+    reference : dict
+        Reference profile, see `build_reference`
+    """
+
+    def __init__(self, reference: Dict):
+        self.reference = reference
+        self.feature_names = list(reference["feature_names"])
+        n_features = len(self.feature_names)
+        edges = [reference["features"][name]["edges"] for name in self.feature_names]
+        self.n_edges = max((len(e) for e in edges), default=0)
+        # Slots per feature: bins for values, then one for missing values
+        self.n_slots = self.n_edges + 2
+        self._missing_slot = self.n_edges + 1
+
+        # Edges padded with +inf (a value is never above the padding), one row per
+        # edge rank so that comparisons run over contiguous memory
+        self._edges = np.full((self.n_edges, n_features), np.inf)
+        self._bin_dtype = np.uint8 if self.n_slots <= 255 else np.intp
+        self._reference = np.zeros((n_features, self.n_slots))
+        for i, (name, feature_edges) in enumerate(zip(self.feature_names, edges)):
+            profile = reference["features"][name]
+            self._edges[:len(feature_edges), i] = feature_edges
+            self._reference[i, :len(profile["proportions"])] = profile["proportions"]
+            self._reference[i, self._missing_slot] = profile["missing"]
+        self._offsets = (np.arange(n_features) * self.n_slots)[None, :]
+
+        self._counts = np.zeros(n_features * self.n_slots, dtype=np.int64)
+        self._rows = 0
+        self._lock = threading.Lock()
+        # (feature names list, whether it matches), checked once per list
+        self._checked = (None, False)
+
+    def matches(self, feature_names: List[str]) -> bool:
+        """
+        Whether rows with these columns can be counted
+
+        The comparison runs once per list object (i.e. once per loaded
+        predictor); later calls with the same list are an identity check.
+        """
+        checked, accepted = self._checked
+        if feature_names is not checked:
+            accepted = list(feature_names) == self.feature_names
+            if not accepted:
+                logger.error(
+                    "Drift reference profile was built for another feature order than the model's, "
+                    "scored rows are not counted; rebuild it with `python -m api.drift build`"
+                )
+            # One assignment, so concurrent readers never see a mismatched pair
+            self._checked = (feature_names, accepted)
+        return accepted
+
+    def _slots(self, X: np.ndarray) -> np.ndarray:
+        """Flat histogram slot of every value of a (small) feature matrix"""
+        # Bin = number of edges strictly below the value (NaN compares False)
+        bins = (X[None, :, :] > self._edges[:, None, :]).sum(axis=0, dtype=self._bin_dtype)
+        bins[np.isnan(X)] = self._missing_slot
+        return (bins + self._offsets).ravel()
+
+    def bin_counts(self, X: np.ndarray) -> np.ndarray:
+        """
+        Histogram counts of a feature matrix
+
+        Parameters
+        ----------
+        X : np.ndarray
+            Features matrix in model column order, NaN for missing
+
+        Returns
+        -------
+        np.ndarray
+            Counts of shape (n_features * n_slots,)
+        """
+        counts = np.zeros(len(self.feature_names) * self.n_slots, dtype=np.int64)
+        for start in range(0, X.shape[0], _UPDATE_ROWS):
+            counts += np.bincount(self._slots(X[start:start + _UPDATE_ROWS]), minlength=counts.size)
+        return counts
+
+    def observe(self, X: np.ndarray) -> None:
+        """Count a scored matrix into the histograms"""
+        if X.shape[0] == 0:
+            return
+        if X.shape[0] == 1:
+            # One slot per feature, all distinct: increment them in place
+            slots = self._slots(X)
+            with self._lock:
+                self._counts[slots] += 1
+                self._rows += 1
+        else:
+            counts = self.bin_counts(X)
+            with self._lock:
+                self._counts += counts
+                self._rows += X.shape[0]
+        _observed_rows.inc(amount=X.shape[0])
+
+    @property
+    def observed_rows(self) -> int:
+        """Rows counted since startup (or the last reset)"""
+        return self._rows
+
+    def reset(self) -> None:
+        """Forget the observed rows"""
+        with self._lock:
+            self._counts[:] = 0
+            self._rows = 0
+
+    def scores(self) -> List[Dict]:
+        """
+        Drift scores of every feature
+
+        Returns
+        -------
+        List[Dict]
+            Per feature: PSI, binned KS distance and missing shares, by
+            decreasing PSI (empty until rows are observed)
+        """
+        with self._lock:
+            counts = self._counts.reshape(len(self.feature_names), self.n_slots).astype(float)
+            rows = self._rows
+        if rows == 0:
+            return []
+
+        current = counts / rows
+        reference = self._reference
+        expected = np.maximum(reference, _PSI_EPSILON)
+        actual = np.maximum(current, _PSI_EPSILON)
+        psi = ((actual - expected) * np.log(actual / expected)).sum(axis=1)
+
+        # KS over the value bins, each distribution normalized to its non-missing rows
+        values_ref = reference[:, :self._missing_slot]
+        values_cur = current[:, :self._missing_slot]
+        cdf_ref = np.cumsum(values_ref, axis=1) / np.maximum(values_ref.sum(axis=1, keepdims=True), 1e-12)
+        cdf_cur = np.cumsum(values_cur, axis=1) / np.maximum(values_cur.sum(axis=1, keepdims=True), 1e-12)
+        ks = np.abs(cdf_cur - cdf_ref).max(axis=1)
+
+        order = np.argsort(-psi, kind="stable")
+        return [
+            {
+                "feature": self.feature_names[i],
+                "psi": float(psi[i]),
+                "ks": float(ks[i]),
+                "missing_reference": float(reference[i, self._missing_slot]),
+                "missing_current": float(current[i, self._missing_slot])
+            }
+            for i in order
+        ]
+
+
+def build_reference(X: np.ndarray, feature_names: List[str], n_bins: int = DRIFT_BINS) -> Dict:
+    """
+    Reference profile of training data
+
+    Parameters
+    ----------
+    X : np.ndarray
+        Training features in model column order, NaN for missing
+    feature_names : List[str]
+        Model features
+    n_bins : int
+        Quantile bins per feature (fewer for features with few distinct values)
+
+    Returns
+    -------
+    dict
+        JSON-serializable profile: bin edges, bin shares and missing share
+        per feature
+    """
+    rows = X.shape[0]
+    quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+    features = {}
+    for i, name in enumerate(feature_names):
+        values = X[:, i][~np.isnan(X[:, i])]
+        # Edges are observed values, so a feature with few distinct values gets few bins
+        edges = np.unique(np.quantile(values, quantiles, method="lower")).tolist() if len(values) else []
+        features[name] = {"edges": edges, "proportions": [], "missing": 0.0}
+
+    reference = {
+        "format_version": REFERENCE_FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "rows": rows,
+        "feature_order_sha256": feature_order_digest(feature_names),
+        "feature_names": list(feature_names),
+        "features": features
+    }
+    # Shares are counted with the serving binning, so both sides agree exactly
+    monitor = DriftMonitor(reference)
+    shares = monitor.bin_counts(X).reshape(len(feature_names), monitor.n_slots) / max(rows, 1)
+    for i, name in enumerate(feature_names):
+        n_values = len(features[name]["edges"]) + 1
+        features[name]["proportions"] = shares[i, :n_values].tolist()
+        features[name]["missing"] = float(shares[i, monitor.n_slots - 1])
+    return reference
+
+
+def load_reference(path: str = DRIFT_REFERENCE_PATH) -> Optional[Dict]:
+    """Read a reference profile (None if the file does not exist)"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+# Drift monitor of the serving process
+_monitor: Optional[DriftMonitor] = None
+_monitor_loaded = False
+_monitor_lock = threading.Lock()
+
+
+def write_reference_sample(
+    path: str,
+    X: np.ndarray,
+    feature_names: List[str],
+    proba_default: np.ndarray
+) -> None:
+    """
+    Write raw reference rows and their scores to Parquet
+
+    Parameters
+    ----------
+    path : str
+        Output path
+    X : np.ndarray
+        Features matrix in model column order
+    feature_names : List[str]
+        Model features
+    proba_default : np.ndarray
+        Scored probability of default of each row
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    X = np.asarray(X, dtype=np.float32)
+    columns = {name: X[:, j] for j, name in enumerate(feature_names)}
+    columns[PROBABILITY_COLUMN] = np.asarray(proba_default, dtype=np.float64)
+    pq.write_table(pa.table(columns), path)
+
+
+def load_reference_sample(path: str = DRIFT_REFERENCE_SAMPLE_PATH):
+    """
+    Load the raw reference rows
+
+    Returns
+    -------
+    Optional[pd.DataFrame]
+        Features in model column order, then `probability_default`;
+        None if the file does not exist
+    """
+    import pandas as pd
+
+    try:
+        return pd.read_parquet(path)
+    except FileNotFoundError:
+        return None
+
+
+def get_drift_monitor() -> Optional[DriftMonitor]:
+    """Get or create the drift monitor (None without a reference profile)"""
+    global _monitor, _monitor_loaded
+    if not _monitor_loaded:
+        with _monitor_lock:
+            if not _monitor_loaded:
+                reference = load_reference()
+                if reference is None:
+                    logger.info(f"No drift reference profile at {DRIFT_REFERENCE_PATH}, drift monitoring disabled")
+                else:
+                    _monitor = DriftMonitor(reference)
+                    logger.info(f"Drift monitoring against {reference['rows']} reference rows")
+                _monitor_loaded = True
+    return _monitor
+
+
+def check_feature_order(feature_names: List[str]) -> bool:
+    """
+    Check the reference profile against a model's features, as it is loaded
+
+    Parameters
+    ----------
+    feature_names : List[str]
+        Model features, in column order
+
+    Returns
+    -------
+    bool
+        False if there is a reference profile and it was built for another
+        feature order (logged; the model's rows are then not counted)
+    """
+    monitor = get_drift_monitor()
+    return monitor is None or monitor.matches(feature_names)
+
+
+def observe(X: np.ndarray, feature_names: List[str]) -> None:
+    """
+    Count scored rows into the drift monitor, if any
+
+    Parameters
+    ----------
+    X : np.ndarray
+        Scored features matrix
+    feature_names : List[str]
+        Its columns, the predictor's own list; rows are skipped if they
+        differ from the reference (checked once, see `DriftMonitor.matches`)
+    """
+    monitor = get_drift_monitor()
+    if monitor is not None and monitor.matches(feature_names):
+        monitor.observe(X)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    from api.batch_score import FeatureMapper, _read_chunks, _read_columns
+    from api.predictor import load_feature_names
+
+    parser = argparse.ArgumentParser(description="Build the drift reference profile from training data")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("training_data", help="Training features, CSV or Parquet")
+    parser.add_argument(
+        "--output", default=DRIFT_REFERENCE_PATH,
+        help="Reference profile path (default: %(default)s)"
+    )
+    parser.add_argument("--bins", type=int, default=DRIFT_BINS, help="Bins per feature (default: %(default)s)")
+    parser.add_argument("--sample", type=int, help="Use a random sample of this many rows")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--reference-rows", type=int, default=DRIFT_REFERENCE_SAMPLE_ROWS,
+        help="Raw rows kept for the offline drift reports, 0 for none (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--reference-output", default=DRIFT_REFERENCE_SAMPLE_PATH,
+        help="Raw reference rows path (default: %(default)s)"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, LOG_LEVEL),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    feature_names = load_feature_names()
+    columns, _ = _read_columns(args.training_data)
+    mapper = FeatureMapper(feature_names, columns)
+    if mapper.missing_features:
+        logger.warning(f"{len(mapper.missing_features)} model features absent from the training data")
+    X = np.concatenate([
+        mapper.transform(chunk)
+        for chunk in _read_chunks(args.training_data, mapper.source_columns, 100000)
+    ])
+    rng = np.random.default_rng(args.seed)
+    if args.sample is not None and args.sample < len(X):
+        X = X[np.sort(rng.choice(len(X), size=args.sample, replace=False))]
+
+    reference = build_reference(X, feature_names, args.bins)
+    with open(args.output, "w") as f:
+        json.dump(reference, f)
+    logger.info(f"Drift reference profile of {len(X)} rows written to {args.output}")
+
+    if args.reference_rows > 0:
+        from api.predictor import CreditScorePredictor, unmonitored
+
+        if args.reference_rows < len(X):
+            X = X[np.sort(rng.choice(len(X), size=args.reference_rows, replace=False))]
+        with unmonitored():
+            proba_default = CreditScorePredictor().predict_proba_matrix(X)
+        write_reference_sample(args.reference_output, X, feature_names, proba_default)
+        logger.info(f"{len(X)} reference rows written to {args.reference_output}")
+
+
+if __name__ == "__main__":
+    main()
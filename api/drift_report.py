@@ -0,0 +1,384 @@
+"""
+Offline drift reports
+Evidently data drift and prediction drift reports of audited traffic against training
+
+The audit log (AUDIT_FEATURES=full) is streamed file by file and a
+seeded reservoir sample of its records is kept in a preallocated matrix,
+so memory is bounded by the sample size whatever the log size. The
+sample is compared to the raw reference rows written by
+`python -m api.drift build`:
+
+- data drift: every feature (DataDriftPreset)
+- target drift: the scored probability of default and the decision, and
+  the scores against the most drifted features. The audit log holds no
+  repayment outcome, so the target is the model's prediction.
+
+Columns empty in either dataset are left out. Reports are written as
+HTML and/or JSON to DRIFT_REPORT_DIR.
+
+Usage
+-----
+python -m api.drift_report [--audit-dir DIR] [--output-dir DIR] [--sample 20000]
+                           [--since 2025-01-01] [--until 2025-02-01] [--format both]
+"""
+
+import argparse
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from api.audit import read_audit
+from api.config import (
+    AUDIT_LOG_DIR,
+    DRIFT_REFERENCE_SAMPLE_PATH,
+    DRIFT_REPORT_DIR,
+    DRIFT_REPORT_SAMPLE,
+    DEFAULT_THRESHOLD,
+    LOG_LEVEL
+)
+from api.drift import PROBABILITY_COLUMN, load_reference_sample
+
+logger = logging.getLogger(__name__)
+
+# Decision column of the compared datasets
+DECISION_COLUMN = "decision"
+
+# Formats
+HTML = "html"
+JSON = "json"
+FORMATS = {HTML: (HTML,), JSON: (JSON,), "both": (HTML, JSON)}
+
+# Features plotted against the scores in the target drift report
+TARGET_FEATURES = 20
+
+
+class AuditSample:
+    """
+    Uniform sample of audited predictions, of fixed size (reservoir sampling)
+
+    Parameters
+    ----------
+    feature_names : List[str]
+        Features kept, in column order
+    size : int
+        Rows kept at most
+    seed : int
+        Seed of the sampling, for reproducible reports
+    """
+
+    def __init__(self, feature_names: List[str], size: int, seed: int = 0):
+        self.feature_names = list(feature_names)
+        self.size = size
+        self._index = {name: j for j, name in enumerate(self.feature_names)}
+        self._rng = np.random.default_rng(seed)
+        self._X = np.full((size, len(self.feature_names)), np.nan, dtype=np.float32)
+        self._proba = np.empty(size)
+        self._decisions = np.empty(size, dtype=object)
+        self.seen = 0
+        self.without_features = 0
+        self.threshold = None
+
+    def add(self, record: Dict) -> None:
+        """Offer one audit record to the sample"""
+        features = record.get("features")
+        if features is None:
+            self.without_features += 1
+            return
+        if record.get("threshold") is not None:
+            self.threshold = record["threshold"]
+
+        # Algorithm R: the n-th record replaces a kept one with probability size / n
+        slot = self.seen if self.seen < self.size else int(self._rng.integers(0, self.seen + 1))
+        self.seen += 1
+        if slot >= self.size:
+            return
+        row = self._X[slot]
+        row[:] = np.nan
+        for name, value in features.items():
+            j = self._index.get(name)
+            if j is not None and value is not None:
+                row[j] = value
+        self._proba[slot] = record["probability_default"]
+        self._decisions[slot] = record["decision"]
+
+    def extend(self, records: Iterable[Dict]) -> "AuditSample":
+        """Offer every record of an iterable"""
+        for record in records:
+            self.add(record)
+        return self
+
+    def to_frame(self):
+        """
+        Sampled rows
+
+        Returns
+        -------
+        pd.DataFrame
+            Features, `probability_default` and `decision` of the kept records
+        """
+        import pandas as pd
+
+        rows = min(self.seen, self.size)
+        frame = pd.DataFrame(self._X[:rows], columns=self.feature_names, copy=False)
+        frame[PROBABILITY_COLUMN] = self._proba[:rows]
+        frame[DECISION_COLUMN] = self._decisions[:rows]
+        return frame
+
+
+def _parse_time(value: str) -> float:
+    """ISO date or date-time (UTC unless stated) to Unix time"""
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _drift_rank(column: Dict) -> float:
+    """Sort key of a DataDriftTable column, most drifted first"""
+    score = column["drift_score"]
+    if score is None or (isinstance(score, float) and math.isnan(score)):
+        return math.inf
+    # p-value tests drift as the score falls, distances as it grows
+    return score if "p_value" in column["stattest_name"] else -score
+
+
+def most_drifted(data_drift: Dict, top: int) -> List[str]:
+    """
+    Most drifted features of a data drift report
+
+    Parameters
+    ----------
+    data_drift : dict
+        `as_dict()` of a DataDriftPreset report
+    top : int
+        Features returned at most
+
+    Returns
+    -------
+    List[str]
+        Drifted features first, by decreasing drift
+    """
+    table = next(metric["result"] for metric in data_drift["metrics"] if metric["metric"] == "DataDriftTable")
+    columns = sorted(
+        table["drift_by_columns"].values(),
+        key=lambda column: (not column["drift_detected"], _drift_rank(column))
+    )
+    return [column["column_name"] for column in columns[:top]]
+
+
+def build_reports(reference, current, target_features: int = TARGET_FEATURES) -> Dict:
+    """
+    Run the data drift and target drift reports
+
+    Parameters
+    ----------
+    reference, current : pd.DataFrame
+        Features, `probability_default` and `decision`, same columns
+    target_features : int
+        Features plotted against the scores
+
+    Returns
+    -------
+    Dict[str, evidently.report.Report]
+        Reports by name ('data_drift', 'target_drift'), already run
+    """
+    from evidently import ColumnMapping
+    from evidently.metric_preset import DataDriftPreset
+    from evidently.metrics import ColumnDriftMetric, TargetByFeaturesTable
+    from evidently.report import Report
+
+    feature_names = [c for c in reference.columns if c not in (PROBABILITY_COLUMN, DECISION_COLUMN)]
+    column_mapping = ColumnMapping(
+        target=None,
+        prediction=PROBABILITY_COLUMN,
+        numerical_features=feature_names,
+        categorical_features=[DECISION_COLUMN]
+    )
+
+    data_drift = Report(metrics=[DataDriftPreset(columns=feature_names)])
+    data_drift.run(reference_data=reference, current_data=current, column_mapping=column_mapping)
+
+    metrics = [ColumnDriftMetric(PROBABILITY_COLUMN), ColumnDriftMetric(DECISION_COLUMN)]
+    plotted = most_drifted(data_drift.as_dict(), target_features)
+    if plotted:
+        metrics.append(TargetByFeaturesTable(columns=plotted))
+    target_drift = Report(metrics=metrics)
+    target_drift.run(reference_data=reference, current_data=current, column_mapping=column_mapping)
+
+    return {"data_drift": data_drift, "target_drift": target_drift}
+
+
+def run(
+    audit_dir: str,
+    output_dir: str = DRIFT_REPORT_DIR,
+    reference_path: str = DRIFT_REFERENCE_SAMPLE_PATH,
+    sample: int = DRIFT_REPORT_SAMPLE,
+    seed: int = 0,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    formats=(HTML, JSON),
+    columns: Optional[List[str]] = None,
+    target_features: int = TARGET_FEATURES
+) -> Dict:
+    """
+    Sample the audit log and write the drift reports
+
+    Parameters
+    ----------
+    audit_dir : str
+        Audit log directory
+    output_dir : str
+        Reports directory, created if needed
+    reference_path : str
+        Raw reference rows (`python -m api.drift build`)
+    sample : int
+        Audited records compared at most
+    seed : int
+        Seed of the sampling
+    since, until : float, optional
+        Audited time range (Unix time)
+    formats : Iterable[str]
+        'html' and/or 'json'
+    columns : List[str], optional
+        Features compared (default: all)
+    target_features : int
+        Features plotted against the scores
+
+    Returns
+    -------
+    dict
+        Row counts, left out columns, drift summary and written paths
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no reference sample
+    ValueError
+        If no audited record in range holds its features
+    """
+    reference = load_reference_sample(reference_path)
+    if reference is None:
+        raise FileNotFoundError(f"No reference sample at {reference_path}, run python -m api.drift build")
+    feature_names = [c for c in reference.columns if c != PROBABILITY_COLUMN]
+    if columns:
+        unknown = sorted(set(columns) - set(feature_names))
+        if unknown:
+            raise ValueError(f"Unknown features: {', '.join(unknown)}")
+        feature_names = [c for c in feature_names if c in set(columns)]
+
+    audited = AuditSample(feature_names, sample, seed)
+    audited.extend(read_audit(audit_dir, since=since, until=until))
+    if audited.seen == 0:
+        raise ValueError(
+            f"No audited record with features in {audit_dir} "
+            f"({audited.without_features} without, enable AUDIT_FEATURES=full)"
+        )
+    if audited.without_features:
+        logger.warning(f"{audited.without_features} audited records without features skipped")
+    current = audited.to_frame()
+
+    # Reference decisions under the threshold the audited traffic was scored with
+    threshold = audited.threshold if audited.threshold is not None else DEFAULT_THRESHOLD
+    reference = reference[feature_names + [PROBABILITY_COLUMN]].copy()
+    reference[DECISION_COLUMN] = np.where(reference[PROBABILITY_COLUMN] > threshold, "REJECTED", "APPROVED")
+
+    # Evidently cannot compare a column empty on either side
+    empty = [
+        name for name in feature_names
+        if reference[name].isna().all() or current[name].isna().all()
+    ]
+    if empty:
+        logger.info(f"{len(empty)} features empty in the reference or the audit sample left out")
+        reference = reference.drop(columns=empty)
+        current = current.drop(columns=empty)
+
+    reports = build_reports(reference, current, target_features)
+
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    paths = []
+    for name, report in reports.items():
+        for fmt in formats:
+            path = output / f"{name}-{stamp}.{fmt}"
+            if fmt == HTML:
+                report.save_html(str(path))
+            else:
+                report.save_json(str(path))
+            paths.append(str(path))
+
+    dataset = next(
+        metric["result"] for metric in reports["data_drift"].as_dict()["metrics"]
+        if metric["metric"] == "DatasetDriftMetric"
+    )
+    summary = {
+        "audited_records": audited.seen + audited.without_features,
+        "sampled_records": len(current),
+        "reference_rows": len(reference),
+        "threshold": threshold,
+        "empty_features": empty,
+        "compared_features": dataset["number_of_columns"],
+        "drifted_features": dataset["number_of_drifted_columns"],
+        "dataset_drift": dataset["dataset_drift"],
+        "paths": paths
+    }
+    logger.info(
+        f"{summary['drifted_features']}/{summary['compared_features']} features drifted "
+        f"over {summary['sampled_records']} sampled records, reports in {output}"
+    )
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Evidently drift reports of the audit log against training")
+    parser.add_argument(
+        "--audit-dir", default=AUDIT_LOG_DIR, required=AUDIT_LOG_DIR is None,
+        help="Audit log directory (default: AUDIT_LOG_DIR)"
+    )
+    parser.add_argument("--output-dir", default=DRIFT_REPORT_DIR, help="Reports directory (default: %(default)s)")
+    parser.add_argument(
+        "--reference", default=DRIFT_REFERENCE_SAMPLE_PATH,
+        help="Raw reference rows (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--sample", type=int, default=DRIFT_REPORT_SAMPLE,
+        help="Audited records compared at most (default: %(default)s)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--since", type=_parse_time, help="Start of the audited range, ISO date (UTC)")
+    parser.add_argument("--until", type=_parse_time, help="End of the audited range, excluded, ISO date (UTC)")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="both")
+    parser.add_argument("--columns", help="Comma-separated features to compare (default: all)")
+    parser.add_argument(
+        "--target-features", type=int, default=TARGET_FEATURES,
+        help="Most drifted features plotted against the scores (default: %(default)s)"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, LOG_LEVEL),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    run(
+        args.audit_dir,
+        output_dir=args.output_dir,
+        reference_path=args.reference,
+        sample=args.sample,
+        seed=args.seed,
+        since=args.since,
+        until=args.until,
+        formats=FORMATS[args.format],
+        columns=args.columns.split(",") if args.columns else None,
+        target_features=args.target_features
+    )
+
+
+if __name__ == "__main__":
+    main()
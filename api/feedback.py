@@ -0,0 +1,375 @@
+"""
+Outcome feedback
+Cost-optimal decision threshold from the realised outcomes of scored clients
+
+Outcomes (1 = the client defaulted) are read from a CSV or Parquet file
+keyed by client id, and matched with the probability the API served to
+each client, taken from the audit log (the latest record of the client).
+A file already holding a `probability_default` column (e.g. batch scores
+of labeled clients) is used as is.
+
+A client is rejected when its probability of default is above the
+threshold, so the business cost of a threshold is
+
+    FP_COST * defaulters approved + FN_COST * good clients rejected
+
+The whole curve is computed with one sort and cumulative sums, at a
+threshold between each pair of consecutive distinct scores: O(n log n),
+a few seconds for tens of millions of rows. The threshold of least cost
+is written to THRESHOLD_PATH (atomically) and recorded in the artifact
+manifest, so that a reload (POST /admin/reload, or the artifact watcher)
+applies it.
+
+Usage
+-----
+python -m api.feedback outcomes.csv [--id-column client_id] [--outcome-column TARGET]
+                                    [--audit-dir DIR] [--output optimal_threshold.json] [--dry-run]
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from api.audit import read_audit
+from api.config import (
+    ARTIFACT_MANIFEST_PATH,
+    AUDIT_LOG_DIR,
+    DEFAULT_THRESHOLD,
+    FN_COST,
+    FP_COST,
+    LOG_LEVEL,
+    THRESHOLD_PATH
+)
+from api.manifest import refresh_threshold
+
+logger = logging.getLogger(__name__)
+
+# Score column of an outcomes file, as written by the audit log and batch scoring
+PROBABILITY_COLUMN = "probability_default"
+
+# Audit records matched with the outcomes at a time
+_JOIN_BATCH = 100000
+
+
+def cost_curve(
+    proba_default: np.ndarray,
+    defaulted: np.ndarray,
+    fn_cost: float = FN_COST,
+    fp_cost: float = FP_COST
+) -> Dict[str, np.ndarray]:
+    """
+    Business cost of every distinct decision threshold
+
+    Parameters
+    ----------
+    proba_default : np.ndarray
+        Scored probability of default of each client
+    defaulted : np.ndarray
+        Realised outcome of each client (1 = default)
+    fn_cost : float
+        Cost of rejecting a client who would have repaid
+    fp_cost : float
+        Cost of approving a client who defaults
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        Ascending `threshold`s, with the `approved` count, `false_positives`
+        (defaulters approved), `false_negatives` (good clients rejected)
+        and `cost` at each
+    """
+    proba_default = np.asarray(proba_default, dtype=np.float64)
+    defaulted = np.asarray(defaulted)
+    order = np.argsort(proba_default, kind="stable")
+    scores = proba_default[order]
+    # Defaulters among the k lowest scores, for k = 0..n
+    defaults_below = np.zeros(len(scores) + 1, dtype=np.int64)
+    np.cumsum(defaulted[order], out=defaults_below[1:])
+
+    # Candidates halfway between consecutive distinct scores, and at both ends
+    distinct = scores[np.concatenate(([True], scores[1:] != scores[:-1]))] if len(scores) else scores
+    bounds = np.concatenate(([0.0], distinct, [1.0]))
+    thresholds = (bounds[:-1] + bounds[1:]) / 2
+    # Approved: probability not above the threshold, as the predictor decides
+    approved = np.searchsorted(scores, thresholds, side="right")
+
+    false_positives = defaults_below[approved]
+    false_negatives = (len(scores) - approved) - (defaults_below[-1] - false_positives)
+    return {
+        "threshold": thresholds,
+        "approved": approved,
+        "false_positives": false_positives,
+        "false_negatives": false_negatives,
+        "cost": fp_cost * false_positives + fn_cost * false_negatives
+    }
+
+
+def business_cost(
+    proba_default: np.ndarray,
+    defaulted: np.ndarray,
+    threshold: float,
+    fn_cost: float = FN_COST,
+    fp_cost: float = FP_COST
+) -> float:
+    """Business cost of one threshold"""
+    rejected = np.asarray(proba_default) > threshold
+    defaulted = np.asarray(defaulted, dtype=bool)
+    return float(
+        fp_cost * np.count_nonzero(defaulted & ~rejected) + fn_cost * np.count_nonzero(~defaulted & rejected)
+    )
+
+
+def optimal_threshold(
+    proba_default: np.ndarray,
+    defaulted: np.ndarray,
+    fn_cost: float = FN_COST,
+    fp_cost: float = FP_COST
+) -> Dict:
+    """
+    Threshold of least business cost
+
+    Parameters
+    ----------
+    proba_default : np.ndarray
+        Scored probability of default of each client
+    defaulted : np.ndarray
+        Realised outcome of each client (1 = default)
+    fn_cost, fp_cost : float
+        Costs of a rejected good client and of an approved defaulter
+
+    Returns
+    -------
+    dict
+        Threshold, its total and per-client cost, errors and approval
+        rate, with the row and default counts
+
+    Raises
+    ------
+    ValueError
+        If there are no outcomes
+    """
+    rows = len(proba_default)
+    if rows == 0:
+        raise ValueError("No outcomes to optimise the threshold on")
+    curve = cost_curve(proba_default, defaulted, fn_cost, fp_cost)
+    best = int(np.argmin(curve["cost"]))
+    cost = float(curve["cost"][best])
+    return {
+        # Unrounded: rounding could move it across a neighbouring score
+        "threshold": float(curve["threshold"][best]),
+        "cost": cost,
+        "cost_per_client": cost / rows,
+        "false_positives": int(curve["false_positives"][best]),
+        "false_negatives": int(curve["false_negatives"][best]),
+        "approval_rate": int(curve["approved"][best]) / rows,
+        "rows": rows,
+        "defaults": int(np.count_nonzero(defaulted)),
+        "fn_cost": fn_cost,
+        "fp_cost": fp_cost
+    }
+
+
+def load_outcomes(
+    path: str,
+    id_column: str = "client_id",
+    outcome_column: str = "TARGET"
+) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """
+    Read the realised outcomes of scored clients
+
+    Rows without an outcome are dropped, and for clients listed twice the
+    last outcome is kept.
+
+    Parameters
+    ----------
+    path : str
+        CSV or Parquet file
+    id_column : str
+        Client id column, compared as text with the audited client ids
+    outcome_column : str
+        Outcome column, 1 for a default and 0 otherwise
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]
+        (client ids, outcomes as int8, probabilities if the file has them)
+
+    Raises
+    ------
+    ValueError
+        If a column is missing or an outcome is not 0 or 1
+    """
+    import pandas as pd
+
+    from api.batch_score import _is_parquet, _read_columns
+
+    columns, _ = _read_columns(path)
+    missing = [c for c in (id_column, outcome_column) if c not in columns]
+    if missing:
+        raise ValueError(f"Missing columns in {path}: {', '.join(missing)}")
+    usecols = [id_column, outcome_column] + ([PROBABILITY_COLUMN] if PROBABILITY_COLUMN in columns else [])
+    if _is_parquet(path):
+        frame = pd.read_parquet(path, columns=usecols)
+    else:
+        frame = pd.read_csv(path, usecols=usecols, dtype={id_column: str})
+
+    frame = frame.dropna(subset=[outcome_column])
+    if not frame[outcome_column].isin((0, 1)).all():
+        raise ValueError(f"Outcomes in '{outcome_column}' must be 0 or 1")
+    frame = frame.drop_duplicates(subset=[id_column], keep="last")
+    proba_default = frame[PROBABILITY_COLUMN].to_numpy(dtype=np.float64) if PROBABILITY_COLUMN in frame else None
+    return (
+        frame[id_column].astype(str).to_numpy(),
+        frame[outcome_column].to_numpy(dtype=np.int8),
+        proba_default
+    )
+
+
+def join_audit(
+    client_ids: np.ndarray,
+    audit_dir: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None
+) -> np.ndarray:
+    """
+    Latest served probability of each client, from the audit log
+
+    Parameters
+    ----------
+    client_ids : np.ndarray
+        Distinct client ids, as text
+    audit_dir : str
+        Audit log directory
+    since, until : float, optional
+        Audited time range (Unix time)
+
+    Returns
+    -------
+    np.ndarray
+        Probability of default of each client, NaN if never audited
+    """
+    import pandas as pd
+
+    index = pd.Index(client_ids)
+    proba_default = np.full(len(client_ids), np.nan)
+    ids, scores = [], []
+
+    def flush():
+        positions = index.get_indexer(ids)
+        values = np.asarray(scores)
+        matched = positions >= 0
+        positions, values = positions[matched], values[matched]
+        # Audit files are read in time order: the last record of a client wins
+        _, last = np.unique(positions[::-1], return_index=True)
+        keep = len(positions) - 1 - last
+        proba_default[positions[keep]] = values[keep]
+        ids.clear()
+        scores.clear()
+
+    for record in read_audit(audit_dir, since=since, until=until):
+        if record.get("client_id") is None:
+            continue
+        ids.append(record["client_id"])
+        scores.append(record["probability_default"])
+        if len(ids) >= _JOIN_BATCH:
+            flush()
+    if ids:
+        flush()
+    return proba_default
+
+
+def write_threshold(result: Dict, path: str = THRESHOLD_PATH) -> None:
+    """
+    Write an optimised threshold file, replacing the current one atomically
+
+    Parameters
+    ----------
+    result : dict
+        Output of `optimal_threshold`
+    path : str
+        Threshold file
+    """
+    payload = {
+        "threshold": result["threshold"],
+        "fn_cost": result["fn_cost"],
+        "fp_cost": result["fp_cost"],
+        "rows": result["rows"],
+        "defaults": result["defaults"],
+        "cost_per_client": result["cost_per_client"],
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def _current_threshold(path: str) -> float:
+    """Threshold of the current threshold file (default if none)"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f).get("threshold", DEFAULT_THRESHOLD)
+    except FileNotFoundError:
+        return DEFAULT_THRESHOLD
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    from api.drift_report import _parse_time
+
+    parser = argparse.ArgumentParser(description="Optimise the decision threshold on realised outcomes")
+    parser.add_argument("outcomes", help="Outcomes of scored clients, CSV or Parquet")
+    parser.add_argument("--id-column", default="client_id")
+    parser.add_argument("--outcome-column", default="TARGET", help="1 for a default, 0 otherwise")
+    parser.add_argument("--audit-dir", default=AUDIT_LOG_DIR, help="Audit log directory (default: AUDIT_LOG_DIR)")
+    parser.add_argument("--since", type=_parse_time, help="Start of the audited range, ISO date (UTC)")
+    parser.add_argument("--until", type=_parse_time, help="End of the audited range, excluded, ISO date (UTC)")
+    parser.add_argument("--fn-cost", type=float, default=FN_COST, help="Cost of a rejected good client")
+    parser.add_argument("--fp-cost", type=float, default=FP_COST, help="Cost of an approved defaulter")
+    parser.add_argument("--output", default=THRESHOLD_PATH, help="Threshold file (default: %(default)s)")
+    parser.add_argument(
+        "--manifest", default=ARTIFACT_MANIFEST_PATH,
+        help="Artifact manifest to record the threshold in, if it exists (default: %(default)s)"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Report the threshold without writing it")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, LOG_LEVEL),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    client_ids, defaulted, proba_default = load_outcomes(args.outcomes, args.id_column, args.outcome_column)
+    if proba_default is None:
+        if args.audit_dir is None:
+            parser.error(f"{args.outcomes} has no {PROBABILITY_COLUMN} column, --audit-dir is needed")
+        proba_default = join_audit(client_ids, args.audit_dir, args.since, args.until)
+    scored = ~np.isnan(proba_default)
+    if not scored.all():
+        logger.warning(f"{np.count_nonzero(~scored)} of {len(scored)} clients with an outcome have no score")
+    proba_default, defaulted = proba_default[scored], defaulted[scored]
+
+    start = time.perf_counter()
+    result = optimal_threshold(proba_default, defaulted, args.fn_cost, args.fp_cost)
+    current = _current_threshold(args.output)
+    current_cost = business_cost(proba_default, defaulted, current, args.fn_cost, args.fp_cost)
+    logger.info(
+        f"Optimised on {result['rows']} outcomes ({result['defaults']} defaults) in "
+        f"{time.perf_counter() - start:.3f}s: threshold {result['threshold']} costs "
+        f"{result['cost_per_client']:.4f} per client, {current_cost / result['rows']:.4f} at the current {current}"
+    )
+    if args.dry_run:
+        return
+    write_threshold(result, args.output)
+    logger.info(f"Wrote threshold {result['threshold']} to {args.output}")
+    if os.path.abspath(args.output) == os.path.abspath(THRESHOLD_PATH):
+        refresh_threshold(args.manifest, args.output)
+
+
+if __name__ == "__main__":
+    main()
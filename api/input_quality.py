@@ -0,0 +1,186 @@
+"""
+Input quality checks
+Out-of-range and unexpectedly missing features, flagged while scoring
+
+Bounds come from the fitted model, once at load: the MinMaxScaler's
+training range (`data_min_`/`data_max_`), and the trees' missing value
+handling. LightGBM only learns where missing values go for features that
+had missing values in training, so a feature split on only with the 'None'
+missing type was always present, and a missing value for it is unexpected.
+
+Every scored matrix is checked with a few vectorized comparisons and the
+flags are counted in metrics. Endpoints can also collect the flagged
+feature names of the rows they score (`collect`).
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from api.metrics import REGISTRY
+
+# Flags
+OUT_OF_RANGE = "out_of_range"
+UNEXPECTED_MISSING = "unexpected_missing"
+FLAGS = (OUT_OF_RANGE, UNEXPECTED_MISSING)
+
+# LightGBM decision_type bits 2-3 in a model string
+_MISSING_TYPE_SHIFT = 2
+_MISSING_NONE = 0
+
+_checked_rows = REGISTRY.counter(
+    "input_rows_checked_total",
+    "Scored rows checked against the training bounds"
+)
+_flagged_rows = REGISTRY.counter(
+    "input_rows_flagged_total",
+    "Scored rows with at least one flagged feature, by flag",
+    ("flag",)
+)
+_flagged_values = REGISTRY.counter(
+    "input_values_flagged_total",
+    "Flagged feature values of scored rows, by flag",
+    ("flag",)
+)
+
+# Flags of the rows scored in the current context, when collected
+_collected: ContextVar[Optional[List]] = ContextVar("input_flags", default=None)
+
+
+class InputBounds:
+    """
+    Expected range and presence of each model feature
+
+    Parameters
+    ----------
+    feature_names : List[str]
+        Model features
+    low, high : np.ndarray
+        Training minimum and maximum of each feature (NaN: not checked)
+    missing_unexpected : np.ndarray
+        Boolean mask of the features never missing in training
+    dtype : np.dtype
+        Dtype of the checked matrices, bounds are compared in it
+    """
+
+    def __init__(
+        self,
+        feature_names: List[str],
+        low: np.ndarray,
+        high: np.ndarray,
+        missing_unexpected: np.ndarray,
+        dtype=np.float64
+    ):
+        self.feature_names = list(feature_names)
+        self.low = np.asarray(low, dtype=dtype)
+        self.high = np.asarray(high, dtype=dtype)
+        self.missing_unexpected = np.asarray(missing_unexpected, dtype=bool)
+
+    @classmethod
+    def from_model(cls, model, feature_names: List[str], dtype=np.float64) -> Optional["InputBounds"]:
+        """
+        Bounds of a (MinMaxScaler, LightGBM) pipeline or a native model
+
+        Returns
+        -------
+        Optional[InputBounds]
+            None if the model does not expose its training range
+        """
+        if hasattr(model, "steps"):
+            scaler, classifier = model.steps[0][1], model.steps[-1][1]
+            if not hasattr(scaler, "data_min_") or not hasattr(classifier, "booster_"):
+                return None
+            low, high = scaler.data_min_, scaler.data_max_
+            split_feature, missing_type = _splits_from_model_string(classifier.booster_.model_to_string())
+        elif getattr(model, "data_min", None) is not None:
+            low, high = model.data_min, model.data_max
+            # Leaves point to themselves; every other node is a split
+            nodes_per_tree = len(model.left) // model.num_trees
+            splits = model.left != np.arange(len(model.left)) % nodes_per_tree
+            split_feature, missing_type = model.split_feature[splits], model.missing_type[splits]
+        else:
+            return None
+
+        n_features = len(feature_names)
+        used = np.bincount(split_feature, minlength=n_features) > 0
+        handles_missing = np.bincount(
+            split_feature, weights=missing_type != _MISSING_NONE, minlength=n_features
+        ) > 0
+        return cls(feature_names, low, high, used & ~handles_missing, dtype=dtype)
+
+    def check(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Flag the values of a feature matrix
+
+        Parameters
+        ----------
+        X : np.ndarray
+            Features matrix in model column order, NaN for missing
+
+        Returns
+        -------
+        Dict[str, np.ndarray]
+            Boolean matrix of the shape of X per flag
+        """
+        # NaN compares False on both sides, so missing values are never out of range
+        return {
+            OUT_OF_RANGE: (X < self.low) | (X > self.high),
+            UNEXPECTED_MISSING: np.isnan(X) & self.missing_unexpected
+        }
+
+    def record(self, X: np.ndarray) -> None:
+        """Check a scored matrix, count its flags and collect them if requested"""
+        flags = self.check(X)
+        _checked_rows.inc(amount=X.shape[0])
+        for flag, mask in flags.items():
+            values = int(np.count_nonzero(mask))
+            if values:
+                _flagged_values.inc(flag, amount=values)
+                _flagged_rows.inc(flag, amount=int(np.count_nonzero(mask.any(axis=1))))
+        collected = _collected.get()
+        if collected is not None:
+            collected.extend(self.names(flags))
+
+    def names(self, flags: Dict[str, np.ndarray]) -> List[Dict[str, List[str]]]:
+        """Flagged feature names of each row"""
+        rows = []
+        for i in range(next(iter(flags.values())).shape[0]):
+            rows.append({
+                flag: [self.feature_names[j] for j in np.flatnonzero(mask[i])]
+                for flag, mask in flags.items()
+            })
+        return rows
+
+
+@contextmanager
+def collect():
+    """
+    Collect the flags of the rows scored within the block
+
+    Yields
+    ------
+    List[Dict[str, List[str]]]
+        Filled with the flagged feature names of each scored row,
+        in scoring order
+    """
+    rows = []
+    token = _collected.set(rows)
+    try:
+        yield rows
+    finally:
+        _collected.reset(token)
+
+
+def _splits_from_model_string(model_str: str):
+    """Split feature and missing type of every split node of a LightGBM model string"""
+    features, decision_types = [], []
+    for line in model_str.splitlines():
+        if line.startswith("split_feature="):
+            features.append(line[len("split_feature="):])
+        elif line.startswith("decision_type="):
+            decision_types.append(line[len("decision_type="):])
+    split_feature = np.array(" ".join(features).split(), dtype=np.int64)
+    decision_type = np.array(" ".join(decision_types).split(), dtype=np.int64)
+    return split_feature, (decision_type >> _MISSING_TYPE_SHIFT) & 3
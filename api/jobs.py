@@ -0,0 +1,409 @@
+"""
+Background scoring jobs
+Runs very large batches off the request path, chunk by chunk, on a bounded worker pool
+"""
+
+import logging
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from api.audit import AuditBackpressureError, get_audit_sink
+from api.batch_score import (
+    FeatureMapper,
+    ResultWriter,
+    _read_chunks,
+    _read_columns,
+    _results_frame
+)
+from api.config import (
+    JOBS_DIR,
+    JOBS_MAX_CONCURRENT,
+    JOBS_MAX_QUEUED,
+    JOBS_CHUNK_SIZE,
+    JOBS_RETENTION_SECONDS
+)
+from api.predictor import get_predictor
+from api.scheduler import BULK, get_scheduler
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+class JobQueueFullError(Exception):
+    """Raised when the maximum number of pending jobs is reached"""
+
+
+def _job_frame(ids: List[Optional[str]], scored: Tuple) -> "pd.DataFrame":
+    """Result rows of a job chunk, keyed by client_id"""
+    frame = _results_frame(None, None, scored)
+    frame.insert(0, "client_id", ids)
+    return frame
+
+
+def _client_features(X: np.ndarray, feature_names: List[str]) -> List[Dict[str, float]]:
+    """Features of each row as a client would send them, missing values left out"""
+    names = np.asarray(feature_names, dtype=object)
+    present = ~np.isnan(X)
+    return [
+        dict(zip(names[row_present].tolist(), row[row_present].tolist()))
+        for row, row_present in zip(X, present)
+    ]
+
+
+class Job:
+    """
+    State of a single background scoring job
+    """
+
+    def __init__(self, job_id: str, directory: Path, total_rows: Optional[int] = None):
+        self.job_id = job_id
+        self.directory = directory
+        self.results_path = directory / "results.csv"
+        self.status = QUEUED
+        self.total_rows = total_rows
+        self.processed_rows = 0
+        self.approved_count = 0
+        self.rejected_count = 0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    @property
+    def rows_per_second(self) -> float:
+        """Scoring throughput since the job started"""
+        if self.started_at is None:
+            return 0.0
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return self.processed_rows / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        """Public view of the job state"""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total_rows": self.total_rows,
+            "processed_rows": self.processed_rows,
+            "approved_count": self.approved_count,
+            "rejected_count": self.rejected_count,
+            "rows_per_second": self.rows_per_second,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobManager:
+    """
+    Bounded pool of background scoring jobs
+
+    At most `max_concurrent` jobs run at once and at most `max_queued`
+    more wait for a worker; further submissions are refused.
+    Results are written incrementally to `<jobs_dir>/<job_id>/results.csv`.
+    """
+
+    def __init__(
+        self,
+        jobs_dir: str = JOBS_DIR,
+        max_concurrent: int = JOBS_MAX_CONCURRENT,
+        max_queued: int = JOBS_MAX_QUEUED,
+        chunk_size: int = JOBS_CHUNK_SIZE,
+        retention_seconds: float = JOBS_RETENTION_SECONDS
+    ):
+        self.jobs_dir = Path(jobs_dir)
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.max_pending = max_concurrent + max_queued
+        self.chunk_size = chunk_size
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent,
+            thread_name_prefix="scoring-job"
+        )
+
+    def _new_job(self, total_rows: Optional[int] = None) -> Job:
+        """Register a new job, enforcing the pending-jobs bound"""
+        self._purge_expired()
+        with self._lock:
+            active = sum(1 for job in self._jobs.values() if job.status in ACTIVE_STATUSES)
+            if active >= self.max_pending:
+                raise JobQueueFullError(
+                    f"Too many pending jobs ({active}), retry later"
+                )
+            job_id = uuid.uuid4().hex
+            directory = self.jobs_dir / job_id
+            directory.mkdir(parents=True)
+            job = Job(job_id, directory, total_rows)
+            self._jobs[job_id] = job
+        return job
+
+    def submit_records(
+        self,
+        features_list: List[Dict[str, float]],
+        client_ids: List[Optional[str]]
+    ) -> Job:
+        """
+        Submit a batch of clients given as feature dictionaries
+
+        Parameters
+        ----------
+        features_list : List[Dict[str, float]]
+            Features of each client
+        client_ids : List[Optional[str]]
+            Client identifiers, in the same order
+
+        Returns
+        -------
+        Job
+            The queued job
+        """
+        job = self._new_job(total_rows=len(features_list))
+
+        def _chunks(predictor):
+            for start in range(0, len(features_list), self.chunk_size):
+                stop = start + self.chunk_size
+                X = predictor._prepare_batch(features_list[start:stop])
+                yield client_ids[start:stop], X, features_list[start:stop]
+
+        job.future = self._executor.submit(self._run, job, _chunks)
+        return job
+
+    def submit_file(self, source, filename: str) -> Job:
+        """
+        Submit a CSV or Parquet file with one client per row
+
+        Parameters
+        ----------
+        source : file-like
+            Binary stream with the uploaded file content
+        filename : str
+            Original file name, used to detect the format
+
+        Returns
+        -------
+        Job
+            The queued job
+        """
+        job = self._new_job()
+        suffix = ".parquet" if filename.lower().endswith((".parquet", ".pq")) else ".csv"
+        input_path = job.directory / f"input{suffix}"
+        try:
+            with open(input_path, "wb") as f:
+                shutil.copyfileobj(source, f)
+            columns, job.total_rows = _read_columns(str(input_path))
+        except Exception:
+            self._forget(job)
+            raise
+
+        id_column = "client_id" if "client_id" in columns else None
+
+        def _chunks(predictor):
+            mapper = FeatureMapper(predictor.feature_names, columns, dtype=predictor.feature_dtype)
+            read_columns = list(mapper.source_columns)
+            if id_column is not None and id_column not in read_columns:
+                read_columns.append(id_column)
+            for chunk in _read_chunks(str(input_path), read_columns, self.chunk_size):
+                ids = chunk[id_column].tolist() if id_column else [None] * len(chunk)
+                yield ids, mapper.transform(chunk), None
+            if job.total_rows is None:
+                job.total_rows = job.processed_rows
+
+        job.future = self._executor.submit(self._run, job, _chunks)
+        return job
+
+    def _run(self, job: Job, chunks) -> None:
+        """Score a job chunk by chunk on a worker thread"""
+        if job.cancel_event.is_set():
+            # Cancelled once picked up by the worker, too late for future.cancel()
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            logger.info(f"Job {job.job_id} cancelled before starting")
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        logger.info(f"Job {job.job_id} started")
+        writer = None
+        try:
+            # The whole job runs on one predictor, even if it is reloaded meanwhile
+            predictor = get_predictor()
+            threshold = predictor.get_threshold()
+            writer = ResultWriter(str(job.results_path))
+            for ids, X, features in chunks(predictor):
+                if job.cancel_event.is_set():
+                    break
+                # Bulk priority: interactive scoring overtakes jobs between sub-chunks
+                futures = get_scheduler().submit_chunks(BULK, predictor.predict_proba_matrix, X)
+                proba_default = (
+                    np.concatenate([future.result() for future in futures])
+                    if futures else np.empty(0)
+                )
+                predictions, decisions = predictor.apply_threshold(proba_default)
+                writer.write(_job_frame(ids, (proba_default, predictions, decisions, threshold)))
+                self._audit(job, predictor, ids, X, features, proba_default, decisions, threshold)
+
+                approved = int((predictions == 0).sum())
+                job.approved_count += approved
+                job.rejected_count += len(predictions) - approved
+                job.processed_rows += len(predictions)
+
+            if job.processed_rows == 0:
+                # Empty input still gets a header-only results file
+                empty = (np.empty(0), np.empty(0, dtype=int), np.empty(0, dtype=object), threshold)
+                writer.write(_job_frame([], empty))
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {str(e)}")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            if writer is not None:
+                writer.close()
+            job.finished_at = time.time()
+
+        if job.status == FAILED:
+            return
+        if job.cancel_event.is_set():
+            job.status = CANCELLED
+            job.results_path.unlink(missing_ok=True)
+            logger.info(f"Job {job.job_id} cancelled after {job.processed_rows} rows")
+            return
+        job.status = COMPLETED
+        logger.info(
+            f"Job {job.job_id} completed: {job.processed_rows} rows "
+            f"({job.rows_per_second:.0f} rows/s)"
+        )
+
+    def _audit(self, job: Job, predictor, ids, X, features, proba_default, decisions, threshold) -> None:
+        """
+        Record the decisions of a scored chunk in the audit log
+
+        Unlike an interactive request, a job waits for audit queue space
+        rather than being rejected, so none of its decisions go unaudited.
+        Features not given as dictionaries (uploaded files) are rebuilt from
+        the matrix, so only model features are recorded.
+        """
+        audit = get_audit_sink()
+        if audit is None:
+            return
+        if features is None:
+            features = _client_features(X, predictor.feature_names)
+        records = [
+            {"client_id": client_id, "features": client_features, "probability_default": proba, "decision": decision}
+            for client_id, client_features, proba, decision
+            in zip(ids, features, proba_default.tolist(), decisions.tolist())
+        ]
+        step = max(1, min(audit.batch_size, audit.queue_size))
+        for start in range(0, len(records), step):
+            piece = records[start:start + step]
+            while True:
+                if audit.wait_for_space(len(piece), timeout=1.0):
+                    try:
+                        audit.record("job", piece, threshold, predictor.artifact_id)
+                        break
+                    except AuditBackpressureError:
+                        # Taken by a request meanwhile
+                        pass
+                if job.cancel_event.is_set():
+                    return
+
+    def get(self, job_id: str) -> Job:
+        """
+        Get a job by id
+
+        Raises
+        ------
+        KeyError
+            If the job is unknown (or expired)
+        """
+        with self._lock:
+            return self._jobs[job_id]
+
+    def cancel(self, job_id: str) -> Job:
+        """
+        Cancel a queued or running job
+
+        A queued job is cancelled immediately, a running job stops
+        before its next chunk.
+        """
+        job = self.get(job_id)
+        if job.status not in ACTIVE_STATUSES:
+            return job
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            job.status = CANCELLED
+            job.finished_at = time.time()
+        return job
+
+    def _forget(self, job: Job) -> None:
+        """Remove a job and its files"""
+        with self._lock:
+            self._jobs.pop(job.job_id, None)
+        shutil.rmtree(job.directory, ignore_errors=True)
+
+    def _purge_expired(self) -> None:
+        """Drop finished jobs older than the retention period"""
+        now = time.time()
+        with self._lock:
+            expired = [
+                job for job in self._jobs.values()
+                if job.finished_at is not None
+                and now - job.finished_at > self.retention_seconds
+            ]
+        for job in expired:
+            self._forget(job)
+
+    def shutdown(self) -> None:
+        """Cancel all pending jobs and stop the worker pool"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if job.status in ACTIVE_STATUSES:
+                self.cancel(job.job_id)
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Global job manager instance
+_job_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    """
+    Get or create the global job manager
+
+    Returns
+    -------
+    JobManager
+        The job manager instance
+    """
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager()
+    return _job_manager
+
+
+def shutdown_job_manager() -> None:
+    """Stop the global job manager if it was started"""
+    global _job_manager
+    if _job_manager is not None:
+        _job_manager.shutdown()
+        _job_manager = None
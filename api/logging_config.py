@@ -0,0 +1,196 @@
+"""
+Logging configuration
+Structured (JSON) logs written by a background thread, off the request path
+
+Handlers attached to the root logger only put records on a bounded queue;
+a `QueueListener` thread formats and writes them. With lazy formatting,
+the message and its arguments are merged on that thread too, so a record
+costs the request little more than its creation. Log calls on the request
+path use %-style arguments for the same reason.
+
+Per-request sampling keeps the INFO and DEBUG records of a fraction of
+requests only; warnings and errors are always kept.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from contextvars import ContextVar
+from typing import Optional
+
+from pythonjsonlogger import jsonlogger
+
+from api.config import LOG_FORMAT, LOG_ASYNC, LOG_LAZY_FORMAT, LOG_QUEUE_SIZE, LOG_SAMPLE_RATE
+from api.metrics import REGISTRY
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+JSON_FORMAT = '%(asctime)s %(name)s %(levelname)s %(message)s'
+
+_dropped = REGISTRY.counter(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full"
+)
+
+# Whether the request being served has its INFO records kept
+_sampled: ContextVar[bool] = ContextVar("log_sampled", default=True)
+
+
+def make_formatter(fmt: str = LOG_FORMAT) -> logging.Formatter:
+    """
+    Formatter for the given log format
+
+    Parameters
+    ----------
+    fmt : str
+        'json' (one JSON object per line, with `extra` fields) or 'text'
+
+    Returns
+    -------
+    logging.Formatter
+        Formatter
+    """
+    if fmt == "json":
+        return jsonlogger.JsonFormatter(JSON_FORMAT, timestamp=False)
+    if fmt == "text":
+        return logging.Formatter(TEXT_FORMAT)
+    raise ValueError(f"Unknown log format '{fmt}', expected 'json' or 'text'")
+
+
+class RequestSamplingFilter(logging.Filter):
+    """Drop records below WARNING emitted while serving an unsampled request"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or _sampled.get()
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks the caller
+
+    Parameters
+    ----------
+    log_queue : queue.Queue
+        Bounded queue read by the listener; records are dropped when full
+    lazy : bool
+        Leave message formatting to the listener thread. Arguments are then
+        read when the record is written, so log values, not mutable objects.
+    """
+
+    def __init__(self, log_queue: queue.Queue, lazy: bool = LOG_LAZY_FORMAT):
+        super().__init__(log_queue)
+        self.lazy = lazy
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if self.lazy:
+            return record
+        return super().prepare(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped.inc()
+
+
+class LogSamplingMiddleware:
+    """
+    ASGI middleware deciding, per request, whether its INFO records are kept
+
+    Parameters
+    ----------
+    app
+        Wrapped ASGI application
+    sample_rate : float
+        Fraction of requests whose INFO records are kept
+    """
+
+    def __init__(self, app, sample_rate: float = LOG_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _sampled.set(random.random() < self.sample_rate)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _sampled.reset(token)
+
+
+# Listener of the serving process
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(
+    level: str,
+    fmt: str = LOG_FORMAT,
+    use_queue: bool = LOG_ASYNC,
+    lazy: bool = LOG_LAZY_FORMAT,
+    queue_size: int = LOG_QUEUE_SIZE,
+    stream=None,
+    logger: Optional[logging.Logger] = None
+) -> Optional[logging.handlers.QueueListener]:
+    """
+    Configure a logger (the root logger by default)
+
+    Like `logging.basicConfig`, leaves a root logger that already has
+    handlers untouched.
+
+    Parameters
+    ----------
+    level : str
+        Log level name
+    fmt : str
+        'json' or 'text'
+    use_queue : bool
+        Write from a background thread through a queue
+    lazy : bool
+        Format messages on the background thread
+    queue_size : int
+        Records queued at most before new ones are dropped
+    stream : file-like, optional
+        Where logs are written (stderr by default)
+    logger : logging.Logger, optional
+        Logger to configure
+
+    Returns
+    -------
+    Optional[logging.handlers.QueueListener]
+        Started listener, None without a queue or if left untouched
+    """
+    global _listener
+    target = logging.getLogger() if logger is None else logger
+    if logger is None and target.handlers:
+        return None
+
+    target.setLevel(getattr(logging, level))
+    output = logging.StreamHandler(sys.stderr if stream is None else stream)
+    output.setFormatter(make_formatter(fmt))
+
+    if not use_queue:
+        output.addFilter(RequestSamplingFilter())
+        target.addHandler(output)
+        return None
+
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size), lazy=lazy)
+    handler.addFilter(RequestSamplingFilter())
+    target.addHandler(handler)
+    listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+    listener.start()
+    if logger is None:
+        _listener = listener
+        atexit.register(shutdown_logging)
+    return listener
+
+
+def shutdown_logging() -> None:
+    """Write the queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -4,34 +4,101 @@ Main application file
 """
 
 import logging
+import secrets
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, status
+from typing import Callable, Optional
+
+from api.startup_report import REPORT, IMPORT
+
+# Time the heavy dependencies first; the imports below then reuse them
+for _module in ("numpy", "pydantic", "fastapi"):
+    REPORT.timed_import(_module)
+_api_import_start = time.perf_counter()
+
+import numpy as np
+from fastapi import (
+    FastAPI, HTTPException, Request, Response, status, File, UploadFile, Depends, Header, Query, BackgroundTasks
+)
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse
 
 from api.config import (
     API_TITLE,
     API_DESCRIPTION,
     API_VERSION,
     ALLOWED_ORIGINS,
-    LOG_LEVEL
+    MAX_BATCH_SIZE,
+    ADMIN_TOKEN,
+    ADMIN_TOKEN_HEADER,
+    SERVER_TIMING_ENABLED,
+    PROFILING_ENABLED,
+    CAPTURE_PATH,
+    ARTIFACT_ID_HEADER,
+    ARTIFACT_WATCH_INTERVAL,
+    LOG_LEVEL,
+    LOG_SAMPLE_RATE,
+    DRIFT_PSI_THRESHOLD
 )
 from api.models import (
     ClientFeatures,
     PredictionResponse,
+    InputFlags,
     BatchPredictionRequest,
     BatchPredictionResponse,
     FeatureImportanceResponse,
+    JobStatusResponse,
     HealthResponse,
+    ReadinessResponse,
+    StartupReportResponse,
+    SlowRequestsResponse,
+    ProfileListResponse,
+    ProfileReport,
+    ReloadResponse,
+    ModelRegistryResponse,
+    DriftResponse,
+    ScoreMonitorResponse,
     ErrorResponse
 )
-from api.predictor import get_predictor
-
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from api.predictor import get_predictor, reload_predictor, ReloadInProgressError
+from api.reload import ArtifactWatcher
+from api.registry import get_model_registry, shutdown_model_registry
+from api.warmup import WARMUP_STATE
+from api.admission import (
+    SCORING,
+    BATCH,
+    EXPLAIN,
+    AdmissionRejectedError,
+    get_admission_controller
 )
+from api.scheduler import BULK, get_scheduler, shutdown_scheduler
+from api.deadlines import (
+    DeadlineExceededError,
+    RequestCancelledError,
+    gather_guarded,
+    token_from_headers
+)
+from api.metrics import REGISTRY
+from api.logging_config import LogSamplingMiddleware, configure_logging, shutdown_logging
+from api.drift import get_drift_monitor
+from api.score_monitor import SCORE_MONITOR
+from api.input_quality import collect as collect_input_flags
+from api.audit import AuditBackpressureError, get_audit_sink, reserve_audit, shutdown_audit_sink
+from api.capture import CaptureMiddleware, get_capture_writer, shutdown_capture
+from api.profiling import PROFILES, ProfilingMiddleware
+from api.timing import SLOW_REQUESTS, TimingMiddleware, set_batch_size, timed_endpoint
+from api.jobs import (
+    COMPLETED,
+    JobQueueFullError,
+    get_job_manager,
+    shutdown_job_manager
+)
+
+REPORT.record("api modules", IMPORT, time.perf_counter() - _api_import_start)
+
+# Configure logging (JSON, written by a background thread)
+configure_logging(LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
@@ -42,14 +109,36 @@ async def lifespan(app: FastAPI):
         logger.info("Starting up API...")
         predictor = get_predictor()
         logger.info(f"Predictor loaded successfully. Threshold: {predictor.get_threshold()}")
+        # Challenger models load at startup too, so their memory is known upfront
+        get_model_registry()
+        get_audit_sink()
+        get_drift_monitor()
+        REPORT.mark_ready()
+        REPORT.log_summary()
+        # /health answers right away; /ready only once this has completed
+        WARMUP_STATE.start()
     except Exception as e:
         logger.error(f"Failed to load predictor: {str(e)}")
         raise
     
+    watcher = None
+    if ARTIFACT_WATCH_INTERVAL > 0:
+        watcher = ArtifactWatcher()
+        watcher.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down API...")
+    if watcher is not None:
+        watcher.stop()
+    shutdown_model_registry()
+    shutdown_job_manager()
+    # Decisions already served must reach the audit log
+    shutdown_audit_sink()
+    shutdown_scheduler()
+    shutdown_capture()
+    shutdown_logging()
 
 
 # Create FastAPI app
@@ -70,6 +159,81 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Per-stage latency histograms of the endpoints marked with @timed_endpoint
+app.add_middleware(TimingMiddleware, server_timing=SERVER_TIMING_ENABLED)
+
+# Not installed at all unless enabled, so the request path is unchanged
+if PROFILING_ENABLED and ADMIN_TOKEN is not None:
+    app.add_middleware(ProfilingMiddleware, admin_token=ADMIN_TOKEN)
+
+if LOG_SAMPLE_RATE < 1:
+    app.add_middleware(LogSamplingMiddleware, sample_rate=LOG_SAMPLE_RATE)
+
+if CAPTURE_PATH is not None:
+    app.add_middleware(CaptureMiddleware, writer=get_capture_writer(CAPTURE_PATH))
+
+
+def _too_many_requests(error: AdmissionRejectedError) -> HTTPException:
+    """Translate an admission rejection into a 429 with Retry-After"""
+    logger.warning(str(error))
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+def _audit_saturated(error: AuditBackpressureError) -> HTTPException:
+    """Translate a full audit queue into a 503 with Retry-After"""
+    logger.warning(str(error))
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+def _abandoned(error: RequestCancelledError) -> HTTPException:
+    """Translate dropped work into 504 (deadline) or 499 (client gone)"""
+    logger.warning(str(error))
+    if isinstance(error, DeadlineExceededError):
+        return HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Request deadline exceeded"
+        )
+    # Non-standard "client closed request"; nobody is left to read it
+    return HTTPException(status_code=499, detail=str(error))
+
+
+def _with_input_flags(score: Callable) -> Callable:
+    """Wrap a scoring function to also return the input flags of the rows it scores"""
+    def _score_flagged(*args):
+        with collect_input_flags() as flags:
+            return score(*args), flags
+    return _score_flagged
+
+
+def require_admin(
+    admin_token: Optional[str] = Header(None, alias=ADMIN_TOKEN_HEADER)
+):
+    """
+    Dependency guarding the admin endpoints
+
+    Raises
+    ------
+    HTTPException
+        404 if admin endpoints are disabled, 401 if the token is wrong
+    """
+    if ADMIN_TOKEN is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Admin endpoints are disabled"
+        )
+    if admin_token is None or not secrets.compare_digest(admin_token, ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin token"
+        )
 
 
 @app.get(
@@ -82,6 +246,8 @@ async def health_check():
     """
     Check if the API is healthy and the model is loaded
     
+    Cheap liveness check: it does not wait for the warm-up (see /ready).
+    
     Returns
     -------
     HealthResponse
@@ -92,7 +258,9 @@ async def health_check():
         return HealthResponse(
             status="healthy",
             model_loaded=predictor.is_loaded(),
-            version=API_VERSION
+            version=API_VERSION,
+            artifact_id=predictor.artifact_id,
+            manifest_verified=predictor.manifest is not None
         )
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
@@ -102,6 +270,334 @@ async def health_check():
         )
 
 
+@app.get(
+    "/ready",
+    response_model=ReadinessResponse,
+    tags=["Health"],
+    summary="Readiness check, gated on the warm-up",
+    responses={503: {"model": ReadinessResponse, "description": "Warm-up not completed"}}
+)
+async def readiness_check(response: Response):
+    """
+    Check if the worker has been warmed up and can take traffic
+    
+    Returns 503 until synthetic predictions have gone through the
+    champion and every challenger model.
+    
+    Returns
+    -------
+    ReadinessResponse
+        Warm-up state and duration
+    """
+    if not WARMUP_STATE.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessResponse(**WARMUP_STATE.as_dict())
+
+
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    tags=["Health"],
+    summary="Service metrics in Prometheus text format"
+)
+async def metrics():
+    """
+    Expose service metrics (admission queue depths, rejections...)
+    
+    Returns
+    -------
+    PlainTextResponse
+        Metrics in the Prometheus text exposition format
+    """
+    return PlainTextResponse(
+        REGISTRY.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get(
+    "/monitoring/drift",
+    response_model=DriftResponse,
+    tags=["Monitoring"],
+    summary="Feature drift of scored traffic",
+    responses={
+        404: {"model": ErrorResponse, "description": "No drift reference profile"}
+    }
+)
+async def drift(top: Optional[int] = Query(None, ge=1, description="Return only the most drifted features")):
+    """
+    PSI and Kolmogorov-Smirnov distance of each feature, scored traffic
+    against the training reference profile (DRIFT_REFERENCE_PATH)
+    
+    Scored rows are counted into fixed histograms as they are scored;
+    the scores are computed from the counts on each call.
+    
+    Returns
+    -------
+    DriftResponse
+        Drift per feature, most drifted first
+    """
+    monitor = get_drift_monitor()
+    if monitor is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No drift reference profile, build one with `python -m api.drift build`"
+        )
+    scores = await run_in_threadpool(monitor.scores)
+    for score in scores:
+        score["drifted"] = score["psi"] > DRIFT_PSI_THRESHOLD
+    return DriftResponse(
+        reference_rows=monitor.reference["rows"],
+        reference_created_at=monitor.reference.get("created_at"),
+        observed_rows=monitor.observed_rows,
+        psi_threshold=DRIFT_PSI_THRESHOLD,
+        drifted_features=sum(score["drifted"] for score in scores),
+        features=scores[:top]
+    )
+
+
+@app.get(
+    "/monitoring/scores",
+    response_model=ScoreMonitorResponse,
+    tags=["Monitoring"],
+    summary="Rolling score distribution and approval rate"
+)
+async def score_monitor(bins: int = Query(10, ge=1, le=100, description="Bins of the probability histograms")):
+    """
+    Approval rate, probability quantiles and histogram of the clients scored
+    by every path (/predict, /predict/batch, jobs), over rolling windows
+    (SCORE_MONITOR_WINDOWS) and per time bucket
+    
+    Returns
+    -------
+    ScoreMonitorResponse
+        Windows and buckets, most recent bucket first
+    """
+    report = await run_in_threadpool(SCORE_MONITOR.report, bins=bins)
+    return ScoreMonitorResponse(**report, threshold=get_predictor().get_threshold())
+
+
+@app.get(
+    "/admin/startup-report",
+    response_model=StartupReportResponse,
+    tags=["Admin"],
+    summary="Startup time breakdown",
+    dependencies=[Depends(require_admin)],
+    responses={
+        401: {"model": ErrorResponse, "description": "Invalid admin token"},
+        404: {"model": ErrorResponse, "description": "Admin endpoints disabled"}
+    }
+)
+async def startup_report():
+    """
+    Wall time spent importing modules and loading artifacts at startup
+    
+    Artifacts loaded on demand (e.g. the SHAP explainer) appear once used.
+    
+    Returns
+    -------
+    StartupReportResponse
+        Timed startup phases
+    """
+    return StartupReportResponse(
+        **REPORT.as_dict(),
+        artifact_source=get_predictor().artifact_source
+    )
+
+
+@app.get(
+    "/admin/slow-requests",
+    response_model=SlowRequestsResponse,
+    tags=["Admin"],
+    summary="Most recent slow requests",
+    dependencies=[Depends(require_admin)],
+    responses={
+        401: {"model": ErrorResponse, "description": "Invalid admin token"},
+        404: {"model": ErrorResponse, "description": "Admin endpoints disabled"}
+    }
+)
+async def slow_requests():
+    """
+    Stage timings, payload size and batch size of the slowest recent requests
+    
+    Requests taking at least SLOW_REQUEST_THRESHOLD seconds are kept in a
+    ring buffer of SLOW_REQUEST_BUFFER_SIZE entries.
+    
+    Returns
+    -------
+    SlowRequestsResponse
+        Captured requests, most recent first
+    """
+    return SlowRequestsResponse(
+        threshold_seconds=SLOW_REQUESTS.threshold,
+        capacity=SLOW_REQUESTS.capacity,
+        requests=SLOW_REQUESTS.entries()
+    )
+
+
+@app.get(
+    "/admin/profiles",
+    response_model=ProfileListResponse,
+    tags=["Admin"],
+    summary="Profiled requests",
+    dependencies=[Depends(require_admin)],
+    responses={
+        401: {"model": ErrorResponse, "description": "Invalid admin token"},
+        404: {"model": ErrorResponse, "description": "Admin endpoints disabled"}
+    }
+)
+async def list_profiles():
+    """
+    Requests profiled on demand, most recent first
+    
+    With PROFILING_ENABLED, a request sent with the X-Profile header
+    ('cpu', 'memory' or 'all') and the admin token is profiled; its
+    profile id is returned in the X-Profile-Id header.
+    
+    Returns
+    -------
+    ProfileListResponse
+        Profiled requests
+    """
+    return ProfileListResponse(profiles=PROFILES.list())
+
+
+def _get_profile_or_404(profile_id: str) -> dict:
+    """Look up a profile, raising 404 if it is unknown or dropped"""
+    report = PROFILES.get(profile_id)
+    if report is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile {profile_id} not found"
+        )
+    return report
+
+
+@app.get(
+    "/admin/profiles/{profile_id}",
+    response_model=ProfileReport,
+    tags=["Admin"],
+    summary="Profile of a request",
+    dependencies=[Depends(require_admin)],
+    responses={
+        401: {"model": ErrorResponse, "description": "Invalid admin token"},
+        404: {"model": ErrorResponse, "description": "Profile not found or admin endpoints disabled"}
+    }
+)
+async def get_profile(profile_id: str):
+    """
+    Hot functions and memory allocations of a profiled request
+    
+    Functions are sorted by cumulative time, so the predictor, pydantic
+    validation and SHAP appear near the top when they dominate.
+    
+    Returns
+    -------
+    ProfileReport
+        CPU and memory profile
+    """
+    return ProfileReport(**_get_profile_or_404(profile_id))
+
+
+@app.get(
+    "/admin/profiles/{profile_id}/pstats",
+    tags=["Admin"],
+    summary="Download a CPU profile",
+    dependencies=[Depends(require_admin)],
+    responses={
+        401: {"model": ErrorResponse, "description": "Invalid admin token"},
+        404: {"model": ErrorResponse, "description": "Profile not found or admin endpoints disabled"}
+    }
+)
+async def download_profile(profile_id: str):
+    """
+    CPU profile in the pstats format, for snakeviz or `python -m pstats`
+    
+    Returns
+    -------
+    Response
+        Profile file
+    """
+    _get_profile_or_404(profile_id)
+    data = PROFILES.pstats_dump(profile_id)
+    if data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile {profile_id} has no CPU profile"
+        )
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'}
+    )
+
+
+@app.post(
+    "/admin/reload",
+    response_model=ReloadResponse,
+    tags=["Admin"],
+    summary="Reload model, explainer and threshold without downtime",
+    dependencies=[Depends(require_admin)],
+    responses={
+        401: {"model": ErrorResponse, "description": "Invalid admin token"},
+        404: {"model": ErrorResponse, "description": "Admin endpoints disabled"},
+        409: {"model": ErrorResponse, "description": "Reload already in progress"},
+        500: {"model": ErrorResponse, "description": "New artifacts failed validation"}
+    }
+)
+async def reload_model():
+    """
+    Load the artifacts from disk again and swap in the new predictor
+    
+    The current predictor keeps serving until the new one has loaded and
+    passed a smoke prediction; in-flight requests finish on the old one.
+    
+    Returns
+    -------
+    ReloadResponse
+        The newly active predictor
+    """
+    try:
+        predictor = await run_in_threadpool(reload_predictor, False)
+    except ReloadInProgressError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Reload failed, the previous model is still serving: {str(e)}"
+        )
+    return ReloadResponse(
+        status="reloaded",
+        artifact_source=predictor.artifact_source,
+        threshold=predictor.get_threshold(),
+        load_seconds=predictor.load_seconds,
+        explainer_loaded=predictor.explainer is not None
+    )
+
+
+@app.get(
+    "/admin/models",
+    response_model=ModelRegistryResponse,
+    tags=["Admin"],
+    summary="Champion and challenger models",
+    dependencies=[Depends(require_admin)],
+    responses={
+        401: {"model": ErrorResponse, "description": "Invalid admin token"},
+        404: {"model": ErrorResponse, "description": "Admin endpoints disabled"}
+    }
+)
+async def list_models():
+    """
+    Loaded models with their memory, and the shadow scoring state
+    
+    Returns
+    -------
+    ModelRegistryResponse
+        Champion and challengers
+    """
+    return ModelRegistryResponse(**get_model_registry().stats())
+
+
 @app.post(
     "/predict",
     response_model=PredictionResponse,
@@ -110,10 +606,20 @@ async def health_check():
     responses={
         200: {"description": "Successful prediction"},
         400: {"model": ErrorResponse, "description": "Invalid input"},
-        500: {"model": ErrorResponse, "description": "Internal server error"}
+        429: {"model": ErrorResponse, "description": "Too many concurrent requests"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+        503: {"model": ErrorResponse, "description": "Audit log saturated"},
+        504: {"model": ErrorResponse, "description": "Request deadline exceeded"}
     }
 )
-async def predict(client: ClientFeatures):
+@timed_endpoint("predict")
+async def predict(
+    client: ClientFeatures,
+    http_request: Request,
+    http_response: Response,
+    background_tasks: BackgroundTasks,
+    include_input_flags: bool = Query(False, description="Return the input quality flags")
+):
     """
     Predict credit score and decision for a client
     
@@ -121,6 +627,15 @@ async def predict(client: ClientFeatures):
     ----------
     client : ClientFeatures
         Client features for prediction
+    http_request : Request
+        Incoming request (deadline header, disconnect detection)
+    http_response : Response
+        Carries the artifact identity header
+    background_tasks : BackgroundTasks
+        Runs shadow scoring after the response is sent
+    include_input_flags : bool
+        Also return the features outside their training range or
+        unexpectedly missing
         
     Returns
     -------
@@ -133,28 +648,68 @@ async def predict(client: ClientFeatures):
         If prediction fails
     """
     try:
-        logger.info(f"Prediction request for client: {client.client_id}")
+        # %-style: formatted on the logging thread, and only if the record is kept
+        logger.info("Prediction request for client: %s", client.client_id)
+        set_batch_size(1)
         
         predictor = get_predictor()
+        # Lets clients and caches tell which artifacts computed the result
+        http_response.headers[ARTIFACT_ID_HEADER] = predictor.artifact_id or ""
+        token = token_from_headers(SCORING, http_request.headers)
         
-        # Get probabilities
-        proba_no_default, proba_default = predictor.predict_proba(client.features)
+        # Get probabilities and decision (single model call, off the event loop)
+        score = _with_input_flags(predictor.score) if include_input_flags else predictor.score
+        # A full audit log rejects the request before anything is scored
+        with reserve_audit(1) as audit:
+            async with get_admission_controller().admit(SCORING):
+                future = get_scheduler().submit(SCORING, score, client.features, token=token)
+                (scored,) = await gather_guarded([future], token, http_request)
+            flags = None
+            if include_input_flags:
+                scored, flags = scored
+            proba_no_default, proba_default, prediction, decision = scored
+            
+            response = PredictionResponse(
+                client_id=client.client_id,
+                probability_default=proba_default,
+                probability_no_default=proba_no_default,
+                prediction=prediction,
+                decision=decision,
+                threshold_used=predictor.get_threshold(),
+                input_flags=InputFlags(**flags[0]) if flags else None
+            )
+            
+            # Only queued here; written in batches by the audit thread
+            audit.record("predict", [{
+                "client_id": client.client_id,
+                "features": client.features,
+                "probability_default": proba_default,
+                "decision": decision
+            }], response.threshold_used, predictor.artifact_id)
         
-        # Get prediction and decision
-        prediction, decision = predictor.predict(client.features)
+        # Challengers score a sample of traffic once the response is sent
+        registry = get_model_registry()
+        if registry.sample():
+            background_tasks.add_task(registry.submit, [{
+                "client_id": client.client_id,
+                "features": client.features,
+                "probability_default": proba_default,
+                "decision": decision,
+                "threshold": response.threshold_used
+            }])
         
-        response = PredictionResponse(
-            client_id=client.client_id,
-            probability_default=proba_default,
-            probability_no_default=proba_no_default,
-            prediction=prediction,
-            decision=decision,
-            threshold_used=predictor.get_threshold()
+        logger.info(
+            "Prediction completed: %s (proba: %.4f)", decision, proba_default,
+            extra={"client_id": client.client_id, "decision": decision, "probability_default": proba_default}
         )
-        
-        logger.info(f"Prediction completed: {decision} (proba: {proba_default:.4f})")
         return response
         
+    except AdmissionRejectedError as e:
+        raise _too_many_requests(e)
+    except AuditBackpressureError as e:
+        raise _audit_saturated(e)
+    except RequestCancelledError as e:
+        raise _abandoned(e)
     except ValueError as e:
         logger.error(f"Validation error: {str(e)}")
         raise HTTPException(
@@ -177,10 +732,21 @@ async def predict(client: ClientFeatures):
     responses={
         200: {"description": "Successful batch prediction"},
         400: {"model": ErrorResponse, "description": "Invalid input"},
-        500: {"model": ErrorResponse, "description": "Internal server error"}
+        413: {"model": ErrorResponse, "description": "Batch too large"},
+        429: {"model": ErrorResponse, "description": "Too many concurrent requests"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+        503: {"model": ErrorResponse, "description": "Audit log saturated"},
+        504: {"model": ErrorResponse, "description": "Request deadline exceeded"}
     }
 )
-async def predict_batch(request: BatchPredictionRequest):
+@timed_endpoint("predict_batch")
+async def predict_batch(
+    request: BatchPredictionRequest,
+    http_request: Request,
+    http_response: Response,
+    background_tasks: BackgroundTasks,
+    include_input_flags: bool = Query(False, description="Return the input quality flags")
+):
     """
     Predict credit scores for multiple clients
     
@@ -188,6 +754,14 @@ async def predict_batch(request: BatchPredictionRequest):
     ----------
     request : BatchPredictionRequest
         List of clients to predict
+    http_request : Request
+        Incoming request (deadline header, disconnect detection)
+    http_response : Response
+        Carries the artifact identity header
+    background_tasks : BackgroundTasks
+        Runs shadow scoring after the response is sent
+    include_input_flags : bool
+        Also return the input quality flags of each client
         
     Returns
     -------
@@ -199,45 +773,110 @@ async def predict_batch(request: BatchPredictionRequest):
     HTTPException
         If batch prediction fails
     """
+    if len(request.clients) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch of {len(request.clients)} clients exceeds the limit of "
+                   f"{MAX_BATCH_SIZE}, submit it to /jobs instead"
+        )
+    
     try:
-        logger.info(f"Batch prediction request for {len(request.clients)} clients")
+        logger.info("Batch prediction request for %d clients", len(request.clients))
+        set_batch_size(len(request.clients))
         
         predictor = get_predictor()
-        predictions = []
-        approved_count = 0
-        rejected_count = 0
+        # Lets clients and caches tell which artifacts computed the result
+        http_response.headers[ARTIFACT_ID_HEADER] = predictor.artifact_id or ""
+        threshold = predictor.get_threshold()
+        token = token_from_headers(BATCH, http_request.headers)
+        
+        def _score_chunk(clients):
+            return predictor.predict_proba_batch([client.features for client in clients])
         
-        for client in request.clients:
-            # Get probabilities
-            proba_no_default, proba_default = predictor.predict_proba(client.features)
+        # One scheduler task per chunk so interactive scoring can overtake,
+        # and abandoned requests stop between chunks
+        score = _with_input_flags(_score_chunk) if include_input_flags else _score_chunk
+        with reserve_audit(len(request.clients)) as audit:
+            async with get_admission_controller().admit(BATCH):
+                futures = get_scheduler().submit_chunks(
+                    BULK, score, request.clients, token=token
+                )
+                chunks = await gather_guarded(futures, token, http_request)
             
-            # Get prediction and decision
-            prediction, decision = predictor.predict(client.features)
+            # Flags are collected per chunk, so they stay in client order
+            flags = [None] * len(request.clients)
+            if include_input_flags:
+                flags = [row for _, chunk_flags in chunks for row in chunk_flags] or flags
+                chunks = [chunk for chunk, _ in chunks]
+            proba_default = np.concatenate(chunks) if chunks else np.empty(0)
+            predictions, decisions = predictor.apply_threshold(proba_default, threshold)
             
-            predictions.append(PredictionResponse(
-                client_id=client.client_id,
-                probability_default=proba_default,
-                probability_no_default=proba_no_default,
-                prediction=prediction,
-                decision=decision,
-                threshold_used=predictor.get_threshold()
-            ))
+            response = BatchPredictionResponse(
+                predictions=[
+                    PredictionResponse(
+                        client_id=client.client_id,
+                        probability_default=float(proba),
+                        probability_no_default=float(1.0 - proba),
+                        prediction=int(prediction),
+                        decision=str(decision),
+                        threshold_used=threshold,
+                        input_flags=InputFlags(**client_flags) if client_flags else None
+                    )
+                    for client, proba, prediction, decision, client_flags
+                    in zip(request.clients, proba_default, predictions, decisions, flags)
+                ],
+                total_clients=len(request.clients),
+                approved_count=int((predictions == 0).sum()),
+                rejected_count=int((predictions == 1).sum())
+            )
             
-            if decision == "APPROVED":
-                approved_count += 1
-            else:
-                rejected_count += 1
+            audit.record("predict_batch", [
+                {
+                    "client_id": client.client_id,
+                    "features": client.features,
+                    "probability_default": prediction.probability_default,
+                    "decision": prediction.decision
+                }
+                for client, prediction in zip(request.clients, response.predictions)
+            ], threshold, predictor.artifact_id)
         
-        response = BatchPredictionResponse(
-            predictions=predictions,
-            total_clients=len(predictions),
-            approved_count=approved_count,
-            rejected_count=rejected_count
-        )
+        registry = get_model_registry()
+        shadowed = [
+            {
+                "client_id": client.client_id,
+                "features": client.features,
+                "probability_default": prediction.probability_default,
+                "decision": prediction.decision,
+                "threshold": threshold
+            }
+            for client, prediction in zip(request.clients, response.predictions)
+            if registry.sample()
+        ]
+        if shadowed:
+            background_tasks.add_task(registry.submit, shadowed)
         
-        logger.info(f"Batch prediction completed: {approved_count} approved, {rejected_count} rejected")
+        logger.info(
+            "Batch prediction completed: %d approved, %d rejected",
+            response.approved_count, response.rejected_count,
+            extra={
+                "total_clients": response.total_clients,
+                "approved_count": response.approved_count,
+                "rejected_count": response.rejected_count
+            }
+        )
         return response
         
+    except AdmissionRejectedError as e:
+        raise _too_many_requests(e)
+    except AuditBackpressureError as e:
+        raise _audit_saturated(e)
+    except RequestCancelledError as e:
+        raise _abandoned(e)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Batch prediction error: {str(e)}")
         raise HTTPException(
@@ -254,10 +893,13 @@ async def predict_batch(request: BatchPredictionRequest):
     responses={
         200: {"description": "Successful feature importance calculation"},
         400: {"model": ErrorResponse, "description": "Invalid input"},
-        500: {"model": ErrorResponse, "description": "Internal server error"}
+        429: {"model": ErrorResponse, "description": "Too many concurrent requests"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+        504: {"model": ErrorResponse, "description": "Request deadline exceeded"}
     }
 )
-async def feature_importance(client: ClientFeatures):
+@timed_endpoint("feature_importance")
+async def feature_importance(client: ClientFeatures, http_request: Request, http_response: Response):
     """
     Get SHAP feature importance values for a client's prediction
     
@@ -268,6 +910,10 @@ async def feature_importance(client: ClientFeatures):
     ----------
     client : ClientFeatures
         Client features for analysis
+    http_request : Request
+        Incoming request (deadline header, disconnect detection)
+    http_response : Response
+        Carries the artifact identity header
         
     Returns
     -------
@@ -280,10 +926,17 @@ async def feature_importance(client: ClientFeatures):
         If feature importance calculation fails
     """
     try:
-        logger.info(f"Feature importance request for client: {client.client_id}")
+        logger.info("Feature importance request for client: %s", client.client_id)
         
         predictor = get_predictor()
-        importance = predictor.get_feature_importance(client.features)
+        # Lets clients and caches tell which artifacts computed the result
+        http_response.headers[ARTIFACT_ID_HEADER] = predictor.artifact_id or ""
+        token = token_from_headers(EXPLAIN, http_request.headers)
+        async with get_admission_controller().admit(EXPLAIN):
+            future = get_scheduler().submit(
+                EXPLAIN, predictor.get_feature_importance, client.features, token=token
+            )
+            (importance,) = await gather_guarded([future], token, http_request)
         
         response = FeatureImportanceResponse(
             client_id=client.client_id,
@@ -294,9 +947,18 @@ async def feature_importance(client: ClientFeatures):
             prediction_value=importance["prediction_value"]
         )
         
-        logger.info(f"Feature importance calculated successfully")
+        logger.info("Feature importance calculated successfully", extra={"client_id": client.client_id})
         return response
         
+    except AdmissionRejectedError as e:
+        raise _too_many_requests(e)
+    except RequestCancelledError as e:
+        raise _abandoned(e)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Feature importance error: {str(e)}")
         raise HTTPException(
@@ -305,6 +967,208 @@ async def feature_importance(client: ClientFeatures):
         )
 
 
+def _job_response(job) -> JobStatusResponse:
+    """Build the public status of a background job"""
+    return JobStatusResponse(
+        **job.to_dict(),
+        results_url=f"/jobs/{job.job_id}/results" if job.status == COMPLETED else None
+    )
+
+
+def _get_job_or_404(job_id: str):
+    """Look up a job, raising 404 if it is unknown or expired"""
+    try:
+        return get_job_manager().get(job_id)
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+
+
+@app.post(
+    "/jobs",
+    response_model=JobStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["Jobs"],
+    summary="Submit a large batch for background scoring",
+    responses={
+        202: {"description": "Job accepted"},
+        429: {"model": ErrorResponse, "description": "Too many pending jobs"}
+    }
+)
+@timed_endpoint("jobs")
+async def submit_job(request: BatchPredictionRequest):
+    """
+    Queue a large batch of clients for background scoring
+    
+    The request returns immediately with a job id; poll
+    `GET /jobs/{job_id}` for progress and download the results
+    from `GET /jobs/{job_id}/results` once completed.
+    
+    Parameters
+    ----------
+    request : BatchPredictionRequest
+        List of clients to score
+        
+    Returns
+    -------
+    JobStatusResponse
+        Initial job status
+    """
+    set_batch_size(len(request.clients))
+    try:
+        job = get_job_manager().submit_records(
+            [client.features for client in request.clients],
+            [client.client_id for client in request.clients]
+        )
+    except JobQueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
+    logger.info(f"Job {job.job_id} queued for {len(request.clients)} clients")
+    return _job_response(job)
+
+
+@app.post(
+    "/jobs/upload",
+    response_model=JobStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["Jobs"],
+    summary="Submit a CSV or Parquet file for background scoring",
+    responses={
+        202: {"description": "Job accepted"},
+        400: {"model": ErrorResponse, "description": "Unreadable file"},
+        429: {"model": ErrorResponse, "description": "Too many pending jobs"}
+    }
+)
+async def submit_job_file(file: UploadFile = File(...)):
+    """
+    Queue an uploaded file for background scoring
+    
+    The file has one client per row with feature columns, and an
+    optional `client_id` column copied to the results.
+    
+    Parameters
+    ----------
+    file : UploadFile
+        CSV or Parquet file (format detected from the file name)
+        
+    Returns
+    -------
+    JobStatusResponse
+        Initial job status
+    """
+    try:
+        job = await run_in_threadpool(
+            get_job_manager().submit_file, file.file, file.filename or ""
+        )
+    except JobQueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Job upload error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not read uploaded file: {str(e)}"
+        )
+    logger.info(f"Job {job.job_id} queued for uploaded file {file.filename}")
+    return _job_response(job)
+
+
+@app.get(
+    "/jobs/{job_id}",
+    response_model=JobStatusResponse,
+    tags=["Jobs"],
+    summary="Get the status of a background job",
+    responses={404: {"model": ErrorResponse, "description": "Unknown job"}}
+)
+async def get_job(job_id: str):
+    """
+    Report progress and throughput of a background job
+    
+    Parameters
+    ----------
+    job_id : str
+        Job identifier
+        
+    Returns
+    -------
+    JobStatusResponse
+        Current job status
+    """
+    return _job_response(_get_job_or_404(job_id))
+
+
+@app.get(
+    "/jobs/{job_id}/results",
+    tags=["Jobs"],
+    summary="Download the results of a completed job",
+    responses={
+        200: {"content": {"text/csv": {}}, "description": "Results as CSV"},
+        404: {"model": ErrorResponse, "description": "Unknown job"},
+        409: {"model": ErrorResponse, "description": "Job not completed"}
+    }
+)
+async def get_job_results(job_id: str):
+    """
+    Serve the results file of a completed job
+    
+    Parameters
+    ----------
+    job_id : str
+        Job identifier
+        
+    Returns
+    -------
+    FileResponse
+        CSV with one row per client
+    """
+    job = _get_job_or_404(job_id)
+    if job.status != COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job {job_id} is {job.status}"
+        )
+    return FileResponse(
+        job.results_path,
+        media_type="text/csv",
+        filename=f"{job_id}.csv"
+    )
+
+
+@app.delete(
+    "/jobs/{job_id}",
+    response_model=JobStatusResponse,
+    tags=["Jobs"],
+    summary="Cancel a background job",
+    responses={404: {"model": ErrorResponse, "description": "Unknown job"}}
+)
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job
+    
+    A running job stops before its next chunk.
+    
+    Parameters
+    ----------
+    job_id : str
+        Job identifier
+        
+    Returns
+    -------
+    JobStatusResponse
+        Job status after the cancellation request
+    """
+    _get_job_or_404(job_id)
+    job = get_job_manager().cancel(job_id)
+    logger.info(f"Cancellation requested for job {job_id}")
+    return _job_response(job)
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
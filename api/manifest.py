@@ -0,0 +1,302 @@
+"""
+Artifact manifest
+Content hashes tying the model, explainer, feature list and threshold together
+
+Usage:
+    python -m api.manifest write [--output artifacts_manifest.json]
+    python -m api.manifest verify
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from api.config import (
+    ARTIFACT_MANIFEST_PATH,
+    MODEL_PATH,
+    EXPLAINER_PATH,
+    FEATURE_NAMES_PATH,
+    THRESHOLD_PATH,
+    DEFAULT_THRESHOLD,
+    LOG_LEVEL
+)
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMAT_VERSION = 1
+
+# Read buffer for streaming hashes (reused, no per-chunk allocation)
+_CHUNK_SIZE = 1024 * 1024
+
+
+class ArtifactMismatchError(ValueError):
+    """Raised when the artifacts on disk do not match their manifest"""
+
+
+def file_digest(path: str) -> str:
+    """
+    SHA-256 of a file, streamed in fixed-size chunks
+
+    Parameters
+    ----------
+    path : str
+        File to hash
+
+    Returns
+    -------
+    str
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    buffer = bytearray(_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+def feature_order_digest(feature_names: List[str]) -> str:
+    """SHA-256 of the feature names in model order"""
+    return hashlib.sha256("\n".join(feature_names).encode("utf-8")).hexdigest()
+
+
+def artifact_identity(digests: Dict[str, str], feature_order_sha256: str, threshold: float) -> str:
+    """
+    Short identifier of a complete set of artifacts
+
+    Changes whenever any artifact, the feature order or the threshold
+    changes; meant for cache keys and for comparing replicas.
+
+    Returns
+    -------
+    str
+        16 hex characters
+    """
+    parts = [f"{name}={digests[name]}" for name in sorted(digests)]
+    parts += [f"feature_order={feature_order_sha256}", f"threshold={threshold!r}"]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def artifact_files(
+    model_path: str = MODEL_PATH,
+    explainer_path: str = EXPLAINER_PATH,
+    feature_names_path: str = FEATURE_NAMES_PATH,
+    threshold_path: str = THRESHOLD_PATH
+) -> Dict[str, str]:
+    """Artifacts covered by the manifest, by name"""
+    return {
+        "model": model_path,
+        "explainer": explainer_path,
+        "feature_names": feature_names_path,
+        "threshold": threshold_path
+    }
+
+
+def build_manifest(files: Optional[Dict[str, str]] = None) -> Dict:
+    """
+    Describe a set of artifacts
+
+    Parameters
+    ----------
+    files : Optional[Dict[str, str]]
+        Artifact paths by name (default: the configured artifacts)
+
+    Returns
+    -------
+    Dict
+        Hashes and sizes, feature count and order hash, threshold and
+        the combined artifact identity
+    """
+    from api.predictor import load_feature_names
+
+    files = artifact_files() if files is None else files
+    entries = {
+        name: {
+            "file": Path(path).name,
+            "sha256": file_digest(path),
+            "bytes": Path(path).stat().st_size
+        }
+        for name, path in files.items()
+    }
+    feature_names = load_feature_names(files["feature_names"])
+    with open(files["threshold"], 'r') as f:
+        threshold = json.load(f).get("threshold", DEFAULT_THRESHOLD)
+    feature_order_sha256 = feature_order_digest(feature_names)
+    return {
+        "format_version": MANIFEST_FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "artifacts": entries,
+        "feature_count": len(feature_names),
+        "feature_order_sha256": feature_order_sha256,
+        "threshold": threshold,
+        "artifact_id": artifact_identity(
+            {name: entry["sha256"] for name, entry in entries.items()},
+            feature_order_sha256,
+            threshold
+        )
+    }
+
+
+def write_manifest(output: str = ARTIFACT_MANIFEST_PATH, files: Optional[Dict[str, str]] = None) -> Dict:
+    """Build the manifest of the artifacts and write it as JSON"""
+    manifest = build_manifest(files)
+    with open(output, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    logger.info(f"Wrote artifact manifest {output} (artifact id {manifest['artifact_id']})")
+    return manifest
+
+
+def refresh_threshold(
+    path: str = ARTIFACT_MANIFEST_PATH,
+    threshold_path: str = THRESHOLD_PATH
+) -> Optional[Dict]:
+    """
+    Record a new threshold file in an existing manifest
+
+    Only the threshold entry, the threshold and the artifact identity
+    change; the other artifacts keep the hashes they were certified with,
+    so a model changed since is still rejected at load.
+
+    Returns
+    -------
+    Optional[Dict]
+        The updated manifest, or None if there is none
+    """
+    manifest = load_manifest(path)
+    if manifest is None:
+        return None
+    with open(threshold_path, 'r') as f:
+        threshold = json.load(f).get("threshold", DEFAULT_THRESHOLD)
+    manifest["artifacts"]["threshold"] = {
+        "file": Path(threshold_path).name,
+        "sha256": file_digest(threshold_path),
+        "bytes": Path(threshold_path).stat().st_size
+    }
+    manifest["threshold"] = threshold
+    manifest["artifact_id"] = artifact_identity(
+        {name: entry["sha256"] for name, entry in manifest["artifacts"].items()},
+        manifest["feature_order_sha256"],
+        threshold
+    )
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+    logger.info(f"Recorded threshold {threshold} in {path} (artifact id {manifest['artifact_id']})")
+    return manifest
+
+
+def load_manifest(path: str = ARTIFACT_MANIFEST_PATH) -> Optional[Dict]:
+    """
+    Read the artifact manifest
+
+    Returns
+    -------
+    Optional[Dict]
+        The manifest, or None if there is none
+
+    Raises
+    ------
+    ArtifactMismatchError
+        If the manifest format version is not supported
+    """
+    if not Path(path).is_file():
+        return None
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != MANIFEST_FORMAT_VERSION:
+        raise ArtifactMismatchError(
+            f"Unsupported artifact manifest version: {manifest.get('format_version')}"
+        )
+    return manifest
+
+
+def verify_file(manifest: Dict, name: str, path: str) -> str:
+    """
+    Check one artifact file against the manifest
+
+    Returns
+    -------
+    str
+        The file's digest
+
+    Raises
+    ------
+    ArtifactMismatchError
+        If the file's content differs from the manifest
+    """
+    digest = file_digest(path)
+    expected = manifest["artifacts"][name]["sha256"]
+    if digest != expected:
+        raise ArtifactMismatchError(
+            f"Artifact '{name}' ({path}) does not match the manifest: "
+            f"sha256 {digest[:12]}..., expected {expected[:12]}..."
+        )
+    return digest
+
+
+def verify_loaded(manifest: Dict, feature_names: List[str], threshold: float) -> None:
+    """
+    Check the feature list and threshold actually loaded against the manifest
+
+    Raises
+    ------
+    ArtifactMismatchError
+        If the feature count, feature order or threshold differ
+    """
+    problems = []
+    if len(feature_names) != manifest["feature_count"]:
+        problems.append(f"{len(feature_names)} features, expected {manifest['feature_count']}")
+    elif feature_order_digest(feature_names) != manifest["feature_order_sha256"]:
+        problems.append("feature order differs")
+    if threshold != manifest["threshold"]:
+        problems.append(f"threshold {threshold}, expected {manifest['threshold']}")
+    if problems:
+        raise ArtifactMismatchError(f"Loaded artifacts do not match the manifest: {'; '.join(problems)}")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Write or verify the artifact manifest")
+    parser.add_argument("command", choices=["write", "verify"])
+    parser.add_argument(
+        "--output", default=ARTIFACT_MANIFEST_PATH,
+        help="Manifest path (default: %(default)s)"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, LOG_LEVEL),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    if args.command == "write":
+        write_manifest(args.output)
+        return
+    manifest = load_manifest(args.output)
+    if manifest is None:
+        logger.error(f"No artifact manifest at {args.output}")
+        sys.exit(1)
+    current = build_manifest()
+    changed = [
+        name for name, entry in manifest["artifacts"].items()
+        if current["artifacts"].get(name, {}).get("sha256") != entry["sha256"]
+    ]
+    if changed:
+        logger.error(f"Artifacts changed since the manifest was written: {', '.join(changed)}")
+        sys.exit(1)
+    logger.info(f"All artifacts match the manifest (artifact id {manifest['artifact_id']})")
+
+
+if __name__ == "__main__":
+    main()
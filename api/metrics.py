@@ -0,0 +1,216 @@
+"""
+Service metrics
+Minimal in-process registry rendered in the Prometheus text format
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    """Render a label set as {name="value",...}"""
+    if not labelnames:
+        return ""
+    pairs = ",".join(
+        f'{name}="{str(value)}"' for name, value in zip(labelnames, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """
+    Monotonic counter, optionally split by labels
+    """
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        """Increase the counter for the given label values"""
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def get(self, *labelvalues: str) -> float:
+        """Current value for the given label values"""
+        return self._values.get(labelvalues, 0.0)
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], float]]:
+        """(suffix, label values, value) triples to render"""
+        with self._lock:
+            items = list(self._values.items())
+        return [("", labels, value) for labels, value in items]
+
+
+class Gauge:
+    """
+    Point-in-time value, either set explicitly or read from a callback
+
+    A callback gauge costs nothing on the request path: the value is
+    only computed when the metrics are scraped.
+    """
+
+    metric_type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        function: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function = function
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        """Set the gauge for the given label values"""
+        self._values[labelvalues] = value
+
+    def get(self, *labelvalues: str) -> float:
+        """Current value for the given label values"""
+        if self._function is not None:
+            return self._function().get(labelvalues, 0.0)
+        return self._values.get(labelvalues, 0.0)
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], float]]:
+        """(suffix, label values, value) triples to render"""
+        values = self._function() if self._function is not None else dict(self._values)
+        return [("", labels, value) for labels, value in values.items()]
+
+
+class Histogram:
+    """
+    Distribution of observed values over fixed buckets
+
+    Each label set gets its bucket counts preallocated on first use;
+    an observation is then a binary search and two increments, with no
+    allocation.
+    """
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., count above the last bucket, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        """Record a value for the given label values"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labelvalues)
+            if counts is None:
+                counts = self._values[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def get(self, *labelvalues: str) -> Tuple[int, float]:
+        """(count, sum) of the observations for the given label values"""
+        with self._lock:
+            counts = self._values.get(labelvalues)
+            if counts is None:
+                return 0, 0.0
+            return int(sum(counts[:-1])), counts[-1]
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], float]]:
+        """(suffix, label values, value) triples to render, 'le' last for buckets"""
+        with self._lock:
+            items = [(labels, list(counts)) for labels, counts in self._values.items()]
+        samples = []
+        for labels, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append(("_bucket", labels + (f"{bound:g}",), cumulative))
+            cumulative += counts[-2]
+            samples.append(("_bucket", labels + ("+Inf",), cumulative))
+            samples.append(("_sum", labels, counts[-1]))
+            samples.append(("_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics exposed on /metrics
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Register a metric, returning the existing one if the name is taken"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        """Create (or get) a counter"""
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        function: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+    ) -> Gauge:
+        """Create (or get) a gauge"""
+        return self.register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Optional[Tuple[float, ...]] = None
+    ) -> Histogram:
+        """Create (or get) a histogram"""
+        if buckets is None:
+            return self.register(Histogram(name, documentation, labelnames))
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format
+
+        Returns
+        -------
+        str
+            Metrics text, one sample per line
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            for suffix, labels, value in metric.samples():
+                # Histogram buckets carry an extra 'le' label
+                labelnames = metric.labelnames + ("le",) if suffix == "_bucket" else metric.labelnames
+                lines.append(
+                    f"{metric.name}{suffix}{_format_labels(labelnames, labels)} {value}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+# Global registry used by the API
+REGISTRY = MetricsRegistry()
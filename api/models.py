@@ -36,6 +36,20 @@ class ClientFeatures(BaseModel):
         return v
 
 
+class InputFlags(BaseModel):
+    """
+    Features of a client outside what the model saw in training
+    """
+    out_of_range: List[str] = Field(
+        ...,
+        description="Features outside their training range"
+    )
+    unexpected_missing: List[str] = Field(
+        ...,
+        description="Missing features that were always present in training"
+    )
+
+
 class PredictionResponse(BaseModel):
     """
     Response model for credit scoring prediction
@@ -70,6 +84,10 @@ class PredictionResponse(BaseModel):
         ...,
         description="Decision threshold used for classification"
     )
+    input_flags: Optional[InputFlags] = Field(
+        None,
+        description="Input quality flags, when requested with include_input_flags"
+    )
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -117,6 +135,60 @@ class BatchPredictionResponse(BaseModel):
     )
 
 
+class JobStatusResponse(BaseModel):
+    """
+    Status of a background scoring job
+    """
+    job_id: str = Field(
+        ...,
+        description="Job identifier"
+    )
+    status: str = Field(
+        ...,
+        description="Job status: queued, running, completed, failed or cancelled"
+    )
+    total_rows: Optional[int] = Field(
+        None,
+        description="Number of clients to score, if known"
+    )
+    processed_rows: int = Field(
+        ...,
+        description="Number of clients scored so far"
+    )
+    approved_count: int = Field(
+        ...,
+        description="Number of approved credits so far"
+    )
+    rejected_count: int = Field(
+        ...,
+        description="Number of rejected credits so far"
+    )
+    rows_per_second: float = Field(
+        ...,
+        description="Scoring throughput since the job started"
+    )
+    error: Optional[str] = Field(
+        None,
+        description="Error message if the job failed"
+    )
+    created_at: float = Field(
+        ...,
+        description="Submission time (Unix timestamp)"
+    )
+    started_at: Optional[float] = Field(
+        None,
+        description="Start time (Unix timestamp)"
+    )
+    finished_at: Optional[float] = Field(
+        None,
+        description="End time (Unix timestamp)"
+    )
+    results_url: Optional[str] = Field(
+        None,
+        description="Where to download the results once completed"
+    )
+
+
 class FeatureImportanceResponse(BaseModel):
     """
     Response model for SHAP feature importance
@@ -163,6 +235,14 @@ class HealthResponse(BaseModel):
         ...,
         description="API version"
     )
+    artifact_id: Optional[str] = Field(
+        None,
+        description="Identity of the loaded artifacts (model, explainer, features, threshold)"
+    )
+    manifest_verified: bool = Field(
+        False,
+        description="Whether the artifacts were verified against the manifest"
+    )
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -186,4 +266,219 @@ class ErrorResponse(BaseModel):
     detail: Optional[str] = Field(
         None,
         description="Detailed error information"
-    )
\ No newline at end of file
+    )
+
+
+class ReadinessResponse(BaseModel):
+    """
+    Readiness check response
+    """
+    status: str = Field(
+        ...,
+        description="'ready', or 'pending', 'running' or 'failed' while not serving"
+    )
+    warmup_seconds: Optional[float] = Field(
+        None,
+        description="Duration of the warm-up routine"
+    )
+    engines: List[str] = Field(
+        default_factory=list,
+        description="Models warmed up ('champion' and challengers)"
+    )
+    error: Optional[str] = Field(
+        None,
+        description="Why the warm-up failed"
+    )
+
+
+class StartupPhase(BaseModel):
+    """
+    Timed step of the process startup
+    """
+    name: str = Field(..., description="Imported module or loaded artifact")
+    kind: str = Field(..., description="'import' or 'artifact'")
+    seconds: float = Field(..., description="Wall time")
+
+
+class StartupReportResponse(BaseModel):
+    """
+    Startup time breakdown of the serving process
+    """
+    phases: List[StartupPhase] = Field(..., description="Timed steps, in order")
+    import_seconds: float = Field(..., description="Total time importing modules")
+    artifact_seconds: float = Field(..., description="Total time loading artifacts")
+    warmup_seconds: float = Field(0.0, description="Time spent in the warm-up routine")
+    ready_seconds: Optional[float] = Field(
+        None,
+        description="Time from the first API import to readiness"
+    )
+    artifact_source: Optional[str] = Field(
+        None,
+        description="Where the model was loaded from ('bundle' or 'pickle')"
+    )
+
+
+class SlowRequest(BaseModel):
+    """
+    Stage timings of one slow request
+    """
+    timestamp: float = Field(..., description="Unix time the request finished")
+    endpoint: str = Field(..., description="Timed endpoint name")
+    status_code: int = Field(..., description="Response status code")
+    duration_seconds: float = Field(..., description="Time from arrival to the response headers")
+    stages: Dict[str, float] = Field(..., description="Seconds spent in each stage")
+    payload_bytes: int = Field(..., description="Size of the request body")
+    batch_size: Optional[int] = Field(None, description="Clients in the request")
+
+
+class SlowRequestsResponse(BaseModel):
+    """
+    Most recent requests slower than the threshold
+    """
+    threshold_seconds: float = Field(..., description="Requests at or above this duration are kept (0 = disabled)")
+    capacity: int = Field(..., description="Maximum number of requests kept")
+    requests: List[SlowRequest] = Field(..., description="Captured requests, most recent first")
+
+
+class ProfiledFunction(BaseModel):
+    """
+    CPU time of one function in a request profile
+    """
+    function: str = Field(..., description="Function name")
+    file: str = Field(..., description="Source file ('~' for built-ins)")
+    line: int = Field(..., description="Line of the definition")
+    calls: int = Field(..., description="Number of calls")
+    primitive_calls: int = Field(..., description="Calls not made recursively")
+    own_seconds: float = Field(..., description="Time in the function itself")
+    cumulative_seconds: float = Field(..., description="Time including callees")
+
+
+class MemoryAllocation(BaseModel):
+    """
+    Memory allocated by one source line during a profiled request
+    """
+    location: str = Field(..., description="file:line")
+    size_bytes: int = Field(..., description="Bytes still allocated when the response started")
+    count: int = Field(..., description="Number of blocks")
+
+
+class ProfileSummary(BaseModel):
+    """
+    Profiled request
+    """
+    id: str = Field(..., description="Profile identifier")
+    timestamp: float = Field(..., description="Unix time the response started")
+    method: str = Field(..., description="HTTP method")
+    path: str = Field(..., description="Request path")
+    status_code: int = Field(..., description="Response status code")
+    modes: List[str] = Field(..., description="'cpu' and/or 'memory'")
+    duration_seconds: float = Field(..., description="Time from arrival to the response headers, profiled")
+
+
+class ProfileListResponse(BaseModel):
+    """
+    Most recent request profiles
+    """
+    profiles: List[ProfileSummary] = Field(..., description="Profiles, most recent first")
+
+
+class ProfileReport(ProfileSummary):
+    """
+    CPU and memory profile of a request
+    """
+    functions: List[ProfiledFunction] = Field(..., description="Functions by decreasing cumulative time")
+    allocations: List[MemoryAllocation] = Field(..., description="Source lines by decreasing memory allocated")
+    peak_memory_bytes: Optional[int] = Field(None, description="Peak traced memory during the request")
+
+
+class ReloadResponse(BaseModel):
+    """
+    Result of a predictor hot reload
+    """
+    status: str = Field(..., description="'reloaded'")
+    artifact_source: str = Field(..., description="Where the model was loaded from ('bundle' or 'pickle')")
+    threshold: float = Field(..., description="Decision threshold now in use")
+    load_seconds: float = Field(..., description="Time spent loading the model")
+    explainer_loaded: bool = Field(..., description="Whether the explainer was preloaded")
+
+
+class ModelInfo(BaseModel):
+    """
+    A loaded model, champion or challenger
+    """
+    name: str = Field(..., description="Model name ('champion' for the serving model)")
+    role: str = Field(..., description="'champion' or 'challenger'")
+    artifact_source: Optional[str] = Field(None, description="'bundle', 'pickle' or the challenger bundle path")
+    threshold: float = Field(..., description="Decision threshold")
+    memory_bytes: int = Field(..., description="Approximate model memory (explainer excluded)")
+
+
+class ModelRegistryResponse(BaseModel):
+    """
+    Loaded models and shadow scoring state
+    """
+    models: List[ModelInfo] = Field(..., description="Champion first, then challengers")
+    sample_rate: float = Field(..., description="Share of scored clients sent to challengers")
+    shadow_queue_depth: int = Field(..., description="Clients waiting for shadow scoring")
+
+
+class DriftFeature(BaseModel):
+    """
+    Drift scores of one feature
+    """
+    feature: str = Field(..., description="Feature name")
+    psi: float = Field(..., description="Population stability index against the reference")
+    ks: float = Field(..., description="Kolmogorov-Smirnov distance over the reference bins")
+    missing_reference: float = Field(..., description="Share of missing values in the reference")
+    missing_current: float = Field(..., description="Share of missing values in scored traffic")
+    drifted: bool = Field(..., description="Whether the PSI exceeds the threshold")
+
+
+class DriftResponse(BaseModel):
+    """
+    Feature drift of scored traffic against the training reference
+    """
+    reference_rows: int = Field(..., description="Rows of the reference profile")
+    reference_created_at: Optional[str] = Field(None, description="When the reference profile was built")
+    observed_rows: int = Field(..., description="Scored rows counted since startup")
+    psi_threshold: float = Field(..., description="PSI above which a feature has drifted")
+    drifted_features: int = Field(..., description="Number of features above the threshold")
+    features: List[DriftFeature] = Field(..., description="Features by decreasing PSI")
+
+
+class ScoreSummary(BaseModel):
+    """
+    Probability distribution and decisions of scored clients
+    """
+    predictions: int = Field(..., description="Clients scored")
+    approved: int = Field(..., description="Clients approved")
+    rejected: int = Field(..., description="Clients rejected")
+    approval_rate: Optional[float] = Field(None, description="Share of clients approved")
+    mean_probability: Optional[float] = Field(None, description="Mean probability of default")
+    quantiles: Dict[str, float] = Field(..., description="Quantiles of the probability of default (p10...p99)")
+    histogram: List[int] = Field(..., description="Clients per equal-width probability bin, from 0 to 1")
+
+
+class ScoreWindow(ScoreSummary):
+    """
+    Scored clients of a rolling window
+    """
+    window_seconds: int = Field(..., description="Window length, in whole buckets, current bucket included")
+
+
+class ScoreBucket(ScoreSummary):
+    """
+    Scored clients of a time bucket
+    """
+    start: float = Field(..., description="Unix time the bucket starts")
+
+
+class ScoreMonitorResponse(BaseModel):
+    """
+    Rolling score distribution and approval rate
+    """
+    bucket_seconds: int = Field(..., description="Width of a time bucket")
+    resolution: int = Field(..., description="Probability bins the quantiles are read from")
+    threshold: float = Field(..., description="Decision threshold now in use")
+    windows: List[ScoreWindow] = Field(..., description="Rolling windows, shortest first")
+    buckets: List[ScoreBucket] = Field(..., description="Time buckets, most recent first")
@@ -0,0 +1,251 @@
+"""
+Optional artifacts
+Artifacts loaded on demand (e.g. the SHAP explainer), released when idle or over budget
+"""
+
+import gc
+import logging
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from api.config import OPTIONAL_ARTIFACT_IDLE_TIMEOUT, OPTIONAL_ARTIFACTS_MEMORY_BUDGET
+from api.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Eviction reasons
+IDLE = "idle"
+BUDGET = "budget"
+CLOSED = "closed"
+
+_loads = REGISTRY.counter(
+    "artifact_loads_total",
+    "On-demand loads of optional artifacts",
+    ("artifact",)
+)
+_load_seconds = REGISTRY.counter(
+    "artifact_load_seconds_total",
+    "Time spent loading optional artifacts",
+    ("artifact",)
+)
+_last_load_seconds = REGISTRY.gauge(
+    "artifact_last_load_seconds",
+    "Duration of the latest load of each optional artifact",
+    ("artifact",)
+)
+_evictions = REGISTRY.counter(
+    "artifact_evictions_total",
+    "Optional artifacts released, by reason (idle, budget or closed)",
+    ("artifact", "reason")
+)
+
+# Every optional artifact alive in the process (e.g. old predictors' explainers)
+_instances: "weakref.WeakSet[OptionalArtifact]" = weakref.WeakSet()
+
+
+def _rss_bytes() -> Optional[int]:
+    """Resident set size of the process (None where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def resident_bytes() -> int:
+    """Total size of the optional artifacts currently loaded"""
+    return sum(artifact.resident_bytes for artifact in list(_instances))
+
+
+class OptionalArtifact:
+    """
+    Lazily loaded artifact with idle eviction and a shared memory budget
+
+    The artifact is loaded on first use and released once unused for
+    `idle_timeout` seconds. Its size is measured as the growth of the
+    process resident memory during the load (falling back to
+    `size_hint`). If loading it would exceed the budget shared by all
+    optional artifacts, idle ones are released first; if it still does
+    not fit, it is released as soon as its current users are done.
+    Once its owner is replaced (e.g. a reloaded predictor), `close` releases
+    it as soon as it is unused; it counts against the budget until then.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        size_hint: int = 0,
+        idle_timeout: float = OPTIONAL_ARTIFACT_IDLE_TIMEOUT,
+        memory_budget: int = OPTIONAL_ARTIFACTS_MEMORY_BUDGET
+    ):
+        self.name = name
+        self.idle_timeout = idle_timeout
+        self.memory_budget = memory_budget
+        self.size_bytes = size_hint  # last measured size, kept across evictions
+        self._loader = loader
+        self._value = None
+        self._users = 0
+        self._last_used = 0.0
+        self._cond = threading.Condition()
+        self._watcher: Optional[threading.Thread] = None
+        self._closed = False
+        _instances.add(self)
+
+    @property
+    def value(self):
+        """The loaded artifact, or None if it is not resident"""
+        return self._value
+
+    @property
+    def resident_bytes(self) -> int:
+        """Size of the artifact if it is loaded, else 0"""
+        return self.size_bytes if self._value is not None else 0
+
+    def load(self) -> None:
+        """Make the artifact resident without using it"""
+        with self._cond:
+            if self._value is None:
+                self._load_locked()
+            self._last_used = time.monotonic()
+
+    @contextmanager
+    def use(self):
+        """
+        Hold the artifact for the duration of the block, loading it if needed
+
+        Yields
+        ------
+        Any
+            The loaded artifact
+        """
+        with self._cond:
+            if self._value is None:
+                self._load_locked()
+            self._users += 1
+            value = self._value
+        try:
+            yield value
+        finally:
+            with self._cond:
+                self._users -= 1
+                self._last_used = time.monotonic()
+                if self._users == 0 and self._value is not None:
+                    if self._closed:
+                        self._evict_locked(CLOSED)
+                    elif self._over_budget():
+                        self._evict_locked(BUDGET)
+                self._cond.notify_all()
+
+    def evict(self, reason: str = IDLE) -> bool:
+        """
+        Release the artifact if nobody is using it
+
+        Returns
+        -------
+        bool
+            Whether it was released
+        """
+        with self._cond:
+            if self._value is None or self._users:
+                return False
+            self._evict_locked(reason)
+            return True
+
+    def close(self) -> None:
+        """
+        Release the artifact now, or once its current users are done
+
+        Later uses (e.g. requests still holding the replaced owner) load it
+        again and release it right after. The idle watcher stops, so it no
+        longer keeps the artifact and its loader alive.
+        """
+        with self._cond:
+            self._closed = True
+            if self._value is not None and not self._users:
+                self._evict_locked(CLOSED)
+            self._cond.notify_all()
+
+    def _over_budget(self) -> bool:
+        return self.memory_budget > 0 and resident_bytes() > self.memory_budget
+
+    def _make_room(self, needed: int) -> None:
+        """Release other idle artifacts, closed ones first, then least recently used"""
+        others = sorted(
+            (a for a in list(_instances) if a is not self and a.resident_bytes),
+            key=lambda a: (not a._closed, a._last_used)
+        )
+        for other in others:
+            if resident_bytes() + needed <= self.memory_budget:
+                break
+            # Never wait on another artifact's lock while holding ours
+            if other._cond.acquire(blocking=False):
+                try:
+                    if other._value is not None and not other._users:
+                        other._evict_locked(BUDGET)
+                finally:
+                    other._cond.release()
+
+    def _load_locked(self) -> None:
+        if self.memory_budget > 0:
+            self._make_room(self.size_bytes)
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        value = self._loader()
+        seconds = time.perf_counter() - start
+        rss_after = _rss_bytes()
+        if rss_before is not None and rss_after is not None and rss_after > rss_before:
+            self.size_bytes = rss_after - rss_before
+        self._value = value
+        self._last_used = time.monotonic()
+
+        _loads.inc(self.name)
+        _load_seconds.inc(self.name, amount=seconds)
+        _last_load_seconds.set(seconds, self.name)
+        logger.info(
+            f"Loaded {self.name} in {seconds:.3f}s "
+            f"(~{self.size_bytes / 1024 / 1024:.1f} MB resident)"
+        )
+
+        if self.idle_timeout > 0 and self._watcher is None and not self._closed:
+            self._watcher = threading.Thread(
+                target=self._watch, name=f"{self.name}-idle", daemon=True
+            )
+            self._watcher.start()
+
+    def _evict_locked(self, reason: str) -> None:
+        self._value = None
+        _evictions.inc(self.name, reason)
+        logger.info(f"Released {self.name} ({reason})")
+        # Explainers hold reference cycles; give the memory back now
+        gc.collect()
+
+    def _watch(self) -> None:
+        """Release the artifact once idle for `idle_timeout` seconds"""
+        with self._cond:
+            while self._value is not None:
+                idle_for = time.monotonic() - self._last_used
+                if self._users == 0 and idle_for >= self.idle_timeout:
+                    self._evict_locked(IDLE)
+                    break
+                self._cond.wait(timeout=max(self.idle_timeout - idle_for, 0.01))
+            self._watcher = None
+
+
+def _resident_by_artifact() -> Dict:
+    totals: Dict = {}
+    for artifact in list(_instances):
+        totals[(artifact.name,)] = totals.get((artifact.name,), 0) + artifact.resident_bytes
+    return totals
+
+
+REGISTRY.gauge(
+    "artifact_resident_bytes",
+    "Approximate memory of the optional artifacts currently loaded",
+    ("artifact",),
+    function=_resident_by_artifact
+)
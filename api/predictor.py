@@ -3,62 +3,186 @@ Credit Score Predictor
 Handles model loading and predictions
 """
 
+import hashlib
 import pickle
 import json
 import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 import numpy as np
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 
+from api import drift
+from api.artifacts import MANIFEST_FILE, bundle_exists, bundle_matches_model, load_bundle, read_bundle_manifest
+from api.input_quality import InputBounds
+from api.manifest import (
+    ArtifactMismatchError,
+    artifact_identity,
+    feature_order_digest,
+    file_digest,
+    load_manifest,
+    verify_file,
+    verify_loaded
+)
+from api.metrics import REGISTRY
+from api.optional_artifacts import OptionalArtifact
+from api.score_monitor import SCORE_MONITOR
+from api.startup_report import REPORT, ARTIFACT
+from api.timing import PREPARE, INFER, EXPLAIN, record_stage
 from api.config import (
+    ARTIFACT_BUNDLE_DIR,
     MODEL_PATH,
     EXPLAINER_PATH,
     FEATURE_NAMES_PATH,
     THRESHOLD_PATH,
+    ARTIFACT_MANIFEST_PATH,
+    FEATURE_DTYPE,
+    SCRATCH_MAX_ROWS,
     DEFAULT_THRESHOLD
 )
 
 logger = logging.getLogger(__name__)
 
+# Scoring not to be counted as traffic (warm-up), see `unmonitored`
+_unmonitored: ContextVar[bool] = ContextVar("unmonitored", default=False)
+
+
+@contextmanager
+def unmonitored():
+    """Keep the rows scored within the block (and its scheduler tasks) out of the monitors"""
+    token = _unmonitored.set(True)
+    try:
+        yield
+    finally:
+        _unmonitored.reset(token)
+
+
+def load_feature_names(path: str = FEATURE_NAMES_PATH) -> List[str]:
+    """
+    Load the ordered list of feature names expected by the model
+
+    Parameters
+    ----------
+    path : str
+        Path to the pickled feature names list
+
+    Returns
+    -------
+    List[str]
+        Feature names in model order
+    """
+    with open(path, 'rb') as f:
+        return list(pickle.load(f))
+
+
+def _file_size(path: str) -> int:
+    """Size of a file in bytes (0 if missing)"""
+    try:
+        return Path(path).stat().st_size
+    except OSError:
+        return 0
+
 
 class CreditScorePredictor:
     """
     Credit scoring predictor with SHAP explainability
     """
     
-    def __init__(self):
-        """Initialize the predictor"""
+    def __init__(self, bundle_dir: Optional[str] = None, feature_dtype: Optional[str] = None):
+        """
+        Initialize the predictor
+        
+        Parameters
+        ----------
+        bundle_dir : Optional[str]
+            Native bundle to load (e.g. a challenger model). By default the
+            configured bundle is used if present, otherwise the pickles.
+        feature_dtype : Optional[str]
+            'float64' or 'float32' feature matrices (default: FEATURE_DTYPE)
+        """
+        self.feature_dtype = np.dtype(feature_dtype or FEATURE_DTYPE)
+        if self.feature_dtype not in (np.float32, np.float64):
+            raise ValueError(f"Unsupported feature dtype: {self.feature_dtype}")
+        # Per-thread scoring matrices, reused across calls
+        self._scratch = threading.local()
+        self.bundle_dir = bundle_dir
         self.model = None
-        self.explainer = None
+        # Released when idle or over the optional-artifact memory budget
+        self._explainer = OptionalArtifact(
+            "explainer", self._read_explainer, size_hint=_file_size(EXPLAINER_PATH)
+        )
         self.feature_names = None
         self.threshold = DEFAULT_THRESHOLD
+        self._feature_index = None
+        self.artifact_source = None
+        self.load_seconds = None
+        self._memory_bytes = None
+        self.manifest = None
+        self.artifact_id = None
+        self.input_bounds = None
+        # Scored rows feed the drift, input and score monitors (serving predictor only)
+        self.monitored = False
         self._load_artifacts()
     
     def _load_artifacts(self):
         """Load model, feature names, and threshold (explainer loaded on demand)"""
         try:
-            # Load model
-            logger.info(f"Loading model from {MODEL_PATH}")
-            with open(MODEL_PATH, 'rb') as f:
-                self.model = pickle.load(f)
-            logger.info("Model loaded successfully")
-            
-            # Load feature names
-            logger.info(f"Loading feature names from {FEATURE_NAMES_PATH}")
-            with open(FEATURE_NAMES_PATH, 'rb') as f:
-                self.feature_names = pickle.load(f)
-            logger.info(f"Loaded {len(self.feature_names)} feature names")
+            start = time.perf_counter()
+            threshold_path = THRESHOLD_PATH
+            if self.bundle_dir is not None:
+                logger.info(f"Loading model bundle from {self.bundle_dir}")
+                self.model, self.feature_names = load_bundle(self.bundle_dir)
+                self.artifact_source = "bundle"
+                # A bundle may ship its own threshold
+                if (Path(self.bundle_dir) / Path(THRESHOLD_PATH).name).exists():
+                    threshold_path = str(Path(self.bundle_dir) / Path(THRESHOLD_PATH).name)
+            elif self._current_bundle():
+                # Native bundle: no sklearn/LightGBM import, memory-mapped arrays
+                logger.info(f"Loading model bundle from {ARTIFACT_BUNDLE_DIR}")
+                with REPORT.measure("model bundle", ARTIFACT):
+                    self.model, self.feature_names = load_bundle(ARTIFACT_BUNDLE_DIR)
+                self.artifact_source = "bundle"
+            else:
+                # Unpickling imports these; time them separately from the load
+                REPORT.timed_import("lightgbm")
+                REPORT.timed_import("sklearn.pipeline")
+                
+                # Load model
+                logger.info(f"Loading model from {MODEL_PATH}")
+                with REPORT.measure("model pickle", ARTIFACT), open(MODEL_PATH, 'rb') as f:
+                    self.model = pickle.load(f)
+                
+                # Load feature names
+                logger.info(f"Loading feature names from {FEATURE_NAMES_PATH}")
+                with REPORT.measure("feature names pickle", ARTIFACT):
+                    self.feature_names = load_feature_names(FEATURE_NAMES_PATH)
+                self.artifact_source = "pickle"
+            self.load_seconds = time.perf_counter() - start
+            logger.info(
+                f"Model loaded from {self.artifact_source} in {self.load_seconds:.3f}s "
+                f"({len(self.feature_names)} features)"
+            )
             
             # Load optimal threshold
-            if Path(THRESHOLD_PATH).exists():
-                logger.info(f"Loading threshold from {THRESHOLD_PATH}")
-                with open(THRESHOLD_PATH, 'r') as f:
+            if Path(threshold_path).exists():
+                logger.info(f"Loading threshold from {threshold_path}")
+                with open(threshold_path, 'r') as f:
                     threshold_data = json.load(f)
                     self.threshold = threshold_data.get('threshold', DEFAULT_THRESHOLD)
                 logger.info(f"Using optimal threshold: {self.threshold}")
             else:
                 logger.warning(f"Threshold file not found, using default: {DEFAULT_THRESHOLD}")
             
+            with REPORT.measure("artifact hashes", ARTIFACT):
+                self._identify_artifacts(threshold_path)
+            
+            # Training range and presence of each feature, to flag unusual inputs
+            with REPORT.measure("input bounds", ARTIFACT):
+                self.input_bounds = InputBounds.from_model(self.model, self.feature_names, self.feature_dtype)
+            
             # Note: Explainer will be loaded on demand when needed
             logger.info("Explainer will be loaded on demand for feature importance")
                 
@@ -66,19 +190,143 @@ class CreditScorePredictor:
             logger.error(f"Error loading artifacts: {str(e)}")
             raise
     
+    def _current_bundle(self) -> bool:
+        """
+        Whether the configured bundle exists and was exported from the pickled model
+        
+        A retrained model rolled out over the pickle makes the bundle
+        stale; the pickle is then loaded instead, until the bundle is
+        exported again.
+        """
+        if not bundle_exists(ARTIFACT_BUNDLE_DIR):
+            return False
+        if not bundle_matches_model(ARTIFACT_BUNDLE_DIR, MODEL_PATH):
+            logger.warning(
+                f"Bundle {ARTIFACT_BUNDLE_DIR} was exported from another model than {MODEL_PATH}, "
+                f"loading the pickle (export the bundle again for fast loads)"
+            )
+            return False
+        return True
+    
+    def _identify_artifacts(self, threshold_path: str):
+        """
+        Check the loaded artifacts against the manifest and compute their identity
+        
+        The champion's artifacts are verified against the manifest when
+        there is one (a mismatch fails the load). A model loaded from the
+        native bundle is matched through the pickle hash recorded at
+        export, so both sources share one identity. Challengers are
+        identified by their bundle.
+        
+        Raises
+        ------
+        ArtifactMismatchError
+            If an artifact does not match the manifest
+        """
+        feature_order = feature_order_digest(self.feature_names)
+        if self.bundle_dir is not None:
+            digests = {"bundle": file_digest(str(Path(self.bundle_dir) / MANIFEST_FILE))}
+            if Path(threshold_path).exists():
+                digests["threshold"] = file_digest(threshold_path)
+            self.artifact_id = artifact_identity(digests, feature_order, self.threshold)
+            return
+        
+        self.manifest = load_manifest(ARTIFACT_MANIFEST_PATH)
+        if self.artifact_source == "bundle":
+            model_digest = read_bundle_manifest(ARTIFACT_BUNDLE_DIR).get("source_model_sha256")
+            if model_digest is None:
+                raise ArtifactMismatchError(
+                    f"Bundle {ARTIFACT_BUNDLE_DIR} has no source model hash, export it again"
+                )
+        
+        if self.manifest is None:
+            logger.warning(f"No artifact manifest at {ARTIFACT_MANIFEST_PATH}, artifacts not verified")
+            digests = {
+                name: file_digest(path)
+                for name, path in (
+                    ("model", MODEL_PATH),
+                    ("explainer", EXPLAINER_PATH),
+                    ("feature_names", FEATURE_NAMES_PATH),
+                    ("threshold", THRESHOLD_PATH)
+                )
+                if Path(path).exists()
+            }
+            if self.artifact_source == "bundle":
+                digests["model"] = model_digest
+            self.artifact_id = artifact_identity(digests, feature_order, self.threshold)
+        else:
+            if self.artifact_source == "bundle":
+                if model_digest != self.manifest["artifacts"]["model"]["sha256"]:
+                    raise ArtifactMismatchError(
+                        f"Bundle {ARTIFACT_BUNDLE_DIR} was exported from another model than the manifest's"
+                    )
+            else:
+                verify_file(self.manifest, "model", MODEL_PATH)
+                verify_file(self.manifest, "feature_names", FEATURE_NAMES_PATH)
+            verify_file(self.manifest, "explainer", EXPLAINER_PATH)
+            if Path(THRESHOLD_PATH).exists():
+                verify_file(self.manifest, "threshold", THRESHOLD_PATH)
+            verify_loaded(self.manifest, self.feature_names, self.threshold)
+            self.artifact_id = self.manifest["artifact_id"]
+        logger.info(
+            f"Artifact id: {self.artifact_id} "
+            f"({'verified against the manifest' if self.manifest else 'computed, no manifest'})"
+        )
+    
+    def cache_key(self, kind: str, features: Dict[str, float], *parts) -> str:
+        """
+        Key for caching a result computed by this predictor
+        
+        Includes the artifact identity, so that entries computed with
+        other artifacts (before a reload, on another replica) never match.
+        
+        Parameters
+        ----------
+        kind : str
+            Result type, e.g. 'prediction' or 'explanation'
+        features : Dict[str, float]
+            Client features
+        *parts
+            Other inputs of the result (threshold, top_n...)
+        
+        Returns
+        -------
+        str
+            Hex digest
+        """
+        payload = json.dumps(
+            [self.artifact_id, kind, sorted(features.items()), list(parts)],
+            separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    @property
+    def explainer(self):
+        """SHAP explainer if currently resident, else None"""
+        return self._explainer.value
+    
+    def _read_explainer(self):
+        """Unpickle the SHAP explainer (called by the optional artifact)"""
+        try:
+            if self.manifest is not None:
+                # The file may have changed since startup; never load a mismatched explainer
+                verify_file(self.manifest, "explainer", EXPLAINER_PATH)
+            logger.info(f"Loading explainer from {EXPLAINER_PATH}")
+            with REPORT.measure("explainer pickle", ARTIFACT), open(EXPLAINER_PATH, 'rb') as f:
+                explainer = pickle.load(f)
+            logger.info("Explainer loaded successfully")
+            return explainer
+        except Exception as e:
+            logger.error(f"Error loading explainer: {str(e)}")
+            raise
+    
     def _load_explainer(self):
         """Load SHAP explainer on demand (lazy loading)"""
-        if self.explainer is None:
-            try:
-                logger.info(f"Loading explainer from {EXPLAINER_PATH}")
-                with open(EXPLAINER_PATH, 'rb') as f:
-                    self.explainer = pickle.load(f)
-                logger.info("Explainer loaded successfully")
-            except Exception as e:
-                logger.error(f"Error loading explainer: {str(e)}")
-                raise
+        # shap is only imported once an explanation is requested
+        REPORT.timed_import("shap")
+        self._explainer.load()
     
-    def _prepare_features(self, features_dict: Dict[str, float]) -> np.ndarray:
+    def _prepare_features(self, features_dict: Dict[str, float], reuse: bool = False) -> np.ndarray:
         """
         Prepare features in the correct order for the model
         
@@ -86,23 +334,155 @@ class CreditScorePredictor:
         ----------
         features_dict : Dict[str, float]
             Dictionary of feature names and values
+        reuse : bool
+            Fill the calling thread's scratch matrix instead of a new one
+            (see `_prepare_batch`)
             
         Returns
         -------
         np.ndarray
-            Features array in correct order
+            Features array of shape (1, n_features) in correct order,
+            NaN for missing features (handled by the model)
         """
-        # Create array with correct order
-        features_array = np.zeros(len(self.feature_names))
+        return self._prepare_batch([features_dict], reuse=reuse)
+    
+    def _scratch_matrix(self, n_rows: int) -> np.ndarray:
+        """NaN-filled matrix backed by the calling thread's reusable buffer"""
+        buffer = getattr(self._scratch, "matrix", None)
+        if buffer is None or buffer.shape[0] < n_rows:
+            rows = n_rows if buffer is None else min(max(n_rows, 2 * buffer.shape[0]), SCRATCH_MAX_ROWS)
+            buffer = np.empty((rows, len(self.feature_names)), dtype=self.feature_dtype)
+            self._scratch.matrix = buffer
+        X = buffer[:n_rows]
+        X.fill(np.nan)
+        return X
+    
+    def _prepare_batch(self, features_list: List[Dict[str, float]], reuse: bool = False) -> np.ndarray:
+        """
+        Prepare a feature matrix for several clients at once
         
-        for i, feature_name in enumerate(self.feature_names):
-            if feature_name in features_dict:
-                features_array[i] = features_dict[feature_name]
-            else:
-                # Missing feature - will be handled by model's imputer
-                features_array[i] = np.nan
+        Parameters
+        ----------
+        features_list : List[Dict[str, float]]
+            One dictionary of feature names and values per client
+        reuse : bool
+            For up to SCRATCH_MAX_ROWS clients, fill the calling thread's
+            scratch matrix instead of allocating one. The result is then
+            only valid until the thread's next reusing call: score it
+            right away and do not keep it.
+            
+        Returns
+        -------
+        np.ndarray
+            Features matrix of shape (n_clients, n_features), NaN for missing
+        """
+        if reuse and len(features_list) <= SCRATCH_MAX_ROWS:
+            X = self._scratch_matrix(len(features_list))
+        else:
+            X = np.full((len(features_list), len(self.feature_names)), np.nan, dtype=self.feature_dtype)
+        index = self.feature_index
+        
+        for row, features_dict in enumerate(features_list):
+            for feature_name, value in features_dict.items():
+                col = index.get(feature_name)
+                if col is not None:
+                    X[row, col] = value
+        
+        return X
+    
+    @property
+    def feature_index(self) -> Dict[str, int]:
+        """Mapping from feature name to column position (built once)"""
+        if self._feature_index is None:
+            self._feature_index = {
+                name: i for i, name in enumerate(self.feature_names)
+            }
+        return self._feature_index
+    
+    def _monitor(self, X: np.ndarray, proba_default: np.ndarray) -> None:
+        """Count scored rows into the drift, input quality and score monitors"""
+        if not self.monitored or _unmonitored.get():
+            return
+        drift.observe(X, self.feature_names)
+        if self.input_bounds is not None:
+            self.input_bounds.record(X)
+        if len(proba_default) == 1:
+            SCORE_MONITOR.record(float(proba_default[0]), self.threshold)
+        else:
+            SCORE_MONITOR.record_batch(proba_default, self.threshold)
+    
+    def predict_proba_matrix(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict probability of default for an already prepared matrix
+        
+        Parameters
+        ----------
+        X : np.ndarray
+            Features matrix in model column order
+            
+        Returns
+        -------
+        np.ndarray
+            Probability of default for each row
+        """
+        if X.shape[0] == 0:
+            return np.empty(0)
+        # Both the pipeline and the native bundle score float32 without upcasting
+        X = np.asarray(X, dtype=self.feature_dtype)
+        proba_default = self.model.predict_proba(X)[:, 1]
+        self._monitor(X, proba_default)
+        return proba_default
+    
+    def predict_proba_batch(self, features_list: List[Dict[str, float]]) -> np.ndarray:
+        """
+        Predict probability of default for several clients
+        
+        Small batches are prepared in the calling thread's scratch matrix.
         
-        return features_array.reshape(1, -1)
+        Parameters
+        ----------
+        features_list : List[Dict[str, float]]
+            One dictionary of feature names and values per client
+            
+        Returns
+        -------
+        np.ndarray
+            Probability of default for each client
+        """
+        start = time.perf_counter()
+        X = self._prepare_batch(features_list, reuse=True)
+        prepared = time.perf_counter()
+        proba_default = self.predict_proba_matrix(X)
+        record_stage(PREPARE, prepared - start)
+        record_stage(INFER, time.perf_counter() - prepared)
+        return proba_default
+    
+    def apply_threshold(
+        self,
+        proba_default: np.ndarray,
+        threshold: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Turn default probabilities into predictions and business decisions
+        
+        Same rule as `predict`, vectorized over rows.
+        
+        Parameters
+        ----------
+        proba_default : np.ndarray
+            Probability of default for each row
+        threshold : Optional[float]
+            Custom threshold (uses optimal if None)
+            
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            (predictions, decisions) arrays
+        """
+        thresh = threshold if threshold is not None else self.threshold
+        predictions = (np.asarray(proba_default) > thresh).astype(int)
+        decisions = np.where(predictions == 1, "REJECTED", "APPROVED")
+        return predictions, decisions
     
     def predict_proba(self, features: Dict[str, float]) -> Tuple[float, float]:
         """
@@ -119,13 +499,59 @@ class CreditScorePredictor:
             (probability_no_default, probability_default)
         """
         try:
-            X = self._prepare_features(features)
+            start = time.perf_counter()
+            X = self._prepare_features(features, reuse=True)
+            prepared = time.perf_counter()
             probas = self.model.predict_proba(X)[0]
+            self._monitor(X, probas[1:])
+            record_stage(PREPARE, prepared - start)
+            record_stage(INFER, time.perf_counter() - prepared)
             return float(probas[0]), float(probas[1])
         except Exception as e:
             logger.error(f"Error in predict_proba: {str(e)}")
             raise
     
+    def score(
+        self,
+        features: Dict[str, float],
+        threshold: Optional[float] = None
+    ) -> Tuple[float, float, int, str]:
+        """
+        Predict probabilities and credit decision with a single model call
+        
+        Parameters
+        ----------
+        features : Dict[str, float]
+            Client features
+        threshold : Optional[float]
+            Custom threshold (uses optimal if None)
+            
+        Returns
+        -------
+        Tuple[float, float, int, str]
+            (probability_no_default, probability_default, prediction, decision)
+        """
+        proba_no_default, proba_default = self.predict_proba(features)
+        prediction, decision = self._decide(proba_default, threshold)
+        return proba_no_default, proba_default, prediction, decision
+    
+    def _decide(
+        self,
+        proba_default: float,
+        threshold: Optional[float] = None
+    ) -> Tuple[int, str]:
+        """Apply the decision threshold to a probability of default"""
+        # Use custom threshold or optimal threshold
+        thresh = threshold if threshold is not None else self.threshold
+        
+        # Predict based on threshold
+        prediction = 1 if proba_default > thresh else 0
+        
+        # Business decision (inverted: default=1 means REJECTED)
+        decision = "REJECTED" if prediction == 1 else "APPROVED"
+        
+        return prediction, decision
+    
     def predict(
         self,
         features: Dict[str, float],
@@ -150,17 +576,7 @@ class CreditScorePredictor:
         """
         try:
             _, proba_default = self.predict_proba(features)
-            
-            # Use custom threshold or optimal threshold
-            thresh = threshold if threshold is not None else self.threshold
-            
-            # Predict based on threshold
-            prediction = 1 if proba_default > thresh else 0
-            
-            # Business decision (inverted: default=1 means REJECTED)
-            decision = "REJECTED" if prediction == 1 else "APPROVED"
-            
-            return prediction, decision
+            return self._decide(proba_default, threshold)
         except Exception as e:
             logger.error(f"Error in predict: {str(e)}")
             raise
@@ -186,13 +602,17 @@ class CreditScorePredictor:
             Dictionary with SHAP values and top features
         """
         try:
-            # Load explainer on demand if not already loaded
-            self._load_explainer()
-            
+            start = time.perf_counter()
             X = self._prepare_features(features)
+            prepared = time.perf_counter()
+            record_stage(PREPARE, prepared - start)
             
-            # Get SHAP values
-            shap_values = self.explainer(X)
+            # Load explainer on demand; it cannot be released while in use
+            REPORT.timed_import("shap")
+            with self._explainer.use() as explainer:
+                # Get SHAP values
+                shap_values = explainer(X)
+            record_stage(EXPLAIN, time.perf_counter() - prepared)
             
             # Extract values
             shap_vals = shap_values.values[0]
@@ -240,25 +660,150 @@ class CreditScorePredictor:
         """Check if model is loaded"""
         return self.model is not None
     
+    @property
+    def memory_bytes(self) -> int:
+        """
+        Approximate size of the loaded model (explainer excluded)
+        
+        Exact array sizes for a native bundle; the serialized size for a
+        pickled pipeline.
+        """
+        if self._memory_bytes is None:
+            if self.artifact_source == "bundle":
+                self._memory_bytes = self.model.nbytes
+            else:
+                self._memory_bytes = len(pickle.dumps(self.model, protocol=pickle.HIGHEST_PROTOCOL))
+        return self._memory_bytes
+    
+    def smoke_test(self):
+        """
+        Validate freshly loaded artifacts with synthetic predictions
+        
+        Scores an all-missing client and an all-zero client, and explains
+        one of them if the explainer is loaded.
+        
+        Raises
+        ------
+        ValueError
+            If a prediction is not a probability or the threshold is invalid
+        """
+        X = self._prepare_batch([{}, {name: 0.0 for name in self.feature_names}])
+        proba_default = self.predict_proba_matrix(X)
+        if proba_default.shape != (2,) or not np.all((proba_default >= 0) & (proba_default <= 1)):
+            raise ValueError(f"Smoke prediction returned invalid probabilities: {proba_default}")
+        if not 0 < self.threshold < 1:
+            raise ValueError(f"Invalid decision threshold: {self.threshold}")
+        if self.explainer is not None:
+            self.get_feature_importance({}, top_n=1)
+    
     def get_threshold(self) -> float:
         """Get current threshold"""
         return self.threshold
+    
+    def close(self):
+        """Release the explainer of a predictor no longer serving (once its explanations finish)"""
+        self._explainer.close()
 
 
-# Global predictor instance
+class ReloadInProgressError(Exception):
+    """Raised when a reload is requested while another one is running"""
+
+
+_reloads = REGISTRY.counter(
+    "model_reloads_total",
+    "Predictor reloads, by result",
+    ("result",)
+)
+
+# Global predictor instance, replaced atomically by reload_predictor()
 _predictor: Optional[CreditScorePredictor] = None
+_predictor_lock = threading.Lock()
+_reload_lock = threading.Lock()
 
 
 def get_predictor() -> CreditScorePredictor:
     """
     Get or create the global predictor instance
     
+    Callers should keep the returned instance for the whole request, so
+    that a concurrent reload never mixes two models in one response.
+    
     Returns
     -------
     CreditScorePredictor
         The predictor instance
     """
     global _predictor
-    if _predictor is None:
-        _predictor = CreditScorePredictor()
-    return _predictor
\ No newline at end of file
+    predictor = _predictor
+    if predictor is None:
+        with _predictor_lock:
+            if _predictor is None:
+                _predictor = CreditScorePredictor()
+                _predictor.monitored = True
+                drift.check_feature_order(_predictor.feature_names)
+            predictor = _predictor
+    return predictor
+
+
+def reload_predictor(wait: bool = True) -> CreditScorePredictor:
+    """
+    Load the artifacts again and swap in the new predictor
+    
+    The new instance is built, smoke-tested and warmed up while the
+    current one keeps serving; requests already holding the old instance
+    finish on it. If the current predictor has its explainer loaded, the
+    new one loads its explainer too before the swap, so explanations stay
+    warm.
+    
+    Parameters
+    ----------
+    wait : bool
+        Wait for a reload already in progress instead of failing
+        
+    Returns
+    -------
+    CreditScorePredictor
+        The new predictor
+        
+    Raises
+    ------
+    ReloadInProgressError
+        If `wait` is False and another reload is running
+    Exception
+        If the new artifacts fail to load or validate (the current
+        predictor is kept)
+    """
+    global _predictor
+    if not _reload_lock.acquire(blocking=wait):
+        raise ReloadInProgressError("A reload is already in progress")
+    try:
+        start = time.perf_counter()
+        current = _predictor
+        try:
+            candidate = CreditScorePredictor()
+            if current is not None and current.explainer is not None:
+                candidate._load_explainer()
+            candidate.smoke_test()
+            # Imported here: the warm-up module depends on this one
+            from api.warmup import WarmUp
+            WarmUp(explain=candidate.explainer is not None).warm(candidate)
+            candidate.monitored = True
+            drift.check_feature_order(candidate.feature_names)
+        except Exception as e:
+            _reloads.inc("failure")
+            logger.error(f"Reload failed, keeping the current predictor: {str(e)}")
+            raise
+        
+        with _predictor_lock:
+            _predictor = candidate
+        if current is not None:
+            # Its explainer would otherwise stay resident until idle, next to the new one
+            current.close()
+        _reloads.inc("success")
+        logger.info(
+            f"Predictor reloaded in {time.perf_counter() - start:.3f}s "
+            f"(source: {candidate.artifact_source}, threshold: {candidate.threshold})"
+        )
+        return candidate
+    finally:
+        _reload_lock.release()
@@ -0,0 +1,316 @@
+"""
+On-demand request profiling
+CPU (cProfile) and memory (tracemalloc) profiles of single live requests
+
+An admin sends a request with the X-Profile header ('cpu', 'memory' or
+'all') and a valid admin token; the request is served as usual and its
+profile is stored in memory, its id returned in the X-Profile-Id header.
+
+The profiler covers the event loop thread, where the request is parsed,
+validated and serialized, and every scheduler task submitted on behalf of
+the request, where features are prepared and the model and SHAP run. Other
+requests handled by the event loop meanwhile are profiled too, so this is
+best used on a quiet instance. One request is profiled at a time.
+
+The middleware is only installed when PROFILING_ENABLED is set; otherwise
+nothing is added to the request path.
+"""
+
+import cProfile
+import logging
+import marshal
+import pstats
+import secrets
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from api.config import (
+    ADMIN_TOKEN_HEADER,
+    PROFILE_HEADER,
+    PROFILE_ID_HEADER,
+    PROFILE_BUFFER_SIZE,
+    PROFILE_TOP_FUNCTIONS
+)
+
+logger = logging.getLogger(__name__)
+
+# Profile modes
+CPU = "cpu"
+MEMORY = "memory"
+_MODES = {CPU: (CPU,), MEMORY: (MEMORY,), "all": (CPU, MEMORY)}
+
+_current: ContextVar[Optional["ProfileSession"]] = ContextVar("profile_session", default=None)
+
+# tracemalloc and the event loop thread profiler are process-wide
+_session_lock = threading.Lock()
+
+# Allocations made by the profiling machinery itself
+_MEMORY_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")
+)
+
+
+class ProfileSession:
+    """
+    Profile of one request being served
+
+    Parameters
+    ----------
+    modes : tuple
+        CPU and/or MEMORY
+    method, path : str
+        Request being profiled
+    """
+
+    def __init__(self, modes: tuple, method: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.modes = modes
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._started_tracing = False
+
+    @property
+    def cpu(self) -> bool:
+        """Whether CPU time is profiled"""
+        return CPU in self.modes
+
+    def start(self) -> cProfile.Profile:
+        """Start memory tracing and the event loop thread profiler"""
+        if MEMORY in self.modes:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            self._baseline = tracemalloc.take_snapshot().filter_traces(_MEMORY_FILTERS)
+        profile = cProfile.Profile()
+        if self.cpu:
+            self._profiles.append(profile)
+            profile.enable()
+        return profile
+
+    def run(self, fn: Callable, *args, **kwargs):
+        """Call `fn` on the current thread under its own profiler"""
+        if not self.cpu:
+            return fn(*args, **kwargs)
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        profile.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+
+    def finish(self, profile: cProfile.Profile, status_code: int) -> Dict:
+        """
+        Stop profiling and build the report
+
+        Parameters
+        ----------
+        profile : cProfile.Profile
+            Event loop thread profiler returned by `start`
+        status_code : int
+            Response status
+
+        Returns
+        -------
+        dict
+            Report, see `ProfileReport`
+        """
+        profile.disable()
+        duration = time.perf_counter() - self.started
+        report = {
+            "id": self.id,
+            "timestamp": time.time(),
+            "method": self.method,
+            "path": self.path,
+            "status_code": status_code,
+            "modes": list(self.modes),
+            "duration_seconds": duration,
+            "functions": [],
+            "allocations": [],
+            "peak_memory_bytes": None
+        }
+        stats = None
+        if self.cpu:
+            with self._lock:
+                profiles = list(self._profiles)
+            stats = pstats.Stats(profiles[0])
+            for other in profiles[1:]:
+                stats.add(other)
+            report["functions"] = _top_functions(stats, PROFILE_TOP_FUNCTIONS)
+        if MEMORY in self.modes:
+            snapshot = tracemalloc.take_snapshot().filter_traces(_MEMORY_FILTERS)
+            report["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+            if self._started_tracing:
+                tracemalloc.stop()
+            report["allocations"] = _top_allocations(snapshot, self._baseline, PROFILE_TOP_FUNCTIONS)
+        report["_stats"] = stats
+        return report
+
+
+def _top_functions(stats: pstats.Stats, limit: int) -> List[Dict]:
+    """Functions with the highest cumulative time"""
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            "function": name,
+            "file": filename,
+            "line": line,
+            "calls": total_calls,
+            "primitive_calls": primitive_calls,
+            "own_seconds": own,
+            "cumulative_seconds": cumulative
+        }
+        for (filename, line, name), (primitive_calls, total_calls, own, cumulative, _) in rows[:limit]
+    ]
+
+
+def _top_allocations(snapshot, baseline, limit: int) -> List[Dict]:
+    """Source lines holding the most memory allocated during the request"""
+    stats = [stat for stat in snapshot.compare_to(baseline, "lineno") if stat.size_diff > 0]
+    return [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_bytes": stat.size_diff,
+            "count": stat.count_diff
+        }
+        for stat in stats[:limit]
+    ]
+
+
+def current_profile() -> Optional[ProfileSession]:
+    """Profile of the request being served (None unless it is profiled)"""
+    return _current.get()
+
+
+class ProfileStore:
+    """
+    Most recent request profiles, kept in memory
+
+    Parameters
+    ----------
+    capacity : int
+        Profiles kept; the oldest is dropped beyond
+    """
+
+    def __init__(self, capacity: int = PROFILE_BUFFER_SIZE):
+        self._profiles: deque = deque(maxlen=max(capacity, 1))
+        self._lock = threading.Lock()
+
+    def add(self, report: Dict) -> None:
+        """Keep a report"""
+        with self._lock:
+            self._profiles.append(report)
+
+    def get(self, profile_id: str) -> Optional[Dict]:
+        """Report of a profile (None if unknown or dropped)"""
+        with self._lock:
+            for report in self._profiles:
+                if report["id"] == profile_id:
+                    return report
+        return None
+
+    def list(self) -> List[Dict]:
+        """Reports, most recent first"""
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def pstats_dump(self, profile_id: str) -> Optional[bytes]:
+        """CPU profile in the pstats file format (None if unknown or not a CPU profile)"""
+        report = self.get(profile_id)
+        if report is None or report["_stats"] is None:
+            return None
+        return marshal.dumps(report["_stats"].stats)
+
+
+# Profiles of the serving process
+PROFILES = ProfileStore()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests that ask for it
+
+    Parameters
+    ----------
+    app
+        Wrapped ASGI application
+    admin_token : str
+        Token required alongside the profile header
+    store : ProfileStore, optional
+        Where reports are kept (defaults to PROFILES)
+    """
+
+    def __init__(self, app, admin_token: str, store: Optional[ProfileStore] = None):
+        self.app = app
+        self.admin_token = admin_token
+        self.store = PROFILES if store is None else store
+        self._profile_header = PROFILE_HEADER.lower().encode("latin-1")
+        self._admin_header = ADMIN_TOKEN_HEADER.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        mode = headers.get(self._profile_header)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        modes = _MODES.get(mode.decode("latin-1").strip().lower())
+        token = headers.get(self._admin_header, b"").decode("latin-1")
+        if modes is None or not secrets.compare_digest(token, self.admin_token):
+            logger.warning(f"Ignoring profile request on {scope['path']}: invalid mode or admin token")
+            await self.app(scope, receive, send)
+            return
+        if not _session_lock.acquire(blocking=False):
+            logger.warning(f"Ignoring profile request on {scope['path']}: another request is being profiled")
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession(modes, scope["method"], scope["path"])
+        context_token = _current.set(session)
+        profile = session.start()
+        finished = False
+
+        def finish(status_code: int) -> None:
+            nonlocal finished
+            finished = True
+            try:
+                report = session.finish(profile, status_code)
+            finally:
+                _session_lock.release()
+            self.store.add(report)
+            logger.info(
+                f"Profiled {session.method} {session.path} ({','.join(modes)}) "
+                f"in {report['duration_seconds']:.3f}s: {session.id}"
+            )
+
+        async def send_profiled(message):
+            if message["type"] == "http.response.start" and not finished:
+                finish(message["status"])
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER.lower().encode("latin-1"), session.id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_profiled)
+        except Exception:
+            if not finished:
+                finish(500)
+            raise
+        finally:
+            _current.reset(context_token)
@@ -0,0 +1,265 @@
+"""
+Model registry
+Champion/challenger serving: challengers score a sample of live traffic in
+the background, off the request path, into an append-only store
+"""
+
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from api.config import (
+    CHALLENGER_BUNDLES,
+    SHADOW_SAMPLE_RATE,
+    SHADOW_BATCH_SIZE,
+    SHADOW_FLUSH_INTERVAL,
+    SHADOW_MAX_QUEUE,
+    SHADOW_STORE_DIR
+)
+from api.metrics import REGISTRY
+from api.predictor import CreditScorePredictor, get_predictor
+from api.scheduler import SHADOW, get_scheduler
+
+logger = logging.getLogger(__name__)
+
+CHAMPION = "champion"
+
+_shadow_scored = REGISTRY.counter(
+    "shadow_scored_total",
+    "Clients scored by each challenger model",
+    ("model",)
+)
+_shadow_dropped = REGISTRY.counter(
+    "shadow_dropped_total",
+    "Sampled clients dropped because the shadow queue was full"
+)
+
+
+class ShadowStore:
+    """
+    Append-only JSON Lines store of champion/challenger comparisons
+
+    One file per UTC day; records are only ever appended.
+    """
+
+    def __init__(self, directory: str = SHADOW_STORE_DIR):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def path_for(self, timestamp: float) -> Path:
+        """File holding the records of a given time"""
+        day = datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y%m%d")
+        return self.directory / f"shadow-{day}.jsonl"
+
+    def append(self, records: List[Dict]) -> None:
+        """Append records (each with a 'timestamp') to their day files"""
+        by_path: Dict[Path, List[str]] = {}
+        for record in records:
+            by_path.setdefault(self.path_for(record["timestamp"]), []).append(json.dumps(record))
+        with self._lock:
+            for path, lines in by_path.items():
+                with open(path, "a") as f:
+                    f.write("\n".join(lines) + "\n")
+
+
+class ModelRegistry:
+    """
+    Champion and challenger models
+
+    The champion is the predictor serving responses (`get_predictor()`,
+    hot-reloadable). Challengers are native bundles that only ever score
+    in the background, on a sampled share of traffic, through the
+    scheduler's SHADOW class: interactive scoring always runs first.
+    """
+
+    def __init__(
+        self,
+        challenger_bundles: Optional[Dict[str, str]] = None,
+        sample_rate: float = SHADOW_SAMPLE_RATE,
+        batch_size: int = SHADOW_BATCH_SIZE,
+        flush_interval: float = SHADOW_FLUSH_INTERVAL,
+        max_queue: int = SHADOW_MAX_QUEUE,
+        store: Optional[ShadowStore] = None
+    ):
+        bundles = CHALLENGER_BUNDLES if challenger_bundles is None else challenger_bundles
+        self.challengers: Dict[str, CreditScorePredictor] = {}
+        for name, bundle_dir in bundles.items():
+            logger.info(f"Loading challenger '{name}' from {bundle_dir}")
+            self.challengers[name] = CreditScorePredictor(bundle_dir=bundle_dir)
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.store = store
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if self.challengers:
+            if self.store is None:
+                self.store = ShadowStore()
+            self._thread = threading.Thread(target=self._run, name="shadow-scoring", daemon=True)
+            self._thread.start()
+
+    def sample(self) -> bool:
+        """Whether a scored client should also be shadow-scored"""
+        return bool(self.challengers) and random.random() < self.sample_rate
+
+    def submit(self, records: List[Dict]) -> None:
+        """
+        Queue champion results for shadow scoring (never blocks)
+
+        Parameters
+        ----------
+        records : List[Dict]
+            One per client, with 'client_id', 'features',
+            'probability_default', 'decision' and 'threshold'
+        """
+        for record in records:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                _shadow_dropped.inc()
+
+    def _next_batch(self) -> List[Dict]:
+        """Wait for up to `batch_size` records, at most `flush_interval` seconds"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _score_batch(self, batch: List[Dict]) -> List[Dict]:
+        """Score a batch with every challenger (runs on an inference thread)"""
+        now = time.time()
+        features_list = [record["features"] for record in batch]
+        results = [
+            {
+                "timestamp": now,
+                "client_id": record["client_id"],
+                CHAMPION: {
+                    "probability_default": record["probability_default"],
+                    "decision": record["decision"],
+                    "threshold": record["threshold"]
+                }
+            }
+            for record in batch
+        ]
+        for name, challenger in self.challengers.items():
+            proba_default = challenger.predict_proba_batch(features_list)
+            _, decisions = challenger.apply_threshold(proba_default)
+            for result, proba, decision in zip(results, proba_default, decisions):
+                result[name] = {
+                    "probability_default": float(proba),
+                    "decision": str(decision),
+                    "threshold": challenger.get_threshold()
+                }
+            _shadow_scored.inc(name, amount=len(batch))
+        return results
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                results = get_scheduler().submit(SHADOW, self._score_batch, batch).result()
+                self.store.append(results)
+            except Exception as e:
+                logger.error(f"Shadow scoring failed for {len(batch)} clients: {str(e)}")
+
+    def stats(self) -> Dict:
+        """
+        Loaded models and shadow scoring state
+
+        Returns
+        -------
+        Dict
+            Per-model memory, source and threshold, and queue depth
+        """
+        champion = get_predictor()
+        models = [{
+            "name": CHAMPION,
+            "role": CHAMPION,
+            "artifact_source": champion.artifact_source,
+            "threshold": champion.get_threshold(),
+            "memory_bytes": champion.memory_bytes
+        }]
+        models += [
+            {
+                "name": name,
+                "role": "challenger",
+                "artifact_source": challenger.bundle_dir,
+                "threshold": challenger.get_threshold(),
+                "memory_bytes": challenger.memory_bytes
+            }
+            for name, challenger in self.challengers.items()
+        ]
+        return {
+            "models": models,
+            "sample_rate": self.sample_rate if self.challengers else 0.0,
+            "shadow_queue_depth": self._queue.qsize()
+        }
+
+    def shutdown(self) -> None:
+        """Stop shadow scoring (records still queued are dropped)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+
+
+# Global registry instance
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Get or create the global model registry
+
+    Returns
+    -------
+    ModelRegistry
+        The registry instance
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
+
+
+def shutdown_model_registry() -> None:
+    """Stop the global registry's shadow scoring if it was started"""
+    global _registry
+    with _registry_lock:
+        if _registry is not None:
+            _registry.shutdown()
+            _registry = None
+
+
+def _model_memory() -> Dict:
+    registry = _registry
+    if registry is None:
+        return {}
+    return {(model["name"],): model["memory_bytes"] for model in registry.stats()["models"]}
+
+
+REGISTRY.gauge(
+    "model_memory_bytes",
+    "Approximate memory of each loaded model (explainer excluded)",
+    ("model",),
+    function=_model_memory
+)
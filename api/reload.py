@@ -0,0 +1,104 @@
+"""
+Artifact watcher
+Reloads the predictor when the model, explainer, feature names, threshold or manifest files change
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from api.artifacts import MANIFEST_FILE
+from api.config import (
+    MODEL_PATH,
+    EXPLAINER_PATH,
+    FEATURE_NAMES_PATH,
+    THRESHOLD_PATH,
+    ARTIFACT_MANIFEST_PATH,
+    ARTIFACT_BUNDLE_DIR,
+    ARTIFACT_WATCH_INTERVAL
+)
+from api.predictor import reload_predictor
+
+logger = logging.getLogger(__name__)
+
+
+def artifact_paths() -> List[Path]:
+    """Files whose change triggers a reload"""
+    return [
+        Path(MODEL_PATH),
+        Path(EXPLAINER_PATH),
+        Path(FEATURE_NAMES_PATH),
+        Path(THRESHOLD_PATH),
+        Path(ARTIFACT_MANIFEST_PATH),
+        Path(ARTIFACT_BUNDLE_DIR) / MANIFEST_FILE
+    ]
+
+
+def _signature(paths: List[Path]) -> Tuple:
+    """Modification time and size of each file (None if missing)"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class ArtifactWatcher:
+    """
+    Background thread polling artifact files for changes
+
+    A change is acted upon once the files look the same on two
+    consecutive polls, so that a reload does not start in the middle of
+    a copy.
+    """
+
+    def __init__(
+        self,
+        paths: Optional[List[Path]] = None,
+        interval: float = ARTIFACT_WATCH_INTERVAL,
+        reload: Callable = reload_predictor
+    ):
+        self.paths = artifact_paths() if paths is None else list(paths)
+        self.interval = interval
+        self.reload = reload
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start polling"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="artifact-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {len(self.paths)} artifact files every {self.interval}s")
+
+    def stop(self) -> None:
+        """Stop polling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        loaded = _signature(self.paths)
+        pending = None
+        while not self._stop.wait(self.interval):
+            current = _signature(self.paths)
+            if current == loaded:
+                pending = None
+                continue
+            if current != pending:
+                # Changed since the last poll: wait for writes to settle
+                pending = current
+                continue
+            logger.info("Artifact files changed, reloading predictor")
+            loaded, pending = current, None
+            try:
+                self.reload()
+            except Exception:
+                # Already logged; the current predictor keeps serving
+                pass
@@ -0,0 +1,266 @@
+"""
+Inference scheduler
+Priority queues feeding a shared pool of inference threads
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from api.config import (
+    SCHEDULER_WORKERS,
+    SCHEDULER_CHUNK_SIZE,
+    SCHEDULER_WEIGHTS,
+    SCHEDULER_MAX_RUNNING
+)
+from api.profiling import current_profile
+from api.timing import QUEUE, record_stage
+
+logger = logging.getLogger(__name__)
+
+# Priority classes, matching the admission endpoint classes
+INTERACTIVE = "scoring"
+BULK = "batch"
+EXPLAIN = "explain"
+SHADOW = "shadow"  # challenger scoring, no endpoint of its own
+
+# Classes sharing the capacity left over by interactive scoring
+_WEIGHTED = (BULK, EXPLAIN, SHADOW)
+
+
+class _Task:
+    """Unit of work waiting in a priority queue"""
+
+    __slots__ = ("fn", "args", "kwargs", "future", "priority_class", "enqueued_at", "token", "context")
+
+    def __init__(self, priority_class: str, fn: Callable, args, kwargs, token=None):
+        self.priority_class = priority_class
+        self.token = token
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+        # Runs in the submitter's context, e.g. to time the request it serves
+        self.context = contextvars.copy_context()
+
+
+class PriorityScheduler:
+    """
+    Shared inference executor with one queue per priority class
+
+    Interactive scoring is always dequeued first. The remaining capacity
+    is shared between bulk, explanation and shadow work in proportion to
+    their weights (stride scheduling). Each class can also be capped to a
+    number of simultaneously running tasks.
+
+    Bulk work is submitted as one task per chunk, so an interactive
+    request never waits for more than the chunk already running on a
+    worker thread.
+    """
+
+    def __init__(
+        self,
+        workers: int = SCHEDULER_WORKERS,
+        weights: Optional[Dict[str, int]] = None,
+        max_running: Optional[Dict[str, int]] = None
+    ):
+        weights = dict(SCHEDULER_WEIGHTS if weights is None else weights)
+        self._queues: Dict[str, deque] = {
+            cls: deque() for cls in (INTERACTIVE,) + _WEIGHTED
+        }
+        self._strides = {cls: 1.0 / max(weights.get(cls, 1), 1) for cls in self._queues}
+        self._passes = {cls: 0.0 for cls in self._queues}
+        self._max_running = dict(SCHEDULER_MAX_RUNNING if max_running is None else max_running)
+        self._running = {cls: 0 for cls in self._queues}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"inference-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, priority_class: str, fn: Callable, *args, token=None, **kwargs) -> Future:
+        """
+        Queue a call in a priority class
+
+        Parameters
+        ----------
+        priority_class : str
+            One of INTERACTIVE, BULK, EXPLAIN or SHADOW
+        fn : Callable
+            Blocking function to run on an inference thread
+        token : Optional[CancellationToken]
+            If given, the task is dropped without running once the token
+            is cancelled or past its deadline
+
+        Returns
+        -------
+        Future
+            Resolved with the function's result or exception
+        """
+        task = _Task(priority_class, fn, args, kwargs, token)
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("Scheduler is shut down")
+            queue = self._queues[priority_class]
+            if not queue and priority_class != INTERACTIVE:
+                # A class returning from idle must not replay its missed turns
+                active = [
+                    self._passes[cls] for cls, q in self._queues.items()
+                    if q and cls != INTERACTIVE
+                ]
+                self._passes[priority_class] = max(
+                    self._passes[priority_class], min(active, default=0.0)
+                )
+            queue.append(task)
+            self._cond.notify()
+        return task.future
+
+    def submit_chunks(
+        self,
+        priority_class: str,
+        fn: Callable,
+        items,
+        chunk_size: int = SCHEDULER_CHUNK_SIZE,
+        token=None
+    ) -> List[Future]:
+        """
+        Queue one task per chunk of a sliceable sequence (list or array)
+
+        Parameters
+        ----------
+        priority_class : str
+            One of INTERACTIVE, BULK or EXPLAIN
+        fn : Callable
+            Blocking function called with each chunk
+        items : sequence
+            Work items, split into consecutive slices
+        chunk_size : int
+            Maximum number of items per task
+        token : Optional[CancellationToken]
+            Cancellation token shared by all chunks: once cancelled, the
+            chunks still queued are dropped
+
+        Returns
+        -------
+        List[Future]
+            One future per chunk, in order
+        """
+        return [
+            self.submit(priority_class, fn, items[start:start + chunk_size], token=token)
+            for start in range(0, len(items), chunk_size)
+        ]
+
+    def capacity(self, priority_class: str) -> int:
+        """Tasks of a class that can run at the same time"""
+        cap = self._max_running.get(priority_class)
+        return len(self._threads) if cap is None else min(cap, len(self._threads))
+
+    def _eligible(self, priority_class: str) -> bool:
+        cap = self._max_running.get(priority_class)
+        return bool(self._queues[priority_class]) and (
+            cap is None or self._running[priority_class] < cap
+        )
+
+    def _next_task(self) -> Optional[_Task]:
+        """Pick the next task to run (caller holds the lock)"""
+        if self._eligible(INTERACTIVE):
+            return self._queues[INTERACTIVE].popleft()
+        candidates = [cls for cls in _WEIGHTED if self._eligible(cls)]
+        if not candidates:
+            return None
+        chosen = min(candidates, key=lambda cls: self._passes[cls])
+        self._passes[chosen] += self._strides[chosen]
+        return self._queues[chosen].popleft()
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                task = self._next_task()
+                while task is None:
+                    if self._stopped:
+                        return
+                    self._cond.wait()
+                    task = self._next_task()
+                self._running[task.priority_class] += 1
+
+            try:
+                if task.future.set_running_or_notify_cancel():
+                    task.context.run(self._run_task, task)
+            finally:
+                with self._cond:
+                    self._running[task.priority_class] -= 1
+                    # A freed per-class slot may unblock a waiting task
+                    self._cond.notify_all()
+
+    @staticmethod
+    def _run_task(task: _Task) -> None:
+        record_stage(QUEUE, time.perf_counter() - task.enqueued_at)
+        try:
+            if task.token is not None:
+                # Drop work whose deadline passed or whose client left
+                task.token.check("queued")
+            profile = current_profile()
+            if profile is None:
+                task.future.set_result(task.fn(*task.args, **task.kwargs))
+            else:
+                task.future.set_result(profile.run(task.fn, *task.args, **task.kwargs))
+        except BaseException as e:
+            task.future.set_exception(e)
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Tasks waiting in each priority queue"""
+        with self._cond:
+            return {cls: len(queue) for cls, queue in self._queues.items()}
+
+    def shutdown(self) -> None:
+        """Cancel queued tasks and stop the worker threads"""
+        with self._cond:
+            self._stopped = True
+            for queue in self._queues.values():
+                while queue:
+                    queue.popleft().future.cancel()
+            self._cond.notify_all()
+
+
+# Global scheduler instance
+_scheduler: Optional[PriorityScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> PriorityScheduler:
+    """
+    Get or create the global inference scheduler
+
+    Returns
+    -------
+    PriorityScheduler
+        The scheduler instance
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PriorityScheduler()
+        return _scheduler
+
+
+def peek_queue_depths() -> Dict[str, int]:
+    """Queue depths of the global scheduler, without starting it"""
+    scheduler = _scheduler
+    return scheduler.queue_depths() if scheduler is not None else {}
+
+
+def shutdown_scheduler() -> None:
+    """Stop the global scheduler if it was started"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.shutdown()
+            _scheduler = None
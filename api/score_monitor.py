@@ -0,0 +1,191 @@
+"""
+Score monitor
+Rolling probability distribution and approval rate of scored clients
+
+Scored probabilities are counted into time buckets (SCORE_MONITOR_BUCKET_SECONDS
+wide) of a ring buffer holding SCORE_MONITOR_BUCKETS of them: per bucket, a
+histogram of `probability_default` in SCORE_MONITOR_RESOLUTION fixed-width
+bins, the approved and rejected counts and the sum of probabilities. The
+histogram doubles as a quantile sketch: quantiles read from it are within
+half a bin of the exact ones, and buckets merge by addition, so rolling
+windows are sums of buckets.
+
+A single prediction costs a few array increments, a batch one bincount.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from api.config import (
+    SCORE_MONITOR_BUCKET_SECONDS,
+    SCORE_MONITOR_BUCKETS,
+    SCORE_MONITOR_RESOLUTION,
+    SCORE_MONITOR_WINDOWS
+)
+
+# Quantiles reported for each window and bucket
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+class ScoreMonitor:
+    """
+    Time-bucketed ring buffer of score histograms and decision counts
+
+    Parameters
+    ----------
+    bucket_seconds : int
+        Width of a bucket
+    buckets : int
+        Buckets kept; older ones are overwritten
+    resolution : int
+        Probability bins per bucket
+    clock : Callable[[], float]
+        Current Unix time
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: int = SCORE_MONITOR_BUCKET_SECONDS,
+        buckets: int = SCORE_MONITOR_BUCKETS,
+        resolution: int = SCORE_MONITOR_RESOLUTION,
+        clock: Callable[[], float] = time.time
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.resolution = resolution
+        self.clock = clock
+        self._histograms = np.zeros((buckets, resolution), dtype=np.int64)
+        self._approved = np.zeros(buckets, dtype=np.int64)
+        self._rejected = np.zeros(buckets, dtype=np.int64)
+        self._sums = np.zeros(buckets)
+        # Absolute bucket number held by each slot, -1 when empty
+        self._bucket_ids = np.full(buckets, -1, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def _slot(self) -> int:
+        """Slot of the current bucket, cleared if it held an older one (lock held)"""
+        bucket_id = int(self.clock() // self.bucket_seconds)
+        slot = bucket_id % self.buckets
+        if self._bucket_ids[slot] != bucket_id:
+            self._histograms[slot] = 0
+            self._approved[slot] = self._rejected[slot] = 0
+            self._sums[slot] = 0.0
+            self._bucket_ids[slot] = bucket_id
+        return slot
+
+    def record(self, proba_default: float, threshold: float) -> None:
+        """Count one prediction"""
+        bin_index = min(int(proba_default * self.resolution), self.resolution - 1)
+        with self._lock:
+            slot = self._slot()
+            self._histograms[slot, bin_index] += 1
+            if proba_default > threshold:
+                self._rejected[slot] += 1
+            else:
+                self._approved[slot] += 1
+            self._sums[slot] += proba_default
+
+    def record_batch(self, proba_default: np.ndarray, threshold: float) -> None:
+        """Count a batch of predictions"""
+        if len(proba_default) == 0:
+            return
+        bins = np.minimum((proba_default * self.resolution).astype(np.intp), self.resolution - 1)
+        histogram = np.bincount(bins, minlength=self.resolution)
+        rejected = int(np.count_nonzero(proba_default > threshold))
+        total = float(proba_default.sum())
+        with self._lock:
+            slot = self._slot()
+            self._histograms[slot] += histogram
+            self._rejected[slot] += rejected
+            self._approved[slot] += len(proba_default) - rejected
+            self._sums[slot] += total
+
+    def reset(self) -> None:
+        """Forget every bucket"""
+        with self._lock:
+            self._bucket_ids[:] = -1
+
+    def _summary(self, histogram: np.ndarray, approved: int, rejected: int, total: float, bins: int) -> Dict:
+        """Counts, approval rate, mean, quantiles and coarse histogram of merged buckets"""
+        predictions = approved + rejected
+        edges = np.linspace(0, self.resolution, bins + 1).astype(np.intp)
+        summary = {
+            "predictions": predictions,
+            "approved": approved,
+            "rejected": rejected,
+            "approval_rate": approved / predictions if predictions else None,
+            "mean_probability": total / predictions if predictions else None,
+            "quantiles": {},
+            "histogram": np.add.reduceat(histogram, edges[:-1]).tolist()
+        }
+        if predictions:
+            # Midpoint of the bin holding each quantile
+            positions = np.searchsorted(np.cumsum(histogram), np.array(QUANTILES) * predictions, side="left")
+            positions = np.minimum(positions, self.resolution - 1)
+            summary["quantiles"] = {
+                f"p{round(q * 100)}": float((position + 0.5) / self.resolution)
+                for q, position in zip(QUANTILES, positions)
+            }
+        return summary
+
+    def report(self, windows: List[int] = SCORE_MONITOR_WINDOWS, bins: int = 10) -> Dict:
+        """
+        Rolling windows and per-bucket series
+
+        Parameters
+        ----------
+        windows : List[int]
+            Window lengths in seconds, rounded up to whole buckets; each
+            includes the current, partial bucket
+        bins : int
+            Bins of the reported probability histograms
+
+        Returns
+        -------
+        dict
+            Window summaries and bucket summaries, most recent first
+        """
+        with self._lock:
+            current = int(self.clock() // self.bucket_seconds)
+            histograms = self._histograms.copy()
+            approved = self._approved.copy()
+            rejected = self._rejected.copy()
+            sums = self._sums.copy()
+            bucket_ids = self._bucket_ids.copy()
+
+        # Buckets newest first, back to the oldest still in the ring
+        valid = (bucket_ids >= 0) & (bucket_ids > current - self.buckets) & (bucket_ids <= current)
+        order = np.argsort(-np.where(valid, bucket_ids, -1), kind="stable")[:int(valid.sum())]
+
+        window_summaries = []
+        for seconds in windows:
+            count = min(-(-seconds // self.bucket_seconds), self.buckets)
+            selected = order[bucket_ids[order] > current - count]
+            window_summaries.append({
+                "window_seconds": count * self.bucket_seconds,
+                **self._summary(
+                    histograms[selected].sum(axis=0), int(approved[selected].sum()),
+                    int(rejected[selected].sum()), float(sums[selected].sum()), bins
+                )
+            })
+
+        bucket_summaries = [
+            {
+                "start": float(bucket_ids[slot] * self.bucket_seconds),
+                **self._summary(histograms[slot], int(approved[slot]), int(rejected[slot]), float(sums[slot]), bins)
+            }
+            for slot in order
+        ]
+        return {
+            "bucket_seconds": self.bucket_seconds,
+            "resolution": self.resolution,
+            "windows": window_summaries,
+            "buckets": bucket_summaries
+        }
+
+
+# Score monitor of the serving process
+SCORE_MONITOR = ScoreMonitor()
@@ -0,0 +1,118 @@
+"""
+Startup report
+Wall time spent importing modules and loading artifacts in the serving process
+
+Kept free of third-party imports so that it can time them.
+"""
+
+import importlib
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Phase kinds
+IMPORT = "import"
+ARTIFACT = "artifact"
+WARMUP = "warmup"
+
+# Reference point: the first api module importing this one
+_STARTED_AT = time.perf_counter()
+
+
+class StartupReport:
+    """
+    Named, timed startup phases
+
+    A phase recorded again (e.g. artifacts reloaded) replaces the
+    previous measurement.
+    """
+
+    def __init__(self, started_at: float = _STARTED_AT):
+        self.started_at = started_at
+        self.ready_seconds: Optional[float] = None
+        self._phases: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, kind: str, seconds: float) -> None:
+        """Record the duration of a phase"""
+        with self._lock:
+            self._phases.pop(name, None)
+            self._phases[name] = {"name": name, "kind": kind, "seconds": seconds}
+
+    @contextmanager
+    def measure(self, name: str, kind: str):
+        """Time the enclosed block as a phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, kind, time.perf_counter() - start)
+
+    def timed_import(self, module_name: str):
+        """
+        Import a module, timing it if it was not imported yet
+
+        Parameters
+        ----------
+        module_name : str
+            Absolute module name
+
+        Returns
+        -------
+        module
+            The imported module
+        """
+        module = sys.modules.get(module_name)
+        if module is not None:
+            return module
+        with self.measure(module_name, IMPORT):
+            return importlib.import_module(module_name)
+
+    def mark_ready(self) -> None:
+        """Record that the process is ready to serve"""
+        self.ready_seconds = time.perf_counter() - self.started_at
+
+    def phases(self) -> List[Dict]:
+        """Recorded phases, in recording order"""
+        with self._lock:
+            return [dict(phase) for phase in self._phases.values()]
+
+    def as_dict(self) -> Dict:
+        """
+        Report as a JSON-serialisable dictionary
+
+        Returns
+        -------
+        Dict
+            Phases, total time per kind and time to ready (warm-up excluded)
+        """
+        phases = self.phases()
+        return {
+            "phases": phases,
+            "import_seconds": sum(p["seconds"] for p in phases if p["kind"] == IMPORT),
+            "artifact_seconds": sum(p["seconds"] for p in phases if p["kind"] == ARTIFACT),
+            "warmup_seconds": sum(p["seconds"] for p in phases if p["kind"] == WARMUP),
+            "ready_seconds": self.ready_seconds
+        }
+
+    def log_summary(self) -> None:
+        """Log the report, slowest phases first"""
+        report = self.as_dict()
+        slowest = sorted(report["phases"], key=lambda p: p["seconds"], reverse=True)
+        ready = report["ready_seconds"]
+        prefix = f"Startup: ready in {ready:.3f}s" if ready is not None else "Startup:"
+        logger.info(
+            f"{prefix} (imports {report['import_seconds']:.3f}s, "
+            f"artifacts {report['artifact_seconds']:.3f}s)"
+        )
+        for phase in slowest:
+            logger.info(f"  {phase['kind']:<8} {phase['name']:<24} {phase['seconds']:.3f}s")
+
+
+# Global report of the serving process
+REPORT = StartupReport()
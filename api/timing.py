@@ -0,0 +1,287 @@
+"""
+Request timing
+Per-stage latency of the serving endpoints, recorded into histograms
+
+A middleware times each request from arrival to the first response byte;
+`timed_endpoint` marks when the endpoint body starts and returns, which
+splits off request parsing/validation and response serialization. Code on
+the inference threads adds its own stages (queue wait, feature preparation,
+inference, SHAP) to the request through a context variable, which the
+scheduler carries over to the thread running the task.
+"""
+
+import functools
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from api.config import SERVER_TIMING_ENABLED, SLOW_REQUEST_THRESHOLD, SLOW_REQUEST_BUFFER_SIZE
+from api.metrics import REGISTRY
+
+# Stages, in request order
+PARSE = "parse"
+QUEUE = "queue"
+PREPARE = "prepare"
+INFER = "infer"
+EXPLAIN = "explain"
+SERIALIZE = "serialize"
+STAGES = (PARSE, QUEUE, PREPARE, INFER, EXPLAIN, SERIALIZE)
+_STAGE_INDEX = {name: i for i, name in enumerate(STAGES)}
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000, 10000)
+
+_request_seconds = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Time from request arrival to the response headers, per endpoint",
+    ("endpoint",),
+    buckets=LATENCY_BUCKETS
+)
+_stage_seconds = REGISTRY.histogram(
+    "request_stage_duration_seconds",
+    "Time spent in each stage of a request (summed over the chunks of a batch)",
+    ("endpoint", "stage"),
+    buckets=LATENCY_BUCKETS
+)
+_batch_size = REGISTRY.histogram(
+    "request_batch_size",
+    "Clients per request",
+    ("endpoint",),
+    buckets=BATCH_SIZE_BUCKETS
+)
+_requests = REGISTRY.counter(
+    "http_requests_total",
+    "Requests served, by endpoint and status code",
+    ("endpoint", "status")
+)
+_errors = REGISTRY.counter(
+    "http_request_errors_total",
+    "Requests answered with an error status (4xx or 5xx), by endpoint",
+    ("endpoint",)
+)
+
+_slow_requests = REGISTRY.counter(
+    "slow_requests_total",
+    "Requests slower than the slow request threshold, by endpoint",
+    ("endpoint",)
+)
+
+_current: ContextVar[Optional["RequestTimings"]] = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """
+    Stage durations of one request
+
+    Slots are preallocated, one per stage. The chunks of a batch may
+    add to a stage from several threads at once, without a lock: a rare
+    lost update only under-reports that stage.
+    """
+
+    __slots__ = ("endpoint", "started", "entered", "returned", "batch_size", "payload_bytes", "stages")
+
+    def __init__(self, started: float):
+        self.endpoint: Optional[str] = None
+        self.started = started
+        self.entered: Optional[float] = None
+        self.returned: Optional[float] = None
+        self.batch_size: Optional[int] = None
+        self.payload_bytes = 0
+        self.stages = [0.0] * len(STAGES)
+
+    def add(self, stage: str, seconds: float) -> None:
+        """Add time spent in a stage"""
+        self.stages[_STAGE_INDEX[stage]] += seconds
+
+    def as_dict(self) -> dict:
+        """Non-zero stage durations, in stage order"""
+        return {name: seconds for name, seconds in zip(STAGES, self.stages) if seconds}
+
+    def server_timing(self, total: float) -> str:
+        """Stage durations as a Server-Timing header value (milliseconds)"""
+        metrics = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.as_dict().items()]
+        metrics.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(metrics)
+
+
+class SlowRequestLog:
+    """
+    Bounded in-memory log of the most recent slow requests
+
+    Only requests above the threshold are copied into the ring buffer;
+    once full, the oldest entry is dropped.
+    """
+
+    def __init__(self, threshold: float = SLOW_REQUEST_THRESHOLD, capacity: int = SLOW_REQUEST_BUFFER_SIZE):
+        self.threshold = threshold
+        self.capacity = capacity
+        self._entries: deque = deque(maxlen=max(capacity, 1))
+        self._lock = threading.Lock()
+
+    def record(self, timings: RequestTimings, status_code: int, total: float) -> None:
+        """Keep the request if it was slow"""
+        if self.threshold <= 0 or total < self.threshold:
+            return
+        entry = {
+            "timestamp": time.time(),
+            "endpoint": timings.endpoint,
+            "status_code": status_code,
+            "duration_seconds": total,
+            "stages": timings.as_dict(),
+            "payload_bytes": timings.payload_bytes,
+            "batch_size": timings.batch_size
+        }
+        with self._lock:
+            self._entries.append(entry)
+        _slow_requests.inc(timings.endpoint)
+
+    def entries(self) -> List[Dict]:
+        """Captured requests, most recent first"""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        """Drop all captured requests"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Slow requests of the serving process
+SLOW_REQUESTS = SlowRequestLog()
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the request being served (None outside a timed request)"""
+    return _current.get()
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Add time to a stage of the current request, if any"""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+def set_batch_size(size: int) -> None:
+    """Record the number of clients of the current request"""
+    timings = _current.get()
+    if timings is not None:
+        timings.batch_size = size
+
+
+def timed_endpoint(endpoint: str) -> Callable:
+    """
+    Mark an async endpoint as timed under the given name
+
+    Time before the body runs is request parsing and validation; time
+    after it returns is response serialization.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            timings = _current.get()
+            if timings is not None:
+                timings.endpoint = endpoint
+                timings.entered = time.perf_counter()
+                timings.add(PARSE, timings.entered - timings.started)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                if timings is not None:
+                    timings.returned = time.perf_counter()
+        # Lets the middleware name requests rejected before the body runs (422)
+        wrapper.timed_endpoint = endpoint
+        return wrapper
+    return decorator
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware recording the latency metrics of timed endpoints
+
+    Requests to endpoints not marked with `timed_endpoint` are passed
+    through and not recorded. Timed responses can also carry the stage
+    breakdown in a Server-Timing header, and slow requests are copied
+    to a `SlowRequestLog`.
+    """
+
+    def __init__(
+        self,
+        app,
+        server_timing: bool = SERVER_TIMING_ENABLED,
+        slow_requests: Optional[SlowRequestLog] = None
+    ):
+        self.app = app
+        self.server_timing = server_timing
+        self.slow_requests = SLOW_REQUESTS if slow_requests is None else slow_requests
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(time.perf_counter())
+        token = _current.set(timings)
+        finished = False
+
+        async def receive_counted():
+            message = await receive()
+            timings.payload_bytes += len(message.get("body", b""))
+            return message
+
+        async def send_timed(message):
+            nonlocal finished
+            if message["type"] == "http.response.start":
+                finished = True
+                total = self._finish(timings, scope, message["status"], time.perf_counter())
+                if total is not None and self.server_timing:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", timings.server_timing(total).encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_counted, send_timed)
+        except Exception:
+            # The error response is sent by an outer middleware
+            if not finished:
+                self._finish(timings, scope, 500, time.perf_counter())
+            raise
+        finally:
+            _current.reset(token)
+
+    def _finish(self, timings: RequestTimings, scope: dict, status_code: int, now: float) -> Optional[float]:
+        """Record a request's metrics once its response starts, returning its duration"""
+        total = _finish(timings, scope, status_code, now)
+        if total is not None:
+            self.slow_requests.record(timings, status_code, total)
+        return total
+
+
+def _finish(timings: RequestTimings, scope: dict, status_code: int, now: float) -> Optional[float]:
+    """Record a request's metrics (None if its endpoint is not timed)"""
+    endpoint = timings.endpoint
+    if endpoint is None:
+        # Routed to a timed endpoint but failed validation: all parsing
+        endpoint = getattr(scope.get("endpoint"), "timed_endpoint", None)
+        if endpoint is None:
+            return None
+        timings.endpoint = endpoint
+        timings.add(PARSE, now - timings.started)
+    if timings.returned is not None:
+        timings.add(SERIALIZE, now - timings.returned)
+    total = now - timings.started
+    _request_seconds.observe(total, endpoint)
+    for name, seconds in zip(STAGES, timings.stages):
+        if seconds:
+            _stage_seconds.observe(seconds, endpoint, name)
+    if timings.batch_size is not None:
+        _batch_size.observe(timings.batch_size, endpoint)
+    _requests.inc(endpoint, str(status_code))
+    if status_code >= 400:
+        _errors.inc(endpoint)
+    return total
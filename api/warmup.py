@@ -0,0 +1,186 @@
+"""
+Warm-up
+Synthetic traffic run before a worker reports ready, so that its first real
+requests do not pay for first-call allocations, thread start-up and lazy loads
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from api.config import WARMUP_ROUNDS, WARMUP_BATCH_SIZE, WARMUP_EXPLAIN
+from api.metrics import REGISTRY
+from api.predictor import CreditScorePredictor, get_predictor, unmonitored
+from api.registry import CHAMPION, get_model_registry
+from api.scheduler import INTERACTIVE, BULK, EXPLAIN, SHADOW, get_scheduler
+from api.startup_report import REPORT, WARMUP
+
+logger = logging.getLogger(__name__)
+
+# Warm-up states
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+
+
+def synthetic_clients(feature_names: List[str], count: int, seed: int = 0) -> List[Dict[str, float]]:
+    """
+    Synthetic clients: an all-missing one, an all-zero one, then random values
+
+    Parameters
+    ----------
+    feature_names : List[str]
+        Model features
+    count : int
+        Number of clients
+
+    Returns
+    -------
+    List[Dict[str, float]]
+        Feature dictionaries
+    """
+    rng = np.random.default_rng(seed)
+    clients = [{}, {name: 0.0 for name in feature_names}]
+    while len(clients) < count:
+        values = rng.normal(size=len(feature_names))
+        clients.append(dict(zip(feature_names, values.tolist())))
+    return clients[:count]
+
+
+class WarmUp:
+    """
+    Warm-up routine and readiness state of the serving process
+
+    Each round sends single-client predictions through as many inference
+    threads as interactive scoring may use at once, a batch through the bulk path, the same batch through every
+    challenger, and optionally one explanation. All of it goes through
+    the scheduler, exactly like live requests.
+    """
+
+    def __init__(
+        self,
+        rounds: int = WARMUP_ROUNDS,
+        batch_size: int = WARMUP_BATCH_SIZE,
+        explain: bool = WARMUP_EXPLAIN
+    ):
+        self.rounds = rounds
+        self.batch_size = batch_size
+        self.explain = explain
+        self.status = PENDING
+        self.seconds: Optional[float] = None
+        self.engines: List[str] = []
+        self.error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the warm-up has completed"""
+        return self.status == READY
+
+    def _round(self, predictor: CreditScorePredictor, challengers: Dict, clients: List[Dict]) -> None:
+        scheduler = get_scheduler()
+        # As many single-client tasks as interactive scoring can run at once,
+        # each held until all have started so that every one gets its own thread
+        count = scheduler.capacity(INTERACTIVE)
+        started = threading.Barrier(count)
+
+        def _score_single(client: Dict[str, float]):
+            result = predictor.score(client)
+            try:
+                started.wait(timeout=1)
+            except threading.BrokenBarrierError:
+                # Threads busy with live requests (e.g. a reload): warm fewer of them
+                pass
+            return result
+
+        singles = [
+            scheduler.submit(INTERACTIVE, _score_single, clients[i % len(clients)])
+            for i in range(count)
+        ]
+        for future in singles:
+            future.result()
+
+        def _score_batch(engine: CreditScorePredictor):
+            return engine.apply_threshold(engine.predict_proba_batch(clients))
+
+        scheduler.submit(BULK, _score_batch, predictor).result()
+        for challenger in challengers.values():
+            scheduler.submit(SHADOW, _score_batch, challenger).result()
+        if self.explain:
+            scheduler.submit(EXPLAIN, predictor.get_feature_importance, clients[-1], 10).result()
+
+    def warm(self, predictor: CreditScorePredictor, challengers: Optional[Dict] = None) -> None:
+        """
+        Run the warm-up rounds on a predictor and its challengers (blocking)
+
+        Parameters
+        ----------
+        predictor : CreditScorePredictor
+            Champion to warm, e.g. a reloaded one before it is swapped in
+        challengers : Optional[Dict]
+            Challenger engines by name
+        """
+        if self.rounds <= 0:
+            return
+        clients = synthetic_clients(predictor.feature_names, max(self.batch_size, 2))
+        # Synthetic clients are not traffic: keep them out of the monitors
+        with unmonitored():
+            for _ in range(self.rounds):
+                self._round(predictor, challengers or {}, clients)
+
+    def run(self) -> None:
+        """Run the warm-up (blocking); failures are recorded, not raised"""
+        self.status = RUNNING
+        start = time.perf_counter()
+        try:
+            predictor = get_predictor()
+            challengers = get_model_registry().challengers
+            self.engines = [CHAMPION] + list(challengers)
+            self.warm(predictor, challengers)
+            self.seconds = time.perf_counter() - start
+            REPORT.record("warm-up", WARMUP, self.seconds)
+            _warmup_seconds.set(self.seconds)
+            self.status = READY
+            logger.info(
+                f"Warm-up completed in {self.seconds:.3f}s "
+                f"({self.rounds} rounds, engines: {', '.join(self.engines)})"
+            )
+        except Exception as e:
+            self.seconds = time.perf_counter() - start
+            self.error = str(e)
+            self.status = FAILED
+            logger.error(f"Warm-up failed after {self.seconds:.3f}s: {str(e)}")
+
+    def start(self) -> None:
+        """Run the warm-up on a background thread"""
+        self._thread = threading.Thread(target=self.run, name="warm-up", daemon=True)
+        self._thread.start()
+
+    def as_dict(self) -> Dict:
+        """
+        Readiness state
+
+        Returns
+        -------
+        Dict
+            Status, warm-up duration, warmed engines and error if any
+        """
+        return {
+            "status": self.status,
+            "warmup_seconds": self.seconds,
+            "engines": list(self.engines),
+            "error": self.error
+        }
+
+
+_warmup_seconds = REGISTRY.gauge(
+    "warmup_seconds",
+    "Duration of the warm-up run before the process reported ready"
+)
+
+# Readiness of the serving process
+WARMUP_STATE = WarmUp()
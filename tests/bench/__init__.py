@@ -0,0 +1,5 @@
+"""
+Performance benchmarks of the predictor and API hot paths
+
+Not collected by pytest; run with `python -m tests.bench`.
+"""
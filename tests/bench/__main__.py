@@ -0,0 +1,95 @@
+"""
+Run the benchmarks
+
+    python -m tests.bench --output bench_report.json
+    python -m tests.bench --baseline tests/bench/baseline.json
+
+With --baseline, exits with status 1 if any benchmark regressed.
+"""
+
+import argparse
+import fnmatch
+import logging
+import os
+import sys
+from typing import List, Optional
+
+from tests.bench.runner import build_report, compare, load_report, run_benchmark, write_report
+
+logger = logging.getLogger("tests.bench")
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the predictor and API hot paths")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    parser.add_argument(
+        "--baseline", nargs="?", const=BASELINE_PATH,
+        help="Compare against a stored report (default: %(const)s)"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2,
+        help="Allowed relative slowdown before flagging a regression (default: %(default)s)"
+    )
+    parser.add_argument("--only", help="Only run cases matching this glob pattern")
+    parser.add_argument(
+        "--min-time", type=float, default=1.0,
+        help="Minimum timed seconds per case (default: %(default)s)"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    # Request logs would dominate the output and the timings
+    for name in ("api", "httpx"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    # Imported late: loading the model is part of the run, not of --help
+    from fastapi.testclient import TestClient
+    from api.main import app
+    from api.predictor import get_predictor
+    from tests.bench.cases import api_cases, logging_cases, predictor_cases
+
+    predictor = get_predictor()
+    cases = (
+        list(predictor_cases(predictor))
+        + list(api_cases(TestClient(app), predictor.feature_names))
+        + list(logging_cases())
+    )
+
+    results = []
+    for name, fn, items in cases:
+        if args.only and not fnmatch.fnmatch(name, args.only):
+            continue
+        result = run_benchmark(name, fn, items_per_call=items, min_time=args.min_time)
+        results.append(result)
+        logger.info(
+            f"{name:<28} p50 {result['p50_seconds'] * 1000:9.3f} ms  "
+            f"p99 {result['p99_seconds'] * 1000:9.3f} ms  "
+            f"{result['throughput_per_second']:12.1f} rows/s"
+        )
+
+    report = build_report(results)
+    if args.output:
+        write_report(report, args.output)
+        logger.info(f"Report written to {args.output}")
+
+    if args.baseline:
+        baseline = load_report(args.baseline)
+        if baseline is None:
+            logger.error(f"No baseline at {args.baseline}")
+            sys.exit(1)
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            logger.error(
+                f"REGRESSION {regression['benchmark']} {regression['statistic']}: "
+                f"{regression['baseline']:.6g} -> {regression['current']:.6g} ({regression['change']:+.1%})"
+            )
+        if regressions:
+            sys.exit(1)
+        logger.info(f"No regression beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
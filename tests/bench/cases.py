@@ -0,0 +1,141 @@
+"""
+Benchmark cases
+Predictor hot paths and the /predict endpoint through the ASGI app
+"""
+
+import io
+import logging
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from api.logging_config import configure_logging
+from api.predictor import CreditScorePredictor
+from api.warmup import synthetic_clients
+
+# Fraction of features present in a sparse client
+SPARSE_DENSITY = 0.1
+
+BATCH_SIZES = (1, 100, 10000)
+SHAP_BATCH_SIZE = 32
+
+
+def sparse_clients(
+    feature_names: List[str],
+    count: int,
+    seed: int = 0,
+    density: float = SPARSE_DENSITY
+) -> List[Dict[str, float]]:
+    """Clients with only a fraction of the features filled in, as sent by most callers"""
+    rng = np.random.default_rng(seed)
+    size = max(1, int(len(feature_names) * density))
+    clients = []
+    for _ in range(count):
+        names = rng.choice(len(feature_names), size=size, replace=False)
+        clients.append({feature_names[i]: float(v) for i, v in zip(names, rng.normal(size=size))})
+    return clients
+
+
+def dense_clients(feature_names: List[str], count: int, seed: int = 0) -> List[Dict[str, float]]:
+    """Clients with every feature filled in"""
+    return synthetic_clients(feature_names, count + 2, seed)[2:]
+
+
+def predictor_cases(predictor: CreditScorePredictor) -> Iterator[Tuple[str, Callable, int]]:
+    """
+    Predictor benchmark cases
+
+    Parameters
+    ----------
+    predictor : CreditScorePredictor
+        Loaded predictor
+
+    Yields
+    ------
+    Tuple[str, Callable, int]
+        Case name, zero-argument callable and clients per call
+    """
+    names = predictor.feature_names
+    sparse = sparse_clients(names, 1)[0]
+    dense = dense_clients(names, 1)[0]
+
+    yield "prepare_features_sparse", lambda: predictor._prepare_features(sparse, reuse=True), 1
+    yield "prepare_features_dense", lambda: predictor._prepare_features(dense, reuse=True), 1
+    yield "predict_proba", lambda: predictor.predict_proba(sparse), 1
+
+    for size in BATCH_SIZES:
+        batch = sparse_clients(names, size, seed=size)
+        yield f"predict_proba_batch_{size}", (lambda batch=batch: predictor.predict_proba_batch(batch)), size
+
+    yield "shap_single", lambda: predictor.get_feature_importance(sparse), 1
+    X = predictor._prepare_batch(sparse_clients(names, SHAP_BATCH_SIZE, seed=1))
+
+    def shap_batch():
+        with predictor._explainer.use() as explainer:
+            explainer(X)
+
+    yield f"shap_batch_{SHAP_BATCH_SIZE}", shap_batch, SHAP_BATCH_SIZE
+
+
+def api_cases(client, feature_names: List[str]) -> Iterator[Tuple[str, Callable, int]]:
+    """
+    End-to-end API benchmark cases
+
+    Parameters
+    ----------
+    client : TestClient
+        Client of the ASGI app
+    feature_names : List[str]
+        Model features
+
+    Yields
+    ------
+    Tuple[str, Callable, int]
+        Case name, zero-argument callable and clients per call
+    """
+    payload = {"client_id": "bench", "features": sparse_clients(feature_names, 1)[0]}
+
+    def predict():
+        response = client.post("/predict", json=payload)
+        response.raise_for_status()
+
+    yield "api_predict", predict, 1
+
+
+def logging_cases() -> Iterator[Tuple[str, Callable, int]]:
+    """
+    Per-request cost of the /predict log lines under each logging setup
+
+    Logs go to an in-memory stream; the queued setups are timed up to
+    the enqueue, which is what the request pays.
+
+    Yields
+    ------
+    Tuple[str, Callable, int]
+        Case name, zero-argument callable and requests per call
+    """
+    setups = {
+        "log_sync_text_fstring": dict(fmt="text", use_queue=False),
+        "log_sync_json": dict(fmt="json", use_queue=False),
+        "log_queue_json_eager": dict(fmt="json", use_queue=True, lazy=False),
+        "log_queue_json_lazy": dict(fmt="json", use_queue=True, lazy=True)
+    }
+    for name, options in setups.items():
+        logger = logging.getLogger(f"bench.{name}")
+        logger.propagate = False
+        logger.handlers.clear()
+        configure_logging("INFO", stream=io.StringIO(), logger=logger, queue_size=1000000, **options)
+
+        if name.endswith("fstring"):
+            def log_request(logger=logger, client_id="100001", decision="APPROVED", proba=0.1234):
+                logger.info(f"Prediction request for client: {client_id}")
+                logger.info(f"Prediction completed: {decision} (proba: {proba:.4f})")
+        else:
+            def log_request(logger=logger, client_id="100001", decision="APPROVED", proba=0.1234):
+                logger.info("Prediction request for client: %s", client_id)
+                logger.info(
+                    "Prediction completed: %s (proba: %.4f)", decision, proba,
+                    extra={"client_id": client_id, "decision": decision, "probability_default": proba}
+                )
+
+        yield name, log_request, 1
@@ -0,0 +1,256 @@
+"""
+Load generator
+Drives the API with synthetic or captured traffic and reports latency
+
+    # Synthetic clients, in-process, 8 clients sending back to back
+    python -m tests.bench.loadgen --requests 2000 --concurrency 8
+
+    # Open loop at 50 requests/s against a local uvicorn
+    python -m tests.bench.loadgen --url http://localhost:8000 --rate 50 --requests 3000
+
+    # Replay a capture (see api/capture.py) at 10x its recorded speed
+    python -m tests.bench.loadgen --replay capture.jsonl --speed 10
+
+In closed-loop mode each of the `concurrency` workers sends its next
+request as soon as the previous one completes. In open-loop mode (--rate
+or --replay) requests start on schedule whatever the response times, and
+latency is measured from the scheduled start, so a slow server is not
+hidden by requests starting late.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from tests.bench.cases import SPARSE_DENSITY, sparse_clients
+
+logger = logging.getLogger("tests.bench.loadgen")
+
+# One request to send: seconds after the start (None in closed loop), method, path, body
+LoadRequest = tuple
+
+
+def synthetic_requests(
+    feature_names: List[str],
+    count: int,
+    density: float = SPARSE_DENSITY,
+    rate: Optional[float] = None,
+    seed: int = 0
+) -> List[LoadRequest]:
+    """
+    /predict requests for synthetic clients
+
+    Parameters
+    ----------
+    feature_names : List[str]
+        Model features
+    count : int
+        Number of requests
+    density : float
+        Fraction of the features filled in per client
+    rate : float, optional
+        Requests per second, with Poisson arrivals (closed loop if None)
+    seed : int
+        Random seed
+
+    Returns
+    -------
+    List[LoadRequest]
+        Requests in sending order
+    """
+    clients = sparse_clients(feature_names, count, seed=seed, density=density)
+    if rate is None:
+        offsets = [None] * count
+    else:
+        rng = np.random.default_rng(seed)
+        offsets = np.cumsum(rng.exponential(1 / rate, size=count)).tolist()
+    return [
+        (offset, "POST", "/predict", {"client_id": f"load-{i}", "features": features})
+        for i, (offset, features) in enumerate(zip(offsets, clients))
+    ]
+
+
+def replay_requests(path: str, speed: float = 1.0, limit: Optional[int] = None) -> List[LoadRequest]:
+    """
+    Requests of a capture file, scheduled at `speed` times their recorded pace
+
+    Parameters
+    ----------
+    path : str
+        Capture file written by the API (CAPTURE_PATH)
+    speed : float
+        Time compression, e.g. 10 for ten times faster
+    limit : int, optional
+        Replay only the first requests
+
+    Returns
+    -------
+    List[LoadRequest]
+        Requests in sending order
+    """
+    from api.capture import read_capture
+
+    records = sorted(read_capture(path), key=lambda record: record.get("timestamp", 0))[:limit]
+    if not records:
+        return []
+    start = records[0].get("timestamp", 0)
+    return [
+        ((record.get("timestamp", start) - start) / speed, record.get("method", "POST"),
+         record["path"], record["body"])
+        for record in records
+    ]
+
+
+async def _send(client: httpx.AsyncClient, request: LoadRequest, scheduled: float) -> Dict:
+    """Send one request, timing it from its scheduled start"""
+    _, method, path, body = request
+    try:
+        response = await client.request(method, path, json=body)
+        status = response.status_code
+        error = None
+    except httpx.HTTPError as e:
+        status = None
+        error = type(e).__name__
+    return {"path": path, "status": status, "error": error, "latency": time.perf_counter() - scheduled}
+
+
+async def run_load(client: httpx.AsyncClient, requests: List[LoadRequest], concurrency: int = 1) -> List[Dict]:
+    """
+    Send requests and collect their outcomes
+
+    Requests with a start offset are sent open loop; otherwise
+    `concurrency` workers send them closed loop.
+
+    Parameters
+    ----------
+    client : httpx.AsyncClient
+        Client of the API under test
+    requests : List[LoadRequest]
+        Requests from `synthetic_requests` or `replay_requests`
+    concurrency : int
+        Closed-loop workers
+
+    Returns
+    -------
+    List[Dict]
+        Path, status (None on a transport error), error and latency per request
+    """
+    if requests and requests[0][0] is not None:
+        start = time.perf_counter()
+        tasks = []
+        for request in requests:
+            scheduled = start + request[0]
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(_send(client, request, scheduled)))
+        return list(await asyncio.gather(*tasks))
+
+    pending = iter(requests)
+    results = []
+
+    async def worker():
+        for request in pending:
+            results.append(await _send(client, request, time.perf_counter()))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+
+def summarize(results: List[Dict], elapsed: float) -> Dict:
+    """
+    Throughput, latency percentiles and error rate of a run
+
+    Parameters
+    ----------
+    results : List[Dict]
+        Outcomes from `run_load`
+    elapsed : float
+        Wall time of the run
+
+    Returns
+    -------
+    dict
+        Run summary
+    """
+    latencies = np.array([result["latency"] for result in results]) if results else np.zeros(1)
+    failed = sum(1 for result in results if result["status"] is None or result["status"] >= 400)
+    return {
+        "requests": len(results),
+        "elapsed_seconds": elapsed,
+        "throughput_per_second": len(results) / elapsed if elapsed > 0 else 0.0,
+        "latency_seconds": {
+            "p50": float(np.percentile(latencies, 50)),
+            "p90": float(np.percentile(latencies, 90)),
+            "p99": float(np.percentile(latencies, 99)),
+            "max": float(latencies.max())
+        },
+        "error_rate": failed / len(results) if results else 0.0,
+        "status_codes": dict(Counter(str(result["status"] or result["error"]) for result in results)),
+        "paths": dict(Counter(result["path"] for result in results))
+    }
+
+
+def _client(url: Optional[str]) -> httpx.AsyncClient:
+    """Client of a running server, or of the app in this process"""
+    if url is not None:
+        return httpx.AsyncClient(base_url=url, timeout=60.0)
+    from api.main import app
+    from api.predictor import get_predictor
+    # Load the model now rather than during the first requests
+    get_predictor()
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadgen", timeout=60.0)
+
+
+async def _run(args) -> Dict:
+    if args.replay:
+        requests = replay_requests(args.replay, speed=args.speed, limit=args.requests)
+    else:
+        from api.predictor import load_feature_names
+        requests = synthetic_requests(
+            load_feature_names(), args.requests or 1000, density=args.density, rate=args.rate, seed=args.seed
+        )
+    async with _client(args.url) as client:
+        start = time.perf_counter()
+        results = await run_load(client, requests, concurrency=args.concurrency)
+        return summarize(results, time.perf_counter() - start)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Load test the API with synthetic or captured traffic")
+    parser.add_argument("--url", help="Server to load (default: the app, in process)")
+    parser.add_argument("--replay", help="Capture file to replay (default: synthetic clients)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed-up (default: %(default)s)")
+    parser.add_argument("--requests", type=int, help="Number of requests (default: 1000 synthetic, or the whole capture)")
+    parser.add_argument("--rate", type=float, help="Open-loop arrival rate in requests/s (default: closed loop)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Closed-loop workers (default: %(default)s)")
+    parser.add_argument(
+        "--density", type=float, default=SPARSE_DENSITY,
+        help="Fraction of features filled in per synthetic client (default: %(default)s)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON summary to this path")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    for name in ("api", "httpx"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    summary = asyncio.run(_run(args))
+    text = json.dumps(summary, indent=2)
+    logger.info(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Benchmark runner
+Times benchmark cases and compares reports against a stored baseline
+"""
+
+import json
+import platform
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+REPORT_FORMAT_VERSION = 1
+
+# Statistics compared against the baseline, and whether higher is better
+COMPARED = {
+    "p50_seconds": False,
+    "p99_seconds": False,
+    "throughput_per_second": True
+}
+
+
+def run_benchmark(
+    name: str,
+    fn: Callable[[], object],
+    items_per_call: int = 1,
+    min_calls: int = 5,
+    max_calls: int = 1000,
+    min_time: float = 1.0,
+    warmup_calls: int = 2
+) -> Dict:
+    """
+    Time repeated calls of a benchmark case
+
+    Calls are repeated until both `min_calls` and `min_time` are reached,
+    or `max_calls` is.
+
+    Parameters
+    ----------
+    name : str
+        Case name
+    fn : Callable
+        Zero-argument callable doing one unit of work
+    items_per_call : int
+        Rows (clients) processed per call, for throughput
+    min_calls, max_calls : int
+        Bounds on the number of timed calls
+    min_time : float
+        Minimum total timed seconds
+    warmup_calls : int
+        Untimed calls first
+
+    Returns
+    -------
+    dict
+        Call count, latency percentiles and rows per second
+    """
+    for _ in range(warmup_calls):
+        fn()
+
+    durations = []
+    total = 0.0
+    while len(durations) < max_calls and (len(durations) < min_calls or total < min_time):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        durations.append(elapsed)
+        total += elapsed
+
+    durations = np.asarray(durations)
+    return {
+        "name": name,
+        "calls": len(durations),
+        "items_per_call": items_per_call,
+        "mean_seconds": float(durations.mean()),
+        "p50_seconds": float(np.percentile(durations, 50)),
+        "p99_seconds": float(np.percentile(durations, 99)),
+        "throughput_per_second": float(items_per_call * len(durations) / total)
+    }
+
+
+def build_report(results: List[Dict]) -> Dict:
+    """
+    Benchmark report with the environment it was measured on
+
+    Parameters
+    ----------
+    results : List[Dict]
+        Results of `run_benchmark`
+
+    Returns
+    -------
+    dict
+        JSON-serializable report
+    """
+    return {
+        "format_version": REPORT_FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "numpy": np.__version__
+        },
+        "benchmarks": {result["name"]: result for result in results}
+    }
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float = 0.2) -> List[Dict]:
+    """
+    Regressions of a report against a baseline
+
+    A statistic regresses when it is worse than the baseline by more than
+    `tolerance` (relative). Cases missing from either report are skipped.
+
+    Parameters
+    ----------
+    report : dict
+        Current report
+    baseline : dict
+        Stored report
+    tolerance : float
+        Allowed relative slowdown, e.g. 0.2 for 20%
+
+    Returns
+    -------
+    List[Dict]
+        One entry per regressed statistic: benchmark, statistic,
+        baseline, current and relative change
+    """
+    regressions = []
+    for name, current in report["benchmarks"].items():
+        reference = baseline["benchmarks"].get(name)
+        if reference is None:
+            continue
+        for statistic, higher_is_better in COMPARED.items():
+            before, after = reference[statistic], current[statistic]
+            if before <= 0:
+                continue
+            change = after / before - 1
+            slowdown = -change / (1 + change) if higher_is_better else change
+            if slowdown > tolerance:
+                regressions.append({
+                    "benchmark": name,
+                    "statistic": statistic,
+                    "baseline": before,
+                    "current": after,
+                    "change": change
+                })
+    return regressions
+
+
+def load_report(path: str) -> Optional[Dict]:
+    """Read a report (None if the file does not exist)"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_report(report: Dict, path: str) -> None:
+    """Write a report as indented JSON"""
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
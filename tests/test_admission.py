@@ -0,0 +1,95 @@
+"""
+Tests for admission control and backpressure
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import status
+
+import api.main
+from api.admission import EndpointLimiter, AdmissionRejectedError
+from api.deadlines import CancellationToken, gather_guarded
+from api.scheduler import get_scheduler
+
+
+async def _serve(limiter, fn, *args):
+    """Run one blocking call the way the endpoints do: admitted, then scheduled"""
+    token = CancellationToken(limiter.name)
+    async with limiter.admit():
+        future = get_scheduler().submit(limiter.name, fn, *args, token=token)
+        (result,) = await gather_guarded([future], token)
+    return result
+
+
+class TestEndpointLimiter:
+    """Tests for EndpointLimiter"""
+
+    def test_rejects_when_concurrency_and_queue_are_full(self):
+        """Test that requests beyond concurrency + queue are rejected immediately"""
+        limiter = EndpointLimiter("explain", max_concurrency=1, max_queue=1, retry_after=2)
+        release = threading.Event()
+
+        async def scenario():
+            running = asyncio.ensure_future(_serve(limiter, release.wait, 5))
+            queued = asyncio.ensure_future(_serve(limiter, lambda: "queued"))
+            await asyncio.sleep(0.05)
+
+            assert limiter.in_flight == 2
+            with pytest.raises(AdmissionRejectedError) as excinfo:
+                await _serve(limiter, lambda: "rejected")
+            assert excinfo.value.retry_after == 2
+
+            release.set()
+            return await running, await queued
+
+        try:
+            assert asyncio.run(scenario()) == (True, "queued")
+            assert limiter.in_flight == 0
+        finally:
+            release.set()
+
+
+class _FullController:
+    """Admission controller stub whose queues are always full"""
+
+    @asynccontextmanager
+    async def admit(self, endpoint_class):
+        raise AdmissionRejectedError(endpoint_class, 3)
+        yield
+
+
+class TestAdmissionEndpoints:
+    """Tests for admission behaviour of the API endpoints"""
+
+    def test_rejection_returns_429_with_retry_after(
+        self, client, sample_client_request, monkeypatch
+    ):
+        """Test that a full queue gives a fast 429 with Retry-After"""
+        monkeypatch.setattr(api.main, "get_admission_controller", lambda: _FullController())
+
+        response = client.post("/feature-importance", json=sample_client_request)
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.headers["Retry-After"] == "3"
+
+    def test_batch_size_is_capped(self, client, sample_batch_request, monkeypatch):
+        """Test that oversized batches are refused with 413"""
+        monkeypatch.setattr(api.main, "MAX_BATCH_SIZE", 2)
+
+        response = client.post("/predict/batch", json=sample_batch_request)
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+    def test_metrics_expose_admission_counters(self, client, sample_client_request):
+        """Test that admission metrics are exposed on /metrics"""
+        client.post("/predict", json=sample_client_request)
+
+        response = client.get("/metrics")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert 'admission_admitted_total{endpoint_class="scoring"}' in response.text
+        assert 'admission_queue_depth{endpoint_class="scoring"}' in response.text
+        assert "# TYPE admission_rejected_total counter" in response.text
@@ -0,0 +1,128 @@
+"""
+Tests for the native artifact bundle
+"""
+
+import json
+import pickle
+
+import pytest
+import numpy as np
+
+import api.predictor
+from api.artifacts import export_bundle, load_bundle, MANIFEST_FILE, MODEL_FILE
+from api.config import MODEL_PATH
+from api.input_quality import InputBounds
+from api.predictor import CreditScorePredictor, load_feature_names
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    """
+    Pickled sklearn pipeline the bundle is exported from
+
+    Returns
+    -------
+    Pipeline
+        The scaler + LightGBM pipeline
+    """
+    with open(MODEL_PATH, 'rb') as f:
+        return pickle.load(f)
+
+
+@pytest.fixture(scope="module")
+def bundle_dir(tmp_path_factory):
+    """
+    Native bundle exported from the pickled model
+
+    Returns
+    -------
+    Path
+        Bundle directory
+    """
+    return export_bundle(tmp_path_factory.mktemp("bundle"))
+
+
+@pytest.fixture
+def feature_matrix(pipeline):
+    """
+    Random features around the training range, with missing values and zeros
+
+    Returns
+    -------
+    np.ndarray
+        Features matrix in model order
+    """
+    scaler = pipeline.steps[0][1]
+    rng = np.random.default_rng(42)
+    X = scaler.data_min_ + scaler.data_range_ * rng.uniform(-0.2, 1.2, size=(300, len(scaler.scale_)))
+    X[rng.random(X.shape) < 0.3] = np.nan
+    X[rng.random(X.shape) < 0.1] = 0.0
+    return X
+
+
+class TestArtifactBundle:
+    """Tests for export and loading of the native bundle"""
+
+    def test_export_writes_manifest_and_native_model(self, bundle_dir):
+        """Test that the bundle contains a manifest and LightGBM's model file"""
+        with open(bundle_dir / MANIFEST_FILE) as f:
+            manifest = json.load(f)
+
+        assert manifest["num_features"] == len(load_feature_names())
+        assert manifest["num_trees"] > 0
+        assert (bundle_dir / MODEL_FILE).read_text().startswith("tree\n")
+        for filename in manifest["files"]["arrays"].values():
+            assert (bundle_dir / filename).is_file()
+
+    def test_predictions_match_pipeline(self, bundle_dir, pipeline, feature_matrix):
+        """Test that the native model reproduces the pickled pipeline"""
+        model, feature_names = load_bundle(bundle_dir)
+
+        expected = pipeline.predict_proba(feature_matrix)
+        actual = model.predict_proba(feature_matrix)
+
+        assert feature_names == load_feature_names()
+        np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12)
+
+    def test_float32_predictions_match_pipeline(self, bundle_dir, pipeline, feature_matrix):
+        """Test that float32 input is scored like the pipeline scores it"""
+        model, _ = load_bundle(bundle_dir)
+        X = feature_matrix.astype(np.float32)
+
+        assert model.transform(X).dtype == np.float32
+        np.testing.assert_allclose(
+            model.predict_proba(X), pipeline.predict_proba(X), rtol=0, atol=1e-12
+        )
+
+    def test_bundle_keeps_training_range(self, bundle_dir, pipeline):
+        """Test that the bundle flags inputs exactly like the pipeline"""
+        model, feature_names = load_bundle(bundle_dir)
+
+        from_bundle = InputBounds.from_model(model, feature_names)
+        from_pipeline = InputBounds.from_model(pipeline, feature_names)
+
+        np.testing.assert_array_equal(from_bundle.low, pipeline.steps[0][1].data_min_)
+        np.testing.assert_array_equal(from_bundle.high, pipeline.steps[0][1].data_max_)
+        np.testing.assert_array_equal(from_bundle.missing_unexpected, from_pipeline.missing_unexpected)
+
+    def test_unsupported_format_version_is_rejected(self, bundle_dir, tmp_path):
+        """Test that a bundle from another format version is refused"""
+        manifest = json.loads((bundle_dir / MANIFEST_FILE).read_text())
+        manifest["format_version"] = 999
+        (tmp_path / MANIFEST_FILE).write_text(json.dumps(manifest))
+
+        with pytest.raises(ValueError):
+            load_bundle(tmp_path)
+
+    def test_predictor_prefers_bundle(self, bundle_dir, pipeline, sample_features, monkeypatch):
+        """Test that the predictor loads the bundle when present"""
+        monkeypatch.setattr(api.predictor, "ARTIFACT_BUNDLE_DIR", str(bundle_dir))
+
+        predictor = CreditScorePredictor()
+        X = predictor._prepare_features(sample_features)
+
+        assert predictor.artifact_source == "bundle"
+        assert predictor.load_seconds is not None
+        assert predictor.predict_proba(sample_features)[1] == pytest.approx(
+            pipeline.predict_proba(X)[0, 1], abs=1e-12
+        )
@@ -0,0 +1,286 @@
+"""
+Tests for the prediction audit log
+"""
+
+import json
+import time
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from fastapi import status
+
+import api.audit
+import api.predictor
+from api.audit import DROP, PARQUET, REJECT, AuditBackpressureError, AuditSink, features_digest, read_audit
+from api.score_monitor import SCORE_MONITOR
+from tests.test_jobs import wait_for_job
+
+
+def _decisions(count, features=None):
+    """Decisions of `count` clients"""
+    return [
+        {
+            "client_id": str(i),
+            "features": features or {"EXT_SOURCE_2": i / 10},
+            "probability_default": 0.1,
+            "decision": "APPROVED"
+        }
+        for i in range(count)
+    ]
+
+
+def _ndjson_rows(directory):
+    """Records of every NDJSON audit file"""
+    return [
+        json.loads(line)
+        for path in sorted(directory.glob("*.ndjson"))
+        for line in path.read_text().splitlines()
+    ]
+
+
+@pytest.fixture
+def audit_dir(tmp_path, monkeypatch):
+    """
+    Audit log directory of the serving process
+
+    Returns
+    -------
+    Path
+        Directory the API writes its audit log to
+    """
+    directory = tmp_path / "audit"
+    monkeypatch.setattr(api.audit, "AUDIT_LOG_DIR", str(directory))
+    yield directory
+    api.audit.shutdown_audit_sink()
+
+
+class TestAuditSink:
+    """Tests for AuditSink"""
+
+    def test_records_are_written_in_batches(self, tmp_path):
+        """Test that queued records reach the NDJSON file with a features hash"""
+        sink = AuditSink(str(tmp_path), batch_size=2, flush_interval=60)
+        features = {"b": 2.0, "a": 1.0}
+
+        sink.record("predict_batch", _decisions(3, features), 0.5, "abc")
+        sink.close()
+
+        rows = _ndjson_rows(tmp_path)
+        assert len(rows) == 3
+        assert len({row["request_id"] for row in rows}) == 1
+        assert rows[0]["features_sha256"] == features_digest({"a": 1.0, "b": 2.0})
+        assert rows[0]["artifact_id"] == "abc"
+        assert rows[0]["features"] is None
+
+    def test_files_rotate(self, tmp_path):
+        """Test that a new file is started once the size limit is reached"""
+        sink = AuditSink(str(tmp_path), batch_size=1, flush_interval=60, rotate_bytes=1)
+
+        sink.record("predict", _decisions(3), 0.5, None)
+        sink.close()
+
+        assert len(list(tmp_path.glob("*.ndjson"))) == 3
+        assert len(_ndjson_rows(tmp_path)) == 3
+
+    def test_parquet_with_features(self, tmp_path):
+        """Test Parquet files, complete only once closed, with the sparse features"""
+        sink = AuditSink(str(tmp_path), fmt=PARQUET, features="full", flush_interval=0.01)
+
+        sink.record("predict", _decisions(2), 0.5, None)
+        sink.close()
+
+        [path] = tmp_path.glob("*.parquet")
+        table = pq.read_table(path)
+        assert table.num_rows == 2
+        assert json.loads(table.column("features")[1].as_py()) == {"EXT_SOURCE_2": 0.1}
+        assert not list(tmp_path.glob("*.tmp"))
+
+    @pytest.mark.parametrize("fmt", ["ndjson", PARQUET])
+    def test_sinks_sharing_a_directory(self, tmp_path, fmt):
+        """Test that two writers started in the same second keep separate files"""
+        first = AuditSink(str(tmp_path), fmt=fmt, flush_interval=0.01)
+        second = AuditSink(str(tmp_path), fmt=fmt, flush_interval=0.01)
+
+        first.record("predict", _decisions(2), 0.5, None)
+        second.record("predict", _decisions(3), 0.5, None)
+        first.close()
+        second.close()
+
+        assert len(list(tmp_path.glob("audit-*." + fmt))) == 2
+        assert len(list(read_audit(str(tmp_path)))) == 5
+
+    def test_parquet_close_does_not_replace(self, tmp_path):
+        """Test that a closed Parquet file never overwrites an existing one"""
+        sink = AuditSink(str(tmp_path), fmt=PARQUET, flush_interval=0.01)
+        sink.record("predict", _decisions(2), 0.5, None)
+        deadline = time.monotonic() + 5
+        while not list(tmp_path.glob("*.parquet.tmp")) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        [tmp] = tmp_path.glob("*.parquet.tmp")
+        taken = tmp.with_name(tmp.name[:-len(".tmp")])
+        taken.write_text("earlier file")
+
+        sink.close()
+
+        assert taken.read_text() == "earlier file"
+        [closed] = set(tmp_path.glob("*.parquet")) - {taken}
+        assert pq.read_table(closed).num_rows == 2
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_parquet_published_while_running(self, tmp_path):
+        """Test that Parquet records become readable without rotation or shutdown"""
+        sink = AuditSink(str(tmp_path), fmt=PARQUET, flush_interval=0.01, publish_interval=0.05)
+
+        sink.record("predict", _decisions(2), 0.5, None)
+        deadline = time.monotonic() + 5
+        while len(list(read_audit(str(tmp_path)))) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert len(list(read_audit(str(tmp_path)))) == 2
+        sink.record("predict", _decisions(1), 0.5, None)
+        sink.close()
+        assert len(list(tmp_path.glob("*.parquet"))) == 2
+        assert len(list(read_audit(str(tmp_path)))) == 3
+
+    def test_reservations(self, tmp_path):
+        """Test that reserved space is held until recorded or released"""
+        sink = AuditSink(str(tmp_path), queue_size=3, flush_interval=60, overflow=REJECT)
+
+        with sink.reserve(2) as reservation:
+            with pytest.raises(AuditBackpressureError):
+                sink.reserve(2)
+            assert reservation.record("predict", _decisions(2), 0.5, None)
+        with sink.reserve(1):
+            pass
+        sink.reserve(1).release()
+
+        assert sink.pending == 2
+        assert sink.reserve(1).count == 1
+        sink.close()
+
+    def test_wait_for_space(self, tmp_path):
+        """Test that background writers can wait for the queue to drain"""
+        sink = AuditSink(str(tmp_path), queue_size=1, batch_size=1, flush_interval=60, overflow=REJECT)
+        with sink.reserve(1):
+            assert not sink.wait_for_space(1, timeout=0.01)
+
+        assert sink.wait_for_space(1, timeout=5)
+        sink.close()
+
+    def test_overflow_drop(self, tmp_path):
+        """Test that records beyond the queue size are dropped"""
+        sink = AuditSink(str(tmp_path), queue_size=2, batch_size=100, flush_interval=60, overflow=DROP)
+
+        assert sink.record("predict", _decisions(2), 0.5, None)
+        assert not sink.record("predict", _decisions(1), 0.5, None)
+        sink.close()
+
+        assert len(_ndjson_rows(tmp_path)) == 2
+
+    def test_overflow_reject(self, tmp_path):
+        """Test that the reject policy raises instead of dropping"""
+        sink = AuditSink(str(tmp_path), queue_size=1, batch_size=100, flush_interval=60, overflow=REJECT)
+
+        with pytest.raises(AuditBackpressureError):
+            sink.record("predict", _decisions(2), 0.5, None)
+        sink.close()
+
+    def test_invalid_format(self, tmp_path):
+        """Test that an unknown format is rejected"""
+        with pytest.raises(ValueError):
+            AuditSink(str(tmp_path), fmt="csv")
+
+
+class TestReadAudit:
+    """Tests for read_audit"""
+
+    def test_reads_both_formats(self, tmp_path):
+        """Test that NDJSON and Parquet records come back with their features"""
+        for fmt in ("ndjson", PARQUET):
+            sink = AuditSink(str(tmp_path), fmt=fmt, features="full", flush_interval=0.01)
+            sink.record("predict", _decisions(2), 0.5, None)
+            sink.close()
+
+        records = list(read_audit(str(tmp_path), batch_size=1))
+
+        assert len(records) == 4
+        assert [record["features"] for record in records[:2]] == [{"EXT_SOURCE_2": 0.0}, {"EXT_SOURCE_2": 0.1}]
+        assert [record["features"] for record in records[2:]] == [{"EXT_SOURCE_2": 0.0}, {"EXT_SOURCE_2": 0.1}]
+
+    def test_time_range_and_malformed_lines(self, tmp_path):
+        """Test that records are filtered by time and broken lines skipped"""
+        lines = [json.dumps({"timestamp": t, "features": None}) for t in (10.0, 20.0, 30.0)]
+        (tmp_path / "audit-1.ndjson").write_text("\n".join(lines[:2] + ["{broken", lines[2]]) + "\n")
+        (tmp_path / "audit-2.parquet.tmp").write_text("being written")
+
+        records = list(read_audit(str(tmp_path), since=20.0, until=30.0))
+
+        assert [record["timestamp"] for record in records] == [20.0]
+
+
+class TestAuditEndpoints:
+    """Tests for auditing the scoring endpoints"""
+
+    def test_every_decision_is_recorded(self, client, audit_dir, sample_client_request, sample_features):
+        """Test that single and batch decisions are audited with the model identity"""
+        client.post("/predict", json=sample_client_request)
+        client.post("/predict/batch", json={"clients": [{"features": sample_features}] * 2})
+        api.audit.shutdown_audit_sink()
+
+        rows = _ndjson_rows(audit_dir)
+        assert [row["endpoint"] for row in rows] == ["predict", "predict_batch", "predict_batch"]
+        assert rows[0]["client_id"] == sample_client_request["client_id"]
+        assert rows[0]["artifact_id"] == api.predictor.get_predictor().artifact_id
+        # Hashed as validated: numbers are floats
+        assert rows[0]["features_sha256"] == features_digest({k: float(v) for k, v in sample_features.items()})
+
+    def test_job_decisions_are_recorded(self, client, audit_dir, sample_features):
+        """Test that decisions of jobs, submitted as records or as a file, are audited"""
+        frame = pd.DataFrame([sample_features, sample_features])
+        frame.insert(0, "client_id", ["A", "B"])
+        upload = {"file": ("clients.csv", frame.to_csv(index=False), "text/csv")}
+
+        records_job = client.post("/jobs", json={"clients": [{"client_id": "C", "features": sample_features}]})
+        file_job = client.post("/jobs/upload", files=upload)
+        wait_for_job(client, records_job.json()["job_id"])
+        wait_for_job(client, file_job.json()["job_id"])
+        api.audit.shutdown_audit_sink()
+
+        rows = _ndjson_rows(audit_dir)
+        assert sorted(row["client_id"] for row in rows) == ["A", "B", "C"]
+        assert {row["endpoint"] for row in rows} == {"job"}
+        assert {row["artifact_id"] for row in rows} == {api.predictor.get_predictor().artifact_id}
+        # Rebuilt from the file: the model features, hashed as if sent to /predict
+        feature_index = api.predictor.get_predictor().feature_index
+        digests = {row["client_id"]: row["features_sha256"] for row in rows}
+        assert digests["C"] == features_digest({k: float(v) for k, v in sample_features.items()})
+        assert digests["A"] == digests["B"] == features_digest(
+            {k: float(v) for k, v in sample_features.items() if k in feature_index}
+        )
+
+    def test_saturated_audit_log_rejects(self, client, audit_dir, sample_client_request, monkeypatch):
+        """Test that a full queue with the reject policy answers 503"""
+        sink = api.audit.get_audit_sink()
+        monkeypatch.setattr(sink, "overflow", REJECT)
+        monkeypatch.setattr(sink, "queue_size", 0)
+
+        response = client.post("/predict", json=sample_client_request)
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert "Retry-After" in response.headers
+
+    def test_rejected_requests_are_not_scored(self, client, audit_dir, sample_client_request, sample_features,
+                                              monkeypatch):
+        """Test that the audit space is reserved before scoring, so monitors miss rejected decisions"""
+        sink = api.audit.get_audit_sink()
+        monkeypatch.setattr(sink, "overflow", REJECT)
+        monkeypatch.setattr(sink, "queue_size", 2)
+        SCORE_MONITOR.reset()
+
+        batch = client.post("/predict/batch", json={"clients": [{"features": sample_features}] * 3})
+        single = client.post("/predict", json=sample_client_request)
+
+        assert batch.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert single.status_code == status.HTTP_200_OK
+        assert SCORE_MONITOR.report()["windows"][0]["predictions"] == 1
@@ -0,0 +1,111 @@
+"""
+Tests for the offline batch scoring CLI
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from api.batch_score import FeatureMapper, score_file, main
+from api.predictor import get_predictor
+
+
+@pytest.fixture
+def portfolio_csv(tmp_path, sample_features):
+    """
+    Small portfolio CSV with an ID column and a column unknown to the model
+
+    Returns
+    -------
+    Tuple[Path, List[dict]]
+        CSV path and the feature dictionaries written to it
+    """
+    rows = [
+        sample_features,
+        {**sample_features, "EXT_SOURCE_2": 0.05, "EXT_SOURCE_3": 0.1},
+        {**sample_features, "EXT_SOURCE_3": 0.9},
+        {"EXT_SOURCE_2": 0.7},
+        {**sample_features, "DAYS_BIRTH": -9000},
+    ]
+    frame = pd.DataFrame(rows)
+    frame.insert(0, "SK_ID_CURR", range(100, 100 + len(rows)))
+    frame["NOT_A_MODEL_FEATURE"] = 1.0
+    path = tmp_path / "portfolio.csv"
+    frame.to_csv(path, index=False)
+    return path, rows
+
+
+class TestFeatureMapper:
+    """Tests for the column to feature mapping"""
+
+    def test_transform_places_columns_in_model_order(self):
+        """Test that known columns land in model positions and others are NaN"""
+        mapper = FeatureMapper(["A", "B", "C"], ["C", "ID", "A"])
+        chunk = pd.DataFrame({"C": [3.0], "ID": [7], "A": [1.0]})
+
+        X = mapper.transform(chunk)
+
+        assert mapper.missing_features == ["B"]
+        assert X[0, 0] == 1.0
+        assert np.isnan(X[0, 1])
+        assert X[0, 2] == 3.0
+
+
+class TestScoreFile:
+    """Tests for score_file"""
+
+    def test_decisions_match_predictor(self, tmp_path, portfolio_csv):
+        """Test that bulk scoring gives the same results as the API predictor"""
+        input_path, rows = portfolio_csv
+        output_path = tmp_path / "scores.csv"
+
+        summary = score_file(
+            str(input_path), str(output_path),
+            chunk_size=2, workers=1, id_column="SK_ID_CURR"
+        )
+        scores = pd.read_csv(output_path)
+        predictor = get_predictor()
+
+        assert summary["rows"] == len(rows)
+        assert summary["approved"] + summary["rejected"] == len(rows)
+        assert list(scores["SK_ID_CURR"]) == list(range(100, 100 + len(rows)))
+        for features, (_, scored) in zip(rows, scores.iterrows()):
+            _, proba_default = predictor.predict_proba(features)
+            prediction, decision = predictor.predict(features)
+            assert scored["probability_default"] == pytest.approx(proba_default)
+            assert scored["prediction"] == prediction
+            assert scored["decision"] == decision
+            assert scored["threshold_used"] == predictor.get_threshold()
+
+    def test_parquet_output_with_process_pool(self, tmp_path, portfolio_csv):
+        """Test Parquet output and multi-process scoring keep row order"""
+        input_path, rows = portfolio_csv
+        serial_path = tmp_path / "serial.csv"
+        parallel_path = tmp_path / "parallel.parquet"
+
+        score_file(str(input_path), str(serial_path), chunk_size=2, workers=1)
+        score_file(str(input_path), str(parallel_path), chunk_size=2, workers=2)
+
+        serial = pd.read_csv(serial_path)
+        parallel = pd.read_parquet(parallel_path)
+        assert len(parallel) == len(rows)
+        assert list(parallel["decision"]) == list(serial["decision"])
+        np.testing.assert_allclose(
+            parallel["probability_default"], serial["probability_default"]
+        )
+
+    def test_unknown_id_column(self, tmp_path, portfolio_csv):
+        """Test that a missing ID column is reported"""
+        input_path, _ = portfolio_csv
+
+        with pytest.raises(ValueError):
+            score_file(str(input_path), str(tmp_path / "out.csv"), id_column="MISSING")
+
+    def test_cli(self, tmp_path, portfolio_csv):
+        """Test the command-line entry point"""
+        input_path, rows = portfolio_csv
+        output_path = tmp_path / "cli.csv"
+
+        main([str(input_path), str(output_path), "--workers", "1", "--chunk-size", "3"])
+
+        assert len(pd.read_csv(output_path)) == len(rows)
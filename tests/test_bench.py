@@ -0,0 +1,85 @@
+"""
+Tests for the benchmark runner and its regression gate
+"""
+
+import time
+
+import pytest
+
+from api.predictor import CreditScorePredictor
+from tests.bench.cases import predictor_cases, sparse_clients
+from tests.bench.runner import build_report, compare, load_report, run_benchmark, write_report
+
+
+def _report(**stats):
+    """Report with one benchmark case"""
+    result = {"name": "case", "p50_seconds": 0.01, "p99_seconds": 0.02, "throughput_per_second": 100.0}
+    result.update(stats)
+    return build_report([result])
+
+
+class TestRunner:
+    """Tests for timing benchmark cases"""
+
+    def test_statistics(self):
+        """Test the call count, percentiles and throughput"""
+        result = run_benchmark("sleep", lambda: time.sleep(0.001), items_per_call=10, min_calls=20, min_time=0)
+
+        assert result["calls"] == 20
+        assert 0.001 <= result["p50_seconds"] <= result["p99_seconds"]
+        assert result["throughput_per_second"] == pytest.approx(10 / result["mean_seconds"])
+
+    def test_report_round_trip(self, tmp_path):
+        """Test that reports are written and read back as JSON"""
+        path = str(tmp_path / "report.json")
+        report = _report()
+
+        write_report(report, path)
+
+        assert load_report(path) == report
+        assert load_report(str(tmp_path / "missing.json")) is None
+
+
+class TestCompare:
+    """Tests for the baseline comparison"""
+
+    def test_within_tolerance(self):
+        """Test that small variations are not flagged"""
+        current = _report(p50_seconds=0.011, throughput_per_second=95.0)
+
+        assert compare(current, _report(), tolerance=0.2) == []
+
+    def test_regressions_are_flagged(self):
+        """Test that slower latencies and lower throughput are flagged"""
+        current = _report(p99_seconds=0.03, throughput_per_second=50.0)
+
+        regressions = compare(current, _report(), tolerance=0.2)
+
+        assert {r["statistic"] for r in regressions} == {"p99_seconds", "throughput_per_second"}
+
+    def test_improvements_and_new_cases_pass(self):
+        """Test that faster results and cases missing from the baseline are accepted"""
+        current = _report(p50_seconds=0.001, throughput_per_second=1000.0)
+        current["benchmarks"]["new"] = dict(current["benchmarks"]["case"], name="new")
+
+        assert compare(current, _report()) == []
+
+
+class TestCases:
+    """Tests for the benchmark cases"""
+
+    def test_sparse_clients(self):
+        """Test that sparse clients fill a tenth of the features"""
+        names = [f"f{i}" for i in range(100)]
+
+        clients = sparse_clients(names, 3)
+
+        assert [len(client) for client in clients] == [10, 10, 10]
+
+    def test_predictor_cases_run(self):
+        """Test that every predictor case runs once"""
+        predictor = CreditScorePredictor()
+
+        for name, fn, items in predictor_cases(predictor):
+            if not name.startswith("shap") and items <= 100:
+                fn()
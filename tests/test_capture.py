@@ -0,0 +1,118 @@
+"""
+Tests for traffic capture and replay
+"""
+
+import asyncio
+import json
+
+import httpx
+from fastapi import status
+from fastapi.testclient import TestClient
+
+import api.main
+from api.capture import CaptureMiddleware, CaptureWriter, read_capture
+from tests.bench.loadgen import replay_requests, run_load, summarize, synthetic_requests
+
+
+def _captured_client(writer, sample_rate=1.0):
+    """Client of the API capturing with `writer`"""
+    return TestClient(CaptureMiddleware(api.main.app, writer, sample_rate=sample_rate))
+
+
+class TestCapture:
+    """Tests for the capture middleware"""
+
+    def test_scoring_requests_are_written(self, tmp_path, sample_client_request):
+        """Test that request bodies are written one per line"""
+        path = tmp_path / "capture.jsonl"
+        writer = CaptureWriter(str(path))
+        client = _captured_client(writer)
+
+        client.post("/predict", json=sample_client_request)
+        client.get("/health")
+        writer.close()
+
+        [record] = read_capture(str(path))
+        assert record["path"] == "/predict"
+        assert record["body"] == sample_client_request
+        assert record["status_code"] == status.HTTP_200_OK
+
+    def test_sampling(self, tmp_path, sample_client_request):
+        """Test that nothing is written at a zero sample rate"""
+        path = tmp_path / "capture.jsonl"
+        writer = CaptureWriter(str(path))
+        client = _captured_client(writer, sample_rate=0.0)
+
+        client.post("/predict", json=sample_client_request)
+        writer.close()
+
+        assert list(read_capture(str(path))) == []
+
+    def test_invalid_bodies_are_skipped(self, tmp_path):
+        """Test that the writer thread skips bodies that are not JSON"""
+        path = tmp_path / "capture.jsonl"
+        writer = CaptureWriter(str(path))
+
+        writer.write({"timestamp": 1.0, "path": "/predict", "body": b"{not json"})
+        writer.write({"timestamp": 2.0, "path": "/predict", "body": b'{"client_id": "1"}'})
+        writer.close()
+
+        assert [record["body"] for record in read_capture(str(path))] == [{"client_id": "1"}]
+
+    def test_full_queue_drops(self, tmp_path, sample_client_request):
+        """Test that requests are still served, uncaptured, when the queue is full"""
+        path = tmp_path / "capture.jsonl"
+        writer = CaptureWriter(str(path), queue_size=0)
+        client = _captured_client(writer)
+
+        response = client.post("/predict", json=sample_client_request)
+        writer.close()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not writer.write({"path": "/predict", "body": {}})
+        assert list(read_capture(str(path))) == []
+
+    def test_malformed_lines_are_skipped(self, tmp_path):
+        """Test that a truncated line does not stop reading"""
+        path = tmp_path / "capture.jsonl"
+        path.write_text(json.dumps({"path": "/predict", "body": {}}) + "\n{\"path\": \"/pre\n")
+
+        assert len(list(read_capture(str(path)))) == 1
+
+
+class TestLoadGenerator:
+    """Tests for the load generator"""
+
+    @staticmethod
+    def _run(requests, concurrency=2):
+        async def run():
+            transport = httpx.ASGITransport(app=api.main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await run_load(client, requests, concurrency=concurrency)
+        return asyncio.run(run())
+
+    def test_closed_loop(self):
+        """Test that every synthetic request is sent and summarized"""
+        requests = synthetic_requests([f"f{i}" for i in range(20)], 6)
+
+        summary = summarize(self._run(requests), elapsed=1.0)
+
+        assert summary["requests"] == 6
+        assert summary["status_codes"] == {"200": 6}
+        assert summary["error_rate"] == 0.0
+        assert summary["latency_seconds"]["p50"] <= summary["latency_seconds"]["max"]
+
+    def test_replay_schedule(self, tmp_path, sample_client_request):
+        """Test that a capture is replayed on its recorded schedule, sped up"""
+        path = tmp_path / "capture.jsonl"
+        writer = CaptureWriter(str(path))
+        for timestamp in (100.0, 101.0, 103.0):
+            writer.write({"timestamp": timestamp, "path": "/predict", "body": sample_client_request})
+        writer.write({"timestamp": 102.0, "path": "/predict", "body": {"features": "invalid"}})
+        writer.close()
+
+        requests = replay_requests(str(path), speed=10)
+        results = self._run(requests)
+
+        assert [request[0] for request in requests] == [0.0, 0.1, 0.2, 0.3]
+        assert summarize(results, elapsed=0.3)["error_rate"] == 0.25
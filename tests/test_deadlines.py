@@ -0,0 +1,144 @@
+"""
+Tests for request deadlines and cancellation
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import status
+
+from api.deadlines import (
+    CancellationToken,
+    DeadlineExceededError,
+    RequestCancelledError,
+    gather_guarded,
+    token_from_headers
+)
+from api.metrics import REGISTRY
+from api.scheduler import PriorityScheduler, BULK
+
+
+def cancelled_count(endpoint_class, reason, stage):
+    """Current value of the cancellation counter"""
+    counter = REGISTRY.counter("requests_cancelled_total", "", ("endpoint_class", "reason", "stage"))
+    return counter.get(endpoint_class, reason, stage)
+
+
+class _DisconnectedRequest:
+    """Request stub whose client has gone away"""
+
+    async def is_disconnected(self):
+        return True
+
+
+@pytest.fixture
+def blocked_scheduler():
+    """
+    Scheduler with one inference thread, blocked until released
+
+    Returns
+    -------
+    Tuple[PriorityScheduler, threading.Event]
+        The scheduler and the event releasing its blocking task
+    """
+    scheduler = PriorityScheduler(workers=1, weights={}, max_running={})
+    release = threading.Event()
+    scheduler.submit(BULK, release.wait, 5)
+    time.sleep(0.05)
+    yield scheduler, release
+    release.set()
+    scheduler.shutdown()
+
+
+class TestCancellationToken:
+    """Tests for CancellationToken"""
+
+    def test_header_sets_deadline(self):
+        """Test that the deadline header is a relative budget in seconds"""
+        token = token_from_headers("scoring", {"X-Request-Timeout": "2.5"})
+
+        assert 2.0 < token.remaining() <= 2.5
+        assert not token.cancelled
+
+    def test_no_header_means_no_deadline(self):
+        """Test that requests without the header never expire"""
+        token = token_from_headers("scoring", {})
+
+        assert token.remaining() is None
+        assert not token.cancelled
+
+    def test_invalid_header(self):
+        """Test that a non-positive budget is rejected"""
+        with pytest.raises(ValueError):
+            token_from_headers("scoring", {"X-Request-Timeout": "-1"})
+
+
+class TestQueuedWorkIsDropped:
+    """Tests for dropping abandoned work in the scheduler"""
+
+    def test_expired_task_does_not_run(self, blocked_scheduler):
+        """Test that a queued task past its deadline is dropped before execution"""
+        scheduler, release = blocked_scheduler
+        ran = []
+        token = CancellationToken(BULK, deadline=time.monotonic() + 0.01)
+        future = scheduler.submit(BULK, ran.append, "work", token=token)
+        before = cancelled_count(BULK, "deadline", "queued")
+
+        time.sleep(0.05)
+        release.set()
+
+        with pytest.raises(DeadlineExceededError):
+            future.result(timeout=5)
+        assert ran == []
+        assert cancelled_count(BULK, "deadline", "queued") == before + 1
+
+    def test_disconnect_stops_chunked_work(self, blocked_scheduler):
+        """Test that remaining chunks are dropped when the client disconnects"""
+        scheduler, release = blocked_scheduler
+        ran = []
+        token = CancellationToken(BULK)
+        futures = scheduler.submit_chunks(BULK, ran.append, list(range(6)), chunk_size=2, token=token)
+
+        with pytest.raises(RequestCancelledError):
+            asyncio.run(gather_guarded(futures, token, _DisconnectedRequest()))
+        release.set()
+        time.sleep(0.05)
+
+        assert token.reason == "disconnected"
+        assert ran == []
+
+
+class TestDeadlineEndpoints:
+    """Tests for deadline handling in the API"""
+
+    def test_expired_deadline_returns_504(self, client, sample_client_request):
+        """Test that a request whose budget is already spent gets 504"""
+        response = client.post(
+            "/predict",
+            json=sample_client_request,
+            headers={"X-Request-Timeout": "0.000001"}
+        )
+
+        assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+
+    def test_generous_deadline_succeeds(self, client, sample_batch_request):
+        """Test that requests within their budget are served normally"""
+        response = client.post(
+            "/predict/batch",
+            json=sample_batch_request,
+            headers={"X-Request-Timeout": "30"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_invalid_deadline_header(self, client, sample_client_request):
+        """Test that an unparsable deadline header is a client error"""
+        response = client.post(
+            "/predict",
+            json=sample_client_request,
+            headers={"X-Request-Timeout": "soon"}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,239 @@
+"""
+Tests for feature drift monitoring
+"""
+
+import json
+
+import numpy as np
+import pytest
+from fastapi import status
+
+import api.drift
+import api.predictor
+from api.drift import DriftMonitor, build_reference, load_reference, observe
+from api.predictor import get_predictor, reload_predictor, unmonitored
+from api.warmup import WarmUp
+
+FEATURES = ["a", "b", "c"]
+
+
+def _training_matrix(rows=5000, seed=0):
+    """Normal features, with a tenth of 'c' missing"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, len(FEATURES)))
+    X[rng.random(rows) < 0.1, 2] = np.nan
+    return X
+
+
+@pytest.fixture
+def drift_monitor(monkeypatch):
+    """
+    Drift monitor of the serving process, against a reference of random
+    training data for the model features
+
+    Returns
+    -------
+    DriftMonitor
+        Monitor fed by the serving predictor
+    """
+    feature_names = get_predictor().feature_names
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, len(feature_names)))
+    X[:, rng.random(len(feature_names)) < 0.5] = np.nan
+    monitor = DriftMonitor(build_reference(X, feature_names, n_bins=4))
+    monkeypatch.setattr(api.drift, "_monitor", monitor)
+    monkeypatch.setattr(api.drift, "_monitor_loaded", True)
+    return monitor
+
+
+class TestReference:
+    """Tests for build_reference"""
+
+    def test_quantile_bins(self):
+        """Test that each bin holds its share of the training rows"""
+        reference = build_reference(_training_matrix(), FEATURES, n_bins=4)
+
+        profile = reference["features"]["a"]
+        assert reference["rows"] == 5000
+        assert len(profile["edges"]) == 3
+        assert profile["proportions"] == pytest.approx([0.25] * 4, abs=0.01)
+        assert profile["missing"] == 0
+
+    def test_missing_share(self):
+        """Test that missing values have their own share"""
+        reference = build_reference(_training_matrix(), FEATURES, n_bins=4)
+
+        profile = reference["features"]["c"]
+        assert profile["missing"] == pytest.approx(0.1, abs=0.02)
+        assert sum(profile["proportions"]) + profile["missing"] == pytest.approx(1)
+
+    def test_few_distinct_values_merge_bins(self):
+        """Test that repeated quantiles give fewer bins"""
+        X = np.zeros((100, 1))
+        X[:10, 0] = 1
+
+        reference = build_reference(X, ["flag"], n_bins=10)
+
+        profile = reference["features"]["flag"]
+        assert profile["edges"] == [0.0]
+        assert profile["proportions"] == pytest.approx([0.9, 0.1])
+
+    def test_round_trip(self, tmp_path):
+        """Test that the profile survives JSON"""
+        path = tmp_path / "drift_reference.json"
+        reference = build_reference(_training_matrix(), FEATURES)
+        path.write_text(json.dumps(reference))
+
+        assert load_reference(str(path)) == reference
+        assert load_reference(str(tmp_path / "missing.json")) is None
+
+
+class TestDriftMonitor:
+    """Tests for DriftMonitor"""
+
+    def test_same_distribution_does_not_drift(self):
+        """Test that traffic like the training data scores low"""
+        monitor = DriftMonitor(build_reference(_training_matrix(), FEATURES))
+
+        monitor.observe(_training_matrix(seed=1))
+
+        scores = monitor.scores()
+        assert monitor.observed_rows == 5000
+        assert max(score["psi"] for score in scores) < 0.05
+        assert max(score["ks"] for score in scores) < 0.05
+
+    def test_shifted_feature_drifts(self):
+        """Test that a shifted feature comes first with a high PSI"""
+        monitor = DriftMonitor(build_reference(_training_matrix(), FEATURES))
+        X = _training_matrix(seed=1)
+        X[:, 1] += 1
+
+        monitor.observe(X)
+
+        scores = monitor.scores()
+        assert scores[0]["feature"] == "b"
+        assert scores[0]["psi"] > 0.2
+        assert scores[0]["ks"] > 0.3
+
+    def test_missing_values_drift(self):
+        """Test that a feature going missing is detected"""
+        monitor = DriftMonitor(build_reference(_training_matrix(), FEATURES))
+        X = _training_matrix(seed=1)
+        X[:, 0] = np.nan
+
+        monitor.observe(X)
+
+        scores = {score["feature"]: score for score in monitor.scores()}
+        assert scores["a"]["missing_current"] == 1
+        assert scores["a"]["psi"] > 1
+
+    def test_incremental_matches_bulk(self):
+        """Test that counting row by row equals counting at once"""
+        reference = build_reference(_training_matrix(), FEATURES)
+        X = _training_matrix(rows=300, seed=1)
+        one_by_one = DriftMonitor(reference)
+        bulk = DriftMonitor(reference)
+
+        for row in X:
+            one_by_one.observe(row[None, :])
+        bulk.observe(X)
+
+        assert one_by_one.scores() == bulk.scores()
+
+    def test_out_of_range_values_fall_in_outer_bins(self):
+        """Test that values beyond the training range are counted"""
+        monitor = DriftMonitor(build_reference(_training_matrix(), FEATURES, n_bins=4))
+
+        counts = monitor.bin_counts(np.array([[-1e9, 1e9, 0.0]]))
+
+        assert counts[0] == 1
+        assert counts[monitor.n_slots + 3] == 1
+
+    def test_reset(self):
+        """Test that reset forgets the observed rows"""
+        monitor = DriftMonitor(build_reference(_training_matrix(), FEATURES))
+        monitor.observe(_training_matrix(seed=1))
+
+        monitor.reset()
+
+        assert monitor.observed_rows == 0
+        assert monitor.scores() == []
+
+
+class TestObserve:
+    """Tests for the serving-path hook"""
+
+    def test_predictions_are_observed(self, drift_monitor, sample_features):
+        """Test that single and batch scoring feed the monitor"""
+        predictor = get_predictor()
+
+        predictor.predict_proba(sample_features)
+        predictor.predict_proba_batch([sample_features] * 3)
+
+        assert drift_monitor.observed_rows == 4
+
+    def test_other_feature_order_is_ignored(self, drift_monitor):
+        """Test that rows in another column order are not counted"""
+        observe(np.zeros((2, 3)), FEATURES)
+
+        assert drift_monitor.observed_rows == 0
+
+    def test_reference_checked_at_load(self, monkeypatch, sample_features):
+        """Test that a reference of another feature order is rejected when the model loads"""
+        monitor = DriftMonitor(build_reference(_training_matrix(), FEATURES, n_bins=4))
+        monkeypatch.setattr(api.drift, "_monitor", monitor)
+        monkeypatch.setattr(api.drift, "_monitor_loaded", True)
+        # Reloads here replace no predictor; the serving one is restored after the test
+        monkeypatch.setattr(api.predictor, "_predictor", None)
+
+        predictor = reload_predictor()
+        predictor.predict_proba(sample_features)
+
+        assert monitor._checked == (predictor.feature_names, False)
+        assert monitor.observed_rows == 0
+
+    def test_unmonitored(self, drift_monitor, sample_features):
+        """Test that unmonitored scoring is not counted"""
+        with unmonitored():
+            get_predictor().predict_proba(sample_features)
+
+        assert drift_monitor.observed_rows == 0
+
+    def test_warmup_is_not_observed(self, drift_monitor):
+        """Test that synthetic warm-up traffic stays out of the histograms"""
+        warmup = WarmUp(rounds=1, batch_size=4)
+
+        warmup.run()
+
+        assert warmup.ready
+        assert drift_monitor.observed_rows == 0
+
+
+class TestDriftEndpoint:
+    """Tests for GET /monitoring/drift"""
+
+    def test_without_reference(self, client, monkeypatch):
+        """Test that drift is not available without a reference profile"""
+        monkeypatch.setattr(api.drift, "_monitor", None)
+        monkeypatch.setattr(api.drift, "_monitor_loaded", True)
+
+        response = client.get("/monitoring/drift")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_drift_of_scored_traffic(self, client, drift_monitor, sample_client_request):
+        """Test that scored requests show up in the drift report"""
+        client.post("/predict", json=sample_client_request)
+
+        response = client.get("/monitoring/drift", params={"top": 5})
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["reference_rows"] == 200
+        assert data["observed_rows"] == 1
+        assert len(data["features"]) == 5
+        psi = [feature["psi"] for feature in data["features"]]
+        assert psi == sorted(psi, reverse=True)
+        assert data["drifted_features"] == sum(
+            feature["psi"] > data["psi_threshold"] for feature in drift_monitor.scores()
+        )
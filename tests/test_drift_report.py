@@ -0,0 +1,152 @@
+"""
+Tests for the offline drift reports
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from api.audit import AuditSink
+from api.drift import load_reference_sample, write_reference_sample
+from api.drift_report import JSON, AuditSample, run
+
+FEATURES = ["a", "b", "c", "empty"]
+
+
+def _audited_decisions(count, shift=0.0, seed=1):
+    """Decisions of `count` clients, 'a' shifted and 'empty' never sent"""
+    rng = np.random.default_rng(seed)
+    decisions = []
+    for i in range(count):
+        proba_default = float(rng.random() * 0.5 + shift / 4)
+        features = {"a": float(rng.normal() + shift), "b": float(rng.normal())}
+        if rng.random() > 0.1:
+            features["c"] = float(rng.normal())
+        decisions.append({
+            "client_id": str(i),
+            "features": features,
+            "probability_default": proba_default,
+            "decision": "REJECTED" if proba_default > 0.3 else "APPROVED"
+        })
+    return decisions
+
+
+@pytest.fixture
+def reference_path(tmp_path):
+    """
+    Raw reference rows of the features
+
+    Returns
+    -------
+    str
+        Parquet path
+    """
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, len(FEATURES)))
+    X[:, 3] = np.nan
+    path = tmp_path / "reference.parquet"
+    write_reference_sample(str(path), X, FEATURES, rng.random(400) * 0.5)
+    return str(path)
+
+
+@pytest.fixture
+def audit_log(tmp_path):
+    """
+    Audit log with features, of traffic where 'a' has shifted
+
+    Returns
+    -------
+    str
+        Audit log directory
+    """
+    directory = tmp_path / "audit"
+    sink = AuditSink(str(directory), features="full", flush_interval=0.01, rotate_bytes=20000)
+    sink.record("predict_batch", _audited_decisions(300, shift=2.0), 0.3, None)
+    sink.close()
+    return str(directory)
+
+
+class TestAuditSample:
+    """Tests for AuditSample"""
+
+    def test_keeps_everything_below_size(self):
+        """Test that all records are kept when fewer than the sample size"""
+        sample = AuditSample(FEATURES, size=10)
+
+        sample.extend(_audited_decisions(5))
+
+        frame = sample.to_frame()
+        assert len(frame) == 5
+        assert list(frame.columns) == FEATURES + ["probability_default", "decision"]
+        assert frame["empty"].isna().all()
+
+    def test_fixed_size_uniform_and_reproducible(self):
+        """Test that the sample size is bounded and the draw depends on the seed only"""
+        records = [
+            {"features": {"a": float(i)}, "probability_default": 0.1, "decision": "APPROVED"}
+            for i in range(5000)
+        ]
+
+        first = AuditSample(FEATURES, size=500, seed=3).extend(records).to_frame()
+        second = AuditSample(FEATURES, size=500, seed=3).extend(records).to_frame()
+
+        assert len(first) == 500
+        assert first["a"].tolist() == second["a"].tolist()
+        assert first["a"].mean() == pytest.approx(2500, rel=0.1)
+
+    def test_records_without_features_are_counted(self):
+        """Test that hash-only records are skipped"""
+        sample = AuditSample(FEATURES, size=10)
+
+        sample.add({"features": None, "probability_default": 0.1, "decision": "APPROVED"})
+
+        assert sample.seen == 0
+        assert sample.without_features == 1
+
+
+class TestRun:
+    """Tests for the report job"""
+
+    def test_reports(self, tmp_path, reference_path, audit_log):
+        """Test that the shifted feature drifts and the reports are written"""
+        summary = run(audit_log, output_dir=str(tmp_path / "reports"), reference_path=reference_path, sample=200)
+
+        assert summary["audited_records"] == 300
+        assert summary["sampled_records"] == 200
+        assert summary["threshold"] == 0.3
+        assert summary["empty_features"] == ["empty"]
+        assert summary["compared_features"] == 3
+        assert len(summary["paths"]) == 4
+        path = next(p for p in summary["paths"] if "data_drift" in p and p.endswith(".json"))
+        with open(path) as f:
+            data_drift = json.load(f)
+        table = next(m["result"] for m in data_drift["metrics"] if m["metric"] == "DataDriftTable")
+        assert table["drift_by_columns"]["a"]["drift_detected"]
+        assert not table["drift_by_columns"]["b"]["drift_detected"]
+
+    def test_selected_columns(self, tmp_path, reference_path, audit_log):
+        """Test that only the requested features are compared"""
+        summary = run(
+            audit_log, output_dir=str(tmp_path / "reports"), reference_path=reference_path,
+            formats=(JSON,), columns=["b"]
+        )
+
+        assert summary["compared_features"] == 1
+        assert summary["drifted_features"] == 0
+        assert all(path.endswith(".json") for path in summary["paths"])
+
+    def test_without_features(self, tmp_path, reference_path):
+        """Test that a hash-only audit log is refused"""
+        sink = AuditSink(str(tmp_path / "audit"), flush_interval=0.01)
+        sink.record("predict", _audited_decisions(3), 0.5, None)
+        sink.close()
+
+        with pytest.raises(ValueError, match="AUDIT_FEATURES=full"):
+            run(str(tmp_path / "audit"), output_dir=str(tmp_path / "reports"), reference_path=reference_path)
+
+    def test_without_reference(self, tmp_path, audit_log):
+        """Test that the job needs the reference rows"""
+        assert load_reference_sample(str(tmp_path / "missing.parquet")) is None
+        with pytest.raises(FileNotFoundError):
+            run(audit_log, reference_path=str(tmp_path / "missing.parquet"))
@@ -0,0 +1,181 @@
+"""
+Tests for outcome feedback and threshold optimisation
+"""
+
+import json
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import api.feedback
+import api.predictor
+from api.audit import AuditSink
+from api.config import THRESHOLD_PATH
+from api.feedback import business_cost, cost_curve, join_audit, load_outcomes, main, optimal_threshold
+from api.manifest import artifact_files, load_manifest, write_manifest
+from api.predictor import CreditScorePredictor
+
+
+def _outcomes(rows=2000, seed=0):
+    """Scores rounded to 2 decimals (many ties) and outcomes that follow them"""
+    rng = np.random.default_rng(seed)
+    proba_default = np.round(rng.beta(2, 5, size=rows), 2)
+    defaulted = (rng.random(rows) < proba_default).astype(np.int8)
+    return proba_default, defaulted
+
+
+@pytest.fixture
+def served_threshold(tmp_path, monkeypatch):
+    """
+    Copy of the threshold file, with a manifest of the artifacts using it,
+    both loaded by new predictors
+
+    Returns
+    -------
+    Tuple[Path, Path]
+        (threshold file, manifest)
+    """
+    threshold_path = tmp_path / "optimal_threshold.json"
+    shutil.copy(THRESHOLD_PATH, threshold_path)
+    manifest_path = tmp_path / "artifacts_manifest.json"
+    write_manifest(str(manifest_path), artifact_files(threshold_path=str(threshold_path)))
+    monkeypatch.setattr(api.feedback, "THRESHOLD_PATH", str(threshold_path))
+    monkeypatch.setattr(api.predictor, "THRESHOLD_PATH", str(threshold_path))
+    monkeypatch.setattr(api.predictor, "ARTIFACT_MANIFEST_PATH", str(manifest_path))
+    return threshold_path, manifest_path
+
+
+class TestCostCurve:
+    """Tests for cost_curve and optimal_threshold"""
+
+    def test_curve_matches_direct_costs(self):
+        """Test that every point of the curve is the cost of its threshold"""
+        proba_default, defaulted = _outcomes()
+
+        curve = cost_curve(proba_default, defaulted, fn_cost=1, fp_cost=10)
+
+        assert np.all(np.diff(curve["threshold"]) > 0)
+        for threshold, cost in zip(curve["threshold"], curve["cost"]):
+            assert cost == business_cost(proba_default, defaulted, threshold, fn_cost=1, fp_cost=10)
+
+    def test_optimum_beats_a_grid(self):
+        """Test that no grid threshold costs less than the optimum"""
+        proba_default, defaulted = _outcomes(rows=5000, seed=1)
+
+        result = optimal_threshold(proba_default, defaulted, fn_cost=1, fp_cost=10)
+
+        grid = [business_cost(proba_default, defaulted, t, fn_cost=1, fp_cost=10) for t in np.linspace(0, 1, 201)]
+        assert result["cost"] <= min(grid)
+        assert result["cost"] == business_cost(proba_default, defaulted, result["threshold"], fn_cost=1, fp_cost=10)
+        assert result["rows"] == 5000
+        assert result["defaults"] == int(defaulted.sum())
+
+    def test_threshold_between_close_scores(self):
+        """Test that the reported cost is the cost of the returned threshold"""
+        proba_default = np.array([0.1000001, 0.1000004, 0.5])
+        defaulted = np.array([0, 1, 1])
+
+        result = optimal_threshold(proba_default, defaulted)
+
+        assert result["cost"] == 0
+        assert business_cost(proba_default, defaulted, result["threshold"]) == result["cost"]
+
+    def test_costlier_defaults_lower_the_threshold(self):
+        """Test that a dearer approved defaulter means rejecting more clients"""
+        proba_default, defaulted = _outcomes()
+
+        cautious = optimal_threshold(proba_default, defaulted, fn_cost=1, fp_cost=10)
+        lenient = optimal_threshold(proba_default, defaulted, fn_cost=1, fp_cost=1)
+
+        assert cautious["threshold"] < lenient["threshold"]
+        assert cautious["approval_rate"] < lenient["approval_rate"]
+
+    def test_extreme_thresholds(self):
+        """Test that approving everyone or no one can be optimal"""
+        proba_default = np.array([0.2, 0.4, 0.6])
+
+        assert optimal_threshold(proba_default, np.zeros(3))["approval_rate"] == 1
+        assert optimal_threshold(proba_default, np.ones(3))["approval_rate"] == 0
+
+    def test_no_outcomes(self):
+        """Test that an empty set of outcomes is refused"""
+        with pytest.raises(ValueError):
+            optimal_threshold(np.empty(0), np.empty(0))
+
+
+class TestOutcomes:
+    """Tests for reading outcomes and matching them with served scores"""
+
+    def test_load_outcomes(self, tmp_path):
+        """Test that unlabeled rows are dropped and the last duplicate kept"""
+        path = tmp_path / "outcomes.csv"
+        pd.DataFrame({"client_id": ["007", "8", "9", "8"], "TARGET": [1, None, 0, 1]}).to_csv(path, index=False)
+
+        client_ids, defaulted, proba_default = load_outcomes(str(path))
+
+        assert client_ids.tolist() == ["007", "9", "8"]
+        assert defaulted.tolist() == [1, 0, 1]
+        assert proba_default is None
+
+    def test_invalid_outcomes(self, tmp_path):
+        """Test that outcomes other than 0 and 1 are refused"""
+        path = tmp_path / "outcomes.parquet"
+        pd.DataFrame({"client_id": [1, 2], "TARGET": [0, 2]}).to_parquet(path)
+
+        with pytest.raises(ValueError, match="0 or 1"):
+            load_outcomes(str(path))
+
+    def test_join_audit_keeps_latest_score(self, tmp_path, monkeypatch):
+        """Test that each client gets the last probability served to it"""
+        monkeypatch.setattr(api.feedback, "_JOIN_BATCH", 2)
+        sink = AuditSink(str(tmp_path), flush_interval=0.01)
+        for proba_default in (0.1, 0.7):
+            sink.record("predict", [
+                {"client_id": client_id, "features": {}, "probability_default": proba_default, "decision": "APPROVED"}
+                for client_id in ("a", "b")
+            ], 0.5, None)
+        sink.close()
+
+        joined = join_audit(np.array(["b", "a", "never"]), str(tmp_path))
+
+        assert joined[:2].tolist() == [0.7, 0.7]
+        assert np.isnan(joined[2])
+
+
+class TestMain:
+    """Tests for the command line"""
+
+    def test_threshold_is_written_and_loadable(self, tmp_path, served_threshold):
+        """Test that the new threshold passes manifest verification at load"""
+        threshold_path, manifest_path = served_threshold
+        proba_default, defaulted = _outcomes()
+        outcomes = tmp_path / "outcomes.parquet"
+        pd.DataFrame({
+            "client_id": np.arange(len(defaulted)),
+            "TARGET": defaulted,
+            "probability_default": proba_default
+        }).to_parquet(outcomes)
+
+        main([str(outcomes), "--manifest", str(manifest_path)])
+
+        expected = optimal_threshold(proba_default, defaulted)["threshold"]
+        assert json.loads(threshold_path.read_text())["threshold"] == expected
+        assert load_manifest(str(manifest_path))["threshold"] == expected
+        predictor = CreditScorePredictor()
+        assert predictor.threshold == expected
+        assert predictor.artifact_id == load_manifest(str(manifest_path))["artifact_id"]
+
+    def test_dry_run(self, tmp_path, served_threshold):
+        """Test that a dry run leaves the threshold alone"""
+        threshold_path, _ = served_threshold
+        before = threshold_path.read_text()
+        outcomes = tmp_path / "outcomes.csv"
+        pd.DataFrame({"client_id": [1, 2], "TARGET": [0, 1], "probability_default": [0.1, 0.9]}).to_csv(
+            outcomes, index=False
+        )
+
+        main([str(outcomes), "--dry-run"])
+
+        assert threshold_path.read_text() == before
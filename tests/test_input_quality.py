@@ -0,0 +1,157 @@
+"""
+Tests for the input quality checks
+"""
+
+import numpy as np
+import pytest
+from fastapi import status
+
+from api.input_quality import (
+    OUT_OF_RANGE, UNEXPECTED_MISSING, InputBounds, _checked_rows, _flagged_rows, _flagged_values, collect
+)
+from api.predictor import get_predictor
+
+
+@pytest.fixture
+def bounds():
+    """
+    Bounds of three features: 'a' in [0, 1] and never missing, 'b' in
+    [-5, 5] and sometimes missing, 'c' unchecked
+
+    Returns
+    -------
+    InputBounds
+        Bounds
+    """
+    return InputBounds(
+        ["a", "b", "c"],
+        low=np.array([0.0, -5.0, np.nan]),
+        high=np.array([1.0, 5.0, np.nan]),
+        missing_unexpected=np.array([True, False, False])
+    )
+
+
+def _bounds_feature(predictor, flag):
+    """A feature of the serving model that can raise the given flag"""
+    bounds = predictor.input_bounds
+    if flag == UNEXPECTED_MISSING:
+        return predictor.feature_names[int(np.flatnonzero(bounds.missing_unexpected)[-1])]
+    return predictor.feature_names[int(np.flatnonzero(np.isfinite(bounds.high))[0])]
+
+
+class TestInputBounds:
+    """Tests for InputBounds"""
+
+    def test_check(self, bounds):
+        """Test that out-of-range and unexpected missing values are flagged"""
+        X = np.array([
+            [0.5, 0.0, 100.0],
+            [2.0, np.nan, 1.0],
+            [np.nan, -6.0, np.nan]
+        ])
+
+        flags = bounds.check(X)
+
+        np.testing.assert_array_equal(flags[OUT_OF_RANGE], [
+            [False, False, False], [True, False, False], [False, True, False]
+        ])
+        np.testing.assert_array_equal(flags[UNEXPECTED_MISSING], [
+            [False, False, False], [False, False, False], [True, False, False]
+        ])
+
+    def test_bounds_are_inclusive(self, bounds):
+        """Test that the training minimum and maximum are in range"""
+        flags = bounds.check(np.array([[0.0, 5.0, 0.0], [1.0, -5.0, 0.0]]))
+
+        assert not flags[OUT_OF_RANGE].any()
+
+    def test_names(self, bounds):
+        """Test that flags translate to feature names per row"""
+        X = np.array([[0.5, 0.0, 0.0], [np.nan, 9.0, 0.0]])
+
+        assert bounds.names(bounds.check(X)) == [
+            {OUT_OF_RANGE: [], UNEXPECTED_MISSING: []},
+            {OUT_OF_RANGE: ["b"], UNEXPECTED_MISSING: ["a"]}
+        ]
+
+    def test_record_counts_and_collects(self, bounds):
+        """Test that recorded matrices are counted, and collected on request"""
+        checked = _checked_rows.get()
+        rows = _flagged_rows.get(OUT_OF_RANGE)
+        values = _flagged_values.get(OUT_OF_RANGE)
+        X = np.array([[2.0, 9.0, 0.0], [0.5, 0.0, 0.0]])
+
+        with collect() as collected:
+            bounds.record(X)
+        bounds.record(X)
+
+        assert _checked_rows.get() == checked + 4
+        assert _flagged_rows.get(OUT_OF_RANGE) == rows + 2
+        assert _flagged_values.get(OUT_OF_RANGE) == values + 4
+        assert len(collected) == 2
+        assert collected[0][OUT_OF_RANGE] == ["a", "b"]
+
+    def test_float32_bounds(self):
+        """Test that a value at the bound stays in range once cast to float32"""
+        bounds = InputBounds(["a"], low=np.array([0.1]), high=np.array([0.7]),
+                             missing_unexpected=np.array([False]), dtype=np.float32)
+
+        flags = bounds.check(np.array([[0.7]], dtype=np.float32))
+
+        assert not flags[OUT_OF_RANGE].any()
+
+    def test_model_bounds(self):
+        """Test that the serving model exposes its training range"""
+        predictor = get_predictor()
+        bounds = predictor.input_bounds
+
+        assert bounds is not None
+        assert bounds.low.shape == (len(predictor.feature_names),)
+        assert np.all(bounds.low[np.isfinite(bounds.low)] <= bounds.high[np.isfinite(bounds.low)])
+        assert 0 < bounds.missing_unexpected.sum() < len(predictor.feature_names)
+
+
+class TestInputFlagsEndpoint:
+    """Tests for the input flags of /predict and /predict/batch"""
+
+    def test_flags_not_returned_by_default(self, client, sample_client_request):
+        """Test that flags are only returned on request"""
+        response = client.post("/predict", json=sample_client_request)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["input_flags"] is None
+
+    def test_predict_flags(self, client):
+        """Test that an out-of-range feature and absent features are reported"""
+        predictor = get_predictor()
+        feature = _bounds_feature(predictor, OUT_OF_RANGE)
+        high = float(predictor.input_bounds.high[predictor.feature_index[feature]])
+
+        response = client.post(
+            "/predict",
+            params={"include_input_flags": True},
+            json={"features": {feature: high * 10 + 1}}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        flags = response.json()["input_flags"]
+        assert flags["out_of_range"] == [feature]
+        assert _bounds_feature(predictor, UNEXPECTED_MISSING) in flags["unexpected_missing"]
+
+    def test_batch_flags_follow_client_order(self, client):
+        """Test that each client gets its own flags"""
+        predictor = get_predictor()
+        feature = _bounds_feature(predictor, OUT_OF_RANGE)
+        high = float(predictor.input_bounds.high[predictor.feature_index[feature]])
+        clients = [
+            {"client_id": str(i), "features": {feature: high * 10 + 1 if i % 2 else high}}
+            for i in range(6)
+        ]
+
+        response = client.post(
+            "/predict/batch", params={"include_input_flags": True}, json={"clients": clients}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        flags = [prediction["input_flags"]["out_of_range"] for prediction in response.json()["predictions"]]
+        assert flags == [[], [feature]] * 3
@@ -0,0 +1,169 @@
+"""
+Tests for background scoring jobs
+"""
+
+import io
+import threading
+import time
+
+import pytest
+import pandas as pd
+from fastapi import status
+
+import api.jobs
+from api.jobs import JobManager, JobQueueFullError, COMPLETED, CANCELLED, FAILED, ACTIVE_STATUSES
+
+
+def wait_for_job(client, job_id, timeout=30.0):
+    """Poll a job until it leaves the queued/running states"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        data = client.get(f"/jobs/{job_id}").json()
+        if data["status"] not in ACTIVE_STATUSES:
+            return data
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish in {timeout}s")
+
+
+class TestJobEndpoints:
+    """Tests for /jobs endpoints"""
+
+    def test_submit_and_download_results(self, client, sample_batch_request):
+        """Test that a job is accepted, completes and serves its results"""
+        response = client.post("/jobs", json=sample_batch_request)
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        job_id = response.json()["job_id"]
+
+        data = wait_for_job(client, job_id)
+        assert data["status"] == COMPLETED
+        assert data["processed_rows"] == len(sample_batch_request["clients"])
+        assert data["approved_count"] + data["rejected_count"] == data["processed_rows"]
+        assert data["results_url"] == f"/jobs/{job_id}/results"
+
+        results = client.get(data["results_url"])
+        assert results.status_code == status.HTTP_200_OK
+        frame = pd.read_csv(io.StringIO(results.text))
+        assert list(frame["client_id"]) == ["TEST_001", "TEST_002", "TEST_003"]
+
+    def test_results_match_batch_endpoint(self, client, sample_batch_request):
+        """Test that job decisions are identical to /predict/batch"""
+        job_id = client.post("/jobs", json=sample_batch_request).json()["job_id"]
+        wait_for_job(client, job_id)
+
+        frame = pd.read_csv(io.StringIO(client.get(f"/jobs/{job_id}/results").text))
+        batch = client.post("/predict/batch", json=sample_batch_request).json()
+
+        assert list(frame["decision"]) == [p["decision"] for p in batch["predictions"]]
+        for expected, actual in zip(batch["predictions"], frame["probability_default"]):
+            assert actual == pytest.approx(expected["probability_default"])
+
+    def test_upload_csv(self, client, sample_features):
+        """Test submitting a CSV file"""
+        frame = pd.DataFrame([sample_features, sample_features])
+        frame.insert(0, "client_id", ["A", "B"])
+        upload = {"file": ("clients.csv", frame.to_csv(index=False), "text/csv")}
+
+        response = client.post("/jobs/upload", files=upload)
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        data = wait_for_job(client, response.json()["job_id"])
+        assert data["status"] == COMPLETED
+        assert data["total_rows"] == 2
+
+    def test_unknown_job(self, client):
+        """Test that unknown jobs return 404"""
+        assert client.get("/jobs/unknown").status_code == status.HTTP_404_NOT_FOUND
+        assert client.delete("/jobs/unknown").status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestJobManager:
+    """Tests for JobManager bounds and cancellation"""
+
+    @pytest.fixture
+    def blocked_manager(self, tmp_path):
+        """
+        Job manager with one worker, no queue slot, and a job runner
+        that blocks until released
+
+        Returns
+        -------
+        Tuple[JobManager, threading.Event]
+            The manager and the event releasing its running job
+        """
+        manager = JobManager(jobs_dir=str(tmp_path), max_concurrent=1, max_queued=0)
+        release = threading.Event()
+
+        def _blocking_run(job, chunks):
+            job.status = "running"
+            release.wait(10)
+            job.status = CANCELLED if job.cancel_event.is_set() else COMPLETED
+            job.finished_at = time.time()
+
+        manager._run = _blocking_run
+        yield manager, release
+        release.set()
+        manager.shutdown()
+
+    def test_pending_jobs_are_bounded(self, blocked_manager, sample_features):
+        """Test that submissions beyond the bound are refused"""
+        manager, release = blocked_manager
+        manager.submit_records([sample_features], [None])
+
+        with pytest.raises(JobQueueFullError):
+            manager.submit_records([sample_features], [None])
+
+    def test_cancel_running_job(self, blocked_manager, sample_features):
+        """Test that cancelling a running job stops it"""
+        manager, release = blocked_manager
+        job = manager.submit_records([sample_features], [None])
+
+        manager.cancel(job.job_id)
+        release.set()
+        job.future.result(timeout=10)
+
+        assert job.status == CANCELLED
+
+    def test_cancel_before_start(self, tmp_path, sample_features):
+        """Test that a job cancelled once picked up by the worker, before running, frees its slot"""
+        manager = JobManager(jobs_dir=str(tmp_path), max_concurrent=1, max_queued=0)
+        picked_up, release = threading.Event(), threading.Event()
+        run = manager._run
+
+        def _delayed_run(job, chunks):
+            picked_up.set()
+            release.wait(10)
+            run(job, chunks)
+
+        manager._run = _delayed_run
+        try:
+            job = manager.submit_records([sample_features], [None])
+            assert picked_up.wait(10)
+            manager.cancel(job.job_id)
+            release.set()
+            job.future.result(timeout=10)
+
+            assert job.status == CANCELLED
+            assert job.finished_at is not None
+            manager._run = run
+            manager.submit_records([sample_features], [None]).future.result(timeout=30)
+        finally:
+            release.set()
+            manager.shutdown()
+
+    def test_setup_failure_fails_job(self, tmp_path, sample_features, monkeypatch):
+        """Test that a job whose model cannot be loaded is marked failed"""
+        def _unloadable():
+            raise ValueError("artifacts do not match the manifest")
+
+        monkeypatch.setattr(api.jobs, "get_predictor", _unloadable)
+        manager = JobManager(jobs_dir=str(tmp_path), max_concurrent=1, max_queued=0)
+        try:
+            job = manager.submit_records([sample_features], [None])
+            job.future.result(timeout=10)
+        finally:
+            manager.shutdown()
+
+        assert job.status == FAILED
+        assert "manifest" in job.error
+        assert job.finished_at is not None
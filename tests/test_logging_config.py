@@ -0,0 +1,124 @@
+"""
+Tests for the structured, queued logging configuration
+"""
+
+import asyncio
+import io
+import json
+import logging
+import queue
+
+import pytest
+
+from api.logging_config import (
+    LogSamplingMiddleware,
+    NonBlockingQueueHandler,
+    RequestSamplingFilter,
+    _sampled,
+    configure_logging,
+    make_formatter
+)
+
+
+@pytest.fixture
+def isolated_logger(request):
+    """
+    Logger not propagating to the root logger
+
+    Returns
+    -------
+    logging.Logger
+        Logger without handlers
+    """
+    logger = logging.getLogger(f"test.{request.node.name}")
+    logger.propagate = False
+    logger.handlers.clear()
+    yield logger
+    logger.handlers.clear()
+
+
+class TestConfigureLogging:
+    """Tests for configure_logging"""
+
+    def test_json_records_through_queue(self, isolated_logger):
+        """Test that records are written as JSON by the listener thread, with extra fields"""
+        stream = io.StringIO()
+        listener = configure_logging("INFO", fmt="json", use_queue=True, stream=stream, logger=isolated_logger)
+
+        isolated_logger.info("Prediction completed: %s", "APPROVED", extra={"client_id": "42"})
+        listener.stop()
+
+        record = json.loads(stream.getvalue())
+        assert record["message"] == "Prediction completed: APPROVED"
+        assert record["client_id"] == "42"
+        assert record["levelname"] == "INFO"
+
+    def test_text_without_queue(self, isolated_logger):
+        """Test the synchronous text setup"""
+        stream = io.StringIO()
+
+        assert configure_logging("INFO", fmt="text", use_queue=False, stream=stream, logger=isolated_logger) is None
+        isolated_logger.info("ready")
+
+        assert stream.getvalue().rstrip().endswith(" - INFO - ready")
+
+    def test_unknown_format(self):
+        """Test that an unknown format is rejected"""
+        with pytest.raises(ValueError):
+            make_formatter("xml")
+
+
+class TestQueueHandler:
+    """Tests for NonBlockingQueueHandler"""
+
+    def test_lazy_formatting(self):
+        """Test that lazy records keep their arguments for the listener"""
+        log_queue = queue.Queue()
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "value %s", ("x",), None)
+
+        NonBlockingQueueHandler(log_queue, lazy=True).handle(record)
+        NonBlockingQueueHandler(log_queue, lazy=False).handle(record)
+
+        lazy, eager = log_queue.get_nowait(), log_queue.get_nowait()
+        assert lazy.args == ("x",)
+        assert eager.args is None and eager.msg == "value x"
+
+    def test_full_queue_drops(self):
+        """Test that a full queue drops records instead of blocking"""
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+        for _ in range(3):
+            handler.handle(logging.LogRecord("test", logging.INFO, __file__, 1, "msg", None, None))
+
+        assert handler.queue.qsize() == 1
+
+
+class TestSampling:
+    """Tests for per-request log sampling"""
+
+    def test_unsampled_requests_keep_warnings(self):
+        """Test that only INFO records of unsampled requests are dropped"""
+        log_filter = RequestSamplingFilter()
+        info = logging.LogRecord("test", logging.INFO, __file__, 1, "msg", None, None)
+        warning = logging.LogRecord("test", logging.WARNING, __file__, 1, "msg", None, None)
+
+        token = _sampled.set(False)
+        try:
+            assert not log_filter.filter(info)
+            assert log_filter.filter(warning)
+        finally:
+            _sampled.reset(token)
+        assert log_filter.filter(info)
+
+    def test_middleware_sets_decision(self):
+        """Test that the middleware decides once per request"""
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(_sampled.get())
+
+        middleware = LogSamplingMiddleware(app, sample_rate=0.0)
+        asyncio.run(middleware({"type": "http"}, None, None))
+
+        assert seen == [False]
+        assert _sampled.get() is True
@@ -0,0 +1,159 @@
+"""
+Tests for the artifact manifest
+"""
+
+import hashlib
+import json
+
+import pytest
+from fastapi import status
+
+import api.predictor
+from api.artifacts import export_bundle
+from api.config import ARTIFACT_ID_HEADER
+from api.manifest import (
+    ArtifactMismatchError,
+    artifact_identity,
+    build_manifest,
+    file_digest,
+    refresh_threshold,
+    verify_file,
+    verify_loaded,
+    write_manifest
+)
+from api.predictor import CreditScorePredictor, load_feature_names
+
+
+@pytest.fixture
+def manifest_path(tmp_path, monkeypatch):
+    """
+    Manifest of the repository artifacts, used by new predictors
+
+    Returns
+    -------
+    Path
+        Manifest file
+    """
+    path = tmp_path / "artifacts_manifest.json"
+    write_manifest(str(path))
+    monkeypatch.setattr(api.predictor, "ARTIFACT_MANIFEST_PATH", str(path))
+    return path
+
+
+class TestManifest:
+    """Tests for building and checking manifests"""
+
+    def test_file_digest_matches_hashlib(self, tmp_path):
+        """Test that streamed hashing gives the plain SHA-256"""
+        path = tmp_path / "blob"
+        data = b"credit" * 500000
+        path.write_bytes(data)
+
+        assert file_digest(str(path)) == hashlib.sha256(data).hexdigest()
+
+    def test_manifest_describes_artifacts(self):
+        """Test the recorded hashes, feature count and threshold"""
+        manifest = build_manifest()
+
+        assert set(manifest["artifacts"]) == {"model", "explainer", "feature_names", "threshold"}
+        assert manifest["feature_count"] == len(load_feature_names())
+        assert 0 < manifest["threshold"] < 1
+        assert len(manifest["artifact_id"]) == 16
+
+    def test_identity_changes_with_threshold(self):
+        """Test that any input change gives another identity"""
+        digests = {"model": "a", "explainer": "b"}
+
+        assert artifact_identity(digests, "f", 0.5) == artifact_identity(dict(digests), "f", 0.5)
+        assert artifact_identity(digests, "f", 0.5) != artifact_identity(digests, "f", 0.51)
+        assert artifact_identity(digests, "f", 0.5) != artifact_identity(digests, "g", 0.5)
+
+    def test_modified_file_is_detected(self, tmp_path):
+        """Test that a file differing from its hash is rejected"""
+        manifest = build_manifest()
+        tampered = tmp_path / "optimal_threshold.json"
+        tampered.write_text('{"threshold": 0.1}')
+
+        with pytest.raises(ArtifactMismatchError):
+            verify_file(manifest, "threshold", str(tampered))
+
+    def test_feature_order_is_checked(self):
+        """Test that reordered features are rejected"""
+        manifest = build_manifest()
+        feature_names = load_feature_names()
+
+        verify_loaded(manifest, feature_names, manifest["threshold"])
+        with pytest.raises(ArtifactMismatchError):
+            verify_loaded(manifest, feature_names[::-1], manifest["threshold"])
+
+    def test_refresh_threshold(self, manifest_path, tmp_path):
+        """Test that a new threshold is recorded without touching the other hashes"""
+        before = json.loads(manifest_path.read_text())
+        threshold_path = tmp_path / "optimal_threshold.json"
+        threshold_path.write_text('{"threshold": 0.3}')
+
+        manifest = refresh_threshold(str(manifest_path), str(threshold_path))
+
+        assert manifest == json.loads(manifest_path.read_text())
+        assert manifest["threshold"] == 0.3
+        assert manifest["artifact_id"] != before["artifact_id"]
+        verify_file(manifest, "threshold", str(threshold_path))
+        assert manifest["artifacts"]["model"] == before["artifacts"]["model"]
+        assert refresh_threshold(str(tmp_path / "missing.json"), str(threshold_path)) is None
+
+
+class TestPredictorIdentity:
+    """Tests for manifest verification in the predictor"""
+
+    def test_predictor_is_verified(self, manifest_path):
+        """Test that the predictor takes the identity of a matching manifest"""
+        predictor = CreditScorePredictor()
+
+        assert predictor.manifest is not None
+        assert predictor.artifact_id == json.loads(manifest_path.read_text())["artifact_id"]
+
+    def test_mismatched_manifest_fails_the_load(self, manifest_path):
+        """Test that artifacts not matching the manifest are refused"""
+        manifest = json.loads(manifest_path.read_text())
+        manifest["threshold"] = 0.9
+        manifest_path.write_text(json.dumps(manifest))
+
+        with pytest.raises(ArtifactMismatchError):
+            CreditScorePredictor()
+
+    def test_bundle_and_pickle_share_identity(self, manifest_path, tmp_path, monkeypatch):
+        """Test that a bundle exported from the model has the model's identity"""
+        pickled = CreditScorePredictor()
+        monkeypatch.setattr(api.predictor, "ARTIFACT_BUNDLE_DIR", str(export_bundle(tmp_path / "bundle")))
+
+        bundled = CreditScorePredictor()
+
+        assert bundled.artifact_source == "bundle"
+        assert bundled.artifact_id == pickled.artifact_id
+
+    def test_cache_key_includes_identity(self, sample_features):
+        """Test that cache keys differ across artifact identities"""
+        predictor = CreditScorePredictor()
+        key = predictor.cache_key("prediction", sample_features)
+
+        assert predictor.cache_key("prediction", dict(reversed(sample_features.items()))) == key
+        assert predictor.cache_key("explanation", sample_features, 10) != key
+        predictor.artifact_id = "0" * 16
+        assert predictor.cache_key("prediction", sample_features) != key
+
+
+class TestIdentityEndpoints:
+    """Tests for the artifact identity in API responses"""
+
+    def test_health_reports_identity(self, client):
+        """Test that /health exposes the artifact identity"""
+        data = client.get("/health").json()
+
+        assert data["artifact_id"] == api.predictor.get_predictor().artifact_id
+
+    def test_predict_sets_identity_header(self, client, sample_client_request):
+        """Test that predictions carry the identity of the artifacts used"""
+        response = client.post("/predict", json=sample_client_request)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers[ARTIFACT_ID_HEADER] == api.predictor.get_predictor().artifact_id
@@ -0,0 +1,162 @@
+"""
+Tests for optional artifacts (idle eviction and memory budget)
+"""
+
+import gc
+import time
+import weakref
+
+import api.predictor
+from api.metrics import REGISTRY
+from api.optional_artifacts import OptionalArtifact, BUDGET, CLOSED, IDLE
+from api.predictor import CreditScorePredictor, reload_predictor
+
+MB = 1024 * 1024
+
+
+def _blob_loader(size: int = 8 * MB):
+    """Loader returning a buffer whose pages are actually resident"""
+    loads = []
+
+    def _load():
+        loads.append(1)
+        return b"\x01" * size
+
+    return _load, loads
+
+
+def _evictions(name: str, reason: str) -> float:
+    return REGISTRY.counter("artifact_evictions_total", "", ("artifact", "reason")).get(name, reason)
+
+
+class TestOptionalArtifact:
+    """Tests for OptionalArtifact"""
+
+    def test_loaded_on_first_use_only(self):
+        """Test that the loader runs once and its cost is recorded"""
+        loader, loads = _blob_loader()
+        artifact = OptionalArtifact("test-lazy", loader, idle_timeout=0)
+
+        assert artifact.value is None
+        with artifact.use() as value:
+            assert len(value) == 8 * MB
+        with artifact.use():
+            pass
+
+        assert len(loads) == 1
+        assert REGISTRY.counter("artifact_loads_total", "", ("artifact",)).get("test-lazy") == 1
+        assert REGISTRY.gauge("artifact_last_load_seconds", "", ("artifact",)).get("test-lazy") > 0
+        assert artifact.resident_bytes > 0
+
+    def test_released_when_idle_and_reloaded_on_demand(self):
+        """Test that an unused artifact is released, then reloaded when needed"""
+        loader, loads = _blob_loader()
+        artifact = OptionalArtifact("test-idle", loader, idle_timeout=0.05)
+
+        artifact.load()
+        deadline = time.monotonic() + 2
+        while artifact.value is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert artifact.value is None
+        assert artifact.resident_bytes == 0
+        assert _evictions("test-idle", IDLE) == 1
+        with artifact.use() as value:
+            assert value is not None
+        assert len(loads) == 2
+
+    def test_not_released_while_in_use(self):
+        """Test that the idle timeout never releases an artifact being used"""
+        loader, _ = _blob_loader()
+        artifact = OptionalArtifact("test-busy", loader, idle_timeout=0.02)
+
+        with artifact.use():
+            time.sleep(0.1)
+            assert artifact.value is not None
+            assert artifact.evict() is False
+
+    def test_budget_releases_least_recently_used(self):
+        """Test that loading past the budget first releases idle artifacts"""
+        first = OptionalArtifact("test-lru-a", _blob_loader()[0], idle_timeout=0, memory_budget=12 * MB)
+        second = OptionalArtifact(
+            "test-lru-b", _blob_loader()[0], size_hint=8 * MB, idle_timeout=0, memory_budget=12 * MB
+        )
+
+        first.load()
+        with second.use():
+            assert first.value is None
+            assert second.value is not None
+        assert _evictions("test-lru-a", BUDGET) == 1
+
+    def test_artifact_larger_than_budget_is_released_after_use(self):
+        """Test that an artifact that cannot fit is only kept while in use"""
+        artifact = OptionalArtifact(
+            "test-big", _blob_loader()[0], size_hint=8 * MB, idle_timeout=0, memory_budget=1 * MB
+        )
+
+        with artifact.use() as value:
+            assert value is not None
+
+        assert artifact.value is None
+        assert _evictions("test-big", BUDGET) == 1
+
+    def test_close_releases_after_use(self):
+        """Test that a closed artifact is released once its users are done, and its watcher stops"""
+        artifact = OptionalArtifact("test-closed", _blob_loader()[0], idle_timeout=60)
+
+        with artifact.use():
+            watcher = artifact._watcher
+            artifact.close()
+            assert artifact.value is not None
+        watcher.join(timeout=2)
+
+        assert artifact.value is None
+        assert not watcher.is_alive()
+        assert _evictions("test-closed", CLOSED) == 1
+
+    def test_closed_artifact_still_loads_on_demand(self):
+        """Test that a late user of a closed artifact gets it, released right after"""
+        loader, loads = _blob_loader()
+        artifact = OptionalArtifact("test-late", loader, idle_timeout=60)
+        artifact.load()
+        artifact.close()
+
+        with artifact.use() as value:
+            assert value is not None
+
+        assert artifact.value is None
+        assert artifact._watcher is None
+        assert len(loads) == 2
+
+
+class TestPredictorExplainer:
+    """Tests for the predictor's evictable explainer"""
+
+    def test_explanations_survive_eviction(self, sample_features):
+        """Test that explanations still work after the explainer is released"""
+        predictor = CreditScorePredictor()
+        before = predictor.get_feature_importance(sample_features, top_n=3)
+
+        assert predictor._explainer.evict()
+        assert predictor.explainer is None
+
+        assert predictor.get_feature_importance(sample_features, top_n=3) == before
+        assert predictor.explainer is not None
+
+    def test_reload_releases_old_explainer(self, monkeypatch):
+        """Test that a replaced predictor's explainer is released and the predictor freed"""
+        # Reloads here replace no predictor; the serving one is restored after the test
+        monkeypatch.setattr(api.predictor, "_predictor", None)
+        old = reload_predictor()
+        old._load_explainer()
+        watcher = old._explainer._watcher
+
+        new = reload_predictor()
+        watcher.join(timeout=2)
+
+        assert old.explainer is None
+        assert new.explainer is not None
+        replaced = weakref.ref(old)
+        del old
+        gc.collect()
+        assert replaced() is None
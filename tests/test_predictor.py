@@ -2,6 +2,10 @@
 Tests for the predictor module
 """
 
+import gc
+import threading
+import tracemalloc
+
 import pytest
 import numpy as np
 from api.predictor import CreditScorePredictor, get_predictor
@@ -11,11 +15,11 @@ class TestCreditScorePredictor:
     """Tests for CreditScorePredictor class"""
     
     def test_predictor_initialization(self):
-        """Test that predictor initializes correctly"""
+        """Test that predictor initializes correctly (explainer loaded on demand)"""
         predictor = CreditScorePredictor()
         
         assert predictor.model is not None
-        assert predictor.explainer is not None
+        assert predictor.explainer is None
         assert predictor.feature_names is not None
         assert predictor.threshold is not None
         assert predictor.is_loaded() is True
@@ -219,4 +223,116 @@ class TestPredictorConsistency:
             assert decision == "REJECTED"
         else:
             assert prediction == 0
-            assert decision == "APPROVED"
\ No newline at end of file
+            assert decision == "APPROVED"
+
+
+def _random_clients(feature_names, n_clients, seed=0):
+    """Clients with random values, a third of the features missing"""
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(n_clients, len(feature_names))) * 1000
+    mask = rng.random(values.shape) < 0.3
+    return [
+        {name: float(v) for name, v, m in zip(feature_names, row, row_mask) if not m}
+        for row, row_mask in zip(values, mask)
+    ]
+
+
+class TestFeatureDtype:
+    """Tests for float32 feature matrices"""
+    
+    def test_float32_matrices(self):
+        """Test that float32 mode builds float32 matrices"""
+        predictor = CreditScorePredictor(feature_dtype="float32")
+        
+        assert predictor._prepare_batch([{}, {}]).dtype == np.float32
+        assert predictor._prepare_features({}).dtype == np.float32
+    
+    def test_float32_decisions_match_float64(self):
+        """Test that float32 scoring gives the same decisions"""
+        predictor64 = get_predictor()
+        predictor32 = CreditScorePredictor(feature_dtype="float32")
+        clients = _random_clients(predictor64.feature_names, 500)
+        
+        proba64 = predictor64.predict_proba_batch(clients)
+        proba32 = predictor32.predict_proba_batch(clients)
+        
+        np.testing.assert_allclose(proba32, proba64, rtol=0, atol=1e-4)
+        np.testing.assert_array_equal(
+            predictor32.apply_threshold(proba32)[1],
+            predictor64.apply_threshold(proba64)[1]
+        )
+    
+    def test_unsupported_dtype_is_rejected(self):
+        """Test that only float32 and float64 are accepted"""
+        with pytest.raises(ValueError):
+            CreditScorePredictor(feature_dtype="int32")
+
+
+class TestScratchBuffers:
+    """Tests for per-thread reusable scoring matrices"""
+    
+    def test_scratch_matrix_is_reused(self, sample_features):
+        """Test that reusing calls on one thread share a buffer, reset to NaN"""
+        predictor = CreditScorePredictor()
+        
+        first = predictor._prepare_features(sample_features, reuse=True)
+        second = predictor._prepare_features({}, reuse=True)
+        
+        assert np.shares_memory(first, second)
+        assert np.isnan(second).all()
+        assert not np.shares_memory(second, predictor._prepare_features({}))
+    
+    def test_threads_do_not_share_scratch(self):
+        """Test that each thread gets its own buffer"""
+        predictor = CreditScorePredictor()
+        main = predictor._prepare_features({}, reuse=True)
+        other = []
+        thread = threading.Thread(
+            target=lambda: other.append(predictor._prepare_features({}, reuse=True))
+        )
+        thread.start()
+        thread.join()
+        
+        assert not np.shares_memory(main, other[0])
+    
+    def test_reused_batches_score_like_fresh_ones(self):
+        """Test that scratch reuse does not change results"""
+        predictor = CreditScorePredictor()
+        clients = _random_clients(predictor.feature_names, 20, seed=1)
+        
+        fresh = predictor.predict_proba_matrix(predictor._prepare_batch(clients))
+        predictor.predict_proba_batch(clients[:7])
+        reused = predictor.predict_proba_batch(clients)
+        
+        np.testing.assert_array_equal(reused, fresh)
+    
+    def test_single_prediction_allocations_are_bounded(self, sample_features):
+        """Test that repeated predictions allocate nothing lasting in the api code"""
+        predictor = CreditScorePredictor()
+        for _ in range(5):
+            predictor.score(sample_features)
+        gc.collect()
+        
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            start, _ = tracemalloc.get_traced_memory()
+            predictor.score(sample_features)
+            _, peak = tracemalloc.get_traced_memory()
+            for _ in range(200):
+                predictor.score(sample_features)
+            gc.collect()
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        
+        api_files = [tracemalloc.Filter(True, "*/api/*")]
+        retained = sum(
+            stat.size_diff
+            for stat in after.filter_traces(api_files).compare_to(before.filter_traces(api_files), "filename")
+        )
+        # Transient memory of one prediction: a few copies of the feature row
+        assert peak - start < 100 * 1024
+        assert retained < 4 * 1024
+
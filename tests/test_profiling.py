@@ -0,0 +1,106 @@
+"""
+Tests for on-demand request profiling
+"""
+
+import marshal
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+import api.main
+from api.profiling import PROFILES, ProfileStore, ProfilingMiddleware, current_profile
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture
+def profiled_client(monkeypatch):
+    """
+    Client of the API with profiling enabled
+
+    Returns
+    -------
+    TestClient
+        Test client storing profiles in PROFILES
+    """
+    monkeypatch.setattr(api.main, "ADMIN_TOKEN", "secret")
+    return TestClient(ProfilingMiddleware(api.main.app, admin_token="secret"))
+
+
+class TestProfilingMiddleware:
+    """Tests for profiling requests on demand"""
+
+    def test_cpu_profile_covers_inference(self, profiled_client, sample_client_request):
+        """Test that the profile includes validation and the predictor on the scheduler threads"""
+        response = profiled_client.post(
+            "/feature-importance", json=sample_client_request, headers={"X-Profile": "cpu", **ADMIN}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        profile_id = response.headers["X-Profile-Id"]
+        report = PROFILES.get(profile_id)
+        functions = marshal.loads(PROFILES.pstats_dump(profile_id))
+        # Scheduler thread: predictor and SHAP; event loop thread: request validation
+        assert any(
+            name == "get_feature_importance" and file.endswith("api/predictor.py")
+            for file, _, name in functions
+        )
+        assert any("shap" in file for file, _, _ in functions)
+        assert any("validate_python" in name for _, _, name in functions)
+        assert report["functions"][0]["cumulative_seconds"] > 0
+        assert report["allocations"] == []
+
+    def test_memory_profile(self, profiled_client, sample_client_request):
+        """Test that memory mode reports allocations without a CPU profile"""
+        response = profiled_client.post(
+            "/predict", json=sample_client_request, headers={"X-Profile": "memory", **ADMIN}
+        )
+
+        report = PROFILES.get(response.headers["X-Profile-Id"])
+        assert report["functions"] == []
+        assert report["peak_memory_bytes"] > 0
+
+    def test_requires_admin_token(self, sample_client_request):
+        """Test that the header is ignored without the admin token"""
+        store = ProfileStore(5)
+        client = TestClient(ProfilingMiddleware(api.main.app, admin_token="secret", store=store))
+
+        response = client.post("/predict", json=sample_client_request, headers={"X-Profile": "cpu"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "X-Profile-Id" not in response.headers
+        assert store.list() == []
+
+    def test_not_installed_by_default(self, client, sample_client_request):
+        """Test that the API ignores the profile header unless profiling is enabled"""
+        response = client.post("/predict", json=sample_client_request, headers={"X-Profile": "all", **ADMIN})
+
+        assert "X-Profile-Id" not in response.headers
+        assert current_profile() is None
+
+
+class TestProfileEndpoints:
+    """Tests for the profile admin endpoints"""
+
+    def test_list_get_and_download(self, profiled_client, sample_client_request):
+        """Test that stored profiles can be listed, read and downloaded"""
+        profile_id = profiled_client.post(
+            "/predict", json=sample_client_request, headers={"X-Profile": "all", **ADMIN}
+        ).headers["X-Profile-Id"]
+
+        listed = profiled_client.get("/admin/profiles", headers=ADMIN).json()["profiles"]
+        report = profiled_client.get(f"/admin/profiles/{profile_id}", headers=ADMIN).json()
+        download = profiled_client.get(f"/admin/profiles/{profile_id}/pstats", headers=ADMIN)
+
+        assert listed[0]["id"] == profile_id
+        assert report["path"] == "/predict"
+        assert report["modes"] == ["cpu", "memory"]
+        assert report["functions"][0]["cumulative_seconds"] >= report["functions"][-1]["cumulative_seconds"]
+        assert isinstance(marshal.loads(download.content), dict)
+
+    def test_unknown_profile(self, profiled_client):
+        """Test that unknown profiles give 404"""
+        response = profiled_client.get("/admin/profiles/unknown", headers=ADMIN)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
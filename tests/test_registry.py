@@ -0,0 +1,141 @@
+"""
+Tests for champion/challenger shadow scoring
+"""
+
+import json
+import time
+
+import pytest
+from fastapi import status
+
+import api.main
+from api.artifacts import export_bundle
+from api.metrics import REGISTRY
+from api.registry import ModelRegistry, ShadowStore, CHAMPION
+
+
+@pytest.fixture(scope="module")
+def challenger_bundle(tmp_path_factory):
+    """
+    Challenger bundle (the current model, exported natively)
+
+    Returns
+    -------
+    str
+        Bundle directory
+    """
+    return str(export_bundle(tmp_path_factory.mktemp("challenger")))
+
+
+@pytest.fixture
+def shadow_registry(challenger_bundle, tmp_path):
+    """
+    Registry shadow-scoring every client with one challenger
+
+    Returns
+    -------
+    ModelRegistry
+        Registry writing to a temporary store
+    """
+    registry = ModelRegistry(
+        {"v2": challenger_bundle},
+        sample_rate=1.0,
+        batch_size=2,
+        flush_interval=0.05,
+        store=ShadowStore(str(tmp_path / "shadow"))
+    )
+    yield registry
+    registry.shutdown()
+
+
+def wait_for_records(store: ShadowStore, count: int, timeout: float = 5.0) -> list:
+    """
+    Poll the store until it holds `count` records
+
+    Returns
+    -------
+    list
+        Stored records
+    """
+    deadline = time.monotonic() + timeout
+    records = []
+    while time.monotonic() < deadline:
+        records = [
+            json.loads(line)
+            for path in sorted(store.directory.glob("shadow-*.jsonl"))
+            for line in path.read_text().splitlines()
+        ]
+        if len(records) >= count:
+            break
+        time.sleep(0.02)
+    return records
+
+
+def _record(client_id, features):
+    return {
+        "client_id": client_id,
+        "features": features,
+        "probability_default": 0.1,
+        "decision": "APPROVED",
+        "threshold": 0.5
+    }
+
+
+class TestModelRegistry:
+    """Tests for ModelRegistry"""
+
+    def test_challengers_score_in_background(self, shadow_registry, sample_features):
+        """Test that submitted clients are scored by challengers and stored"""
+        shadow_registry.submit([_record(f"c{i}", sample_features) for i in range(3)])
+
+        records = wait_for_records(shadow_registry.store, 3)
+
+        assert sorted(record["client_id"] for record in records) == ["c0", "c1", "c2"]
+        for record in records:
+            assert record[CHAMPION]["probability_default"] == 0.1
+            assert 0 <= record["v2"]["probability_default"] <= 1
+            assert record["v2"]["decision"] in ("APPROVED", "REJECTED")
+
+    def test_full_queue_drops_instead_of_blocking(self, sample_features):
+        """Test that submitting to a full shadow queue never blocks"""
+        registry = ModelRegistry({}, sample_rate=1.0, max_queue=1)
+        dropped = REGISTRY.counter("shadow_dropped_total", "").get()
+
+        registry.submit([_record(f"c{i}", sample_features) for i in range(3)])
+
+        assert REGISTRY.counter("shadow_dropped_total", "").get() == dropped + 2
+        assert registry.sample() is False
+
+    def test_stats_report_memory_per_model(self, shadow_registry):
+        """Test that every loaded model reports its memory"""
+        stats = shadow_registry.stats()
+
+        assert [model["name"] for model in stats["models"]] == [CHAMPION, "v2"]
+        assert all(model["memory_bytes"] > 0 for model in stats["models"])
+
+
+class TestShadowEndpoints:
+    """Tests for shadow scoring from the API"""
+
+    def test_predict_feeds_challengers(self, client, shadow_registry, sample_client_request, monkeypatch):
+        """Test that a sampled prediction reaches the shadow store"""
+        monkeypatch.setattr(api.main, "get_model_registry", lambda: shadow_registry)
+
+        response = client.post("/predict", json=sample_client_request)
+        records = wait_for_records(shadow_registry.store, 1)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert records[0]["client_id"] == sample_client_request["client_id"]
+        assert records[0][CHAMPION]["probability_default"] == pytest.approx(
+            response.json()["probability_default"]
+        )
+
+    def test_models_endpoint(self, client, shadow_registry, monkeypatch):
+        """Test that the admin endpoint lists champion and challengers"""
+        monkeypatch.setattr(api.main, "ADMIN_TOKEN", "secret")
+        monkeypatch.setattr(api.main, "get_model_registry", lambda: shadow_registry)
+
+        response = client.get("/admin/models", headers={"X-Admin-Token": "secret"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [model["role"] for model in response.json()["models"]] == [CHAMPION, "challenger"]
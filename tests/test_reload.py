@@ -0,0 +1,181 @@
+"""
+Tests for predictor hot reload
+"""
+
+import pickle
+import shutil
+import threading
+import time
+
+import pytest
+from fastapi import status
+
+import api.main
+import api.predictor
+from api.artifacts import export_bundle
+from api.config import MODEL_PATH
+from api.manifest import ArtifactMismatchError, artifact_files, write_manifest
+from api.predictor import CreditScorePredictor, get_predictor, reload_predictor, ReloadInProgressError
+from api.reload import ArtifactWatcher
+
+
+@pytest.fixture
+def deployed_bundle(tmp_path, monkeypatch):
+    """
+    Copy of the pickled model with its exported bundle and manifest, as in
+    the Docker image, served by new predictors
+
+    Returns
+    -------
+    Tuple[Path, Path]
+        (pickled model, manifest)
+    """
+    model_path = tmp_path / "selected_model.sav"
+    shutil.copy(MODEL_PATH, model_path)
+    bundle_dir = export_bundle(str(tmp_path / "model_bundle"), model_path=str(model_path))
+    manifest_path = tmp_path / "artifacts_manifest.json"
+    write_manifest(str(manifest_path), artifact_files(model_path=str(model_path)))
+    monkeypatch.setattr(api.predictor, "MODEL_PATH", str(model_path))
+    monkeypatch.setattr(api.predictor, "ARTIFACT_BUNDLE_DIR", str(bundle_dir))
+    monkeypatch.setattr(api.predictor, "ARTIFACT_MANIFEST_PATH", str(manifest_path))
+    # Reloads here replace no predictor; the serving one is restored after the test
+    monkeypatch.setattr(api.predictor, "_predictor", None)
+    return model_path, manifest_path
+
+
+def _retrain(model_path):
+    """Replace the pickled model with one scoring differently"""
+    with open(model_path, 'rb') as f:
+        pipeline = pickle.load(f)
+    scaler = pipeline.steps[0][1]
+    scaler.min_ = scaler.min_ + 0.1
+    with open(model_path, 'wb') as f:
+        pickle.dump(pipeline, f)
+    return pipeline
+
+
+class TestReloadPredictor:
+    """Tests for get_predictor / reload_predictor"""
+
+    def test_reload_swaps_instance(self, sample_features):
+        """Test that a reload replaces the instance while the old one keeps working"""
+        previous = get_predictor()
+
+        reloaded = reload_predictor()
+
+        assert reloaded is not previous
+        assert get_predictor() is reloaded
+        assert previous.predict_proba(sample_features) == reloaded.predict_proba(sample_features)
+
+    def test_failed_reload_keeps_current_predictor(self, monkeypatch):
+        """Test that artifacts failing the smoke test are not swapped in"""
+        current = get_predictor()
+
+        def _broken(self):
+            raise ValueError("bad model")
+
+        monkeypatch.setattr(CreditScorePredictor, "smoke_test", _broken)
+
+        with pytest.raises(ValueError):
+            reload_predictor()
+        assert get_predictor() is current
+
+    def test_retrained_model_replaces_stale_bundle(self, deployed_bundle, sample_features):
+        """Test that a pickle rolled out over an exported bundle is served after a reload"""
+        model_path, manifest_path = deployed_bundle
+        assert reload_predictor().artifact_source == "bundle"
+        pipeline = _retrain(model_path)
+        write_manifest(str(manifest_path), artifact_files(model_path=str(model_path)))
+
+        reloaded = reload_predictor()
+
+        X = reloaded._prepare_features(sample_features)
+        assert reloaded.artifact_source == "pickle"
+        assert reloaded.predict_proba(sample_features)[1] == pytest.approx(pipeline.predict_proba(X)[0, 1])
+
+    def test_retrained_model_without_manifest_fails(self, deployed_bundle):
+        """Test that a new pickle not in the manifest fails the reload instead of serving the old bundle"""
+        model_path, _ = deployed_bundle
+        current = reload_predictor()
+        _retrain(model_path)
+
+        with pytest.raises(ArtifactMismatchError):
+            reload_predictor()
+        assert get_predictor() is current
+
+    def test_reload_in_progress_is_refused(self):
+        """Test that a second reload fails fast when asked not to wait"""
+        with api.predictor._reload_lock:
+            with pytest.raises(ReloadInProgressError):
+                reload_predictor(wait=False)
+
+    def test_concurrent_first_access_creates_one_instance(self, monkeypatch):
+        """Test that racing threads share a single lazily created predictor"""
+        created = []
+
+        class _SlowPredictor:
+            feature_names = []
+
+            def __init__(self):
+                time.sleep(0.05)
+                created.append(self)
+
+        monkeypatch.setattr(api.predictor, "CreditScorePredictor", _SlowPredictor)
+        monkeypatch.setattr(api.predictor, "_predictor", None)
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(get_predictor()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(created) == 1
+        assert len(results) == 8
+        assert all(result is created[0] for result in results)
+
+
+class TestArtifactWatcher:
+    """Tests for ArtifactWatcher"""
+
+    def test_change_triggers_reload(self, tmp_path):
+        """Test that modifying a watched file triggers one reload"""
+        watched = tmp_path / "optimal_threshold.json"
+        watched.write_text('{"threshold": 0.5}')
+        reloaded = threading.Event()
+        watcher = ArtifactWatcher([watched], interval=0.02, reload=reloaded.set)
+
+        watcher.start()
+        try:
+            time.sleep(0.05)
+            watched.write_text('{"threshold": 0.45}')
+            assert reloaded.wait(timeout=2)
+        finally:
+            watcher.stop()
+
+
+class TestReloadEndpoint:
+    """Tests for the /admin/reload endpoint"""
+
+    def test_reload_endpoint(self, client, monkeypatch):
+        """Test that an admin reload swaps in a new predictor"""
+        monkeypatch.setattr(api.main, "ADMIN_TOKEN", "secret")
+        previous = get_predictor()
+
+        response = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "reloaded"
+        assert get_predictor() is not previous
+
+    def test_reload_endpoint_conflict(self, client, monkeypatch):
+        """Test that a reload already running gives 409"""
+        monkeypatch.setattr(api.main, "ADMIN_TOKEN", "secret")
+
+        with api.predictor._reload_lock:
+            response = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+
+        assert response.status_code == status.HTTP_409_CONFLICT
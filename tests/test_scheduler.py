@@ -0,0 +1,115 @@
+"""
+Tests for the priority inference scheduler
+"""
+
+import threading
+import time
+
+import pytest
+
+from api.scheduler import PriorityScheduler, INTERACTIVE, BULK, EXPLAIN
+
+
+@pytest.fixture
+def single_worker():
+    """
+    Scheduler with one inference thread, blocked until released
+
+    Returns
+    -------
+    Tuple[PriorityScheduler, threading.Event]
+        The scheduler and the event releasing its blocking task
+    """
+    scheduler = PriorityScheduler(
+        workers=1,
+        weights={BULK: 2, EXPLAIN: 1},
+        max_running={}
+    )
+    release = threading.Event()
+    scheduler.submit(BULK, release.wait, 5)
+    time.sleep(0.05)
+    yield scheduler, release
+    release.set()
+    scheduler.shutdown()
+
+
+class TestPriorityScheduler:
+    """Tests for PriorityScheduler ordering"""
+
+    def test_interactive_runs_before_queued_bulk(self, single_worker):
+        """Test that interactive work overtakes bulk and explanation work"""
+        scheduler, release = single_worker
+        order = []
+        futures = [scheduler.submit(BULK, order.append, f"bulk-{i}") for i in range(3)]
+        futures.append(scheduler.submit(EXPLAIN, order.append, "explain"))
+        futures.append(scheduler.submit(INTERACTIVE, order.append, "interactive"))
+
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+
+        assert order[0] == "interactive"
+
+    def test_weights_share_remaining_capacity(self, single_worker):
+        """Test that bulk and explanation work are interleaved by weight"""
+        scheduler, release = single_worker
+        order = []
+        futures = [scheduler.submit(BULK, order.append, "bulk") for _ in range(4)]
+        futures += [scheduler.submit(EXPLAIN, order.append, "explain") for _ in range(2)]
+
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+
+        # Weight 2:1 - explanation work gets a turn after every two bulk tasks
+        assert order[:3].count("explain") == 1
+        assert order.count("bulk") == 4
+
+    def test_chunks_let_interactive_overtake(self, single_worker):
+        """Test that a single prediction waits at most one bulk chunk"""
+        scheduler, release = single_worker
+        order = []
+        futures = scheduler.submit_chunks(BULK, order.append, list(range(10)), chunk_size=2)
+        assert len(futures) == 5
+
+        interactive = scheduler.submit(INTERACTIVE, order.append, "interactive")
+        release.set()
+        interactive.result(timeout=5)
+        for future in futures:
+            future.result(timeout=5)
+
+        assert order.index("interactive") == 0
+        assert order[1:] == [[0, 1], [2, 3], [4, 5], [6, 7], [8, 9]]
+
+    def test_per_class_running_cap(self):
+        """Test that a class never runs more tasks than its cap"""
+        scheduler = PriorityScheduler(workers=3, weights={}, max_running={EXPLAIN: 1})
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def _work():
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.02)
+            with lock:
+                state["running"] -= 1
+
+        try:
+            futures = [scheduler.submit(EXPLAIN, _work) for _ in range(5)]
+            for future in futures:
+                future.result(timeout=5)
+        finally:
+            scheduler.shutdown()
+
+        assert state["peak"] == 1
+
+    def test_exceptions_are_propagated(self):
+        """Test that task exceptions are raised from the future"""
+        scheduler = PriorityScheduler(workers=1, weights={}, max_running={})
+        try:
+            future = scheduler.submit(INTERACTIVE, int, "not a number")
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+        finally:
+            scheduler.shutdown()
@@ -0,0 +1,187 @@
+"""
+Tests for the rolling score monitor
+"""
+
+import numpy as np
+import pytest
+from fastapi import status
+
+import api.predictor
+from api.predictor import get_predictor, unmonitored
+from api.score_monitor import SCORE_MONITOR, ScoreMonitor
+
+
+class FakeClock:
+    """Settable Unix time"""
+
+    def __init__(self, now=10_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def monitor(clock):
+    """Ring of four 100-second buckets"""
+    return ScoreMonitor(bucket_seconds=100, buckets=4, resolution=100, clock=clock)
+
+
+@pytest.fixture
+def score_monitor():
+    """
+    Score monitor of the serving process, emptied before and after the test
+
+    Returns
+    -------
+    ScoreMonitor
+        The global monitor
+    """
+    SCORE_MONITOR.reset()
+    yield SCORE_MONITOR
+    SCORE_MONITOR.reset()
+
+
+class TestScoreMonitor:
+    """Tests for ScoreMonitor"""
+
+    def test_single_and_batch_agree(self, clock):
+        """Test that recording one by one equals recording a batch"""
+        probas = np.random.default_rng(0).random(500)
+        one_by_one = ScoreMonitor(bucket_seconds=100, buckets=4, resolution=100, clock=clock)
+        batch = ScoreMonitor(bucket_seconds=100, buckets=4, resolution=100, clock=clock)
+
+        for proba in probas:
+            one_by_one.record(float(proba), 0.5)
+        batch.record_batch(probas, 0.5)
+
+        single_window, batch_window = one_by_one.report([100])["windows"][0], batch.report([100])["windows"][0]
+        assert single_window["mean_probability"] == pytest.approx(batch_window["mean_probability"])
+        for key in ("predictions", "approved", "quantiles", "histogram"):
+            assert single_window[key] == batch_window[key]
+
+    def test_approval_counts(self, monitor):
+        """Test that clients above the threshold are rejected"""
+        monitor.record_batch(np.array([0.1, 0.2, 0.6, 0.9]), 0.5)
+        monitor.record(0.5, 0.5)
+
+        window = monitor.report([100])["windows"][0]
+        assert window["predictions"] == 5
+        assert window["approved"] == 3
+        assert window["rejected"] == 2
+        assert window["approval_rate"] == pytest.approx(0.6)
+        assert window["mean_probability"] == pytest.approx(0.46)
+
+    def test_quantiles_within_half_a_bin(self, monitor):
+        """Test that sketch quantiles are close to the exact ones"""
+        probas = np.random.default_rng(1).beta(2, 5, size=20000)
+
+        monitor.record_batch(probas, 0.5)
+
+        quantiles = monitor.report([100])["windows"][0]["quantiles"]
+        for name, q in (("p10", 0.1), ("p50", 0.5), ("p99", 0.99)):
+            assert quantiles[name] == pytest.approx(np.quantile(probas, q), abs=0.0051)
+
+    def test_histogram(self, monitor):
+        """Test that the reported histogram merges the fine bins"""
+        monitor.record_batch(np.array([0.05, 0.15, 0.95, 1.0]), 0.5)
+
+        histogram = monitor.report([100], bins=10)["windows"][0]["histogram"]
+
+        assert histogram == [1, 1, 0, 0, 0, 0, 0, 0, 0, 2]
+
+    def test_rolling_windows(self, monitor, clock):
+        """Test that windows sum the most recent buckets"""
+        for _ in range(3):
+            monitor.record(0.1, 0.5)
+            clock.now += 100
+        monitor.record(0.9, 0.5)
+
+        report = monitor.report([100, 200, 10_000])
+
+        assert [window["predictions"] for window in report["windows"]] == [1, 2, 4]
+        assert report["windows"][2]["window_seconds"] == 400
+        assert [bucket["predictions"] for bucket in report["buckets"]] == [1, 1, 1, 1]
+        assert report["buckets"][0]["start"] == 10_300
+        assert report["buckets"][0]["approval_rate"] == 0
+
+    def test_old_buckets_are_overwritten(self, monitor, clock):
+        """Test that memory stays fixed as time passes"""
+        monitor.record(0.1, 0.5)
+        clock.now += 400
+        monitor.record(0.2, 0.5)
+
+        report = monitor.report([10_000])
+
+        assert report["windows"][0]["predictions"] == 1
+        assert len(report["buckets"]) == 1
+
+    def test_expired_buckets_are_not_reported(self, monitor, clock):
+        """Test that a quiet period empties the windows"""
+        monitor.record(0.1, 0.5)
+        clock.now += 1000
+
+        report = monitor.report([10_000])
+
+        assert report["windows"][0]["predictions"] == 0
+        assert report["windows"][0]["approval_rate"] is None
+        assert report["buckets"] == []
+
+
+class TestScoringPaths:
+    """Tests for the scoring paths feeding the monitor"""
+
+    def test_single_and_batch_scoring(self, score_monitor, sample_features):
+        """Test that single and batch predictions are counted"""
+        predictor = get_predictor()
+
+        predictor.score(sample_features)
+        predictor.predict_proba_batch([sample_features] * 4)
+
+        assert score_monitor.report([3600])["windows"][0]["predictions"] == 5
+
+    def test_unmonitored_scoring(self, score_monitor, sample_features):
+        """Test that warm-up style scoring is not counted"""
+        with unmonitored():
+            get_predictor().score(sample_features)
+
+        assert score_monitor.report([3600])["windows"][0]["predictions"] == 0
+
+    def test_unmonitored_predictor(self, score_monitor, sample_features):
+        """Test that predictors other than the serving one are not counted"""
+        predictor = api.predictor.CreditScorePredictor()
+
+        predictor.score(sample_features)
+
+        assert score_monitor.report([3600])["windows"][0]["predictions"] == 0
+
+
+class TestScoreMonitorEndpoint:
+    """Tests for GET /monitoring/scores"""
+
+    def test_scores_of_traffic(self, client, score_monitor, sample_client_request, sample_batch_request):
+        """Test that scored requests show up in the rolling windows"""
+        client.post("/predict", json=sample_client_request)
+        client.post("/predict/batch", json=sample_batch_request)
+
+        response = client.get("/monitoring/scores", params={"bins": 5})
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        window = data["windows"][0]
+        assert window["predictions"] == 1 + len(sample_batch_request["clients"])
+        assert window["approved"] + window["rejected"] == window["predictions"]
+        assert len(window["histogram"]) == 5
+        assert data["threshold"] == get_predictor().get_threshold()
+        assert data["buckets"][0]["predictions"] == window["predictions"]
+
+    def test_invalid_bins(self, client):
+        """Test that the histogram size is bounded"""
+        response = client.get("/monitoring/scores", params={"bins": 0})
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,144 @@
+"""
+Tests for lazy imports and the startup report
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi import status
+
+import api.main
+from api.artifacts import export_bundle
+from api.startup_report import StartupReport, IMPORT, ARTIFACT
+
+# Modules that must only be imported on the code paths needing them
+HEAVY_MODULES = ("sklearn", "lightgbm", "shap", "pandas", "pyarrow", "scipy", "matplotlib")
+
+# Direct dependencies of api.main; anything else it pulls in is a regression
+DIRECT_DEPENDENCIES = (
+    "numpy, pydantic, fastapi, fastapi.responses, fastapi.middleware.cors, pythonjsonlogger.jsonlogger"
+)
+
+_IMPORTED_PACKAGES = """
+import sys, json
+before = set(sys.modules)
+{statement}
+packages = {{name.split(".")[0] for name in set(sys.modules) - before}}
+print(json.dumps(sorted(
+    name for name in packages - set(sys.stdlib_module_names) if not name.startswith("_")
+)))
+"""
+
+
+def imported_packages(statement: str, env: dict = None) -> set:
+    """
+    Third-party top-level packages imported by a statement in a fresh interpreter
+
+    Parameters
+    ----------
+    statement : str
+        Python code to run
+    env : dict
+        Extra environment variables
+
+    Returns
+    -------
+    set
+        Package names
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", _IMPORTED_PACKAGES.format(statement=statement)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, **(env or {})}
+    )
+    return set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+
+class TestStartupImports:
+    """Regression tests on what the serving process imports at startup"""
+
+    def test_api_import_stays_light(self):
+        """Test that importing the app pulls in no heavy or unexpected package"""
+        packages = imported_packages("import api.main")
+        expected = imported_packages(f"import {DIRECT_DEPENDENCIES}") | {"api"}
+
+        assert not packages & set(HEAVY_MODULES)
+        assert packages <= expected, f"New startup imports: {sorted(packages - expected)}"
+
+    def test_bundle_predictor_skips_sklearn_and_lightgbm(self, tmp_path):
+        """Test that loading the native bundle imports no ML framework"""
+        bundle_dir = export_bundle(tmp_path / "bundle")
+
+        packages = imported_packages(
+            "from api.predictor import get_predictor; get_predictor()",
+            env={"ARTIFACT_BUNDLE_DIR": str(bundle_dir)}
+        )
+
+        assert not packages & set(HEAVY_MODULES)
+
+
+class TestStartupReport:
+    """Tests for StartupReport"""
+
+    def test_phases_are_recorded_in_order_and_replaced(self):
+        """Test that re-recording a phase replaces its previous measurement"""
+        report = StartupReport()
+        report.record("numpy", IMPORT, 0.1)
+        report.record("model", ARTIFACT, 0.2)
+        report.record("numpy", IMPORT, 0.3)
+
+        summary = report.as_dict()
+
+        assert [p["name"] for p in summary["phases"]] == ["model", "numpy"]
+        assert summary["import_seconds"] == pytest.approx(0.3)
+        assert summary["artifact_seconds"] == pytest.approx(0.2)
+        assert summary["ready_seconds"] is None
+
+    def test_timed_import_only_times_new_modules(self):
+        """Test that modules already imported are not reported"""
+        report = StartupReport()
+
+        module = report.timed_import("json")
+
+        assert module is json
+        assert report.phases() == []
+
+
+class TestStartupReportEndpoint:
+    """Tests for the /admin/startup-report endpoint"""
+
+    def test_disabled_without_admin_token(self, client, monkeypatch):
+        """Test that admin endpoints are hidden when no token is configured"""
+        monkeypatch.setattr(api.main, "ADMIN_TOKEN", None)
+
+        response = client.get("/admin/startup-report")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_wrong_token_is_rejected(self, client, monkeypatch):
+        """Test that a wrong admin token gives 401"""
+        monkeypatch.setattr(api.main, "ADMIN_TOKEN", "secret")
+
+        response = client.get("/admin/startup-report", headers={"X-Admin-Token": "guess"})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_report_lists_imports_and_artifacts(self, client, monkeypatch):
+        """Test that the report exposes the timed startup phases"""
+        monkeypatch.setattr(api.main, "ADMIN_TOKEN", "secret")
+
+        with client:
+            response = client.get("/admin/startup-report", headers={"X-Admin-Token": "secret"})
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        names = {phase["name"] for phase in data["phases"]}
+        assert "api modules" in names
+        assert any(phase["kind"] == ARTIFACT for phase in data["phases"])
+        assert data["artifact_source"] in ("bundle", "pickle")
+        assert data["ready_seconds"] is not None
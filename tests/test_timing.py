@@ -0,0 +1,193 @@
+"""
+Tests for histograms and per-stage request latency metrics
+"""
+
+import tracemalloc
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+import api.main
+from api.metrics import REGISTRY, Histogram, MetricsRegistry
+from api.timing import SLOW_REQUESTS, STAGES, RequestTimings, SlowRequestLog, TimingMiddleware, timed_endpoint
+
+
+def _stage_count(endpoint: str, stage: str) -> int:
+    return REGISTRY.histogram("request_stage_duration_seconds", "").get(endpoint, stage)[0]
+
+
+class TestHistogram:
+    """Tests for Histogram"""
+
+    def test_render_cumulative_buckets(self):
+        """Test the Prometheus rendering of buckets, sum and count"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", ("endpoint",), buckets=(0.1, 1.0))
+
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "predict")
+        text = registry.render()
+
+        assert "# TYPE latency_seconds histogram" in text
+        assert 'latency_seconds_bucket{endpoint="predict",le="0.1"} 2' in text
+        assert 'latency_seconds_bucket{endpoint="predict",le="1"} 3' in text
+        assert 'latency_seconds_bucket{endpoint="predict",le="+Inf"} 4' in text
+        assert 'latency_seconds_count{endpoint="predict"} 4' in text
+        assert histogram.get("predict") == (4, 3.65)
+
+    def test_observe_does_not_allocate(self):
+        """Test that recording into an existing label set allocates nothing"""
+        histogram = Histogram("alloc_seconds", "", ("endpoint",))
+        histogram.observe(0.01, "predict")
+
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            for i in range(1000):
+                histogram.observe(i * 1e-4, "predict")
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert after - before < 1024
+
+
+class TestStageMetrics:
+    """Tests for the serving path latency metrics"""
+
+    def test_predict_records_every_stage(self, client, sample_client_request):
+        """Test that a prediction records parse, queue, prepare, infer and serialize"""
+        before = {stage: _stage_count("predict", stage) for stage in STAGES}
+
+        response = client.post("/predict", json=sample_client_request)
+
+        assert response.status_code == status.HTTP_200_OK
+        for stage in ("parse", "queue", "prepare", "infer", "serialize"):
+            assert _stage_count("predict", stage) == before[stage] + 1
+        assert _stage_count("predict", "explain") == before["explain"]
+
+    def test_explanation_records_shap_stage(self, client, sample_client_request):
+        """Test that SHAP evaluation is timed separately"""
+        before = _stage_count("feature_importance", "explain")
+
+        response = client.post("/feature-importance", json=sample_client_request)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert _stage_count("feature_importance", "explain") == before + 1
+
+    def test_batch_size_and_errors_are_counted(self, client, sample_features):
+        """Test the batch size histogram and the error counter"""
+        batch_sizes = REGISTRY.histogram("request_batch_size", "")
+        errors = REGISTRY.counter("http_request_errors_total", "", ("endpoint",))
+        count, total = batch_sizes.get("predict_batch")
+        errors_before = errors.get("predict_batch")
+
+        client.post("/predict/batch", json={"clients": [{"features": sample_features}] * 3})
+        client.post("/predict/batch", json={"clients": "invalid"})
+
+        assert batch_sizes.get("predict_batch") == (count + 1, total + 3)
+        assert errors.get("predict_batch") == errors_before + 1
+
+    def test_metrics_endpoint_exposes_histograms(self, client, sample_client_request):
+        """Test that the histograms are rendered on /metrics"""
+        client.post("/predict", json=sample_client_request)
+
+        text = client.get("/metrics").text
+
+        assert 'request_stage_duration_seconds_bucket{endpoint="predict",stage="infer",le="+Inf"}' in text
+        assert 'http_request_duration_seconds_count{endpoint="predict"}' in text
+        assert 'http_requests_total{endpoint="predict",status="200"}' in text
+
+
+@pytest.fixture
+def slow_requests(monkeypatch):
+    """
+    Capture every timed request into an empty slow request log
+
+    Returns
+    -------
+    SlowRequestLog
+        The serving process log
+    """
+    monkeypatch.setattr(SLOW_REQUESTS, "threshold", 1e-9)
+    SLOW_REQUESTS.clear()
+    yield SLOW_REQUESTS
+    SLOW_REQUESTS.clear()
+
+
+class TestServerTiming:
+    """Tests for the Server-Timing header"""
+
+    @staticmethod
+    def _client(server_timing: bool) -> TestClient:
+        app = FastAPI()
+
+        @app.get("/timed")
+        @timed_endpoint("timed")
+        async def timed():
+            return {"ok": True}
+
+        @app.get("/untimed")
+        async def untimed():
+            return {"ok": True}
+
+        app.add_middleware(TimingMiddleware, server_timing=server_timing, slow_requests=SlowRequestLog(0, 1))
+        return TestClient(app)
+
+    def test_header_lists_stages(self):
+        """Test that timed responses carry the stage breakdown in milliseconds"""
+        response = self._client(True).get("/timed")
+
+        metrics = [metric.split(";")[0] for metric in response.headers["server-timing"].split(", ")]
+        assert metrics[0] == "parse"
+        assert metrics[-1] == "total"
+        assert "serialize" in metrics
+
+    def test_header_is_optional(self):
+        """Test that the header is absent when disabled or on untimed endpoints"""
+        assert "server-timing" not in self._client(False).get("/timed").headers
+        assert "server-timing" not in self._client(True).get("/untimed").headers
+
+    def test_disabled_by_default(self, client):
+        """Test that the serving API does not send the header unless configured"""
+        assert "server-timing" not in client.get("/health").headers
+
+
+class TestSlowRequests:
+    """Tests for the slow request sampler"""
+
+    def test_ring_buffer_is_bounded(self):
+        """Test that only the most recent slow requests are kept"""
+        log = SlowRequestLog(threshold=0.5, capacity=2)
+        timings = RequestTimings(0.0)
+        timings.endpoint = "predict"
+
+        for total in (0.1, 0.6, 0.7, 0.8):
+            log.record(timings, 200, total)
+
+        assert [entry["duration_seconds"] for entry in log.entries()] == [0.8, 0.7]
+
+    def test_request_details_are_captured(self, client, sample_features, slow_requests):
+        """Test that stages, payload size and batch size are recorded"""
+        response = client.post("/predict/batch", json={"clients": [{"features": sample_features}] * 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        [entry] = slow_requests.entries()
+        assert entry["endpoint"] == "predict_batch"
+        assert entry["batch_size"] == 2
+        assert entry["payload_bytes"] == int(response.request.headers["content-length"])
+        assert {"parse", "infer", "serialize"} <= set(entry["stages"])
+
+    def test_admin_endpoint(self, client, sample_client_request, slow_requests, monkeypatch):
+        """Test that captured requests are listed on the admin endpoint"""
+        monkeypatch.setattr(api.main, "ADMIN_TOKEN", "secret")
+        client.post("/predict", json=sample_client_request)
+
+        response = client.get("/admin/slow-requests", headers={"X-Admin-Token": "secret"})
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["threshold_seconds"] == slow_requests.threshold
+        assert data["requests"][0]["endpoint"] == "predict"
+        assert client.get("/admin/slow-requests").status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,130 @@
+"""
+Tests for the warm-up routine and the /ready endpoint
+"""
+
+import threading
+
+import pytest
+from fastapi import status
+
+import api.main
+import api.predictor
+import api.warmup
+from api.predictor import CreditScorePredictor, reload_predictor
+from api.registry import CHAMPION
+from api.scheduler import PriorityScheduler
+from api.startup_report import REPORT
+from api.warmup import WarmUp, synthetic_clients, READY, FAILED, PENDING
+
+
+class TestWarmUp:
+    """Tests for WarmUp"""
+
+    def test_run_warms_every_engine(self):
+        """Test that a completed warm-up is ready and reports its duration"""
+        warmup = WarmUp(rounds=1, batch_size=4)
+
+        warmup.run()
+
+        assert warmup.status == READY
+        assert warmup.ready
+        assert warmup.engines == [CHAMPION]
+        assert warmup.seconds > 0
+        assert REPORT.as_dict()["warmup_seconds"] > 0
+
+    def test_singles_use_every_scoring_thread(self, monkeypatch):
+        """Test that single-client scoring is spread over as many threads as the class may use"""
+        scheduler = PriorityScheduler(workers=6, max_running={"scoring": 3})
+        monkeypatch.setattr(api.warmup, "get_scheduler", lambda: scheduler)
+        threads = []
+        score = CreditScorePredictor.score
+
+        def _score(self, *args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return score(self, *args, **kwargs)
+
+        monkeypatch.setattr(CreditScorePredictor, "score", _score)
+        try:
+            WarmUp(rounds=1, batch_size=2).run()
+        finally:
+            scheduler.shutdown()
+
+        assert len(threads) == 3
+        assert len(set(threads)) == 3
+
+    def test_reloaded_predictor_is_warmed(self, monkeypatch):
+        """Test that a reloaded predictor is warmed up before it serves"""
+        # Reloads here replace no predictor; the serving one is restored after the test
+        monkeypatch.setattr(api.predictor, "_predictor", None)
+        scored = []
+        score = CreditScorePredictor.score
+
+        def _score(self, *args, **kwargs):
+            scored.append((self, api.predictor._predictor is self))
+            return score(self, *args, **kwargs)
+
+        monkeypatch.setattr(CreditScorePredictor, "score", _score)
+
+        reloaded = reload_predictor()
+
+        assert (reloaded, False) in scored
+
+    def test_explanations_are_warmed_on_request(self):
+        """Test that the explainer is loaded when explanations are warmed up"""
+        warmup = WarmUp(rounds=1, batch_size=2, explain=True)
+
+        warmup.run()
+
+        assert warmup.ready
+        assert api.main.get_predictor().explainer is not None
+
+    def test_failure_is_not_ready(self, monkeypatch):
+        """Test that a failing warm-up never reports ready"""
+        def _broken():
+            raise RuntimeError("no model")
+
+        monkeypatch.setattr(api.warmup, "get_predictor", _broken)
+        warmup = WarmUp(rounds=1)
+
+        warmup.run()
+
+        assert warmup.status == FAILED
+        assert warmup.error == "no model"
+
+    def test_synthetic_clients(self):
+        """Test the synthetic client mix"""
+        clients = synthetic_clients(["A", "B"], 4)
+
+        assert len(clients) == 4
+        assert clients[0] == {}
+        assert clients[1] == {"A": 0.0, "B": 0.0}
+        assert set(clients[2]) == {"A", "B"}
+
+
+class TestReadinessEndpoint:
+    """Tests for the /ready endpoint"""
+
+    def test_not_ready_before_warmup(self, client, monkeypatch):
+        """Test that /ready is 503 while /health already answers"""
+        monkeypatch.setattr(api.main, "WARMUP_STATE", WarmUp(rounds=1))
+
+        ready = client.get("/ready")
+        health = client.get("/health")
+
+        assert ready.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert ready.json()["status"] == PENDING
+        assert health.status_code == status.HTTP_200_OK
+
+    def test_ready_after_warmup(self, client, monkeypatch):
+        """Test that /ready is 200 with the warm-up duration once warmed up"""
+        warmup = WarmUp(rounds=1, batch_size=2)
+        warmup.run()
+        monkeypatch.setattr(api.main, "WARMUP_STATE", warmup)
+
+        response = client.get("/ready")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["status"] == READY
+        assert data["warmup_seconds"] == pytest.approx(warmup.seconds)
+        assert data["engines"] == [CHAMPION]